@@ -0,0 +1,237 @@
+"""Bounded worker pool for blocking GitHub and filesystem control actions.
+
+Control actions such as ``generateTerraformGraph`` or ``setupRepositoryWorkspace``
+shell out to git, terraform and rover, or call the GitHub API with urllib. Run on
+the event loop, one of them freezes every chat stream in the runtime process, so
+``invocations`` hands them to this pool instead.
+
+Each action name gets its own lane with a concurrency limit. Jobs beyond the
+limit wait in a FIFO queue for that lane and do not take a worker thread, so a
+burst of terraform graphs cannot starve cheap actions like ``getFileDiff``.
+Cancelling a queued job removes it from its lane. Jobs run in a copy of the
+submitting context, so timings and the workspace binding carry over, with
+their subprocesses registered under the job's session. ``cancelSession`` thus
+kills a running job's git or terraform process group through
+``cancel_session_processes`` and the job fails with ``ProcessCancelled`` at
+that step. GitHub API calls made with urllib are not interruptible and finish
+within their own timeouts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from threading import RLock
+from typing import Any, TypeVar
+
+from agents.cancellation import process_session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_DEFAULT_CONTROL_ACTION_WORKERS = 8
+_DEFAULT_CONTROL_ACTION_LIMIT = 4
+_DEFAULT_ACTION_LIMITS = {
+    "generateTerraformGraph": 2,
+    "setupRepositoryWorkspace": 4,
+    "downloadSourceZip": 2,
+}
+
+
+def _env_int(name: str, default: int) -> int:
+    raw_value = os.environ.get(name, str(default))
+    try:
+        return max(1, int(raw_value))
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw_value, default)
+        return default
+
+
+def control_action_workers() -> int:
+    return _env_int("CONTROL_ACTION_WORKERS", _DEFAULT_CONTROL_ACTION_WORKERS)
+
+
+def control_action_default_limit() -> int:
+    return _env_int("CONTROL_ACTION_DEFAULT_LIMIT", _DEFAULT_CONTROL_ACTION_LIMIT)
+
+
+def control_action_limits() -> dict[str, int]:
+    """Per-action limits, overridable with ``CONTROL_ACTION_LIMITS=action=n,...``."""
+    limits = dict(_DEFAULT_ACTION_LIMITS)
+    raw_value = os.environ.get("CONTROL_ACTION_LIMITS", "")
+    for entry in raw_value.split(","):
+        if not entry.strip():
+            continue
+        name, _, value = entry.partition("=")
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning("Invalid CONTROL_ACTION_LIMITS entry %r; ignoring it", entry)
+    return limits
+
+
+class _Job:
+    __slots__ = ("action", "session_id", "call", "context", "future", "queued_at")
+
+    def __init__(self, action: str, session_id: str, call: Callable[[], Any]) -> None:
+        self.action = action
+        self.session_id = session_id
+        self.call = call
+        self.context = copy_context()
+        self.future: Future = Future()
+        self.queued_at = time.monotonic()
+
+
+class ControlActionPool:
+    """Run blocking control actions on worker threads, limited per action name."""
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        limits: dict[str, int] | None = None,
+        default_limit: int | None = None,
+    ) -> None:
+        self._max_workers = max_workers or control_action_workers()
+        self._limits = control_action_limits() if limits is None else dict(limits)
+        self._default_limit = default_limit or control_action_default_limit()
+        self._lock = RLock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._queues: dict[str, deque[_Job]] = {}
+        self._running: dict[str, list[_Job]] = {}
+        self._stats: dict[str, dict[str, float]] = {}
+
+    def limit(self, action: str) -> int:
+        return min(self._limits.get(action, self._default_limit), self._max_workers)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="control-action")
+            return self._executor
+
+    def _action_stats(self, action: str) -> dict[str, float]:
+        return self._stats.setdefault(
+            action,
+            {
+                "submitted": 0,
+                "completed": 0,
+                "failed": 0,
+                "cancelled": 0,
+                "peakQueued": 0,
+                "waitSeconds": 0.0,
+                "runSeconds": 0.0,
+            },
+        )
+
+    def submit(self, action: str, session_id: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> Future:
+        """Queue ``func`` in the lane for ``action`` and return its future."""
+        job = _Job(action, session_id or "", partial(func, *args, **kwargs))
+        with self._lock:
+            queue = self._queues.setdefault(action, deque())
+            queue.append(job)
+            stats = self._action_stats(action)
+            stats["submitted"] += 1
+            stats["peakQueued"] = max(stats["peakQueued"], len(queue))
+        job.future.add_done_callback(partial(self._discard_if_cancelled, job))
+        self._dispatch(action)
+        return job.future
+
+    async def run(self, action: str, session_id: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``func`` in the lane for ``action`` and return its result.
+
+        If the caller is cancelled while the job is still queued, the job is
+        dropped before it starts.
+        """
+        future = self.submit(action, session_id, func, *args, **kwargs)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def cancel_session(self, session_id: str | None) -> int:
+        """Drop queued jobs for ``session_id`` and return how many were cancelled.
+
+        Running jobs are stopped by ``cancel_session_processes`` instead.
+        """
+        if not session_id:
+            return 0
+        with self._lock:
+            jobs = [job for queue in self._queues.values() for job in queue if job.session_id == session_id]
+        return sum(1 for job in jobs if job.future.cancel())
+
+    def _discard_if_cancelled(self, job: _Job, future: Future) -> None:
+        if not future.cancelled():
+            return
+        with self._lock:
+            queue = self._queues.get(job.action)
+            if queue is not None and job in queue:
+                queue.remove(job)
+                self._action_stats(job.action)["cancelled"] += 1
+
+    def _dispatch(self, action: str) -> None:
+        ready = []
+        with self._lock:
+            queue = self._queues.get(action)
+            running = self._running.setdefault(action, [])
+            while queue and len(running) < self.limit(action):
+                job = queue.popleft()
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                running.append(job)
+                self._action_stats(action)["waitSeconds"] += time.monotonic() - job.queued_at
+                ready.append(job)
+        for job in ready:
+            self._pool().submit(self._run_job, job)
+
+    def _run_job(self, job: _Job) -> None:
+        started = time.monotonic()
+        failed = False
+        try:
+            result = job.context.run(_call_in_session, job.session_id, job.call)
+        except BaseException as exc:
+            failed = True
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(result)
+        finally:
+            with self._lock:
+                self._running[job.action].remove(job)
+                stats = self._action_stats(job.action)
+                stats["failed" if failed else "completed"] += 1
+                stats["runSeconds"] += time.monotonic() - started
+            self._dispatch(job.action)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            actions = {
+                action: {
+                    **{key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()},
+                    "queued": len(self._queues.get(action, ())),
+                    "running": len(self._running.get(action, ())),
+                    "limit": self.limit(action),
+                }
+                for action, stats in self._stats.items()
+            }
+            return {
+                "workers": self._max_workers,
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "running": sum(len(jobs) for jobs in self._running.values()),
+                "actions": actions,
+            }
+
+
+def _call_in_session(session_id: str, call: Callable[[], T]) -> T:
+    with process_session(session_id):
+        return call()
+
+
+control_actions = ControlActionPool()
@@ -6,6 +6,7 @@ from agents.architect.config import DESCRIPTION, NAME
 from agents.architect.output import ArchitectOutput
 from agents.architect.system_prompt import SYSTEM_PROMPT
 from agents.architect.tools import create_tools
+from agents.context_compaction import SupersededToolResults
 from agents.runtime import AgentRuntimeTools
 from agents.skills.terrashark_plugin import create_terrashark_plugin
 from agents.tool_adapter import create_agent_text_tool
@@ -19,6 +20,7 @@ def create_agent(model, runtime_tools: AgentRuntimeTools, trace_attributes: dict
         system_prompt=SYSTEM_PROMPT,
         tools=create_tools(runtime_tools),
         plugins=[create_terrashark_plugin()],
+        hooks=[SupersededToolResults()],
         callback_handler=None,
         trace_attributes=trace_attributes,
     )
@@ -2,6 +2,7 @@
 
 NAME = "architect_agent"
 DESCRIPTION = "Turns infrastructure intent into architecture plans, resource graphs, and diagrams."
+MODEL_TIER = "primary"
 TOOL_NAMES = (
     "handoff_to_user",
     "opentofu",
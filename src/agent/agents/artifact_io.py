@@ -0,0 +1,166 @@
+"""Bounded thread pool for runtime artifact reads and writes.
+
+Checkpoints and attachments live on the shared files mount, where a single write
+can take hundreds of milliseconds. Running that I/O on the event loop stalls every
+other session streaming from the same process, so callers hand it to this pool
+instead. The number of queued jobs is bounded; when it is full, callers wait for
+a slot without blocking the loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from threading import BoundedSemaphore, RLock
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_DEFAULT_ARTIFACT_IO_WORKERS = 4
+_DEFAULT_ARTIFACT_IO_MAX_PENDING = 64
+
+
+def _env_int(name: str, default: int) -> int:
+    raw_value = os.environ.get(name, str(default))
+    try:
+        return max(1, int(raw_value))
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw_value, default)
+        return default
+
+
+def artifact_io_workers() -> int:
+    return _env_int("ARTIFACT_IO_WORKERS", _DEFAULT_ARTIFACT_IO_WORKERS)
+
+
+def artifact_io_max_pending() -> int:
+    return _env_int("ARTIFACT_IO_MAX_PENDING", _DEFAULT_ARTIFACT_IO_MAX_PENDING)
+
+
+class ArtifactIOExecutor:
+    """Run blocking artifact I/O on worker threads with a bounded backlog.
+
+    ``run`` awaits the result. ``write_behind`` returns once the job is queued and
+    records it under a key, usually the session id, so a later reader can call
+    ``wait_for`` to see its own writes.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_pending: int | None = None) -> None:
+        self._max_workers = max_workers or artifact_io_workers()
+        self._max_pending = max_pending or artifact_io_max_pending()
+        self._slots = BoundedSemaphore(self._max_pending)
+        self._lock = RLock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending_by_key: dict[str, list[Future]] = {}
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "pending": 0, "peakPending": 0, "waitedForSlot": 0}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="artifact-io")
+            return self._executor
+
+    async def _acquire_slot(self) -> None:
+        if self._slots.acquire(blocking=False):
+            return
+        with self._lock:
+            self._stats["waitedForSlot"] += 1
+        acquired = asyncio.get_running_loop().run_in_executor(None, self._slots.acquire)
+        try:
+            await asyncio.shield(acquired)
+        except asyncio.CancelledError:
+            acquired.add_done_callback(lambda _future: self._slots.release())
+            raise
+
+    def _submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["pending"] += 1
+            self._stats["peakPending"] = max(self._stats["peakPending"], self._stats["pending"])
+        try:
+            future = self._pool().submit(partial(func, *args, **kwargs))
+        except BaseException:
+            self._finish(None)
+            raise
+        future.add_done_callback(self._finish)
+        return future
+
+    def _finish(self, future: Future | None) -> None:
+        failed = future is None or future.cancelled() or future.exception() is not None
+        with self._lock:
+            self._stats["pending"] -= 1
+            self._stats["failed" if failed else "completed"] += 1
+        self._slots.release()
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``func`` on a worker thread and return its result."""
+        await self._acquire_slot()
+        return await asyncio.wrap_future(self._submit(func, *args, **kwargs))
+
+    async def write_behind(self, key: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queue ``func`` without waiting for it; failures are logged.
+
+        Jobs sharing a key run in submission order: each one first waits for the
+        jobs queued before it. The pool dequeues in FIFO order, so those earlier
+        jobs are already running or done and the wait cannot deadlock.
+        """
+        await self._acquire_slot()
+        return self._queue_behind(key, func, *args, **kwargs)
+
+    def write_behind_nowait(self, key: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future | None:
+        """``write_behind`` for synchronous callers; returns None instead of waiting when the backlog is full."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        return self._queue_behind(key, func, *args, **kwargs)
+
+    def _queue_behind(self, key: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            previous = list(self._pending_by_key.get(key, ()))
+            future = self._submit(_after, previous, partial(func, *args, **kwargs))
+            self._pending_by_key.setdefault(key, []).append(future)
+        future.add_done_callback(partial(self._forget, key))
+        return future
+
+    def _forget(self, key: str, future: Future) -> None:
+        with self._lock:
+            pending = self._pending_by_key.get(key)
+            if pending is not None and future in pending:
+                pending.remove(future)
+                if not pending:
+                    self._pending_by_key.pop(key, None)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Write-behind artifact job for %s failed", key, exc_info=future.exception())
+
+    async def wait_for(self, key: str) -> None:
+        """Wait until write-behind jobs queued under ``key`` have finished."""
+        with self._lock:
+            pending = list(self._pending_by_key.get(key, ()))
+        if pending:
+            await asyncio.gather(*(asyncio.wrap_future(future) for future in pending), return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **self._stats,
+                "writeBehindPending": sum(len(futures) for futures in self._pending_by_key.values()),
+                "maxPending": self._max_pending,
+                "workers": self._max_workers,
+            }
+
+
+def _after(previous: list[Future], job: Callable[[], T]) -> T:
+    for future in previous:
+        try:
+            future.result()
+        except BaseException:
+            pass
+    return job()
+
+
+artifact_io = ArtifactIOExecutor()
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import hashlib
+import logging
 import os
 import re
 from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
 
 
 def safe_session_id(value: str) -> str:
@@ -22,8 +27,94 @@ def shared_artifact_base_path() -> Path:
     )
 
 
+def session_artifact_path(session_id: str, category: str, base_path: Path | None = None) -> Path:
+    """Like ``session_artifact_dir`` without creating the directory."""
+    root = base_path or shared_artifact_base_path()
+    return root / "sessions" / safe_session_id(session_id) / safe_artifact_category(category)
+
+
 def session_artifact_dir(session_id: str, category: str, base_path: Path | None = None) -> Path:
+    path = session_artifact_path(session_id, category, base_path)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def user_artifact_dir(user_id: str, category: str, base_path: Path | None = None) -> Path:
+    """Per-user artifact directory keyed by a hash so raw user ids never appear in paths."""
     root = base_path or shared_artifact_base_path()
-    path = root / "sessions" / safe_session_id(session_id) / safe_artifact_category(category)
+    user_hash = hashlib.sha256((user_id or "anonymous").encode("utf-8")).hexdigest()[:24]
+    path = root / "users" / user_hash / safe_artifact_category(category)
     path.mkdir(parents=True, exist_ok=True)
     return path
+
+
+def shared_files_object_key(file_path: Path) -> str:
+    """Map a path on the shared files mount to its object key in the backing bucket."""
+    mount_path = shared_artifact_base_path().resolve()
+    bucket_prefix = os.environ.get("SHARED_FILES_BUCKET_PREFIX", "").strip("/")
+    root_directory = os.environ.get("SHARED_FILES_ROOT_DIRECTORY", "").strip("/")
+    resolved_path = file_path.resolve()
+    try:
+        relative_path = resolved_path.relative_to(mount_path)
+    except ValueError:
+        return ""
+    relative_key = relative_path.as_posix().lstrip("/")
+    if root_directory:
+        relative_key = f"{root_directory}/{relative_key}".strip("/")
+    return f"{bucket_prefix}/{relative_key}".strip("/") if bucket_prefix else relative_key
+
+
+def _upload_marker(file_path: Path) -> Path:
+    return file_path.with_name(f"{file_path.name}.uploaded")
+
+
+def _file_signature(file_path: Path) -> str:
+    file_stat = file_path.stat()
+    return f"{file_stat.st_size}:{file_stat.st_mtime_ns}"
+
+
+def presigned_artifact_url(
+    file_path: Path,
+    mime_type: str | None,
+    expires_in: int = 3600,
+    reuse_upload: bool = False,
+) -> tuple[str, str, int | None]:
+    """Upload an artifact to the shared files bucket and return a presigned GET URL.
+
+    With ``reuse_upload``, a successful upload leaves a ``.uploaded`` marker next to
+    the file, and later calls for the same unchanged file skip the upload.
+
+    Returns empty values when no bucket is configured, the file is outside the
+    shared files mount or the upload fails, so callers can fall back to another
+    delivery mode.
+    """
+    bucket_name = os.environ.get("SHARED_FILES_BUCKET_NAME", "").strip()
+    if not bucket_name:
+        return "", "", None
+
+    object_key = shared_files_object_key(file_path)
+    if not object_key:
+        return "", "", None
+
+    try:
+        import boto3
+
+        s3_client = boto3.client("s3")
+        marker = _upload_marker(file_path)
+        signature = _file_signature(file_path)
+        if not (reuse_upload and marker.is_file() and marker.read_text(encoding="utf-8") == signature):
+            extra_args: dict[str, Any] | None = {"ContentType": mime_type} if mime_type else None
+            if extra_args:
+                s3_client.upload_file(str(file_path), bucket_name, object_key, ExtraArgs=extra_args)
+            else:
+                s3_client.upload_file(str(file_path), bucket_name, object_key)
+            if reuse_upload:
+                marker.write_text(signature, encoding="utf-8")
+        params: dict[str, Any] = {"Bucket": bucket_name, "Key": object_key}
+        if mime_type:
+            params["ResponseContentType"] = mime_type
+        url = s3_client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_in)
+        return url, object_key, expires_in
+    except Exception:
+        logger.exception("Failed to upload or presign artifact %s", object_key)
+        return "", object_key, None
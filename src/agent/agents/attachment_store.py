@@ -0,0 +1,127 @@
+"""Content-addressed store for prompt attachments.
+
+Attachments are stored once per user under their SHA-256 digest, so an image the
+frontend resends on every turn is written to the shared mount only the first
+time. Each referencing session owns a small marker file under
+``refs/<digest>/``, holding the name, type and size it stored the blob with.
+
+The mount is shared by separate runtime processes and may be S3-backed, so
+neither a shared index nor file locks are used. A session only ever creates or
+removes its own marker, and a blob is deleted only by the release that manages
+to remove the then-empty ``refs/<digest>/`` directory. A ``put`` racing that
+release recreates the directory and, if the blob is already gone, rewrites it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_MAX_PUT_ATTEMPTS = 3
+
+
+def attachment_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _session_marker(session_id: str) -> str:
+    return hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:32]
+
+
+class AttachmentStore:
+    """Blobs under ``blobs/<digest[:2]>/<digest><ext>`` plus per-session reference markers."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def put(self, content: bytes, *, name: str, content_type: str, session_id: str) -> dict:
+        """Store ``content`` if it is new and reference it from ``session_id``."""
+        digest = attachment_digest(content)
+        marker = {"session": session_id, "name": name, "type": content_type, "size": len(content)}
+        self._add_ref(digest, session_id, marker)
+        path = self._existing_blob(digest)
+        deduplicated = path is not None
+        if path is None:
+            path = self._blob_path(digest, os.path.splitext(name)[1].lower()[:16])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._write_atomic(path, content)
+        return {"sha256": digest, "path": path, "size": len(content), "deduplicated": deduplicated}
+
+    def release_session(self, session_id: str) -> dict:
+        """Drop ``session_id`` references and delete blobs left unreferenced."""
+        released = 0
+        deleted = 0
+        for marker_path in (self.root / "refs").glob(f"*/{_session_marker(session_id)}"):
+            try:
+                marker_path.unlink()
+            except FileNotFoundError:
+                continue
+            released += 1
+            try:
+                # Fails while any other session still holds a marker in the directory.
+                marker_path.parent.rmdir()
+            except OSError:
+                continue
+            for blob in self._blobs(marker_path.parent.name):
+                blob.unlink(missing_ok=True)
+            deleted += 1
+        return {"released": released, "deleted": deleted}
+
+    def entries(self) -> dict[str, dict]:
+        entries: dict[str, dict] = {}
+        for marker_path in sorted((self.root / "refs").glob("*/*")):
+            if marker_path.name.startswith("."):
+                continue
+            try:
+                marker = json.loads(marker_path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                logger.warning("Ignoring unreadable attachment reference %s", marker_path)
+                continue
+            entry = entries.setdefault(
+                marker_path.parent.name,
+                {"size": marker.get("size", 0), "type": marker.get("type", ""), "names": [], "sessions": []},
+            )
+            if marker.get("name") not in entry["names"]:
+                entry["names"].append(marker.get("name"))
+            entry["sessions"].append(marker.get("session"))
+        return entries
+
+    def _add_ref(self, digest: str, session_id: str, marker: dict) -> None:
+        ref_dir = self.root / "refs" / digest
+        payload = json.dumps(marker, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        for attempt in range(_MAX_PUT_ATTEMPTS):
+            ref_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                self._write_atomic(ref_dir / _session_marker(session_id), payload)
+                return
+            except FileNotFoundError:
+                # A concurrent release removed the directory between mkdir and the write.
+                if attempt == _MAX_PUT_ATTEMPTS - 1:
+                    raise
+
+    def _existing_blob(self, digest: str) -> Path | None:
+        return next(iter(self._blobs(digest)), None)
+
+    def _blobs(self, digest: str) -> list[Path]:
+        directory = self.root / "blobs" / digest[:2]
+        return [path for path in directory.glob(f"{digest}*") if not path.name.startswith(".")]
+
+    def _blob_path(self, digest: str, extension: str) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}{extension}"
+
+    @staticmethod
+    def _write_atomic(path: Path, payload: bytes) -> None:
+        fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
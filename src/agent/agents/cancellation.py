@@ -1,18 +1,54 @@
-"""Session-scoped cancellation for concurrently running Strands agents."""
+"""Session-scoped cancellation for concurrently running Strands agents.
+
+Besides agents, the registry tracks the child processes that tools start with
+``run_process``. Each one runs in its own process group, so cancelling a
+session can signal the whole tree (terraform and its provider plugins, go test
+and its test binaries) rather than only the direct child. Cancelled processes
+get SIGTERM, then SIGKILL if they are still running after a grace period.
+``StreamedProcess`` is the asyncio counterpart of ``run_process`` and hands
+output to the caller line by line instead of capturing it.
+
+Processes are registered under the bound workspace's session unless a caller
+such as the control-action pool scopes them with ``process_session``.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import os
+import signal
+import subprocess
 from contextlib import contextmanager
-from threading import RLock
-from typing import Iterator, Protocol
+from contextvars import ContextVar
+from threading import RLock, Timer
+from typing import AsyncIterator, Iterator, Protocol
+
+from agents.workspace import workspace_session_id
+
+TERMINATE_GRACE_SECONDS = 5.0
+_READ_CHUNK_BYTES = 64 * 1024
+_LINE_QUEUE_SIZE = 1000
 
 
 class CancellableAgent(Protocol):
     def cancel(self) -> None: ...
 
 
+class ProcessCancelled(subprocess.SubprocessError):
+    """Raised by ``run_process`` when the session was cancelled while the process ran."""
+
+    def __init__(self, cmd: list[str], output: str = "", stderr: str = "") -> None:
+        super().__init__(f"{cmd[0] if cmd else 'process'} was cancelled")
+        self.cmd = cmd
+        self.output = output
+        self.stderr = stderr
+
+
 _lock = RLock()
 _agents_by_session: dict[str, set[CancellableAgent]] = {}
+_processes_by_session: dict[str, set[subprocess.Popen | asyncio.subprocess.Process]] = {}
+_cancelled_processes: set[subprocess.Popen | asyncio.subprocess.Process] = set()
+_process_session: ContextVar[str | None] = ContextVar("process_session", default=None)
 
 
 @contextmanager
@@ -44,3 +80,215 @@ def cancel_session_agents(session_id: str | None) -> int:
     for agent in agents:
         agent.cancel()
     return len(agents)
+
+
+@contextmanager
+def process_session(session_id: str | None) -> Iterator[None]:
+    """Register processes started in this context under ``session_id``."""
+    token = _process_session.set(session_id or None)
+    try:
+        yield
+    finally:
+        _process_session.reset(token)
+
+
+def _default_session_id() -> str:
+    return _process_session.get() or workspace_session_id()
+
+
+def _signal_group(process: subprocess.Popen | asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        os.killpg(process.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_process(
+    command: list[str],
+    *,
+    cwd: str | None = None,
+    env: dict[str, str] | None = None,
+    timeout: float | None = None,
+    session_id: str | None = None,
+) -> subprocess.CompletedProcess[str]:
+    """Run ``command`` like ``subprocess.run(capture_output=True, text=True)``, cancellable per session.
+
+    The process gets its own process group, registered under ``session_id``
+    (the ``process_session`` or bound workspace's session by default). On timeout the whole group is
+    killed and ``subprocess.TimeoutExpired`` is raised as ``subprocess.run``
+    would; if the session was cancelled meanwhile, ``ProcessCancelled`` is
+    raised with the output captured so far.
+    """
+    session_id = session_id or _default_session_id()
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+    )
+    with _lock:
+        _processes_by_session.setdefault(session_id, set()).add(process)
+    try:
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _signal_group(process, signal.SIGKILL)
+            stdout, stderr = process.communicate()
+            raise subprocess.TimeoutExpired(command, timeout, output=stdout, stderr=stderr) from None
+        except BaseException:
+            _signal_group(process, signal.SIGKILL)
+            process.wait()
+            raise
+        with _lock:
+            cancelled = process in _cancelled_processes
+        if cancelled:
+            raise ProcessCancelled(command, stdout, stderr)
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+    finally:
+        _unregister(session_id, process)
+
+
+def _unregister(session_id: str, process: subprocess.Popen | asyncio.subprocess.Process) -> None:
+    with _lock:
+        _cancelled_processes.discard(process)
+        processes = _processes_by_session.get(session_id)
+        if processes is not None:
+            processes.discard(process)
+            if not processes:
+                _processes_by_session.pop(session_id, None)
+
+
+async def _read_lines(reader: asyncio.StreamReader, stream: str, lines: asyncio.Queue) -> None:
+    # Read in chunks rather than readline() so a huge single-line JSON report cannot overrun the reader.
+    pending = b""
+    while chunk := await reader.read(_READ_CHUNK_BYTES):
+        *complete, pending = (pending + chunk).split(b"\n")
+        if len(pending) >= _READ_CHUNK_BYTES:
+            complete.append(pending)
+            pending = b""
+        for line in complete:
+            await lines.put((stream, line.decode(errors="replace").rstrip("\r")))
+    if pending:
+        await lines.put((stream, pending.decode(errors="replace").rstrip("\r")))
+    await lines.put((stream, None))
+
+
+class StreamedProcess:
+    """Run ``command`` on the event loop and iterate its output as ``(stream, line)`` pairs.
+
+    Registration, timeout and cancellation behave as in ``run_process``, except
+    that ``subprocess.TimeoutExpired`` and ``ProcessCancelled`` carry no output:
+    the caller has already seen it. ``returncode`` is set once iteration
+    finishes normally.
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        *,
+        cwd: str | None = None,
+        env: dict[str, str] | None = None,
+        timeout: float | None = None,
+        session_id: str | None = None,
+    ) -> None:
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.timeout = timeout
+        self.session_id = session_id
+        self.returncode: int | None = None
+
+    def __aiter__(self) -> AsyncIterator[tuple[str, str]]:
+        return self._lines()
+
+    async def _lines(self) -> AsyncIterator[tuple[str, str]]:
+        session_id = self.session_id or _default_session_id()
+        loop = asyncio.get_running_loop()
+        deadline = None if self.timeout is None else loop.time() + self.timeout
+        process = await asyncio.create_subprocess_exec(
+            *self.command,
+            cwd=self.cwd,
+            env=self.env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        with _lock:
+            _processes_by_session.setdefault(session_id, set()).add(process)
+        # Bounded, so a consumer that falls behind stalls the process instead of buffering its output.
+        lines: asyncio.Queue = asyncio.Queue(maxsize=_LINE_QUEUE_SIZE)
+        readers = [
+            asyncio.create_task(_read_lines(process.stdout, "stdout", lines)),
+            asyncio.create_task(_read_lines(process.stderr, "stderr", lines)),
+        ]
+        try:
+            open_streams = len(readers)
+            while open_streams:
+                remaining = None if deadline is None else deadline - loop.time()
+                try:
+                    stream, line = await asyncio.wait_for(lines.get(), remaining)
+                except TimeoutError:
+                    raise subprocess.TimeoutExpired(self.command, self.timeout) from None
+                if line is None:
+                    open_streams -= 1
+                else:
+                    yield stream, line
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                self.returncode = await asyncio.wait_for(process.wait(), remaining)
+            except TimeoutError:
+                raise subprocess.TimeoutExpired(self.command, self.timeout) from None
+            with _lock:
+                cancelled = process in _cancelled_processes
+            if cancelled:
+                raise ProcessCancelled(self.command)
+        finally:
+            for reader in readers:
+                reader.cancel()
+            _unregister(session_id, process)
+            if process.returncode is None:
+                _signal_group(process, signal.SIGKILL)
+                await process.wait()
+
+
+def _running(process: subprocess.Popen | asyncio.subprocess.Process) -> bool:
+    if isinstance(process, subprocess.Popen):
+        return process.poll() is None
+    return process.returncode is None
+
+
+def cancel_session_processes(session_id: str | None, grace_seconds: float = TERMINATE_GRACE_SECONDS) -> int:
+    """SIGTERM the session's running process groups, SIGKILL survivors later; returns how many were signalled."""
+    if not session_id:
+        return 0
+    with _lock:
+        processes = [process for process in _processes_by_session.get(session_id, ()) if _running(process)]
+        _cancelled_processes.update(processes)
+    for process in processes:
+        _signal_group(process, signal.SIGTERM)
+    if processes:
+        # The control action returns right away; stragglers are killed off the request path.
+        timer = Timer(grace_seconds, _kill_survivors, args=(processes,))
+        timer.daemon = True
+        timer.start()
+    return len(processes)
+
+
+def _group_alive(pgid: int) -> bool:
+    try:
+        os.killpg(pgid, 0)
+    except (ProcessLookupError, PermissionError):
+        return False
+    return True
+
+
+def _kill_survivors(processes: list[subprocess.Popen | asyncio.subprocess.Process]) -> None:
+    for process in processes:
+        # An unreaped leader pins the group id. Once it is reaped, signal the group only if children
+        # still hold it (they may keep the output pipes open); an empty group's id can be reused.
+        if process.returncode is not None and not _group_alive(process.pid):
+            continue
+        _signal_group(process, signal.SIGKILL)
@@ -0,0 +1,342 @@
+"""Incremental on-disk store for agent snapshot checkpoints.
+
+A checkpoint directory holds:
+
+- ``manifest.json``: small pointer file, rewritten atomically on every save.
+- ``head-<digest>.json[.gz]``: the snapshot without messages, app data and
+  timestamps. It is content addressed, so it is only written when the system
+  prompt or agent state changes.
+- ``base-<generation>.json[.gz]``: the full message list at the last compaction.
+- ``journal-<generation>.jsonl[.gz]``: appended message deltas since the base.
+
+Saving a turn appends only the new messages. When the history no longer extends
+the saved one, or the journal has grown past the compaction threshold, a new
+base generation is written instead. The history extends the saved one only if
+the digest over all saved messages still matches. A conversation manager that
+trims the history, or rewrites a message in the middle of it, therefore
+triggers a rebase.
+"""
+
+from __future__ import annotations
+
+import copy
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from threading import RLock
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+LEGACY_CHECKPOINT_NAME = "latest.json"
+CHECKPOINT_FORMAT = 2
+_DEFAULT_COMPACT_EVERY = 20
+_MAX_CACHED_SESSIONS = 16
+
+_cache_lock = RLock()
+_saved_states: OrderedDict[str, "_SavedState"] = OrderedDict()
+
+
+def checkpoint_compact_every() -> int:
+    raw_value = os.environ.get("AGENT_CHECKPOINT_COMPACT_EVERY", str(_DEFAULT_COMPACT_EVERY))
+    try:
+        return max(1, int(raw_value))
+    except ValueError:
+        logger.warning(
+            "Invalid AGENT_CHECKPOINT_COMPACT_EVERY=%r; using %s",
+            raw_value,
+            _DEFAULT_COMPACT_EVERY,
+        )
+        return _DEFAULT_COMPACT_EVERY
+
+
+def checkpoint_compression_enabled() -> bool:
+    return os.environ.get("AGENT_CHECKPOINT_COMPRESSION", "gzip").lower() not in {"", "none", "false"}
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _digest(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+def _message_digest(message: Any) -> str:
+    return _digest(json.dumps(message, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+
+
+def _prefix_digests(messages: list, count: int) -> tuple[str, str]:
+    """Digests of ``messages[:count]`` and of all ``messages``, computed in one pass."""
+    hasher = hashlib.sha256()
+    prefix = ""
+    for index, message in enumerate(messages):
+        if index == count:
+            prefix = hasher.hexdigest()[:32]
+        hasher.update(_message_digest(message).encode("ascii"))
+    full = hasher.hexdigest()[:32]
+    return (full if count >= len(messages) else prefix), full
+
+
+@dataclass
+class _SavedState:
+    generation: int
+    base: str
+    journal: str
+    journal_entries: int
+    journal_bytes: int
+    message_count: int
+    prefix_digest: str
+    head: str
+    snapshot: dict | None = None
+
+
+class CheckpointStore:
+    """Read and write incremental snapshot checkpoints in one directory."""
+
+    def __init__(self, directory: Path, compress: bool | None = None, compact_every: int | None = None) -> None:
+        self.directory = Path(directory)
+        self.compress = checkpoint_compression_enabled() if compress is None else compress
+        self.compact_every = checkpoint_compact_every() if compact_every is None else max(1, compact_every)
+        self._suffix = ".gz" if self.compress else ""
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / MANIFEST_NAME
+
+    def save(self, snapshot: dict) -> Path:
+        """Persist ``snapshot`` and return the manifest path."""
+        data = snapshot.get("data") or {}
+        messages = list(data.get("messages") or [])
+        head = {
+            **{key: value for key, value in snapshot.items() if key not in {"data", "app_data", "created_at"}},
+            "data": {key: value for key, value in data.items() if key != "messages"},
+        }
+        head_bytes = _encode(head)
+        head_name = f"head-{_digest(head_bytes)}.json{self._suffix}"
+        if not (self.directory / head_name).exists():
+            self._write_atomic(head_name, head_bytes)
+
+        previous = self._saved_state()
+        saved_prefix, prefix_digest = _prefix_digests(messages, previous.message_count if previous else 0)
+        if (
+            previous is not None
+            and previous.journal_entries < self.compact_every
+            and len(messages) >= previous.message_count
+            and saved_prefix == previous.prefix_digest
+        ):
+            state = self._append_delta(previous, messages)
+        else:
+            state = self._write_base(previous, messages)
+        state.prefix_digest = prefix_digest
+        state.head = head_name
+        state.snapshot = snapshot
+
+        manifest = {
+            "format": CHECKPOINT_FORMAT,
+            "generation": state.generation,
+            "base": state.base,
+            "journal": state.journal,
+            "journalEntries": state.journal_entries,
+            "journalBytes": state.journal_bytes,
+            "messageCount": state.message_count,
+            "prefixDigest": state.prefix_digest,
+            "head": state.head,
+            "createdAt": snapshot.get("created_at", ""),
+            "appData": snapshot.get("app_data", {}),
+        }
+        self._write_atomic(MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"), compress=False)
+        self._remember(state)
+        if previous is not None:
+            self._remove_stale(previous, state)
+        return self.manifest_path
+
+    def load(self) -> dict | None:
+        """Return the latest snapshot dict, or None when no checkpoint exists.
+
+        A snapshot saved by this process is served from memory when the manifest
+        still points at it; otherwise the head, base and journal are read and the
+        deltas replayed.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            legacy_path = self.directory / LEGACY_CHECKPOINT_NAME
+            if legacy_path.exists():
+                return json.loads(legacy_path.read_text(encoding="utf-8"))
+            return None
+
+        with _cache_lock:
+            cached = _saved_states.get(str(self.directory))
+        if cached is not None and self._matches(cached, manifest):
+            return copy.deepcopy(cached.snapshot)
+
+        head = json.loads(self._read_file(manifest["head"]))
+        messages = json.loads(self._read_file(manifest["base"])) if manifest.get("base") else []
+        for entry in self._journal_entries(manifest.get("journal", ""), int(manifest.get("journalEntries", 0))):
+            messages = messages[: entry["start"]] + entry["messages"]
+
+        snapshot = {
+            **head,
+            "data": {**head.get("data", {}), "messages": messages},
+            "app_data": manifest.get("appData", {}),
+            "created_at": manifest.get("createdAt", ""),
+        }
+        state = self._state_from_manifest(manifest)
+        state.snapshot = snapshot
+        self._remember(state)
+        return copy.deepcopy(snapshot)
+
+    def _saved_state(self) -> _SavedState | None:
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        with _cache_lock:
+            cached = _saved_states.get(str(self.directory))
+        if cached is not None and cached.generation == int(manifest.get("generation", 0)) and (
+            cached.journal_entries == int(manifest.get("journalEntries", 0))
+        ):
+            return cached
+        return self._state_from_manifest(manifest)
+
+    def _append_delta(self, state: _SavedState, messages: list) -> _SavedState:
+        new_messages = messages[state.message_count :]
+        if not new_messages:
+            return replace(state, snapshot=None)
+        entry = _encode({"start": state.message_count, "messages": new_messages}) + b"\n"
+        if self.compress:
+            entry = gzip.compress(entry)
+        path = self.directory / state.journal
+        with path.open("r+b" if path.exists() else "wb") as handle:
+            # Drop any torn tail from a save whose manifest was never written.
+            handle.truncate(state.journal_bytes)
+            handle.seek(state.journal_bytes)
+            handle.write(entry)
+        return _SavedState(
+            generation=state.generation,
+            base=state.base,
+            journal=state.journal,
+            journal_entries=state.journal_entries + 1,
+            journal_bytes=state.journal_bytes + len(entry),
+            message_count=len(messages),
+            prefix_digest=state.prefix_digest,
+            head=state.head,
+        )
+
+    def _write_base(self, previous: _SavedState | None, messages: list) -> _SavedState:
+        generation = (previous.generation + 1) if previous is not None else 1
+        base_name = f"base-{generation}.json{self._suffix}"
+        self._write_atomic(base_name, _encode(messages))
+        return _SavedState(
+            generation=generation,
+            base=base_name,
+            journal=f"journal-{generation}.jsonl{self._suffix}",
+            journal_entries=0,
+            journal_bytes=0,
+            message_count=len(messages),
+            prefix_digest="",
+            head="",
+        )
+
+    def _journal_entries(self, name: str, limit: int):
+        """Yield at most ``limit`` journal entries.
+
+        Entries past the manifest count, or a torn final append, belong to a save
+        whose manifest was never written and are ignored.
+        """
+        path = self.directory / name
+        if not name or limit <= 0 or not path.exists():
+            return
+        opener = gzip.open if name.endswith(".gz") else open
+        count = 0
+        try:
+            with opener(path, "rb") as handle:
+                for line in handle:
+                    if count >= limit:
+                        return
+                    yield json.loads(line)
+                    count += 1
+        except (EOFError, OSError, json.JSONDecodeError):
+            logger.warning("Ignoring torn checkpoint journal tail in %s after %s entries", path, count)
+
+    def _remove_stale(self, previous: _SavedState, current: _SavedState) -> None:
+        stale = set()
+        if previous.generation != current.generation:
+            stale.update({previous.base, previous.journal})
+        if previous.head and previous.head != current.head:
+            stale.add(previous.head)
+        for name in stale:
+            try:
+                (self.directory / name).unlink(missing_ok=True)
+            except OSError:
+                logger.warning("Failed to remove stale checkpoint file %s", self.directory / name)
+        legacy_path = self.directory / LEGACY_CHECKPOINT_NAME
+        if legacy_path.exists():
+            legacy_path.unlink(missing_ok=True)
+
+    def _read_manifest(self) -> dict | None:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if manifest.get("format") != CHECKPOINT_FORMAT:
+            return None
+        return manifest
+
+    def _read_file(self, name: str) -> bytes:
+        payload = (self.directory / name).read_bytes()
+        return gzip.decompress(payload) if name.endswith(".gz") else payload
+
+    def _write_atomic(self, name: str, payload: bytes, compress: bool | None = None) -> None:
+        if compress if compress is not None else self.compress:
+            payload = gzip.compress(payload)
+        fd, temp_name = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            os.replace(temp_name, self.directory / name)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _state_from_manifest(manifest: dict) -> _SavedState:
+        return _SavedState(
+            generation=int(manifest.get("generation", 0)),
+            base=manifest.get("base", ""),
+            journal=manifest.get("journal", ""),
+            journal_entries=int(manifest.get("journalEntries", 0)),
+            journal_bytes=int(manifest.get("journalBytes", 0)),
+            message_count=int(manifest.get("messageCount", 0)),
+            prefix_digest=manifest.get("prefixDigest", ""),
+            head=manifest.get("head", ""),
+        )
+
+    @staticmethod
+    def _matches(state: _SavedState, manifest: dict) -> bool:
+        return (
+            state.generation == int(manifest.get("generation", 0))
+            and state.journal_entries == int(manifest.get("journalEntries", 0))
+            and state.head == manifest.get("head", "")
+            and state.message_count == int(manifest.get("messageCount", 0))
+            and state.snapshot is not None
+            and state.snapshot.get("app_data", {}) == manifest.get("appData", {})
+        )
+
+    def _remember(self, state: _SavedState) -> None:
+        with _cache_lock:
+            _saved_states[str(self.directory)] = state
+            _saved_states.move_to_end(str(self.directory))
+            while len(_saved_states) > _MAX_CACHED_SESSIONS:
+                _saved_states.popitem(last=False)
+
+
+def clear_checkpoint_cache() -> None:
+    with _cache_lock:
+        _saved_states.clear()
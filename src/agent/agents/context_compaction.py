@@ -0,0 +1,261 @@
+"""Keep long chat sessions within a per-session context budget.
+
+Each turn restores the orchestrator's whole AgentCore Memory history, including
+large specialist envelopes and tool output. Two mechanisms bound it:
+
+- Superseded tool results are replaced with short stubs before every model
+  call. A result is superseded when a later call to the same observation tool
+  (``terraform_plan``, ``checkov_scan``, ``file_read``...) used the same input.
+  Stubbing is deterministic and only touches the in-memory copy, so it is simply
+  reapplied after a restore.
+- ``CompactingConversationManager.compact`` folds turns older than the last
+  ``AGENT_CONTEXT_KEEP_TURNS`` into a rolling summary once the estimated history
+  exceeds the session's token budget. The summary and the number of folded
+  messages live in the conversation manager state, which the session manager
+  persists, so later turns restore the summary instead of recomputing it.
+
+``compact`` is awaited by the runtime before a turn starts. ``apply_management``
+runs synchronously inside strands and must not call the model from the event
+loop, so it only stubs.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from threading import RLock
+from typing import Any
+
+from strands.agent.conversation_manager import SummarizingConversationManager
+from strands.agent.conversation_manager.summarizing_conversation_manager import DEFAULT_SUMMARIZATION_PROMPT
+from strands.event_loop.streaming import process_stream
+from strands.hooks import BeforeModelCallEvent, HookProvider, HookRegistry
+from strands.types.content import Message
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_KEEP_TURNS = 4
+_DEFAULT_TOKEN_BUDGET = 48_000
+# Rough chars-per-token for English text and JSON; only used to compare against budgets.
+_CHARS_PER_TOKEN = 4
+# Images and documents are sent as bytes; count them as a fixed cost.
+_BINARY_BLOCK_CHARS = 6_000
+_MIN_STUB_CHARS = 400
+
+# Tools whose latest result replaces earlier results for the same input.
+SUPERSEDABLE_TOOLS = frozenset(
+    {
+        "file_read",
+        "terraform_init",
+        "terraform_plan",
+        "terraform_validate",
+        "tflint_scan",
+        "checkov_scan",
+        "infracost_breakdown",
+        "ministack_terratest",
+    }
+)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation in this session:\n"
+
+_stats_lock = RLock()
+_totals: dict[str, int] = {}
+
+
+def _env_int(name: str, default: int) -> int:
+    raw_value = os.environ.get(name, str(default))
+    try:
+        return max(0, int(raw_value))
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw_value, default)
+        return default
+
+
+def context_keep_turns() -> int:
+    """Most recent user turns kept verbatim; at least one."""
+    return max(1, _env_int("AGENT_CONTEXT_KEEP_TURNS", _DEFAULT_KEEP_TURNS))
+
+
+def context_token_budget() -> int:
+    """Default estimated-token budget for a session's history; 0 disables summarization."""
+    return _env_int("AGENT_CONTEXT_TOKEN_BUDGET", _DEFAULT_TOKEN_BUDGET)
+
+
+def _record(**counters: int) -> None:
+    with _stats_lock:
+        for key, value in counters.items():
+            _totals[key] = _totals.get(key, 0) + value
+
+
+def context_compaction_stats() -> dict[str, int]:
+    with _stats_lock:
+        return dict(_totals)
+
+
+def reset_context_compaction_stats() -> None:
+    with _stats_lock:
+        _totals.clear()
+
+
+def _content_chars(block: dict) -> int:
+    if "text" in block:
+        return len(block["text"])
+    if "json" in block:
+        return len(json.dumps(block["json"], default=str))
+    if "toolUse" in block:
+        return len(block["toolUse"].get("name", "")) + len(json.dumps(block["toolUse"].get("input"), default=str))
+    if "toolResult" in block:
+        return sum(_content_chars(item) for item in block["toolResult"].get("content") or [])
+    if "image" in block or "document" in block:
+        return _BINARY_BLOCK_CHARS
+    return len(json.dumps(block, default=str))
+
+
+def estimate_tokens(messages: list[Message]) -> int:
+    """Cheap token estimate for budget checks; not a tokenizer."""
+    chars = sum(_content_chars(block) for message in messages for block in message.get("content") or [])
+    return chars // _CHARS_PER_TOKEN
+
+
+def stub_superseded_tool_results(messages: list[Message]) -> int:
+    """Replace superseded observation tool results in place; returns how many were stubbed."""
+    calls: dict[str, tuple[str, str]] = {}
+    results: list[tuple[str, dict]] = []
+    for message in messages:
+        for block in message.get("content") or []:
+            tool_use = block.get("toolUse")
+            if tool_use and tool_use.get("name") in SUPERSEDABLE_TOOLS:
+                key = json.dumps(tool_use.get("input"), sort_keys=True, default=str)
+                calls[tool_use["toolUseId"]] = (tool_use["name"], key)
+            tool_result = block.get("toolResult")
+            if tool_result and tool_result.get("toolUseId") in calls:
+                results.append((tool_result["toolUseId"], tool_result))
+
+    latest: dict[tuple[str, str], str] = {}
+    for tool_use_id, _ in results:
+        latest[calls[tool_use_id]] = tool_use_id
+
+    stubbed = 0
+    for tool_use_id, tool_result in results:
+        name, _ = calls[tool_use_id]
+        # Stubs are shorter than the threshold, so an already stubbed result is skipped here.
+        if latest[calls[tool_use_id]] == tool_use_id:
+            continue
+        if sum(_content_chars(item) for item in tool_result.get("content") or []) < _MIN_STUB_CHARS:
+            continue
+        tool_result["content"] = [
+            {"text": f"[Superseded: a later {name} call with the same arguments replaced this output.]"}
+        ]
+        stubbed += 1
+    if stubbed:
+        _record(stubbedResults=stubbed)
+    return stubbed
+
+
+def _turn_starts(messages: list[Message], first: int) -> list[int]:
+    """Indexes of user messages that start a turn (user text rather than tool results)."""
+    return [
+        index
+        for index in range(first, len(messages))
+        if messages[index].get("role") == "user"
+        and not any("toolResult" in block for block in messages[index].get("content") or [])
+    ]
+
+
+class SupersededToolResults(HookProvider):
+    """Stub superseded tool results before every model call of an agent."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+
+    def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        stub_superseded_tool_results(event.agent.messages)
+
+
+class CompactingConversationManager(SummarizingConversationManager):
+    """Keep the last turns verbatim and fold older ones into a persisted rolling summary."""
+
+    def __init__(
+        self,
+        keep_turns: int | None = None,
+        token_budget: int | None = None,
+        summary_model: Any = None,
+    ) -> None:
+        super().__init__(preserve_recent_messages=2)
+        self.keep_turns = context_keep_turns() if keep_turns is None else max(1, keep_turns)
+        self.token_budget = context_token_budget() if token_budget is None else max(0, token_budget)
+        # Model for the rolling summary; defaults to the agent's own model.
+        self.summary_model = summary_model
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        super().register_hooks(registry, **kwargs)
+        SupersededToolResults().register_hooks(registry, **kwargs)
+
+    def apply_management(self, agent: Any, **kwargs: Any) -> None:
+        stub_superseded_tool_results(agent.messages)
+
+    def restore_from_session(self, state: dict[str, Any]) -> list[Message] | None:
+        if state.get("__name__") != self.__class__.__name__:
+            # Sessions started under another manager: keep its message offset, start without a summary.
+            self.removed_message_count = int(state.get("removed_message_count") or 0)
+            return None
+        return super().restore_from_session(state)
+
+    def _history_start(self, messages: list[Message]) -> int:
+        return 1 if self._summary_message is not None and messages and messages[0] == self._summary_message else 0
+
+    def compaction_split(self, messages: list[Message]) -> int:
+        """Index of the first message to keep verbatim, or 0 when there is nothing to fold."""
+        if not self.token_budget or estimate_tokens(messages) <= self.token_budget:
+            return 0
+        starts = _turn_starts(messages, self._history_start(messages))
+        if len(starts) <= self.keep_turns:
+            return 0
+        return starts[-self.keep_turns]
+
+    async def compact(self, agent: Any) -> dict | None:
+        """Fold old turns into the rolling summary when the history is over budget."""
+        messages = agent.messages
+        stub_superseded_tool_results(messages)
+        split = self.compaction_split(messages)
+        if split <= self._history_start(messages):
+            return None
+        tokens_before = estimate_tokens(messages)
+        summary = await self._summarize(messages[:split], agent)
+
+        folded = split - self._history_start(messages)
+        self.removed_message_count += folded
+        self._summary_message = summary
+        agent.messages[:] = [summary, *messages[split:]]
+        tokens_after = estimate_tokens(agent.messages)
+        _record(compactions=1, summarizedMessages=folded, tokensSaved=max(0, tokens_before - tokens_after))
+        return {"summarizedMessages": folded, "tokensBefore": tokens_before, "tokensAfter": tokens_after}
+
+    async def _summarize(self, messages: list[Message], agent: Any) -> Message:
+        request = [*messages, {"role": "user", "content": [{"text": "Please summarize this conversation."}]}]
+        result: Message | None = None
+        model = self.summary_model or agent.model
+        async for event in process_stream(
+            model.stream(request, tool_specs=None, system_prompt=DEFAULT_SUMMARIZATION_PROMPT)
+        ):
+            if "stop" in event:
+                _, result, _, _ = event["stop"]
+        text = "".join(block.get("text", "") for block in (result or {}).get("content") or []).strip()
+        if not text:
+            raise RuntimeError("Conversation summary was empty")
+        return {"role": "user", "content": [{"text": SUMMARY_PREFIX + text}]}
+
+
+async def compact_conversation(agent: Any) -> dict | None:
+    """Run ``CompactingConversationManager.compact`` for agents that use it."""
+    manager = getattr(agent, "conversation_manager", None)
+    if not isinstance(manager, CompactingConversationManager):
+        return None
+    try:
+        return await manager.compact(agent)
+    except Exception:
+        # A failed summary only costs context size; the turn can still run.
+        logger.exception("Conversation compaction failed")
+        _record(failures=1)
+        return None
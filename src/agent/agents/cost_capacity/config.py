@@ -2,6 +2,7 @@
 
 NAME = "cost_capacity_agent"
 DESCRIPTION = "Assesses cloud cost, sizing, capacity, and FinOps tradeoffs."
+MODEL_TIER = "primary"
 TOOL_NAMES = (
     "gateway",
     "handoff_to_user",
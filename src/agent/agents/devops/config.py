@@ -2,6 +2,7 @@
 
 NAME = "devops_agent"
 DESCRIPTION = "Handles CI/CD, deployment structure, tests, observability, and operational readiness."
+MODEL_TIER = "primary"
 TOOL_NAMES = (
     "gateway",
     "handoff_to_user",
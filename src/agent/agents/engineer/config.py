@@ -2,6 +2,7 @@
 
 NAME = "engineer_agent"
 DESCRIPTION = "Implements repository changes, Terraform/OpenTofu code, scripts, tests, and fixes."
+MODEL_TIER = "primary"
 TOOL_NAMES = (
     "gateway",
     "opentofu",
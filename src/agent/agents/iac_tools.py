@@ -1,30 +1,66 @@
-"""Scoped infrastructure command tools for specialist agents."""
-
+"""Scoped infrastructure command tools for specialist agents.
+
+The tools are async generators: commands run on the event loop through
+``StreamedProcess``, output lines are streamed as ``specialistToolProgress``
+events while they run, and the final yield is the JSON result. Each output
+stream is kept within ``MAX_OUTPUT_CHARS`` as its head, its tail and the
+error/warning lines in between.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+import hashlib
 import json
 import os
 from pathlib import Path
+import re
 import shutil
 import subprocess
 import time
+import weakref
 import urllib.error
 import urllib.parse
 import urllib.request
 
 from strands import tool
 
+from agents.cancellation import ProcessCancelled, StreamedProcess
+from agents.plugin_cache import async_init_lock, locked_provider_dirs, provider_platform, terraform_env
+from agents.timings import timed_phase
+from agents.workspace import resolve_in_workspace
+
 
 MAX_OUTPUT_CHARS = 12000
+_PROGRESS_INTERVAL_SECONDS = 0.5
+_PROGRESS_MAX_LINES = 5
+_PROGRESS_MAX_CHARS = 480
+_NOTABLE_LINE = re.compile(r"\b(?:error|warning|warn|fail|failed|failure|panic)\b", re.IGNORECASE)
 MINISTACK_DEFAULT_ENDPOINT = "http://127.0.0.1:4566"
 _MINISTACK_PROCESS: subprocess.Popen | None = None
+_INIT_MEMO_FILE = "agent-init-memo.json"
+_MODULE_BLOCK = re.compile(r'\bmodule\s+"([^"]+)"\s*\{')
+_INIT_BLOCK = re.compile(r'\b(?:required_providers|backend\s+"[^"]+"|cloud)\s*\{')
+_MODULE_ATTRIBUTE = re.compile(r'^\s*(source|version)\s*=\s*(.+?)\s*$', re.MULTILINE)
 
 
 def _workspace_path(path: str | None) -> Path:
-    root = Path.cwd().resolve()
-    requested = (path or ".").strip() or "."
-    candidate = (root / requested).resolve()
-    if candidate != root and root not in candidate.parents:
-        raise ValueError("path must stay inside the current session workspace")
-    return candidate
+    return resolve_in_workspace(path)
+
+
+_workdir_locks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Lock]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _workdir_lock(cwd: Path) -> asyncio.Lock:
+    """Serialize init, plan and validate in one directory; they all read and write its ``.terraform``.
+
+    Specialists fanned out in one turn share the session workspace, so their
+    commands can target the same directory at the same time.
+    """
+    locks = _workdir_locks.setdefault(asyncio.get_running_loop(), {})
+    return locks.setdefault(str(cwd), asyncio.Lock())
 
 
 def _which(first_choice: str, *fallbacks: str) -> str | None:
@@ -34,59 +70,222 @@ def _which(first_choice: str, *fallbacks: str) -> str | None:
     return None
 
 
-def _run(command: list[str], cwd: Path, timeout: int = 180) -> str:
+class _OutputBuffer:
+    """Head and tail of one output stream plus its error/warning lines, within a fixed budget.
+
+    Lines that scroll out of the tail are dropped unless they look like an
+    error or warning; those are kept, oldest dropped first, in their own slice
+    of the budget. The tail may use whatever budget the head and those lines
+    leave, and a single line that fits the whole budget, such as a one-line
+    JSON report, is kept whole at the expense of both. ``text()`` marks each
+    gap with the number of lines omitted.
+    """
+
+    def __init__(self, limit: int = MAX_OUTPUT_CHARS) -> None:
+        self.limit = limit
+        self.head_limit = limit // 6
+        self.notable_limit = limit // 3
+        self.head: list[str] = []
+        self.head_chars = 0
+        self.notable: deque[tuple[int, str]] = deque()
+        self.notable_chars = 0
+        self.tail: deque[tuple[int, str]] = deque()
+        self.tail_chars = 0
+        self.lines = 0
+        self.truncated = False
+
+    def append(self, line: str) -> None:
+        index = self.lines
+        self.lines += 1
+        if not self.tail and self.head_chars + len(line) + 1 <= self.head_limit:
+            self.head.append(line)
+            self.head_chars += len(line) + 1
+            return
+        if len(line) >= self.limit:
+            line = line[-(self.limit - 1) :]
+            self.truncated = True
+        while self.notable and len(line) + 1 > self._tail_budget():
+            self.notable_chars -= len(self.notable.popleft()[1]) + 1
+            self.truncated = True
+        while self.head and len(line) + 1 > self._tail_budget():
+            self.head_chars -= len(self.head.pop()) + 1
+            self.truncated = True
+        self.tail.append((index, line))
+        self.tail_chars += len(line) + 1
+        while len(self.tail) > 1 and self.tail_chars > self._tail_budget():
+            dropped_index, dropped = self.tail.popleft()
+            self.tail_chars -= len(dropped) + 1
+            self.truncated = True
+            if _NOTABLE_LINE.search(dropped) and len(dropped) < self.notable_limit:
+                self.notable.append((dropped_index, dropped))
+                self.notable_chars += len(dropped) + 1
+            while self.notable_chars > self.notable_limit:
+                self.notable_chars -= len(self.notable.popleft()[1]) + 1
+        while self.notable and self.tail_chars > self._tail_budget():
+            self.notable_chars -= len(self.notable.popleft()[1]) + 1
+
+    def _tail_budget(self) -> int:
+        return self.limit - self.head_chars - self.notable_chars
+
+    def text(self) -> str:
+        kept = [*enumerate(self.head), *self.notable, *self.tail]
+        parts = []
+        expected = 0
+        for index, line in kept:
+            if index > expected:
+                parts.append(f"[... {index - expected} lines omitted ...]")
+            parts.append(line)
+            expected = index + 1
+        return "\n".join(parts) + "\n" if parts else ""
+
+
+def _output_progress(program: str, lines: list[str]) -> dict[str, dict[str, str]]:
+    message = "\n".join(lines[-_PROGRESS_MAX_LINES:])
+    return {"specialistToolProgress": {"phase": "output", "message": f"{program}: {message[-_PROGRESS_MAX_CHARS:]}"}}
+
+
+async def _stream_command(
+    command: list[str], cwd: Path, timeout: int, env: dict[str, str]
+) -> AsyncIterator[dict | str]:
+    """Run ``command`` without holding the event loop.
+
+    Yields ``specialistToolProgress`` events with the latest output lines, at
+    most one per ``_PROGRESS_INTERVAL_SECONDS``, and finally the JSON result.
+    """
     if not command or not shutil.which(command[0]):
-        return json.dumps(
+        yield json.dumps(
             {
                 "ok": False,
                 "error": "not_installed",
                 "command": command[0] if command else "",
             }
         )
+        return
+    program = Path(command[0]).name
+    outputs = {"stdout": _OutputBuffer(), "stderr": _OutputBuffer()}
+    pending: list[str] = []
+    last_progress = 0.0
+    process = StreamedProcess(
+        command,
+        cwd=str(cwd),
+        env=env,
+        timeout=timeout,
+    )
+    result: dict = {"cwd": str(cwd), "command": command}
     try:
-        completed = subprocess.run(
-            command,
-            cwd=str(cwd),
-            env={**os.environ, "TF_INPUT": "0", "TOFU_INPUT": "0"},
-            capture_output=True,
-            check=False,
-            text=True,
-            timeout=timeout,
-        )
-        stdout = completed.stdout[-MAX_OUTPUT_CHARS:]
-        stderr = completed.stderr[-MAX_OUTPUT_CHARS:]
-        return json.dumps(
-            {
-                "ok": completed.returncode == 0,
-                "returncode": completed.returncode,
-                "cwd": str(cwd),
-                "command": command,
-                "stdout": stdout,
-                "stderr": stderr,
-                "truncated": len(completed.stdout) > MAX_OUTPUT_CHARS or len(completed.stderr) > MAX_OUTPUT_CHARS,
-            }
-        )
-    except subprocess.TimeoutExpired as exc:
-        return json.dumps(
-            {
-                "ok": False,
-                "error": "timeout",
-                "cwd": str(cwd),
-                "command": command,
-                "stdout": (exc.stdout or "")[-MAX_OUTPUT_CHARS:] if isinstance(exc.stdout, str) else "",
-                "stderr": (exc.stderr or "")[-MAX_OUTPUT_CHARS:] if isinstance(exc.stderr, str) else "",
-            }
-        )
+        with timed_phase(f"subprocess.{program}", command=" ".join(command[:2])):
+            async for stream, line in process:
+                outputs[stream].append(line)
+                if line.strip():
+                    pending.append(line)
+                if pending and time.monotonic() - last_progress >= _PROGRESS_INTERVAL_SECONDS:
+                    yield _output_progress(program, pending)
+                    pending = []
+                    last_progress = time.monotonic()
+        result = {"ok": process.returncode == 0, "returncode": process.returncode, **result}
+    except subprocess.TimeoutExpired:
+        result = {"ok": False, "error": "timeout", **result}
+    except ProcessCancelled:
+        result = {"ok": False, "error": "cancelled", **result}
     except Exception as exc:
-        return json.dumps(
-            {
-                "ok": False,
-                "error": type(exc).__name__,
-                "message": str(exc),
-                "cwd": str(cwd),
-                "command": command,
-            }
-        )
+        result = {"ok": False, "error": type(exc).__name__, "message": str(exc), **result}
+    if pending:
+        yield _output_progress(program, pending)
+    yield json.dumps(
+        {
+            **result,
+            "stdout": outputs["stdout"].text(),
+            "stderr": outputs["stderr"].text(),
+            "truncated": outputs["stdout"].truncated or outputs["stderr"].truncated,
+        }
+    )
+
+
+async def _run(command: list[str], cwd: Path, timeout: int = 180) -> AsyncIterator[dict | str]:
+    env = {**os.environ, **terraform_env(), "TF_INPUT": "0", "TOFU_INPUT": "0"}
+    async for event in _stream_command(command, cwd, timeout, env):
+        yield event
+
+
+def _hcl_blocks(text: str, start: re.Pattern[str]) -> list[tuple[re.Match[str], str]]:
+    blocks = []
+    for match in start.finditer(text):
+        depth = 0
+        for index in range(match.end() - 1, len(text)):
+            if text[index] == "{":
+                depth += 1
+            elif text[index] == "}":
+                depth -= 1
+                if depth == 0:
+                    blocks.append((match, text[match.end() : index]))
+                    break
+    return blocks
+
+
+def _init_inputs(workdir: Path, seen: set[Path]) -> tuple[list[str], bool]:
+    """Module sources, provider requirements and backend blocks that ``init`` acts on."""
+    seen.add(workdir)
+    inputs = []
+    has_modules = False
+    for tf_file in sorted(workdir.glob("*.tf")):
+        text = tf_file.read_text(encoding="utf-8", errors="replace")
+        for match, body in _hcl_blocks(text, _MODULE_BLOCK):
+            has_modules = True
+            attributes = dict(_MODULE_ATTRIBUTE.findall(body))
+            inputs.append(f"module {match.group(1)} {attributes.get('source')} {attributes.get('version')}")
+            source = (attributes.get("source") or "").strip('"')
+            local_dir = (workdir / source).resolve()
+            if source.startswith(("./", "../")) and local_dir.is_dir() and local_dir not in seen:
+                nested, _ = _init_inputs(local_dir, seen)
+                inputs.extend(nested)
+        for match, body in _hcl_blocks(text, _INIT_BLOCK):
+            inputs.append(" ".join(f"{match.group(0)}{body}".split()))
+    return inputs, has_modules
+
+
+def _init_memo_key(workdir: Path, command: list[str]) -> tuple[str, bool]:
+    lock_file = workdir / ".terraform.lock.hcl"
+    inputs, has_modules = _init_inputs(workdir, set())
+    material = {
+        "command": [Path(command[0]).name, *command[1:]],
+        "lock": hashlib.sha256(lock_file.read_bytes()).hexdigest() if lock_file.is_file() else None,
+        "inputs": inputs,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest(), has_modules
+
+
+def _init_intact(workdir: Path, has_modules: bool) -> bool:
+    dot_terraform = workdir / ".terraform"
+    if not dot_terraform.is_dir():
+        return False
+    if has_modules and not (dot_terraform / "modules" / "modules.json").is_file():
+        return False
+    provider_dirs = locked_provider_dirs(workdir, dot_terraform / "providers") or []
+    return all((path / provider_platform()).exists() for path in provider_dirs)
+
+
+def cached_terraform_init(workdir: Path, command: list[str]) -> dict | None:
+    """The memoized result of ``command`` if nothing init depends on changed since it succeeded."""
+    try:
+        memo = json.loads((workdir / ".terraform" / _INIT_MEMO_FILE).read_text(encoding="utf-8"))
+        key, has_modules = _init_memo_key(workdir, command)
+    except (OSError, ValueError):
+        return None
+    if memo.get("key") != key or not _init_intact(workdir, has_modules):
+        return None
+    return {**memo["result"], "cached": True}
+
+
+def remember_terraform_init(workdir: Path, command: list[str], result: dict) -> None:
+    """Memoize a successful init; the memo lives in ``.terraform`` and goes away with it."""
+    memo_path = workdir / ".terraform" / _INIT_MEMO_FILE
+    if not result.get("ok") or not memo_path.parent.is_dir():
+        return
+    try:
+        key, _ = _init_memo_key(workdir, command)
+        memo_path.write_text(json.dumps({"key": key, "result": result}), encoding="utf-8")
+    except OSError:
+        return
 
 
 def _ministack_env(endpoint: str, region: str = "us-east-1") -> dict[str, str]:
@@ -207,16 +406,16 @@ def _go_test_args(test_pattern: str, timeout_seconds: int) -> list[str]:
     return args
 
 
-def _run_ministack_terratest(
+async def _run_ministack_terratest(
     cwd: Path,
     endpoint: str,
     test_pattern: str,
     timeout_seconds: int,
     reset_before: bool,
-) -> str:
+) -> AsyncIterator[dict | str]:
     args = _go_test_args(test_pattern, timeout_seconds)
     if not shutil.which(args[0]):
-        return json.dumps(
+        yield json.dumps(
             {
                 "ok": False,
                 "error": "not_installed",
@@ -224,9 +423,12 @@ def _run_ministack_terratest(
                 "endpoint": endpoint,
             }
         )
-    reset_result = _reset_ministack(endpoint) if reset_before else {"ok": True, "skipped": True}
+        return
+    reset_result = {"ok": True, "skipped": True}
+    if reset_before:
+        reset_result = await asyncio.to_thread(_reset_ministack, endpoint)
     if not reset_result.get("ok"):
-        return json.dumps(
+        yield json.dumps(
             {
                 "ok": False,
                 "error": "ministack_reset_failed",
@@ -234,54 +436,11 @@ def _run_ministack_terratest(
                 "reset": reset_result,
             }
         )
-    try:
-        completed = subprocess.run(
-            args,
-            cwd=str(cwd),
-            env=_ministack_env(endpoint),
-            capture_output=True,
-            check=False,
-            text=True,
-            timeout=max(1, timeout_seconds + 30),
-        )
-        stdout = completed.stdout[-MAX_OUTPUT_CHARS:]
-        stderr = completed.stderr[-MAX_OUTPUT_CHARS:]
-        return json.dumps(
-            {
-                "ok": completed.returncode == 0,
-                "returncode": completed.returncode,
-                "cwd": str(cwd),
-                "endpoint": endpoint,
-                "command": args,
-                "reset": reset_result,
-                "stdout": stdout,
-                "stderr": stderr,
-                "truncated": len(completed.stdout) > MAX_OUTPUT_CHARS or len(completed.stderr) > MAX_OUTPUT_CHARS,
-            }
-        )
-    except subprocess.TimeoutExpired as exc:
-        return json.dumps(
-            {
-                "ok": False,
-                "error": "timeout",
-                "cwd": str(cwd),
-                "endpoint": endpoint,
-                "command": args,
-                "stdout": (exc.stdout or "")[-MAX_OUTPUT_CHARS:] if isinstance(exc.stdout, str) else "",
-                "stderr": (exc.stderr or "")[-MAX_OUTPUT_CHARS:] if isinstance(exc.stderr, str) else "",
-            }
-        )
-    except Exception as exc:
-        return json.dumps(
-            {
-                "ok": False,
-                "error": type(exc).__name__,
-                "message": str(exc),
-                "cwd": str(cwd),
-                "endpoint": endpoint,
-                "command": args,
-            }
-        )
+        return
+    async for event in _stream_command(args, cwd, max(1, timeout_seconds + 30), _ministack_env(endpoint)):
+        if isinstance(event, str):
+            event = json.dumps({**json.loads(event), "endpoint": endpoint, "reset": reset_result})
+        yield event
 
 
 def _configure_infracost_api_key(cwd: Path) -> dict | None:
@@ -344,13 +503,13 @@ def _configure_infracost_api_key(cwd: Path) -> dict | None:
 
 
 @tool
-def terraform_init(
+async def terraform_init(
     path: str = ".",
     upgrade: bool = False,
     backend_bucket: str = "",
     backend_key: str = "",
     backend_region: str = "",
-) -> str:
+) -> AsyncIterator[dict | str]:
     """Run Terraform/OpenTofu init in a workspace-relative directory.
 
     Args:
@@ -361,7 +520,9 @@ def terraform_init(
         backend_region: Optional S3 backend region to pass as -backend-config=region=...
 
     Returns:
-        JSON string with command, cwd, return code, stdout, and stderr.
+        JSON string with command, cwd, return code, stdout, and stderr. ``cached`` is true when the
+        lock file, module sources, provider requirements and backend config are unchanged since the
+        last successful init and ``.terraform`` is intact, in which case init is not run again.
     """
     cwd = _workspace_path(path)
     command = _which("tofu", "terraform")
@@ -374,11 +535,21 @@ def terraform_init(
         args.append(f"-backend-config=key={backend_key.strip()}")
     if backend_region.strip():
         args.append(f"-backend-config=region={backend_region.strip()}")
-    return _run(args, cwd, timeout=240)
+    async with _workdir_lock(cwd):
+        # Checked under the lock, so an init that waited on another one can reuse its result.
+        cached = None if upgrade else cached_terraform_init(cwd, args)
+        if cached is not None:
+            yield json.dumps(cached)
+            return
+        async with async_init_lock(cwd, upgrade=upgrade):
+            async for event in _run(args, cwd, timeout=240):
+                if isinstance(event, str):
+                    remember_terraform_init(cwd, args, json.loads(event))
+                yield event
 
 
 @tool
-def terraform_plan(path: str = ".", var_file: str = "") -> str:
+async def terraform_plan(path: str = ".", var_file: str = "") -> AsyncIterator[dict | str]:
     """Run Terraform/OpenTofu plan in a workspace-relative directory.
 
     Args:
@@ -394,26 +565,30 @@ def terraform_plan(path: str = ".", var_file: str = "") -> str:
     if var_file.strip():
         var_path = _workspace_path(var_file)
         args.append(f"-var-file={var_path}")
-    return _run(args, cwd, timeout=300)
+    async with _workdir_lock(cwd):
+        async for event in _run(args, cwd, timeout=300):
+            yield event
 
 
 @tool
-def terraform_validate(path: str = ".") -> str:
+async def terraform_validate(path: str = ".") -> AsyncIterator[dict | str]:
     """Run Terraform/OpenTofu validate in a workspace-relative directory."""
     cwd = _workspace_path(path)
     command = _which("tofu", "terraform")
-    return _run([command or "tofu", "validate", "-no-color"], cwd, timeout=180)
+    async with _workdir_lock(cwd):
+        async for event in _run([command or "tofu", "validate", "-no-color"], cwd, timeout=180):
+            yield event
 
 
 @tool
-def ministack_terratest(
+async def ministack_terratest(
     path: str = ".",
     test_pattern: str = "",
     endpoint: str = "",
     services: str = "",
     timeout_seconds: int = 1800,
     reset_before: bool = True,
-) -> str:
+) -> AsyncIterator[dict | str]:
     """Run Go Terratest tests against a local MiniStack AWS emulator.
 
     The tool starts MiniStack in the AgentCore runtime when the endpoint is local and not already
@@ -440,41 +615,45 @@ def ministack_terratest(
         or os.environ.get("MINISTACK_ENDPOINT", "").strip()
         or MINISTACK_DEFAULT_ENDPOINT
     )
-    startup = _ensure_ministack(selected_endpoint, services=services)
+    startup = await asyncio.to_thread(_ensure_ministack, selected_endpoint, services=services)
     if not startup.get("ok"):
-        return json.dumps(startup)
-    result = json.loads(
-        _run_ministack_terratest(
-            cwd,
-            selected_endpoint,
-            test_pattern,
-            max(1, int(timeout_seconds)),
-            reset_before,
-        )
-    )
-    result["ministack"] = startup
-    return json.dumps(result)
+        yield json.dumps(startup)
+        return
+    async for event in _run_ministack_terratest(
+        cwd,
+        selected_endpoint,
+        test_pattern,
+        max(1, int(timeout_seconds)),
+        reset_before,
+    ):
+        if isinstance(event, str):
+            event = json.dumps({**json.loads(event), "ministack": startup})
+        yield event
 
 
 @tool
-def tflint_scan(path: str = ".") -> str:
+async def tflint_scan(path: str = ".") -> AsyncIterator[dict | str]:
     """Run tflint in a workspace-relative directory."""
     cwd = _workspace_path(path)
-    return _run(["tflint", "--no-color"], cwd, timeout=180)
+    async for event in _run(["tflint", "--no-color"], cwd, timeout=180):
+        yield event
 
 
 @tool
-def infracost_breakdown(path: str = ".") -> str:
+async def infracost_breakdown(path: str = ".") -> AsyncIterator[dict | str]:
     """Run infracost breakdown for Terraform/OpenTofu code in a workspace-relative directory."""
     cwd = _workspace_path(path)
-    configure_error = _configure_infracost_api_key(cwd)
+    configure_error = await asyncio.to_thread(_configure_infracost_api_key, cwd)
     if configure_error:
-        return json.dumps(configure_error)
-    return _run(["infracost", "breakdown", "--path", str(cwd), "--format", "json"], cwd, timeout=300)
+        yield json.dumps(configure_error)
+        return
+    async for event in _run(["infracost", "breakdown", "--path", str(cwd), "--format", "json"], cwd, timeout=300):
+        yield event
 
 
 @tool
-def checkov_scan(path: str = ".") -> str:
+async def checkov_scan(path: str = ".") -> AsyncIterator[dict | str]:
     """Run checkov against a workspace-relative directory."""
     cwd = _workspace_path(path)
-    return _run(["checkov", "-d", str(cwd), "--quiet", "--compact"], cwd, timeout=300)
+    async for event in _run(["checkov", "-d", str(cwd), "--quiet", "--compact"], cwd, timeout=300):
+        yield event
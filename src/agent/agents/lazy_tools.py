@@ -0,0 +1,69 @@
+"""Tool proxies that import their implementation on first use.
+
+Some runtime tools pull in large dependency trees that most invocations never
+touch. ``LazyTool`` registers under the real tool's name and imports the target
+(``"package.module:attribute"``) only when an agent needs it. Calls import it on
+a worker thread, so a cold import never blocks the event loop. Reading
+``tool_spec`` imports it inline unless the spec was given up front.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+from threading import Lock
+from typing import Any
+
+from strands.types.tools import AgentTool, ToolGenerator, ToolSpec, ToolUse
+
+logger = logging.getLogger(__name__)
+
+
+class LazyTool(AgentTool):
+    """Stand-in for an ``AgentTool`` whose module is imported on first use."""
+
+    def __init__(self, name: str, target: str, tool_spec: ToolSpec | None = None) -> None:
+        super().__init__()
+        self._name = name
+        self._target = target
+        self._spec = tool_spec
+        self._tool: AgentTool | None = None
+        self._lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._tool is not None
+
+    def load(self) -> AgentTool:
+        """Import and return the proxied tool."""
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    module_name, _, attribute = self._target.partition(":")
+                    tool = getattr(importlib.import_module(module_name), attribute)
+                    if tool.tool_name != self._name:
+                        raise ValueError(f"{self._target} is tool {tool.tool_name!r}, not {self._name!r}")
+                    logger.info("Loaded lazy tool %s from %s", self._name, self._target)
+                    self._tool = tool
+        return self._tool
+
+    @property
+    def tool_name(self) -> str:
+        return self._name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self._spec if self._spec is not None else self.load().tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self._tool.tool_type if self._tool is not None else "python"
+
+    def get_display_properties(self) -> dict[str, str]:
+        return {"Name": self._name, "Type": self.tool_type, "Target": self._target}
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        tool = self._tool or await asyncio.to_thread(self.load)
+        async for event in tool.stream(tool_use, invocation_state, **kwargs):
+            yield event
@@ -0,0 +1,308 @@
+"""Process-wide scheduler for requests to the OpenAI-compatible endpoint.
+
+Every session and every nested specialist in a runtime process shares one
+provider quota. ``OpenRouterModel.stream`` takes a slot from this scheduler
+before each request, so a burst of parallel specialists queues here instead of
+turning into provider 429s and retry storms.
+
+- At most ``LLM_MAX_CONCURRENT_REQUESTS`` requests stream at once.
+- Token buckets refill at ``LLM_REQUESTS_PER_MINUTE`` and
+  ``LLM_TOKENS_PER_MINUTE`` (0, the default, turns a bucket off). A request is
+  charged its estimated prompt tokens up front and reconciled with the usage
+  the provider reports when it finishes.
+- Queued requests are served by priority, then round-robin across sessions, so
+  one session's fan-out cannot starve another. Calls made by the orchestrator
+  itself, which produce the user-facing answer, go ahead of specialist calls.
+
+A slot is held only while one model response streams, never across tool calls,
+so an orchestrator waiting on its specialists does not hold one. Queue wait is
+counted per priority for the runtimeStats control action.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from functools import partial
+from threading import RLock
+from typing import Any
+
+from agents.context_compaction import estimate_tokens
+from agents.workspace import workspace_session_id
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+_DEFAULT_MAX_CONCURRENT_REQUESTS = 16
+_CHARS_PER_TOKEN = 4
+
+
+def _env_int(name: str, default: int, minimum: int) -> int:
+    raw_value = os.environ.get(name, str(default))
+    try:
+        return max(minimum, int(raw_value))
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw_value, default)
+        return default
+
+
+def llm_max_concurrent_requests() -> int:
+    return _env_int("LLM_MAX_CONCURRENT_REQUESTS", _DEFAULT_MAX_CONCURRENT_REQUESTS, 1)
+
+
+def llm_requests_per_minute() -> int:
+    return _env_int("LLM_REQUESTS_PER_MINUTE", 0, 0)
+
+
+def llm_tokens_per_minute() -> int:
+    return _env_int("LLM_TOKENS_PER_MINUTE", 0, 0)
+
+
+def request_origin(invocation_state: dict | None) -> tuple[str, str]:
+    """Session id and priority for a model call from the strands invocation state.
+
+    Specialist agents carry a ``specialist.agent`` trace attribute. Calls without
+    an agent, such as conversation summaries, run on the user's turn and count
+    as interactive.
+    """
+    agent = (invocation_state or {}).get("agent")
+    attributes = getattr(agent, "trace_attributes", None) or {}
+    session_id = str(attributes.get("session.id") or workspace_session_id())
+    return session_id, BACKGROUND if attributes.get("specialist.agent") else INTERACTIVE
+
+
+def estimate_request_tokens(messages: list, tool_specs: list | None = None, system_prompt: str | None = None) -> int:
+    """Prompt tokens to charge up front; reconciled with reported usage later."""
+    extra_chars = len(system_prompt or "") + sum(len(str(spec)) for spec in tool_specs or ())
+    return max(1, estimate_tokens(messages) + extra_chars // _CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """Refill ``per_minute`` units per minute up to a burst of one minute's worth.
+
+    Not thread-safe on its own; the scheduler calls it under its lock.
+    """
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = float(max(0, per_minute))
+        self.level = self.capacity
+        self._rate = self.capacity / 60.0
+        self._clock = clock
+        self._updated = clock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_seconds(self, amount: float) -> float:
+        """Seconds until ``amount`` is available; requests above the burst wait for a full bucket."""
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return missing / self._rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        if self.enabled:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        """Return ``amount`` to the bucket; a negative amount charges an underestimate."""
+        if self.enabled:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+
+class LLMRequest:
+    """A queued or running model request and its token charge."""
+
+    __slots__ = ("session_id", "priority", "tokens", "used_tokens", "future", "queued_at")
+
+    def __init__(self, session_id: str, priority: str, tokens: int, queued_at: float) -> None:
+        self.session_id = session_id
+        self.priority = priority
+        self.tokens = tokens
+        self.used_tokens: int | None = None
+        self.future: Future = Future()
+        self.queued_at = queued_at
+
+    def record_usage(self, usage: dict | None) -> None:
+        total = (usage or {}).get("totalTokens")
+        if isinstance(total, int):
+            self.used_tokens = total
+
+
+class LLMScheduler:
+    """Admit model requests under a concurrency cap and rate limits, fairly across sessions."""
+
+    def __init__(
+        self,
+        max_concurrent: int | None = None,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_concurrent = max_concurrent or llm_max_concurrent_requests()
+        self._clock = clock
+        self._requests = TokenBucket(
+            llm_requests_per_minute() if requests_per_minute is None else requests_per_minute, clock
+        )
+        self._tokens = TokenBucket(llm_tokens_per_minute() if tokens_per_minute is None else tokens_per_minute, clock)
+        self._lock = RLock()
+        self._queues: dict[str, OrderedDict[str, deque[LLMRequest]]] = {priority: OrderedDict() for priority in PRIORITIES}
+        self._running = 0
+        self._timer: threading.Timer | None = None
+        self._timer_due = 0.0
+        self._stats: dict[str, dict[str, float]] = {}
+
+    def _priority_stats(self, priority: str) -> dict[str, float]:
+        return self._stats.setdefault(
+            priority, {"requests": 0, "throttled": 0, "cancelled": 0, "waitSeconds": 0.0, "maxWaitSeconds": 0.0}
+        )
+
+    def submit(self, session_id: str, priority: str, tokens: int) -> LLMRequest:
+        """Queue a request; its future resolves once it may start."""
+        priority = priority if priority in PRIORITIES else BACKGROUND
+        request = LLMRequest(session_id or "", priority, max(1, int(tokens)), self._clock())
+        with self._lock:
+            self._queues[priority].setdefault(request.session_id, deque()).append(request)
+        request.future.add_done_callback(partial(self._discard_if_cancelled, request))
+        self._dispatch()
+        return request
+
+    async def acquire(self, session_id: str, priority: str, tokens: int) -> LLMRequest:
+        """Wait for a slot; pair with ``release`` once the response has streamed."""
+        request = self.submit(session_id, priority, tokens)
+        try:
+            await asyncio.wrap_future(request.future)
+        except asyncio.CancelledError:
+            if not request.future.cancel() and not request.future.cancelled():
+                # Granted just as the caller went away.
+                self.release(request)
+            raise
+        return request
+
+    def release(self, request: LLMRequest) -> None:
+        with self._lock:
+            self._running -= 1
+            if request.used_tokens is not None:
+                self._tokens.refund(request.tokens - request.used_tokens)
+        self._dispatch()
+
+    def has_idle_slot(self) -> bool:
+        """True when a new request would start right away, ignoring the rate limits."""
+        with self._lock:
+            return self._running < self.max_concurrent and not any(self._queues.values())
+
+    def _discard_if_cancelled(self, request: LLMRequest, future: Future) -> None:
+        if not future.cancelled():
+            return
+        with self._lock:
+            sessions = self._queues[request.priority]
+            queue = sessions.get(request.session_id)
+            if queue is not None and request in queue:
+                queue.remove(request)
+                if not queue:
+                    del sessions[request.session_id]
+                self._priority_stats(request.priority)["cancelled"] += 1
+
+    def _next(self) -> LLMRequest | None:
+        for priority in PRIORITIES:
+            sessions = self._queues[priority]
+            if sessions:
+                return next(iter(sessions.values()))[0]
+        return None
+
+    def _pop(self, request: LLMRequest) -> None:
+        """Remove the head request and move its session to the back of the round."""
+        sessions = self._queues[request.priority]
+        queue = sessions[request.session_id]
+        queue.popleft()
+        if queue:
+            sessions.move_to_end(request.session_id)
+        else:
+            del sessions[request.session_id]
+
+    def _dispatch(self) -> None:
+        granted = []
+        with self._lock:
+            while self._running < self.max_concurrent:
+                request = self._next()
+                if request is None:
+                    break
+                wait = max(self._requests.wait_seconds(1), self._tokens.wait_seconds(request.tokens))
+                if wait > 0:
+                    self._retry_after(wait, request)
+                    break
+                self._pop(request)
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                self._requests.take(1)
+                self._tokens.take(request.tokens)
+                self._running += 1
+                waited = self._clock() - request.queued_at
+                stats = self._priority_stats(request.priority)
+                stats["requests"] += 1
+                stats["waitSeconds"] += waited
+                stats["maxWaitSeconds"] = max(stats["maxWaitSeconds"], waited)
+                granted.append(request)
+        for request in granted:
+            request.future.set_result(request)
+
+    def _retry_after(self, delay: float, request: LLMRequest) -> None:
+        due = time.monotonic() + delay
+        if self._timer is not None:
+            if self._timer_due <= due:
+                return
+            self._timer.cancel()
+        self._priority_stats(request.priority)["throttled"] += 1
+        self._timer_due = due
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._dispatch()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            priorities = {}
+            for priority, stats in self._stats.items():
+                requests = stats["requests"] or 1
+                priorities[priority] = {
+                    "requests": stats["requests"],
+                    "throttled": stats["throttled"],
+                    "cancelled": stats["cancelled"],
+                    "queued": sum(len(queue) for queue in self._queues[priority].values()),
+                    "waitMs": round(stats["waitSeconds"] * 1000, 1),
+                    "avgWaitMs": round(stats["waitSeconds"] * 1000 / requests, 1),
+                    "maxWaitMs": round(stats["maxWaitSeconds"] * 1000, 1),
+                }
+            return {
+                "maxConcurrent": self.max_concurrent,
+                "requestsPerMinute": int(self._requests.capacity),
+                "tokensPerMinute": int(self._tokens.capacity),
+                "running": self._running,
+                "queued": sum(len(queue) for sessions in self._queues.values() for queue in sessions.values()),
+                "priorities": priorities,
+            }
+
+
+llm_scheduler = LLMScheduler()
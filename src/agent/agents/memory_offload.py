@@ -0,0 +1,160 @@
+"""Persist large tool results to session artifacts instead of AgentCore Memory.
+
+``AgentCoreMemorySessionManager`` stores every message verbatim, so a 12k-char
+``terraform plan`` log or a full specialist envelope is kept in memory events and
+re-sent to the model on every later turn of the session. The session manager
+here rewrites each tool result above ``AGENT_MEMORY_OFFLOAD_CHARS`` before it is
+persisted: the full output is written once to the session's ``tool-outputs``
+artifact directory, named by its content hash, and the memory event keeps a
+short excerpt plus that path. Specialist envelopes keep their agent, status,
+summary and changed files instead of an excerpt.
+
+Only the persisted copy changes. The running turn still sees the full result.
+Artifact writes go through the artifact I/O pool keyed by session id, so the
+next turn's ``artifact_io.wait_for(session_id)`` sees them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import replace
+from pathlib import Path
+from threading import RLock
+from typing import Any
+
+from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
+from strands.types.content import Message
+from strands.types.session import SessionMessage
+
+from agents.artifact_io import artifact_io
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_OFFLOAD_CHARS = 4_000
+_EXCERPT_CHARS = 600
+# Fields of the specialist envelope (agents.specialist_output.SpecialistResponse) kept inline.
+_ENVELOPE_FIELDS = ("agent", "status", "summary", "changed_files")
+
+_stats_lock = RLock()
+_totals: dict[str, int] = {}
+
+
+def memory_offload_chars() -> int:
+    """Tool results longer than this are stored as artifacts; 0 disables offloading."""
+    raw_value = os.environ.get("AGENT_MEMORY_OFFLOAD_CHARS", str(_DEFAULT_OFFLOAD_CHARS))
+    try:
+        return max(0, int(raw_value))
+    except ValueError:
+        logger.warning("Invalid AGENT_MEMORY_OFFLOAD_CHARS=%r; using %s", raw_value, _DEFAULT_OFFLOAD_CHARS)
+        return _DEFAULT_OFFLOAD_CHARS
+
+
+def _record(**counters: int) -> None:
+    with _stats_lock:
+        for key, value in counters.items():
+            _totals[key] = _totals.get(key, 0) + value
+
+
+def memory_offload_stats() -> dict[str, int]:
+    with _stats_lock:
+        return dict(_totals)
+
+
+def reset_memory_offload_stats() -> None:
+    with _stats_lock:
+        _totals.clear()
+
+
+def _result_text(content: list[dict]) -> str | None:
+    """Tool result content as one string, or None when it holds non-text blocks."""
+    parts = []
+    for block in content:
+        if "text" in block:
+            parts.append(block["text"])
+        elif "json" in block:
+            parts.append(json.dumps(block["json"], indent=2, default=str))
+        else:
+            return None
+    return "\n".join(parts)
+
+
+def _envelope_summary(text: str) -> dict | None:
+    try:
+        envelope = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(envelope, dict) or not {"agent", "status", "summary"} <= envelope.keys():
+        return None
+    return {field: envelope[field] for field in _ENVELOPE_FIELDS if field in envelope}
+
+
+def compact_tool_output(text: str, path: Path) -> str:
+    """Memory-event replacement for an offloaded tool output stored at ``path``."""
+    pointer = f"[Full tool output ({len(text)} chars) stored at {path}; read it with file_read if needed.]"
+    envelope = _envelope_summary(text)
+    if envelope is not None:
+        return f"{json.dumps(envelope, indent=2)}\n{pointer}"
+    half = _EXCERPT_CHARS // 2
+    # Command output puts errors and summaries at the end, so keep both ends.
+    return f"{pointer}\n{text[:half]}\n[...]\n{text[-half:]}"
+
+
+def _write_artifact(path: Path, text: str) -> None:
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    partial.write_text(text, encoding="utf-8")
+    partial.replace(path)
+
+
+class OffloadingMemorySessionManager(AgentCoreMemorySessionManager):
+    """AgentCore Memory session manager that persists large tool results by reference."""
+
+    def __init__(self, *args: Any, artifact_dir: Path, offload_chars: int | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.artifact_dir = artifact_dir
+        self.offload_chars = memory_offload_chars() if offload_chars is None else max(0, offload_chars)
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any):
+        compact = self.offload_tool_results(session_message.message)
+        if compact is not session_message.message:
+            session_message = replace(session_message, message=compact)
+        return super().create_message(session_id, agent_id, session_message, **kwargs)
+
+    def offload_tool_results(self, message: Message) -> Message:
+        """Return ``message`` with large tool results replaced by artifact references."""
+        if not self.offload_chars:
+            return message
+        content = message.get("content") or []
+        compact_content = [self._offload_block(block) for block in content]
+        if all(new is old for new, old in zip(compact_content, content)):
+            return message
+        return {**message, "content": compact_content}
+
+    def _offload_block(self, block: dict) -> dict:
+        tool_result = block.get("toolResult")
+        if not tool_result:
+            return block
+        text = _result_text(tool_result.get("content") or [])
+        if text is None or len(text) <= self.offload_chars:
+            return block
+
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+        path = self.artifact_dir / f"{digest}.txt"
+        if artifact_io.write_behind_nowait(self.config.session_id, _write_artifact, path, text) is None:
+            # Backlog full: write inline rather than persist a pointer to nothing.
+            try:
+                _write_artifact(path, text)
+            except OSError:
+                logger.exception("Failed to store tool output at %s; persisting it inline", path)
+                _record(failures=1)
+                return block
+            _record(inlineWrites=1)
+
+        compact = compact_tool_output(text, path)
+        _record(offloadedResults=1, offloadedChars=len(text), persistedChars=len(compact))
+        return {"toolResult": {**tool_result, "content": [{"text": compact}]}}
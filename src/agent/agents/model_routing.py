@@ -0,0 +1,172 @@
+"""Route agents to model tiers and fall back to the primary model on errors.
+
+Each specialist config declares a ``MODEL_TIER``. ``primary`` is the model from
+``get_openai_credentials``; other tiers map to model ids through a JSON object
+such as ``{"fast": "gpt-4o-mini"}``. The mapping is read from the SSM parameter
+named by ``OPENAI_MODEL_TIERS_PARAMETER`` when it is set, so tiers can be retuned
+without a deploy, and otherwise from ``OPENAI_MODEL_TIERS``. A tier without a
+mapping uses the primary model.
+
+A tier model whose request fails before it produced any event is retried once on
+the primary model. Calls, latency, fallbacks and token usage are counted per
+tier for the runtimeStats control action.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections.abc import AsyncGenerator, AsyncIterable, Callable
+from threading import RLock
+from typing import Any
+
+from strands.models.model import Model
+
+from utils.ssm import get_ssm_parameter
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_TIER = "primary"
+
+_stats_lock = RLock()
+_tier_stats: dict[str, dict[str, float]] = {}
+
+
+def model_tier_map() -> dict[str, str]:
+    """Tier name to model id from SSM or ``OPENAI_MODEL_TIERS``; empty when neither is usable."""
+    parameter_name = os.environ.get("OPENAI_MODEL_TIERS_PARAMETER", "").strip()
+    if parameter_name:
+        try:
+            return _parse_tier_map(get_ssm_parameter(parameter_name), parameter_name)
+        except ValueError:
+            logger.warning("Could not read model tiers from %s; using OPENAI_MODEL_TIERS", parameter_name, exc_info=True)
+    return _parse_tier_map(os.environ.get("OPENAI_MODEL_TIERS", ""), "OPENAI_MODEL_TIERS")
+
+
+def _parse_tier_map(raw_value: str, source: str) -> dict[str, str]:
+    if not raw_value.strip():
+        return {}
+    try:
+        parsed = json.loads(raw_value)
+    except json.JSONDecodeError:
+        parsed = None
+    if not isinstance(parsed, dict):
+        logger.warning("Invalid %s=%r; using the primary model for every tier", source, raw_value)
+        return {}
+    return {str(tier): str(model_id).strip() for tier, model_id in parsed.items() if str(model_id or "").strip()}
+
+
+def _record(tier: str, **values: float) -> None:
+    with _stats_lock:
+        stats = _tier_stats.setdefault(
+            tier,
+            {"calls": 0, "errors": 0, "fallbacks": 0, "totalMs": 0.0, "firstEventMs": 0.0, "inputTokens": 0, "outputTokens": 0},
+        )
+        for key, value in values.items():
+            stats[key] += value
+
+
+def model_tier_stats() -> dict[str, dict[str, float]]:
+    with _stats_lock:
+        result = {}
+        for tier, stats in _tier_stats.items():
+            calls = stats["calls"] or 1
+            result[tier] = {
+                **stats,
+                "totalMs": round(stats["totalMs"], 1),
+                "firstEventMs": round(stats["firstEventMs"], 1),
+                "avgMs": round(stats["totalMs"] / calls, 1),
+                "avgFirstEventMs": round(stats["firstEventMs"] / calls, 1),
+            }
+        return result
+
+
+def reset_model_tier_stats() -> None:
+    with _stats_lock:
+        _tier_stats.clear()
+
+
+class TierModel(Model):
+    """Model for one tier that measures its calls and falls back to the primary model."""
+
+    def __init__(self, tier: str, model: Model, fallback: Model | None = None) -> None:
+        self.tier = tier
+        self.model = model
+        self.fallback = fallback
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    async def stream(self, *args: Any, **kwargs: Any) -> AsyncIterable[Any]:
+        async for event in self._measured(self.model.stream, *args, **kwargs):
+            yield event
+
+    async def structured_output(self, *args: Any, **kwargs: Any) -> AsyncGenerator[dict[str, Any], None]:
+        async for event in self._measured(self.model.structured_output, *args, **kwargs):
+            yield event
+
+    async def _measured(self, call: Callable[..., AsyncIterable[Any]], *args: Any, **kwargs: Any):
+        started = time.perf_counter()
+        first_event_ms = None
+        usage: dict = {}
+        try:
+            try:
+                async for event in call(*args, **kwargs):
+                    if first_event_ms is None:
+                        first_event_ms = (time.perf_counter() - started) * 1000
+                    if isinstance(event, dict) and "metadata" in event:
+                        usage = event["metadata"].get("usage") or usage
+                    yield event
+            except Exception:
+                if first_event_ms is not None or self.fallback is None:
+                    raise
+                logger.warning("Model tier %s failed before its first event; retrying on the primary model", self.tier, exc_info=True)
+                _record(self.tier, fallbacks=1)
+                fallback_call = getattr(self.fallback, call.__name__)
+                async for event in fallback_call(*args, **kwargs):
+                    if first_event_ms is None:
+                        first_event_ms = (time.perf_counter() - started) * 1000
+                    if isinstance(event, dict) and "metadata" in event:
+                        usage = event["metadata"].get("usage") or usage
+                    yield event
+        except Exception:
+            _record(self.tier, errors=1)
+            raise
+        finally:
+            _record(
+                self.tier,
+                calls=1,
+                totalMs=(time.perf_counter() - started) * 1000,
+                firstEventMs=first_event_ms or 0.0,
+                inputTokens=int(usage.get("inputTokens") or 0),
+                outputTokens=int(usage.get("outputTokens") or 0),
+            )
+
+
+class ModelRouter:
+    """Build one ``TierModel`` per tier, sharing the primary model as the fallback."""
+
+    def __init__(self, primary: Model, build: Callable[[str], Model], tiers: dict[str, str] | None = None) -> None:
+        self.primary = primary
+        self.tiers = model_tier_map() if tiers is None else dict(tiers)
+        self._build = build
+        self._models: dict[str, TierModel] = {}
+        self._lock = RLock()
+
+    def model_for(self, tier: str | None) -> TierModel:
+        tier = tier or PRIMARY_TIER
+        with self._lock:
+            model = self._models.get(tier)
+            if model is None:
+                model_id = self.tiers.get(tier) if tier != PRIMARY_TIER else None
+                if model_id and model_id != self.primary.get_config().get("model_id"):
+                    model = TierModel(tier, self._build(model_id), fallback=self.primary)
+                else:
+                    model = TierModel(tier, self.primary)
+                self._models[tier] = model
+            return model
@@ -2,7 +2,9 @@
 
 from strands import Agent
 
-from agents.orchestator.config import DESCRIPTION, NAME
+from agents.context_compaction import CompactingConversationManager
+from agents.model_routing import ModelRouter
+from agents.orchestator.config import DESCRIPTION, MODEL_TIER, NAME, SUMMARY_MODEL_TIER
 from agents.orchestator.system_prompt import repo_prompt
 from agents.orchestator.tool import create_tools
 from agents.runtime import AgentRuntimeTools
@@ -15,13 +17,23 @@ def create_agent(
     runtime_tools: AgentRuntimeTools,
     session_manager,
     trace_attributes: dict,
+    context_token_budget: int | None = None,
+    model_router: ModelRouter | None = None,
 ) -> Agent:
+    summary_model = None
+    if model_router is not None:
+        model = model_router.model_for(MODEL_TIER)
+        summary_model = model_router.model_for(SUMMARY_MODEL_TIER)
     return Agent(
         model=model,
         name=NAME,
         description=DESCRIPTION,
         system_prompt=repo_prompt(repository, state_backend),
-        tools=create_tools(model, runtime_tools, trace_attributes),
+        tools=create_tools(model, runtime_tools, trace_attributes, model_router),
+        conversation_manager=CompactingConversationManager(
+            token_budget=context_token_budget,
+            summary_model=summary_model,
+        ),
         session_manager=session_manager,
         trace_attributes=trace_attributes,
     )
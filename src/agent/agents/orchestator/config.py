@@ -2,7 +2,17 @@
 
 NAME = "orchestrator_agent"
 DESCRIPTION = "Answers general questions, routes infrastructure work to specialists, and owns the final user-facing response."
+MODEL_TIER = "primary"
+# Rolling conversation summaries only restate earlier turns.
+SUMMARY_MODEL_TIER = "fast"
 TOOL_NAMES = (
     "handoff_to_user",
     "create_pull_request",
 )
+FAN_OUT_AGENT_NAMES = (
+    "architect_agent",
+    "reviewer_agent",
+    "cost_capacity_agent",
+    "security_prover_agent",
+    "devops_agent",
+)
@@ -1,10 +1,14 @@
 """Tool assembly for the orchestrator agent."""
 
+import importlib
+
 from agents.architect.agent import create_tool as create_architect_tool
 from agents.cost_capacity.agent import create_tool as create_cost_capacity_tool
 from agents.devops.agent import create_tool as create_devops_tool
 from agents.engineer.agent import create_tool as create_engineer_tool
-from agents.orchestator.config import TOOL_NAMES
+from agents.model_routing import ModelRouter
+from agents.orchestator.config import FAN_OUT_AGENT_NAMES, TOOL_NAMES
+from agents.orchestator.tools.fan_out import create_fan_out_tool
 from agents.reviewer.agent import create_tool as create_reviewer_tool
 from agents.runtime import AgentRuntimeTools, pick_tools
 from agents.security_prover.agent import create_tool as create_security_prover_tool
@@ -20,11 +24,24 @@ SPECIALIST_TOOL_FACTORIES = (
 )
 
 
-def create_tools(model, runtime_tools: AgentRuntimeTools, trace_attributes: dict) -> list:
+def _specialist_model(model, model_router: ModelRouter | None, factory):
+    """Model for the ``MODEL_TIER`` declared in the specialist package's config."""
+    if model_router is None:
+        return model
+    config = importlib.import_module(f"{factory.__module__.rsplit('.', 1)[0]}.config")
+    return model_router.model_for(config.MODEL_TIER)
+
+
+def create_tools(
+    model,
+    runtime_tools: AgentRuntimeTools,
+    trace_attributes: dict,
+    model_router: ModelRouter | None = None,
+) -> list:
     own_tools = pick_tools(runtime_tools, TOOL_NAMES)
     specialist_tools = [
         factory(
-            model=model,
+            model=_specialist_model(model, model_router, factory),
             runtime_tools=runtime_tools,
             trace_attributes={
                 **trace_attributes,
@@ -33,5 +50,8 @@ def create_tools(model, runtime_tools: AgentRuntimeTools, trace_attributes: dict
         )
         for factory in SPECIALIST_TOOL_FACTORIES
     ]
-    return [*own_tools, *specialist_tools]
+    fan_out_tool = create_fan_out_tool(
+        [specialist for specialist in specialist_tools if specialist.tool_name in FAN_OUT_AGENT_NAMES]
+    )
+    return [*own_tools, *specialist_tools, fan_out_tool]
 
@@ -0,0 +1,152 @@
+"""Concurrent fan-out of independent specialist delegations."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+
+from strands import ToolContext, tool
+
+logger = logging.getLogger(__name__)
+
+FAN_OUT_TOOL_NAME = "parallel_specialists"
+_DEFAULT_FAN_OUT_CONCURRENCY = 3
+
+
+def fan_out_concurrency() -> int:
+    raw_value = os.environ.get("SPECIALIST_FAN_OUT_CONCURRENCY", str(_DEFAULT_FAN_OUT_CONCURRENCY))
+    try:
+        return max(1, int(raw_value))
+    except ValueError:
+        logger.warning(
+            "Invalid SPECIALIST_FAN_OUT_CONCURRENCY=%r; using %s",
+            raw_value,
+            _DEFAULT_FAN_OUT_CONCURRENCY,
+        )
+        return _DEFAULT_FAN_OUT_CONCURRENCY
+
+
+def _parse_delegations(raw_delegations: str | list, allowed: set[str]) -> list[tuple[str, str]]:
+    parsed = json.loads(raw_delegations) if isinstance(raw_delegations, str) else raw_delegations
+    if isinstance(parsed, dict):
+        parsed = parsed.get("delegations") or []
+    if not isinstance(parsed, list) or not parsed:
+        raise ValueError("delegations must be a non-empty JSON list")
+
+    delegations = []
+    for item in parsed:
+        if not isinstance(item, dict):
+            raise ValueError("each delegation must be an object with agent and input")
+        name = str(item.get("agent") or "").strip()
+        text = str(item.get("input") or "").strip()
+        if name not in allowed:
+            raise ValueError(f"agent must be one of: {', '.join(sorted(allowed))}")
+        if not text:
+            raise ValueError(f"input is required for {name}")
+        if any(name == existing for existing, _text in delegations):
+            raise ValueError(f"{name} can only be delegated once per fan-out; combine its inputs")
+        delegations.append((name, text))
+    return delegations
+
+
+def _envelope(name: str, final_text: str | None) -> dict:
+    if final_text is None:
+        return {"agent": name, "status": "failed", "summary": f"{name} did not produce a result"}
+    try:
+        parsed = json.loads(final_text)
+    except json.JSONDecodeError:
+        parsed = None
+    if isinstance(parsed, dict):
+        return parsed
+    return {"agent": name, "status": "failed", "summary": final_text}
+
+
+def _tagged_progress(name: str, chunk: dict) -> dict:
+    progress = chunk.get("specialistToolProgress") or {}
+    message = str(progress.get("message", ""))
+    if not message.startswith(name):
+        message = f"{name}: {message}"
+    return {"specialistToolProgress": {"phase": str(progress.get("phase", "")), "message": message}}
+
+
+def create_fan_out_tool(specialist_tools: list):
+    """Create a tool that runs independent specialist delegations concurrently.
+
+    Progress events from all specialists are merged into the tool stream as they
+    arrive. Final envelopes are returned in the order the delegations were given,
+    regardless of completion order.
+    """
+    tools_by_name = {specialist.tool_name: specialist for specialist in specialist_tools}
+    allowed = set(tools_by_name)
+
+    @tool(
+        name=FAN_OUT_TOOL_NAME,
+        description=(
+            "Run independent specialist delegations concurrently and return their "
+            "structured envelopes in request order. Use only when no delegation depends "
+            "on another's output, such as review, security, and cost verification of the "
+            f"same changed files. Allowed agents: {', '.join(sorted(allowed))}."
+        ),
+        context=True,
+    )
+    async def parallel_specialists(delegations: str, tool_context: ToolContext, max_concurrency: int = 0):
+        """Run independent specialist delegations at the same time.
+
+        Args:
+            delegations: JSON list of {"agent": "<specialist tool name>", "input": "<delegation text>"}.
+            max_concurrency: Optional lower concurrency limit; capped by the runtime setting.
+        """
+        try:
+            parsed = _parse_delegations(delegations, allowed)
+        except (ValueError, json.JSONDecodeError) as exc:
+            yield json.dumps({"agent": FAN_OUT_TOOL_NAME, "status": "failed", "summary": str(exc)})
+            return
+
+        limit = fan_out_concurrency()
+        if max_concurrency and max_concurrency > 0:
+            limit = min(limit, max_concurrency)
+        semaphore = asyncio.Semaphore(limit)
+        queue: asyncio.Queue = asyncio.Queue()
+        final_texts: list[str | None] = [None] * len(parsed)
+
+        async def run(index: int, name: str, text: str) -> None:
+            try:
+                async with semaphore:
+                    async for chunk in tools_by_name[name].__wrapped__(text, tool_context):
+                        if isinstance(chunk, dict):
+                            await queue.put(_tagged_progress(name, chunk))
+                        else:
+                            final_texts[index] = str(chunk)
+            except Exception as exc:
+                logger.exception("Specialist %s failed during fan-out", name)
+                final_texts[index] = json.dumps({"agent": name, "status": "failed", "summary": str(exc)})
+            finally:
+                await queue.put(None)
+
+        yield {
+            "specialistToolProgress": {
+                "phase": "started",
+                "message": f"{FAN_OUT_TOOL_NAME} started {len(parsed)} delegations with concurrency {limit}",
+            }
+        }
+        tasks = [asyncio.create_task(run(index, name, text)) for index, (name, text) in enumerate(parsed)]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        envelopes = [_envelope(name, final_texts[index]) for index, (name, _text) in enumerate(parsed)]
+        yield {"specialistToolProgress": {"phase": "completed", "message": f"{FAN_OUT_TOOL_NAME} completed"}}
+        yield json.dumps({"agent": FAN_OUT_TOOL_NAME, "results": envelopes}, indent=2)
+
+    return parallel_specialists
@@ -2,67 +2,50 @@
 
 from __future__ import annotations
 
+import importlib
 import os
 import json
 import mimetypes
 import re
+from functools import cache
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Dict, List, Union
 
 from strands import tool
-from strands_tools.diagram import diagram as strands_diagram
 
-from agents.artifacts import session_artifact_dir
-
-
-def _shared_files_object_key(file_path: Path) -> str:
-    mount_path = Path(
-        os.environ.get("SHARED_FILES_ACTIVE_PATH")
-        or os.environ.get("SHARED_FILES_MOUNT_PATH", "/mnt/s3")
-    ).resolve()
-    bucket_prefix = os.environ.get("SHARED_FILES_BUCKET_PREFIX", "").strip("/")
-    root_directory = os.environ.get("SHARED_FILES_ROOT_DIRECTORY", "").strip("/")
-    resolved_path = file_path.resolve()
-    try:
-        relative_path = resolved_path.relative_to(mount_path)
-    except ValueError:
-        return ""
-    relative_key = relative_path.as_posix().lstrip("/")
-    if root_directory:
-        relative_key = f"{root_directory}/{relative_key}".strip("/")
-    return f"{bucket_prefix}/{relative_key}".strip("/") if bucket_prefix else relative_key
+from agents.artifacts import presigned_artifact_url, session_artifact_dir
+from agents.workspace import workspace_session_id
 
 
 def _presigned_image_url(file_path: Path, mime_type: str | None) -> tuple[str, str, int | None]:
-    bucket_name = os.environ.get("SHARED_FILES_BUCKET_NAME", "").strip()
-    if not bucket_name:
-        return "", "", None
-
-    object_key = _shared_files_object_key(file_path)
-    if not object_key:
-        return "", "", None
-
-    try:
-        import boto3
-
-        expires_in = int(os.environ.get("DIAGRAM_URL_EXPIRES_IN", "3600"))
-        s3_client = boto3.client("s3")
-        extra_args: dict[str, Any] | None = {"ContentType": mime_type} if mime_type else None
-        if extra_args:
-            s3_client.upload_file(str(file_path), bucket_name, object_key, ExtraArgs=extra_args)
-        else:
-            s3_client.upload_file(str(file_path), bucket_name, object_key)
-        params: dict[str, Any] = {"Bucket": bucket_name, "Key": object_key}
-        if mime_type:
-            params["ResponseContentType"] = mime_type
-        url = s3_client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_in)
-        return url, object_key, expires_in
-    except Exception:
-        return "", object_key, None
+    expires_in = int(os.environ.get("DIAGRAM_URL_EXPIRES_IN", "3600"))
+    return presigned_artifact_url(file_path, mime_type, expires_in)
 
 
 def _diagram_output_dir() -> Path:
-    return session_artifact_dir(os.environ.get("SHARED_FILES_SESSION_ID", "agentcore"), "generic-diagrams")
+    return session_artifact_dir(workspace_session_id(), "generic-diagrams")
+
+
+def _save_diagram_to_session_dir(title: str, extension: str, content: str | None = None) -> str:
+    if extension and not extension.startswith("."):
+        extension = "." + extension
+    output_path = _diagram_output_dir() / f"{title}{extension}"
+    if content is not None:
+        output_path.write_text(content)
+    return str(output_path)
+
+
+@cache
+def _strands_diagram():
+    """Import strands_tools.diagram on first use; it pulls in matplotlib, networkx and graphviz.
+
+    The module writes every file through ``save_diagram_to_directory`` into
+    ``os.getcwd()/diagrams``. Route it to the calling session's artifact directory
+    instead, so diagrams never land in a checkout and no chdir is needed.
+    """
+    module = importlib.import_module("strands_tools.diagram")
+    module.save_diagram_to_directory = _save_diagram_to_session_dir
+    return module.diagram
 
 
 def _diagram_path_from_result(result: str) -> Path | None:
@@ -86,37 +69,31 @@ def diagram(
     open_diagram_flag: bool = False,
 ) -> str:
     """Create a generic diagram while keeping generated files outside the repository."""
-    previous_cwd = os.getcwd()
-    workdir = _diagram_output_dir()
-    try:
-        os.chdir(workdir)
-        result = strands_diagram(
-            diagram_type=diagram_type,
-            nodes=nodes,
-            edges=edges,
-            output_format=output_format,
-            title=title,
-            style=style,
-            elements=elements,
-            relationships=relationships,
-            open_diagram_flag=open_diagram_flag,
-        )
-        image_path = _diagram_path_from_result(str(result))
-        if not image_path:
-            return str(result)
-        mime_type = mimetypes.guess_type(image_path.name)[0] or f"image/{output_format}"
-        public_url, object_key, expires_in = _presigned_image_url(image_path, mime_type)
-        return json.dumps(
-            {
-                "ok": True,
-                "public_url": public_url,
-                "public_url_expires_in": expires_in,
-                "image_key": object_key,
-                "image_path": str(image_path),
-                "mime_type": mime_type,
-                "result": str(result),
-            },
-            indent=2,
-        )
-    finally:
-        os.chdir(previous_cwd)
+    result = _strands_diagram()(
+        diagram_type=diagram_type,
+        nodes=nodes,
+        edges=edges,
+        output_format=output_format,
+        title=title,
+        style=style,
+        elements=elements,
+        relationships=relationships,
+        open_diagram_flag=open_diagram_flag,
+    )
+    image_path = _diagram_path_from_result(str(result))
+    if not image_path:
+        return str(result)
+    mime_type = mimetypes.guess_type(image_path.name)[0] or f"image/{output_format}"
+    public_url, object_key, expires_in = _presigned_image_url(image_path, mime_type)
+    return json.dumps(
+        {
+            "ok": True,
+            "public_url": public_url,
+            "public_url_expires_in": expires_in,
+            "image_key": object_key,
+            "image_path": str(image_path),
+            "mime_type": mime_type,
+            "result": str(result),
+        },
+        indent=2,
+    )
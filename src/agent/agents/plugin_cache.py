@@ -0,0 +1,229 @@
+"""Process-shared provider plugin cache for Terraform/OpenTofu.
+
+Every fresh session checkout used to download the AWS provider again into its
+own ``.terraform``. All tofu/terraform runs now share one plugin cache
+(``TF_PLUGIN_CACHE_DIR`` if it is set, otherwise a directory under the system
+temp dir), so init links providers from the cache instead of downloading them.
+
+The cache itself is not safe for concurrent writers, so ``init_lock`` takes an
+``flock`` on it: shared when every provider pinned in ``.terraform.lock.hcl`` is
+already cached for this platform, exclusive otherwise and for ``-upgrade``.
+``async_init_lock`` does the same without blocking the event loop.
+Each init refreshes the mtime of the provider versions it uses. After an
+exclusive init, versions are evicted least recently used first until the cache
+fits in ``TF_PLUGIN_CACHE_MAX_MB``; versions used within the last hour are kept,
+since session ``.terraform`` directories link into the cache.
+
+``TF_PROVIDER_MIRROR_DIR`` points at a filesystem mirror, such as the one the
+image build pre-seeds with ``tofu providers mirror``. Providers found there are
+installed from the mirror and everything else from the registry. With
+``TF_PROVIDER_MIRROR_OFFLINE=true`` only the mirror is used. An existing
+``TF_CLI_CONFIG_FILE`` is left alone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from threading import RLock
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_MB = 4096
+_EVICTION_MIN_IDLE_SECONDS = 3600
+_LOCK_FILE = ".lock"
+_CLI_CONFIG_FILE = ".tofurc"
+_LOCKED_PROVIDER = re.compile(r'provider\s+"([^"]+)"\s*\{[^}]*?version\s*=\s*"([^"]+)"', re.DOTALL)
+
+_stats_lock = RLock()
+_stats = {"sharedInits": 0, "exclusiveInits": 0, "evictedVersions": 0, "evictedBytes": 0, "sizeBytes": 0}
+
+
+def plugin_cache_dir() -> Path:
+    raw_value = os.environ.get("TF_PLUGIN_CACHE_DIR", "").strip()
+    root = Path(raw_value) if raw_value else Path(tempfile.gettempdir()) / "terraform-plugin-cache"
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def plugin_cache_max_bytes() -> int:
+    raw_value = os.environ.get("TF_PLUGIN_CACHE_MAX_MB", str(_DEFAULT_MAX_MB))
+    try:
+        return max(0, int(raw_value)) * 1024 * 1024
+    except ValueError:
+        logger.warning("Invalid TF_PLUGIN_CACHE_MAX_MB=%r; using %s", raw_value, _DEFAULT_MAX_MB)
+        return _DEFAULT_MAX_MB * 1024 * 1024
+
+
+def provider_mirror_dir() -> Path | None:
+    raw_value = os.environ.get("TF_PROVIDER_MIRROR_DIR", "").strip()
+    return Path(raw_value) if raw_value and Path(raw_value).is_dir() else None
+
+
+def provider_mirror_offline() -> bool:
+    return os.environ.get("TF_PROVIDER_MIRROR_OFFLINE", "false").lower() == "true"
+
+
+def provider_platform() -> str:
+    machine = platform.machine().lower()
+    arch = {"x86_64": "amd64", "aarch64": "arm64"}.get(machine, machine)
+    return f"{sys.platform}_{arch}"
+
+
+def _record(**values: int) -> None:
+    with _stats_lock:
+        for key, value in values.items():
+            _stats[key] += value
+
+
+def plugin_cache_stats() -> dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_plugin_cache_stats() -> None:
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def _mirrored_providers(mirror: Path) -> list[str]:
+    """``host/namespace/type`` addresses present in a packed or unpacked mirror."""
+    return sorted(
+        "/".join(path.relative_to(mirror).parts)
+        for path in mirror.glob("*/*/*")
+        if path.is_dir() and not path.name.startswith(".")
+    )
+
+
+def _cli_config(mirror: Path, offline: bool) -> str:
+    providers = _mirrored_providers(mirror)
+    lines = ["provider_installation {", "  filesystem_mirror {", f"    path = {json.dumps(str(mirror))}"]
+    if not offline:
+        lines.append(f"    include = {json.dumps(providers)}")
+    lines.append("  }")
+    if not offline:
+        lines += ["  direct {", f"    exclude = {json.dumps(providers)}", "  }"]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def terraform_env() -> dict[str, str]:
+    """Environment overrides that point tofu/terraform at the shared cache and mirror."""
+    root = plugin_cache_dir()
+    env = {"TF_PLUGIN_CACHE_DIR": str(root)}
+    mirror = provider_mirror_dir()
+    if mirror is None or os.environ.get("TF_CLI_CONFIG_FILE"):
+        return env
+    offline = provider_mirror_offline()
+    if not offline and not _mirrored_providers(mirror):
+        return env
+    config_path = root / _CLI_CONFIG_FILE
+    content = _cli_config(mirror, offline)
+    try:
+        current = config_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        current = None
+    if current != content:
+        partial_path = config_path.with_name(f"{config_path.name}.{os.getpid()}.partial")
+        partial_path.write_text(content, encoding="utf-8")
+        os.replace(partial_path, config_path)
+    env["TF_CLI_CONFIG_FILE"] = str(config_path)
+    return env
+
+
+def locked_provider_dirs(workdir: Path, root: Path) -> list[Path] | None:
+    """Cache directories for the providers pinned in ``workdir``; None without a lock file."""
+    try:
+        lock_file = (workdir / ".terraform.lock.hcl").read_text(encoding="utf-8")
+    except (FileNotFoundError, UnicodeDecodeError):
+        return None
+    return [root / address / version for address, version in _LOCKED_PROVIDER.findall(lock_file)]
+
+
+@contextmanager
+def init_lock(workdir: Path, upgrade: bool = False) -> Iterator[Path]:
+    """Hold the cache lock around an init in ``workdir`` and keep the cache bounded afterwards."""
+    root = plugin_cache_dir()
+    provider_dirs = None if upgrade else locked_provider_dirs(workdir, root)
+    cached = provider_dirs is not None and all((path / provider_platform()).is_dir() for path in provider_dirs)
+    with open(root / _LOCK_FILE, "a+") as lock_handle:
+        fcntl.flock(lock_handle, fcntl.LOCK_SH if cached else fcntl.LOCK_EX)
+        try:
+            yield root
+            for path in locked_provider_dirs(workdir, root) or ():
+                if path.is_dir():
+                    os.utime(path)
+            if cached:
+                _record(sharedInits=1)
+            else:
+                _record(exclusiveInits=1)
+                evict_plugin_cache(root, plugin_cache_max_bytes())
+        finally:
+            fcntl.flock(lock_handle, fcntl.LOCK_UN)
+
+
+@asynccontextmanager
+async def async_init_lock(workdir: Path, upgrade: bool = False) -> AsyncIterator[Path]:
+    """``init_lock`` for coroutines; waiting for the lock and evicting run in worker threads."""
+    lock = init_lock(workdir, upgrade=upgrade)
+    root = await asyncio.to_thread(lock.__enter__)
+    try:
+        yield root
+    except BaseException:
+        if not await asyncio.to_thread(lock.__exit__, *sys.exc_info()):
+            raise
+    else:
+        await asyncio.to_thread(lock.__exit__, None, None, None)
+
+
+def _tree_size(path: Path) -> int:
+    size = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(directory, name)).st_size
+            except OSError:
+                continue
+    return size
+
+
+def evict_plugin_cache(root: Path, max_bytes: int, now: float | None = None) -> int:
+    """Remove least recently used provider versions until the cache fits; returns bytes removed.
+
+    Call with the cache lock held exclusively.
+    """
+    if max_bytes <= 0:
+        return 0
+    now = time.time() if now is None else now
+    versions = []
+    for path in root.glob("*/*/*/*"):
+        if path.is_dir() and not path.is_symlink():
+            versions.append((path.stat().st_mtime, _tree_size(path), path))
+    total = sum(size for _, size, _ in versions)
+    removed = 0
+    for mtime, size, path in sorted(versions):
+        if total <= max_bytes:
+            break
+        if now - mtime < _EVICTION_MIN_IDLE_SECONDS:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        logger.info("Evicted provider %s from the plugin cache", path.relative_to(root))
+        total -= size
+        removed += size
+        _record(evictedVersions=1, evictedBytes=size)
+    with _stats_lock:
+        _stats["sizeBytes"] = total
+    return removed
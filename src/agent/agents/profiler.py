@@ -0,0 +1,110 @@
+"""Optional per-invocation profiler dumps.
+
+Set ``AGENT_PROFILER=cprofile`` (or ``pyinstrument`` when that package is
+installed) to profile invocations and write the output into the session's
+``profiles`` artifact directory. ``AGENT_PROFILER_SAMPLE_RATE`` (0 to 1, default
+1) limits profiling to a fraction of invocations.
+
+Both profilers hook the event loop thread, so only one invocation per process is
+profiled at a time; invocations that overlap it are skipped. A cProfile dump
+covers everything the loop ran while it was active, including other sessions'
+streams; pyinstrument's async mode attributes time to the profiled task.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import random
+import time
+from pathlib import Path
+from threading import Lock
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+_active_lock = Lock()
+
+
+def profiler_mode() -> str:
+    mode = os.environ.get("AGENT_PROFILER", "").strip().lower()
+    if mode in {"", "0", "false", "off", "none"}:
+        return ""
+    if mode not in {"cprofile", "pyinstrument"}:
+        logger.warning("Invalid AGENT_PROFILER=%r; using cprofile", mode)
+        return "cprofile"
+    return mode
+
+
+def profiler_sample_rate() -> float:
+    raw_value = os.environ.get("AGENT_PROFILER_SAMPLE_RATE", "1")
+    try:
+        return min(1.0, max(0.0, float(raw_value)))
+    except ValueError:
+        logger.warning("Invalid AGENT_PROFILER_SAMPLE_RATE=%r; using 1", raw_value)
+        return 1.0
+
+
+class InvocationProfiler:
+    """Profile one invocation; a no-op unless profiling is enabled and sampled."""
+
+    def __init__(self, mode: str | None = None, sample_rate: float | None = None) -> None:
+        self.mode = profiler_mode() if mode is None else mode
+        rate = profiler_sample_rate() if sample_rate is None else sample_rate
+        self._profiler = None
+        if not self.mode or random.random() >= rate:
+            return
+        if not _active_lock.acquire(blocking=False):
+            return
+        try:
+            self._profiler = self._start()
+        except Exception:
+            _active_lock.release()
+            logger.exception("Failed to start %s profiler", self.mode)
+
+    @property
+    def active(self) -> bool:
+        return self._profiler is not None
+
+    def _start(self):
+        if self.mode == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument is not installed; using cprofile")
+                self.mode = "cprofile"
+            else:
+                profiler = Profiler(async_mode="enabled")
+                profiler.start()
+                return profiler
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def stop(self, output_dir: Path | None) -> str | None:
+        """Stop profiling and write the dump into ``output_dir``; returns its path."""
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return None
+        try:
+            if self.mode == "pyinstrument":
+                profiler.stop()
+            else:
+                profiler.disable()
+        finally:
+            _active_lock.release()
+        if output_dir is None:
+            return None
+        name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid4().hex[:8]}"
+        try:
+            if self.mode == "pyinstrument":
+                path = output_dir / f"{name}.html"
+                path.write_text(profiler.output_html(), encoding="utf-8")
+            else:
+                path = output_dir / f"{name}.prof"
+                profiler.dump_stats(str(path))
+        except OSError:
+            logger.exception("Failed to write %s profile to %s", self.mode, output_dir)
+            return None
+        return str(path)
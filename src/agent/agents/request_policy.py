@@ -0,0 +1,320 @@
+"""Deadlines, hedging and fallback for streaming model requests.
+
+``OpenRouterModel.stream`` hands each request to ``request_policy`` as a
+callable that opens one attempt. The policy is opt-in; with nothing configured
+the request streams as before.
+
+- ``LLM_INVOCATION_BUDGET_SECONDS`` bounds the whole invocation. Every model
+  call gets the remaining budget as its deadline, covering the wait for the
+  first event and every gap after it, so a stalled upstream fails the call with
+  ``ModelDeadlineExceeded`` instead of holding a specialist loop for minutes.
+- ``LLM_HEDGE_REQUESTS=true`` starts a second attempt when the first has not
+  produced a content event within the p95 first-content latency seen for that
+  model (never less than ``LLM_HEDGE_MIN_DELAY_SECONDS``). ``messageStart``
+  arrives with the response headers, before any token, so it is held back and
+  does not count. Latency is measured from when the attempt is granted its LLM
+  scheduler slot (``slot_granted``), not from when it started queueing. The
+  first attempt to produce content wins and the other is cancelled. No hedge
+  is sent until enough latencies have been seen, or while the LLM scheduler has
+  no idle slot.
+- ``OPENAI_FALLBACK_BASE_URL`` and ``OPENAI_FALLBACK_MODEL_ID`` name a secondary
+  endpoint. When every attempt fails before its first event, the request is
+  retried there with the same credentials. Context window overflows are raised
+  unchanged so strands can reduce the context instead.
+
+Each attempt runs in its own task and hands events over through a queue, so an
+HTTP response stream is never resumed from a different task than the one that
+opened it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextvars import ContextVar
+from threading import RLock
+from typing import Any
+
+from strands.types.exceptions import ContextWindowOverflowException
+
+from agents.timings import current_timings
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_HEDGE_MIN_DELAY_SECONDS = 2.0
+_HEDGE_MIN_SAMPLES = 20
+_LATENCY_WINDOW = 200
+_HEDGE_PERCENTILE = 0.95
+
+_END = object()
+
+_current_attempt: ContextVar["_Attempt | None"] = ContextVar("request_policy_attempt", default=None)
+
+
+class ModelDeadlineExceeded(TimeoutError):
+    """Raised when a model call runs past the remaining invocation budget."""
+
+
+def _env_float(name: str, default: float) -> float:
+    raw_value = os.environ.get(name, str(default))
+    try:
+        return max(0.0, float(raw_value))
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw_value, default)
+        return default
+
+
+def llm_invocation_budget_seconds() -> float:
+    return _env_float("LLM_INVOCATION_BUDGET_SECONDS", 0.0)
+
+
+def llm_hedge_requests() -> bool:
+    return os.environ.get("LLM_HEDGE_REQUESTS", "false").lower() == "true"
+
+
+def llm_hedge_min_delay_seconds() -> float:
+    return _env_float("LLM_HEDGE_MIN_DELAY_SECONDS", _DEFAULT_HEDGE_MIN_DELAY_SECONDS)
+
+
+def fallback_model_settings() -> dict[str, str]:
+    """Secondary ``base_url`` and ``model_id`` overrides; empty when no fallback is configured."""
+    settings = {
+        "base_url": os.environ.get("OPENAI_FALLBACK_BASE_URL", "").strip(),
+        "model_id": os.environ.get("OPENAI_FALLBACK_MODEL_ID", "").strip(),
+    }
+    return {key: value for key, value in settings.items() if value}
+
+
+def slot_granted() -> None:
+    """Restart the current attempt's latency clock once it holds its scheduler slot."""
+    attempt = _current_attempt.get()
+    if attempt is not None:
+        attempt.mark_started()
+
+
+def _is_preamble(event: Any) -> bool:
+    return isinstance(event, dict) and "messageStart" in event
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class _Attempt:
+    """One streaming attempt pumped into a queue by its own task.
+
+    ``ready`` resolves on the first event past ``messageStart``, or on the end
+    or failure of the stream; ``started`` is reset when the slot is granted.
+    """
+
+    def __init__(self, events: AsyncIterator[Any], on_expired: Callable[[], BaseException]) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self.started = loop.time()
+        self.ready_at: float | None = None
+        self.granted: asyncio.Future = loop.create_future()
+        self.ready: asyncio.Future = loop.create_future()
+        self.error: BaseException | None = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._expired = False
+        self._on_expired = on_expired
+        self._task = loop.create_task(self._pump(events))
+
+    def mark_started(self) -> None:
+        self.started = self._loop.time()
+        if not self.granted.done():
+            self.granted.set_result(None)
+
+    async def _pump(self, events: AsyncIterator[Any]) -> None:
+        _current_attempt.set(self)
+        try:
+            async for event in events:
+                self._put(event)
+        except asyncio.CancelledError:
+            if self._expired:
+                self._put(_Failure(self._on_expired()))
+            raise
+        except Exception as exc:
+            self._put(_Failure(exc))
+        else:
+            self._put(_END)
+
+    def _put(self, item: Any) -> None:
+        self._queue.put_nowait(item)
+        if not self.ready.done() and not _is_preamble(item):
+            if isinstance(item, _Failure):
+                self.error = item.error
+            self.ready_at = self._loop.time()
+            self.ready.set_result(None)
+
+    async def events(self) -> AsyncIterator[Any]:
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+
+    def expire(self) -> None:
+        self._expired = True
+        self._task.cancel()
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+
+class RequestPolicy:
+    """Apply the invocation deadline, hedging and fallback to model requests."""
+
+    def __init__(
+        self,
+        budget_seconds: float | None = None,
+        hedge: bool | None = None,
+        hedge_min_delay_seconds: float | None = None,
+    ) -> None:
+        self.budget_seconds = llm_invocation_budget_seconds() if budget_seconds is None else budget_seconds
+        self.hedge = llm_hedge_requests() if hedge is None else hedge
+        self.hedge_min_delay_seconds = (
+            llm_hedge_min_delay_seconds() if hedge_min_delay_seconds is None else hedge_min_delay_seconds
+        )
+        self._lock = RLock()
+        self._latencies: dict[str, deque[float]] = {}
+        self._stats = {"hedgesFired": 0, "hedgesWon": 0, "fallbacks": 0, "deadlineExceeded": 0}
+
+    def active(self, has_fallback: bool = False) -> bool:
+        return self.budget_seconds > 0 or self.hedge or has_fallback
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _deadline_exceeded(self) -> ModelDeadlineExceeded:
+        self._count("deadlineExceeded")
+        return ModelDeadlineExceeded(f"model call exceeded the {self.budget_seconds:g}s invocation budget")
+
+    def record_first_content(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=_LATENCY_WINDOW)).append(seconds)
+
+    def hedge_delay(self, key: str) -> float | None:
+        """Seconds to wait for first content before hedging, or None when hedging is off or unprimed."""
+        if not self.hedge:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies.get(key) or ())
+        if len(samples) < _HEDGE_MIN_SAMPLES:
+            return None
+        p95 = samples[min(len(samples) - 1, int(len(samples) * _HEDGE_PERCENTILE))]
+        return max(self.hedge_min_delay_seconds, p95)
+
+    def deadline(self, loop: asyncio.AbstractEventLoop) -> float | None:
+        """Loop time when the current invocation's budget runs out, if there is one."""
+        timings = current_timings()
+        if self.budget_seconds <= 0 or timings is None:
+            return None
+        return loop.time() + self.budget_seconds - timings.elapsed_seconds()
+
+    async def stream(
+        self,
+        key: str,
+        open_stream: Callable[[], AsyncIterator[Any]],
+        fallback: Callable[[], AsyncIterator[Any]] | None = None,
+        can_hedge: Callable[[], bool] = lambda: True,
+    ) -> AsyncIterator[Any]:
+        """Stream one model call under the policy; ``open_stream`` starts a fresh attempt."""
+        loop = asyncio.get_running_loop()
+        deadline = self.deadline(loop)
+        if deadline is not None and deadline <= loop.time():
+            raise self._deadline_exceeded()
+        try:
+            winner = await self._race(key, open_stream, deadline, can_hedge)
+        except (ModelDeadlineExceeded, ContextWindowOverflowException):
+            raise
+        except Exception:
+            if fallback is None:
+                raise
+            logger.warning("Model %s failed before its first event; retrying on the fallback endpoint", key, exc_info=True)
+            self._count("fallbacks")
+            winner = await self._race(f"{key}:fallback", fallback, deadline, lambda: False)
+        timer = loop.call_at(deadline, winner.expire) if deadline is not None else None
+        try:
+            async for event in winner.events():
+                yield event
+        finally:
+            if timer is not None:
+                timer.cancel()
+            winner.cancel()
+
+    async def _race(
+        self,
+        key: str,
+        open_stream: Callable[[], AsyncIterator[Any]],
+        deadline: float | None,
+        can_hedge: Callable[[], bool],
+    ) -> _Attempt:
+        loop = asyncio.get_running_loop()
+        delay = self.hedge_delay(key)
+        first = _Attempt(open_stream(), self._deadline_exceeded)
+        attempts = [first]
+        live = list(attempts)
+        # The first attempt's start the hedge was last considered for; a slot grant re-arms it.
+        hedge_checked_for = None
+        winner = None
+        error: BaseException | None = None
+        try:
+            while live:
+                hedge_at = None
+                if delay is not None and len(attempts) == 1 and hedge_checked_for != first.started:
+                    hedge_at = first.started + delay
+                wake_at = min((at for at in (deadline, hedge_at) if at is not None), default=None)
+                timeout = None if wake_at is None else max(0.0, wake_at - loop.time())
+                waiting = [attempt.ready for attempt in live]
+                if first in live and not first.granted.done():
+                    waiting.append(first.granted)
+                done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if deadline is not None and loop.time() >= deadline:
+                        raise self._deadline_exceeded()
+                    hedge_checked_for = first.started
+                    if can_hedge():
+                        attempts.append(_Attempt(open_stream(), self._deadline_exceeded))
+                        live.append(attempts[-1])
+                        self._count("hedgesFired")
+                    continue
+                for attempt in [attempt for attempt in live if attempt.ready.done()]:
+                    if attempt.error is not None:
+                        live.remove(attempt)
+                        error = attempt.error
+                        continue
+                    winner = attempt
+                    self.record_first_content(key, attempt.ready_at - attempt.started)
+                    if attempt is not attempts[0]:
+                        self._count("hedgesWon")
+                    return attempt
+            raise error
+        finally:
+            for attempt in attempts:
+                if attempt is not winner:
+                    attempt.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            keys = list(self._latencies)
+            stats = dict(self._stats)
+        hedge_delays = {key: self.hedge_delay(key) for key in keys}
+        return {
+            **stats,
+            "budgetSeconds": self.budget_seconds,
+            "hedging": self.hedge,
+            "hedgeDelayMs": {key: round(delay * 1000, 1) for key, delay in hedge_delays.items() if delay is not None},
+        }
+
+
+request_policy = RequestPolicy()
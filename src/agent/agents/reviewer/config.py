@@ -2,6 +2,7 @@
 
 NAME = "reviewer_agent"
 DESCRIPTION = "Reviews code and infrastructure changes for correctness, regressions, and missing tests."
+MODEL_TIER = "fast"
 TOOL_NAMES = (
     "handoff_to_user",
     "opentofu",
@@ -2,6 +2,7 @@
 
 from strands import Agent
 
+from agents.context_compaction import SupersededToolResults
 from agents.runtime import AgentRuntimeTools
 from agents.security_prover.config import DESCRIPTION, NAME
 from agents.security_prover.output import SecurityProverOutput
@@ -19,6 +20,7 @@ def create_agent(model, runtime_tools: AgentRuntimeTools, trace_attributes: dict
         system_prompt=SYSTEM_PROMPT,
         tools=create_tools(runtime_tools),
         plugins=[create_terrashark_plugin()],
+        hooks=[SupersededToolResults()],
         callback_handler=None,
         trace_attributes=trace_attributes,
     )
@@ -2,6 +2,7 @@
 
 NAME = "security_prover_agent"
 DESCRIPTION = "Checks IAM, network exposure, encryption, secret handling, and security evidence."
+MODEL_TIER = "primary"
 TOOL_NAMES = (
     "gateway",
     "handoff_to_user",
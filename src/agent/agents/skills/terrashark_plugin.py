@@ -1,5 +1,6 @@
 """TerraShark skill plugin configuration."""
 
+from functools import lru_cache
 from pathlib import Path
 
 from strands import AgentSkills
@@ -8,6 +9,16 @@ from strands import AgentSkills
 TERRASHARK_SKILL_DIR = Path(__file__).resolve().parent / "terrashark"
 
 
+@lru_cache(maxsize=1)
+def terrashark_skills() -> tuple:
+    """Resolve the TerraShark skill index once per process."""
+    return tuple(AgentSkills(skills=str(TERRASHARK_SKILL_DIR)).get_available_skills())
+
+
 def create_terrashark_plugin() -> AgentSkills:
-    """Create a fresh TerraShark AgentSkills plugin instance for one agent."""
-    return AgentSkills(skills=str(TERRASHARK_SKILL_DIR), max_resource_files=30)
+    """Create a fresh TerraShark AgentSkills plugin instance for one agent.
+
+    The plugin instance keeps per-agent state, but the parsed skill index is
+    shared so building a specialist does not re-read SKILL.md from disk.
+    """
+    return AgentSkills(skills=list(terrashark_skills()), max_resource_files=30)
@@ -0,0 +1,153 @@
+"""Cache of specialist responses for repeated, read-only delegations.
+
+A reviewer re-review after a no-op fix, or a second cost question in the same
+session, otherwise pays for a full specialist loop and its tool runs. Entries are
+keyed by session, specialist, normalized delegation text, workspace content
+fingerprint and model id, expire after ``SPECIALIST_CACHE_TTL_SECONDS`` and are
+evicted least recently used beyond ``SPECIALIST_CACHE_MAX_ENTRIES``.
+
+Only responses that left the workspace as they found it are stored, so a cached
+answer never stands in for work that changed files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_CACHE_TTL_SECONDS = 900
+_DEFAULT_CACHE_MAX_ENTRIES = 128
+# Generated and vendored trees: provider binaries, VCS data and caches do not change the answer.
+FINGERPRINT_IGNORED_DIRECTORIES = frozenset({".git", ".terraform", "node_modules", "__pycache__", ".venv"})
+_MAX_FILE_DIGESTS = 20_000
+
+_digests_lock = RLock()
+_file_digests: OrderedDict[str, tuple[int, int, str]] = OrderedDict()
+
+
+def _env_int(name: str, default: int) -> int:
+    raw_value = os.environ.get(name, str(default))
+    try:
+        return max(0, int(raw_value))
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw_value, default)
+        return default
+
+
+def specialist_cache_ttl_seconds() -> int:
+    """Lifetime of a cached response; 0 disables the cache."""
+    return _env_int("SPECIALIST_CACHE_TTL_SECONDS", _DEFAULT_CACHE_TTL_SECONDS)
+
+
+def specialist_cache_max_entries() -> int:
+    return _env_int("SPECIALIST_CACHE_MAX_ENTRIES", _DEFAULT_CACHE_MAX_ENTRIES)
+
+
+def normalize_delegation(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    with _digests_lock:
+        cached = _file_digests.get(path)
+        if cached is not None and cached[:2] == (size, mtime_ns):
+            _file_digests.move_to_end(path)
+            return cached[2]
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _digests_lock:
+        _file_digests[path] = (size, mtime_ns, value)
+        _file_digests.move_to_end(path)
+        while len(_file_digests) > _MAX_FILE_DIGESTS:
+            _file_digests.popitem(last=False)
+    return value
+
+
+def workspace_fingerprint(root: Path) -> str:
+    """Content hash of the files under ``root``; unchanged files are not re-read."""
+    fingerprint = hashlib.sha256()
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(name for name in subdirectories if name not in FINGERPRINT_IGNORED_DIRECTORIES)
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path, follow_symlinks=False)
+                digest = _file_digest(path, stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+            fingerprint.update(os.path.relpath(path, root).encode("utf-8", "surrogateescape"))
+            fingerprint.update(b"\0" + digest.encode("ascii") + b"\n")
+    return fingerprint.hexdigest()
+
+
+def specialist_cache_key(session_id: str, specialist: str, delegation: str, workspace_hash: str, model_id: str) -> str:
+    payload = json.dumps([session_id, specialist, normalize_delegation(delegation), workspace_hash, model_id])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SpecialistResponseCache:
+    """TTL and LRU bounded map from delegation key to the specialist's final text."""
+
+    def __init__(self, ttl_seconds: int | None = None, max_entries: int | None = None) -> None:
+        self._ttl_seconds = specialist_cache_ttl_seconds() if ttl_seconds is None else max(0, ttl_seconds)
+        self._max_entries = specialist_cache_max_entries() if max_entries is None else max(0, max_entries)
+        self._lock = RLock()
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bypassed": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_seconds > 0 and self._max_entries > 0
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and time.monotonic() - cached[0] > self._ttl_seconds:
+                self._entries.pop(key)
+                self._stats["evictions"] += 1
+                cached = None
+            if cached is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return cached[1]
+
+    def put(self, key: str, response: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "maxEntries": self._max_entries}
+
+
+specialist_cache = SpecialistResponseCache()
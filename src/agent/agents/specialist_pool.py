@@ -0,0 +1,158 @@
+"""Bounded pools of reusable specialist agents."""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from threading import RLock
+from typing import Any
+
+from agents.timings import timed_phase
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_SPECIALIST_POOL_SIZE = 2
+
+_stats_lock = RLock()
+_pool_stats: dict[str, dict[str, int]] = {}
+
+
+def specialist_pool_size() -> int:
+    raw_value = os.environ.get("SPECIALIST_AGENT_POOL_SIZE", str(_DEFAULT_SPECIALIST_POOL_SIZE))
+    try:
+        return max(0, int(raw_value))
+    except ValueError:
+        logger.warning(
+            "Invalid SPECIALIST_AGENT_POOL_SIZE=%r; using %s",
+            raw_value,
+            _DEFAULT_SPECIALIST_POOL_SIZE,
+        )
+        return _DEFAULT_SPECIALIST_POOL_SIZE
+
+
+def _conversation_manager_state(agent: Any) -> dict | None:
+    get_state = getattr(getattr(agent, "conversation_manager", None), "get_state", None)
+    return get_state() if callable(get_state) else None
+
+
+def reset_agent_conversation(agent: Any, system_prompt: Any, manager_state: dict | None = None) -> None:
+    """Clear per-delegation conversation state while keeping the tool registry.
+
+    ``manager_state`` is the conversation manager's state from when the agent was
+    created; restoring it drops the removed-message count and any summary left
+    by the previous lease.
+    """
+    agent.messages = []
+    agent.state = type(agent.state)()
+    if system_prompt is not None:
+        agent.system_prompt = system_prompt
+    if manager_state is not None:
+        agent.conversation_manager.restore_from_session(manager_state)
+    metrics = getattr(agent, "event_loop_metrics", None)
+    if metrics is not None:
+        agent.event_loop_metrics = type(metrics)()
+
+
+class SpecialistAgentPool:
+    """Reuse specialist agents for one (specialist, model, session) binding within a turn.
+
+    A pool lives as long as the specialist tool that owns it, which is rebuilt
+    with the orchestrator on every invocation. Its agents hold that invocation's
+    handoff and pull-request tools, which write to per-turn result lists, so they
+    are not carried over to the next turn.
+
+    Agents are created lazily, leased for one delegation, reset, and returned to
+    an idle list bounded by ``max_idle``. Leases beyond the bound still get an
+    agent; the surplus is discarded on release. Agents whose delegation failed
+    are always discarded because their conversation may be inconsistent.
+    """
+
+    def __init__(self, name: str, create_agent: Callable[[], Any], max_idle: int | None = None) -> None:
+        self.name = name
+        self._create_agent = create_agent
+        self._max_idle = specialist_pool_size() if max_idle is None else max(0, max_idle)
+        self._lock = RLock()
+        self._idle: list[Any] = []
+        self._initial_state: dict[int, tuple[Any, dict | None]] = {}
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        agent = self._acquire()
+        try:
+            yield agent
+        except BaseException:
+            self._discard(agent)
+            raise
+        self._release(agent)
+
+    def _acquire(self) -> Any:
+        with self._lock:
+            if self._idle:
+                agent = self._idle.pop()
+                _record(self.name, "reused")
+                return agent
+        with timed_phase("specialist_create", specialist=self.name):
+            agent = self._create_agent()
+        initial_state = (getattr(agent, "system_prompt", None), _conversation_manager_state(agent))
+        with self._lock:
+            self._initial_state[id(agent)] = initial_state
+        _record(self.name, "created")
+        return agent
+
+    def _release(self, agent: Any) -> None:
+        with self._lock:
+            system_prompt, manager_state = self._initial_state.get(id(agent), (None, None))
+            if len(self._idle) >= self._max_idle:
+                self._initial_state.pop(id(agent), None)
+                _record(self.name, "overflow", in_use_delta=-1)
+                return
+        try:
+            reset_agent_conversation(agent, system_prompt, manager_state)
+        except Exception:
+            logger.exception("Failed to reset pooled %s; discarding it", self.name)
+            self._discard(agent)
+            return
+        with self._lock:
+            self._idle.append(agent)
+        _record(self.name, "released", in_use_delta=-1)
+
+    def _discard(self, agent: Any) -> None:
+        with self._lock:
+            self._initial_state.pop(id(agent), None)
+        _record(self.name, "discarded", in_use_delta=-1)
+
+
+def _record(name: str, field: str, in_use_delta: int = 1) -> None:
+    with _stats_lock:
+        stats = _pool_stats.setdefault(
+            name,
+            {
+                "created": 0,
+                "reused": 0,
+                "released": 0,
+                "overflow": 0,
+                "discarded": 0,
+                "inUse": 0,
+                "peakInUse": 0,
+            },
+        )
+        stats[field] += 1
+        stats["inUse"] = max(0, stats["inUse"] + in_use_delta)
+        stats["peakInUse"] = max(stats["peakInUse"], stats["inUse"])
+
+
+def specialist_pool_stats() -> dict[str, dict[str, float]]:
+    """Return per-specialist lease counters and the share of leases served from a pool."""
+    with _stats_lock:
+        snapshot = {name: dict(stats) for name, stats in _pool_stats.items()}
+    for stats in snapshot.values():
+        leases = stats["created"] + stats["reused"]
+        stats["reuseRatio"] = round(stats["reused"] / leases, 3) if leases else 0.0
+    return snapshot
+
+
+def reset_specialist_pool_stats() -> None:
+    with _stats_lock:
+        _pool_stats.clear()
@@ -0,0 +1,192 @@
+"""Coalesce streamed text deltas into fewer SSE frames."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator
+from threading import RLock
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_WINDOW_MS = 40.0
+_DEFAULT_MAX_BYTES = 2048
+_DEFAULT_MAX_BUFFERED_EVENTS = 256
+
+_stats_lock = RLock()
+_totals: dict[str, float] = {}
+
+
+def _env_number(name: str, default: float, cast=float):
+    raw_value = os.environ.get(name, str(default))
+    try:
+        return max(0, cast(raw_value))
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw_value, default)
+        return default
+
+
+def stream_coalesce_window_ms() -> float:
+    """Milliseconds a text delta may wait for followers; 0 disables coalescing."""
+    return _env_number("STREAM_COALESCE_WINDOW_MS", _DEFAULT_WINDOW_MS)
+
+
+def stream_coalesce_max_bytes() -> int:
+    return _env_number("STREAM_COALESCE_MAX_BYTES", _DEFAULT_MAX_BYTES, int) or _DEFAULT_MAX_BYTES
+
+
+def stream_coalesce_max_buffered_events() -> int:
+    return _env_number("STREAM_COALESCE_MAX_BUFFERED_EVENTS", _DEFAULT_MAX_BUFFERED_EVENTS, int) or 1
+
+
+def _is_text_delta(event: dict) -> bool:
+    return len(event) == 1 and isinstance(event.get("data"), str)
+
+
+class _Failure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+_END = object()
+
+
+async def coalesce_stream(
+    events: AsyncIterator[dict],
+    *,
+    window_ms: float | None = None,
+    max_bytes: int | None = None,
+    max_buffered_events: int | None = None,
+) -> AsyncIterator[dict]:
+    """Yield ``events`` with consecutive ``{"data": str}`` deltas merged into frames.
+
+    A frame is flushed when its first delta has waited ``window_ms``, when it
+    reaches ``max_bytes`` of UTF-8 text, or just before any other event, so tool
+    and lifecycle events keep their position relative to the text. Upstream events
+    are read by a pump task into a queue of at most ``max_buffered_events``; when
+    the client stops reading, the pump blocks and the model stream is paused
+    rather than buffered without bound.
+    """
+    window = (stream_coalesce_window_ms() if window_ms is None else window_ms) / 1000
+    limit = stream_coalesce_max_bytes() if max_bytes is None else max_bytes
+    counters = {
+        "streams": 1,
+        "inputDeltas": 0,
+        "frames": 0,
+        "textFrames": 0,
+        "textBytes": 0,
+        "windowFlushes": 0,
+        "sizeFlushes": 0,
+        "boundaryFlushes": 0,
+        "backPressureWaits": 0,
+        "seconds": 0.0,
+    }
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    if window <= 0:
+        try:
+            async for event in events:
+                counters["frames"] += 1
+                yield event
+        finally:
+            counters["seconds"] = loop.time() - started
+            _record(counters)
+        return
+
+    queue: asyncio.Queue = asyncio.Queue(
+        maxsize=stream_coalesce_max_buffered_events() if max_buffered_events is None else max(1, max_buffered_events)
+    )
+
+    async def pump() -> None:
+        try:
+            async for event in events:
+                if queue.full():
+                    counters["backPressureWaits"] += 1
+                await queue.put(event)
+        except Exception as exc:
+            await queue.put(_Failure(exc))
+            return
+        await queue.put(_END)
+
+    pending: list[str] = []
+    pending_bytes = 0
+    deadline: float | None = None
+
+    def flush(reason: str) -> dict:
+        nonlocal pending, pending_bytes, deadline
+        frame = {"data": "".join(pending)}
+        counters["frames"] += 1
+        counters["textFrames"] += 1
+        counters["textBytes"] += pending_bytes
+        counters[f"{reason}Flushes"] += 1
+        pending, pending_bytes, deadline = [], 0, None
+        return frame
+
+    pump_task = asyncio.create_task(pump())
+    getter: asyncio.Future | None = None
+    try:
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(queue.get())
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait({getter}, timeout=timeout)
+            if not done:
+                yield flush("window")
+                continue
+            item, getter = getter.result(), None
+
+            if item is _END:
+                break
+            if isinstance(item, _Failure):
+                if pending:
+                    yield flush("boundary")
+                raise item.error
+            if _is_text_delta(item):
+                text = item["data"]
+                counters["inputDeltas"] += 1
+                pending.append(text)
+                pending_bytes += len(text.encode("utf-8"))
+                if deadline is None:
+                    deadline = loop.time() + window
+                if pending_bytes >= limit:
+                    yield flush("size")
+                continue
+            if pending:
+                yield flush("boundary")
+            counters["frames"] += 1
+            yield item
+
+        if pending:
+            yield flush("boundary")
+    finally:
+        if getter is not None:
+            getter.cancel()
+        pump_task.cancel()
+        await asyncio.gather(pump_task, return_exceptions=True)
+        counters["seconds"] = loop.time() - started
+        _record(counters)
+
+
+def _record(counters: dict[str, float]) -> None:
+    with _stats_lock:
+        for key, value in counters.items():
+            _totals[key] = _totals.get(key, 0) + value
+
+
+def stream_coalescer_stats() -> dict[str, float]:
+    """Return aggregate frame counters plus frames/sec, bytes/frame and deltas/frame."""
+    with _stats_lock:
+        snapshot = dict(_totals)
+    frames = snapshot.get("textFrames", 0)
+    seconds = snapshot.get("seconds", 0)
+    snapshot["framesPerSecond"] = round(snapshot.get("frames", 0) / seconds, 2) if seconds else 0.0
+    snapshot["bytesPerFrame"] = round(snapshot.get("textBytes", 0) / frames, 1) if frames else 0.0
+    snapshot["deltasPerFrame"] = round(snapshot.get("inputDeltas", 0) / frames, 2) if frames else 0.0
+    return snapshot
+
+
+def reset_stream_coalescer_stats() -> None:
+    with _stats_lock:
+        _totals.clear()
@@ -0,0 +1,133 @@
+"""Per-invocation phase timers exported as OpenTelemetry spans.
+
+``invocations`` starts an ``InvocationTimings`` for each request and binds it in a
+context variable. Code on the request path wraps its slow steps in
+``timed_phase``: credential lookup, session manager creation, checkpoint I/O,
+model calls, specialist runs and subprocess tools. Each phase is exported as a
+child span of the invocation span and accumulated into a summary that the
+runtime streams back as a ``lifecycle: timings`` event.
+
+Phases may overlap. A specialist phase includes the model calls it makes, so the
+summary is a breakdown of where time went, not a partition of the total. Spans
+are created with an explicit parent rather than made current, so phases can be
+held open across ``yield`` in async generators without detaching contexts.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import RLock
+from typing import Any
+
+from opentelemetry import trace
+from opentelemetry.trace import Span, Status, StatusCode
+
+_tracer = trace.get_tracer("agentcore.runtime")
+_current_timings: ContextVar["InvocationTimings | None"] = ContextVar("invocation_timings", default=None)
+
+
+class InvocationTimings:
+    """Accumulate phase durations and marks for one invocation."""
+
+    def __init__(self, attributes: dict[str, Any] | None = None) -> None:
+        self.span: Span = _tracer.start_span("agentcore.invocation", attributes=_span_attributes(attributes))
+        self._started = time.perf_counter()
+        self._lock = RLock()
+        self._phases: dict[str, list[float]] = {}
+        self._marks: dict[str, float] = {}
+        self._finished: dict | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            phase = self._phases.setdefault(name, [0.0, 0])
+            phase[0] += seconds
+            phase[1] += 1
+
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self._started
+
+    def mark(self, name: str) -> None:
+        """Record the first time ``name`` happened, relative to the invocation start."""
+        with self._lock:
+            self._marks.setdefault(name, time.perf_counter() - self._started)
+
+    def summary(self) -> dict:
+        with self._lock:
+            if self._finished is not None:
+                return self._finished
+            return {
+                "totalMs": _ms(time.perf_counter() - self._started),
+                "phases": {
+                    name: {"ms": _ms(seconds), "count": count}
+                    for name, (seconds, count) in sorted(self._phases.items(), key=lambda item: -item[1][0])
+                },
+                "marks": {name: _ms(seconds) for name, seconds in self._marks.items()},
+            }
+
+    def finish(self, error: BaseException | None = None) -> dict:
+        """End the invocation span with per-phase attributes and freeze the summary."""
+        with self._lock:
+            if self._finished is not None:
+                return self._finished
+            summary = self.summary()
+            self._finished = summary
+        self.span.set_attribute("agentcore.total_ms", summary["totalMs"])
+        for name, phase in summary["phases"].items():
+            self.span.set_attribute(f"agentcore.phase.{name}.ms", phase["ms"])
+            self.span.set_attribute(f"agentcore.phase.{name}.count", phase["count"])
+        for name, offset in summary["marks"].items():
+            self.span.set_attribute(f"agentcore.mark.{name}.ms", offset)
+        if error is not None:
+            self.span.record_exception(error)
+            self.span.set_status(Status(StatusCode.ERROR, str(error)))
+        self.span.end()
+        return summary
+
+
+def start_invocation_timings(attributes: dict[str, Any] | None = None) -> InvocationTimings:
+    """Start timing an invocation and bind it to the current context."""
+    timings = InvocationTimings(attributes)
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> InvocationTimings | None:
+    return _current_timings.get()
+
+
+@contextmanager
+def timed_phase(name: str, **attributes: Any) -> Iterator[Span]:
+    """Time a block as phase ``name`` of the current invocation, if any, and export it as a span."""
+    timings = _current_timings.get()
+    context = trace.set_span_in_context(timings.span) if timings is not None else None
+    span = _tracer.start_span(f"agentcore.{name}", context=context, attributes=_span_attributes(attributes))
+    started = time.perf_counter()
+    try:
+        yield span
+    except Exception as exc:
+        span.record_exception(exc)
+        span.set_status(Status(StatusCode.ERROR, str(exc)))
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        span.set_attribute("agentcore.duration_ms", _ms(elapsed))
+        span.end()
+        if timings is not None:
+            timings.add(name, elapsed)
+
+
+def mark_phase(name: str) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.mark(name)
+
+
+def _span_attributes(attributes: dict[str, Any] | None) -> dict[str, Any]:
+    return {key: value for key, value in (attributes or {}).items() if isinstance(value, (str, bool, int, float))}
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
@@ -1,5 +1,6 @@
 """Helpers for exposing specialist agents as orchestrator tools."""
 
+import asyncio
 import base64
 import json
 from collections.abc import Callable
@@ -9,10 +10,17 @@ from strands import Agent, ToolContext, tool
 
 from agents.cancellation import registered_agent
 from agents.runtime import AgentRuntimeTools
+from agents.specialist_cache import specialist_cache, specialist_cache_key, workspace_fingerprint
+from agents.specialist_pool import SpecialistAgentPool
+from agents.timings import timed_phase
+from agents.workspace import current_workspace
 
 
 AgentFactory = Callable[[object, AgentRuntimeTools, dict], Agent]
 
+# Invocation state flag that makes every specialist run fresh instead of reusing cached responses.
+BYPASS_SPECIALIST_CACHE = "bypass_specialist_cache"
+
 
 def create_agent_text_tool(
     *,
@@ -29,19 +37,74 @@ def create_agent_text_tool(
     Strands' Agent.as_tool streams sub-agent events into the parent stream. That is
     useful for progress display, but it can leak sub-agent side effects such as
     handoff events and make the parent/UI disagree about the actual tool result.
-    The orchestrator needs a plain tool result, so each invocation uses a fresh
-    specialist agent and returns only its final AgentResult text.
+    The orchestrator needs a plain tool result, so each invocation leases a
+    specialist agent with a clean conversation from a bounded pool and returns
+    only its final AgentResult text. The pool belongs to this tool, so agents are
+    reused across delegations within one turn, not across turns.
+
+    Specialists with a structured output model reuse a cached response when the
+    same delegation is repeated in the session against unchanged workspace
+    content; the cache hit is reported as a ``cache_hit`` progress event.
     """
 
+    pool = SpecialistAgentPool(name, lambda: create_agent(model, runtime_tools, trace_attributes))
+
     @tool(name=name, description=description, context=True)
     async def specialist_agent(input: str, tool_context: ToolContext):
-        agent = create_agent(model, runtime_tools, trace_attributes)
-        session_id = str(trace_attributes.get("session.id") or "")
         specialist_input = _with_original_user_prompt(
             original_user_prompt=tool_context.agent.state.get("original_user_prompt"),
             original_context=tool_context.agent.state.get("original_user_context"),
             specialist_input=input,
         )
+        fingerprint = await _cacheable_workspace_fingerprint(tool_context)
+        cache_key = None
+        if fingerprint is not None:
+            # Keyed on what the specialist actually sees, so the same delegation under a new user request misses.
+            session_id = str(trace_attributes.get("session.id") or "")
+            cache_key = specialist_cache_key(
+                session_id, name, _specialist_input_text(specialist_input), fingerprint, _model_id(model)
+            )
+            cached = specialist_cache.get(cache_key)
+            if cached is not None:
+                yield _progress("cache_hit", f"{name} reused a cached result")
+                yield cached
+                return
+
+        final_text = None
+        with timed_phase(f"specialist.{name}", specialist=name), pool.lease() as agent:
+            async for chunk in _run_specialist(agent, specialist_input, tool_context):
+                if isinstance(chunk, str):
+                    final_text = chunk
+                yield chunk
+
+        # Runs after the final yield: the decorated tool drains this generator before returning its result.
+        if cache_key is not None and final_text is not None and _is_read_only_response(final_text):
+            if await _workspace_fingerprint() == fingerprint:
+                specialist_cache.put(cache_key, final_text)
+
+    async def _cacheable_workspace_fingerprint(tool_context: ToolContext) -> str | None:
+        if output_model is None or not specialist_cache.enabled or current_workspace() is None:
+            return None
+        if tool_context.invocation_state.get(BYPASS_SPECIALIST_CACHE):
+            specialist_cache.record_bypass()
+            return None
+        if _has_binary_blocks(tool_context.agent.state.get("original_user_context")):
+            return None
+        return await _workspace_fingerprint()
+
+    async def _workspace_fingerprint() -> str:
+        with timed_phase("specialist_cache.fingerprint", specialist=name):
+            return await asyncio.to_thread(workspace_fingerprint, current_workspace().root)
+
+    def _is_read_only_response(text: str) -> bool:
+        try:
+            response = output_model.model_validate_json(text)
+        except ValueError:
+            return False
+        return getattr(response, "status", "") == "complete" and not getattr(response, "changed_files", None)
+
+    async def _run_specialist(agent: Agent, specialist_input: str | list[dict], tool_context: ToolContext):
+        session_id = str(trace_attributes.get("session.id") or "")
         yield _progress("started", f"{name} started")
 
         result = None
@@ -64,6 +127,11 @@ def create_agent_text_tool(
                         yield _progress("text", preview)
                     continue
 
+                inner_progress = _inner_tool_progress(event_dict)
+                if inner_progress is not None:
+                    yield inner_progress
+                    continue
+
                 tool_use = event_dict.get("current_tool_use")
                 if isinstance(tool_use, dict):
                     tool_name = str(tool_use.get("name") or "tool")
@@ -174,10 +242,39 @@ def _extract_text_from_context_blocks(blocks: list[dict]) -> str:
     return "\n".join(chunks)
 
 
+def _specialist_input_text(specialist_input: str | list[dict]) -> str:
+    if isinstance(specialist_input, list):
+        return _extract_text_from_context_blocks(specialist_input)
+    return specialist_input
+
+
+def _model_id(model: object) -> str:
+    get_config = getattr(model, "get_config", None)
+    config = get_config() if callable(get_config) else {}
+    return str((config or {}).get("model_id") or "")
+
+
+def _has_binary_blocks(context: object) -> bool:
+    """Whether the original user context carries attachments that the cache key does not cover."""
+    if not isinstance(context, list):
+        return False
+    return any(isinstance(block, dict) and set(block) - {"text"} for block in context)
+
+
 def _progress(phase: str, message: str) -> dict[str, dict[str, str]]:
     return {"specialistToolProgress": {"phase": phase, "message": message}}
 
 
+def _inner_tool_progress(event: dict) -> dict[str, dict[str, str]] | None:
+    """Progress streamed by a tool the specialist is running, such as live IaC command output."""
+    stream_event = event.get("tool_stream_event")
+    data = stream_event.get("data") if isinstance(stream_event, dict) else None
+    progress = data.get("specialistToolProgress") if isinstance(data, dict) else None
+    if not isinstance(progress, dict):
+        return None
+    return _progress(str(progress.get("phase", "")), str(progress.get("message", "")))
+
+
 def _tail_preview(text: str, limit: int = 240) -> str:
     compact = " ".join(text.split())
     if not compact:
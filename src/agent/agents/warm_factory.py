@@ -0,0 +1,118 @@
+"""Process-wide warm resources reused across agent invocations."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from collections.abc import Callable, Hashable
+from threading import RLock
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_DEFAULT_WARM_RESOURCE_TTL_SECONDS = 900
+
+
+def credential_fingerprint(value: str) -> str:
+    """Return a short, non-reversible cache key for a credential value."""
+    return hashlib.sha256((value or "").encode("utf-8")).hexdigest()[:16]
+
+
+class WarmResourceCache:
+    """Keyed cache for expensive per-process resources with hit/miss counters.
+
+    Entries are grouped by ``kind`` (for example ``openai_client``) so metrics can
+    show which setup step is being reused. Expired entries are handed to their
+    ``on_evict`` callback so live connections can be released.
+    """
+
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self._entries: dict[tuple[str, Hashable], tuple[float, Any, Callable[[Any], None] | None]] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def get_or_create(
+        self,
+        kind: str,
+        key: Hashable,
+        build: Callable[[], T],
+        *,
+        ttl_seconds: int | None = None,
+        on_evict: Callable[[T], None] | None = None,
+    ) -> T:
+        cache_key = (kind, key)
+        with self._lock:
+            cached = self._entries.get(cache_key)
+            if cached is not None:
+                created_at, value, evict = cached
+                if ttl_seconds is None or time.monotonic() - created_at <= ttl_seconds:
+                    self._count(kind, "hits")
+                    return value
+                self._entries.pop(cache_key, None)
+                self._count(kind, "evictions")
+                _release(kind, value, evict)
+
+            value = build()
+            self._entries[cache_key] = (time.monotonic(), value, on_evict)
+            self._count(kind, "misses")
+            return value
+
+    def invalidate(self, kind: str, key: Hashable) -> bool:
+        with self._lock:
+            cached = self._entries.pop((kind, key), None)
+            if cached is None:
+                return False
+            self._count(kind, "evictions")
+        _release(kind, cached[1], cached[2])
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries.clear()
+            self._stats.clear()
+        for (kind, _key), (_created_at, value, evict) in entries:
+            _release(kind, value, evict)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            result = {kind: dict(counts) for kind, counts in self._stats.items()}
+            for kind, _key in self._entries:
+                result.setdefault(kind, {"hits": 0, "misses": 0, "evictions": 0})
+                result[kind]["size"] = result[kind].get("size", 0) + 1
+        for counts in result.values():
+            counts.setdefault("size", 0)
+        return result
+
+    def _count(self, kind: str, field: str) -> None:
+        counts = self._stats.setdefault(kind, {"hits": 0, "misses": 0, "evictions": 0})
+        counts[field] += 1
+
+
+def _release(kind: str, value: Any, evict: Callable[[Any], None] | None) -> None:
+    if evict is None:
+        return
+    try:
+        evict(value)
+    except Exception:
+        logger.exception("Failed to release warm %s resource", kind)
+
+
+def warm_resource_ttl_seconds() -> int:
+    raw_value = os.environ.get("WARM_RESOURCE_TTL_SECONDS", str(_DEFAULT_WARM_RESOURCE_TTL_SECONDS))
+    try:
+        return max(0, int(raw_value))
+    except ValueError:
+        logger.warning(
+            "Invalid WARM_RESOURCE_TTL_SECONDS=%r; using %s",
+            raw_value,
+            _DEFAULT_WARM_RESOURCE_TTL_SECONDS,
+        )
+        return _DEFAULT_WARM_RESOURCE_TTL_SECONDS
+
+
+warm_resources = WarmResourceCache()
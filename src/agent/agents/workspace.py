@@ -0,0 +1,76 @@
+"""Session-scoped workspace context for runtime tools.
+
+The runtime used to ``os.chdir`` into the session workspace on every invocation.
+The working directory is process-global, so two sessions served by one process
+could run terraform in each other's checkout. The workspace is now held in a
+context variable bound per invocation. asyncio tasks and ``asyncio.to_thread``,
+which Strands uses for synchronous tools, copy the current context, so each tool
+call sees the workspace of the invocation that made it.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class SessionWorkspace:
+    root: Path
+    session_id: str
+
+
+_current_workspace: ContextVar[SessionWorkspace | None] = ContextVar("session_workspace", default=None)
+
+
+def bind_workspace(root: str | Path, session_id: str) -> Token:
+    """Bind the workspace for the current context and return the reset token."""
+    return _current_workspace.set(SessionWorkspace(Path(root), session_id))
+
+
+@contextmanager
+def use_workspace(root: str | Path, session_id: str) -> Iterator[SessionWorkspace]:
+    token = bind_workspace(root, session_id)
+    try:
+        yield _current_workspace.get()
+    finally:
+        _current_workspace.reset(token)
+
+
+def current_workspace() -> SessionWorkspace | None:
+    return _current_workspace.get()
+
+
+def workspace_root() -> Path:
+    """Return the bound workspace root, or the process working directory outside a session."""
+    workspace = _current_workspace.get()
+    return workspace.root if workspace is not None else Path.cwd()
+
+
+def workspace_session_id() -> str:
+    workspace = _current_workspace.get()
+    if workspace is not None:
+        return workspace.session_id
+    return os.environ.get("SHARED_FILES_SESSION_ID", "agentcore")
+
+
+def resolve_in_workspace(path: str | None) -> Path:
+    """Resolve ``path`` against the workspace root, refusing paths that leave it."""
+    root = workspace_root().resolve()
+    requested = (path or ".").strip() or "."
+    candidate = (root / requested).resolve()
+    if candidate != root and root not in candidate.parents:
+        raise ValueError("path must stay inside the current session workspace")
+    return candidate
+
+
+def workspace_file_path(path: str) -> str:
+    """Anchor a relative tool path at the workspace root; absolute paths are kept."""
+    expanded = os.path.expanduser(path.strip())
+    if os.path.isabs(expanded):
+        return expanded
+    return str(workspace_root() / expanded)
@@ -0,0 +1,47 @@
+"""``file_read`` and ``file_write`` tools that resolve paths in the session workspace.
+
+The strands_tools versions resolve relative paths against the process working
+directory. These wrappers keep the upstream tool specs and behaviour but anchor
+relative paths at the workspace bound in ``agents.workspace`` before calling them.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from types import ModuleType
+from typing import Any
+
+from strands.tools.tools import PythonAgentTool
+from strands_tools import file_read as strands_file_read
+from strands_tools import file_write as strands_file_write
+
+from agents.workspace import workspace_file_path
+
+
+def _workspace_paths(value: str, comma_separated: bool) -> str:
+    if not comma_separated:
+        return workspace_file_path(value)
+    return ",".join(workspace_file_path(part) for part in value.split(",") if part.strip())
+
+
+def workspace_file_tool(module: ModuleType, path_fields: dict[str, bool]) -> PythonAgentTool:
+    """Wrap a module-style strands tool so ``path_fields`` resolve in the workspace.
+
+    ``path_fields`` maps each input field to whether it holds a comma-separated
+    list of paths.
+    """
+    tool_spec = module.TOOL_SPEC
+    tool_func: Callable[..., Any] = getattr(module, tool_spec["name"])
+
+    def run(tool: dict, **kwargs: Any) -> Any:
+        tool_input = dict(tool.get("input") or {})
+        for field, comma_separated in path_fields.items():
+            if isinstance(tool_input.get(field), str) and tool_input[field].strip():
+                tool_input[field] = _workspace_paths(tool_input[field], comma_separated)
+        return tool_func({**tool, "input": tool_input}, **kwargs)
+
+    return PythonAgentTool(tool_spec["name"], tool_spec, run)
+
+
+file_read = workspace_file_tool(strands_file_read, {"path": True, "comparison_path": False})
+file_write = workspace_file_tool(strands_file_write, {"path": False})
@@ -0,0 +1 @@
+"""Offline record/replay benchmarks for full orchestrator runs."""
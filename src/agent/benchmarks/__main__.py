@@ -0,0 +1,135 @@
+"""Command line entry point, run from ``src/agent``.
+
+Replay a cassette and fail on regressions against a saved report::
+
+    python -m benchmarks replay benchmarks/cassettes/validate-terraform.json \\
+        --speed 1 --repeat 5 --output report.json \\
+        --baseline baseline.json --max-regression 0.25
+
+Record a new cassette from a scenario against a real OpenAI-compatible endpoint,
+the deployed Gateway and locally installed IaC tools::
+
+    OPENAI_API_KEY=... python -m benchmarks record scenario.json \\
+        --upstream-url https://openrouter.ai/api/v1 --model <model-id> \\
+        --output benchmarks/cassettes/<name>.json
+
+The scenario file is a cassette with only its ``scenario`` section filled in.
+
+Report where startup time goes and fail past a budget::
+
+    python -m benchmarks imports --runs 3 --budget-ms 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from benchmarks.cassette import Cassette
+from benchmarks.harness import compare_reports, replay_report, run_scenario
+from benchmarks.import_time import measure_import_time, top_imports
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay = commands.add_parser("replay", help="Replay a cassette and report latency metrics.")
+    replay.add_argument("cassette", type=Path)
+    replay.add_argument("--speed", type=float, default=1.0, help="Recorded delay multiplier; 0 replays without delays.")
+    replay.add_argument("--repeat", type=int, default=1, help="Number of runs; the summary reports medians.")
+    replay.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout.")
+    replay.add_argument("--baseline", type=Path, help="Previous report to compare the summary against.")
+    replay.add_argument("--max-regression", type=float, default=0.25, help="Allowed relative regression, e.g. 0.25.")
+
+    record = commands.add_parser("record", help="Record a cassette from a scenario against live services.")
+    record.add_argument("scenario", type=Path)
+    record.add_argument("--output", type=Path, required=True)
+    record.add_argument("--upstream-url", default=os.environ.get("OPENAI_BASE_URL", ""))
+    record.add_argument("--api-key-env", default="OPENAI_API_KEY", help="Environment variable holding the API key.")
+    record.add_argument("--model", required=True)
+
+    imports = commands.add_parser("imports", help="Report import time of the runtime entry module.")
+    imports.add_argument("--module", default="main")
+    imports.add_argument("--runs", type=int, default=3, help="Fresh interpreters to measure; the fastest is reported.")
+    imports.add_argument("--top", type=int, default=20)
+    imports.add_argument("--budget-ms", type=float, help="Exit non-zero when the import takes longer.")
+    return parser
+
+
+def _replay(args: argparse.Namespace) -> int:
+    cassette = Cassette.load(args.cassette)
+    # Agents print streamed text to stdout; keep stdout for the report.
+    with contextlib.redirect_stdout(sys.stderr):
+        report = replay_report(cassette, speed=args.speed, repeat=args.repeat)
+    encoded = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        args.output.write_text(encoded, encoding="utf-8")
+    else:
+        sys.stdout.write(encoded)
+    print(f"{report['scenario']}: {json.dumps(report['summary'])}", file=sys.stderr)
+
+    failed = False
+    for run in report["runs"]:
+        for turn in run["turns"]:
+            for error in turn["errors"]:
+                print(f"error: {error}", file=sys.stderr)
+                failed = True
+        if run["replay"].get("missing"):
+            print(f"replay: {run['replay']['missing']} requests had no recording", file=sys.stderr)
+            failed = True
+    if args.baseline:
+        regressions = compare_reports(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.max_regression)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+def _record(args: argparse.Namespace) -> int:
+    if not args.upstream_url:
+        print("--upstream-url or OPENAI_BASE_URL is required to record", file=sys.stderr)
+        return 2
+    source = json.loads(args.scenario.read_text(encoding="utf-8"))
+    cassette = Cassette({"scenario": {**source.get("scenario", source), "modelId": args.model}})
+    with contextlib.redirect_stdout(sys.stderr):
+        run = run_scenario(
+            cassette,
+            record=True,
+            upstream_url=args.upstream_url,
+            upstream_api_key=os.environ.get(args.api_key_env, ""),
+            model_id=args.model,
+        )
+    cassette.save(args.output)
+    print(
+        f"recorded {len(cassette.model)} model calls, {len(cassette.subprocess)} subprocess runs "
+        f"in {run['totalMs']} ms to {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _imports(args: argparse.Namespace) -> int:
+    report = measure_import_time(args.module, runs=args.runs)
+    print(f"import {report['module']}: {report['totalMs']:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, cumulative, self_ms in top_imports(report, args.top):
+        print(f"{cumulative:>14.1f} {self_ms:>9.1f}  {name}")
+    if args.budget_ms is not None and report["totalMs"] > args.budget_ms:
+        print(f"budget: {report['totalMs']:.1f} ms exceeds {args.budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    commands = {"replay": _replay, "record": _record, "imports": _imports}
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Cassettes: recorded model, MCP and subprocess traffic for a scripted session.
+
+A cassette is one JSON document::
+
+    {
+      "version": 1,
+      "scenario": {
+        "name": "review-terraform",
+        "sessionId": "bench-session",
+        "modelId": "replay-model",
+        "files": {"main.tf": "..."},
+        "turns": [{"prompt": "Review the Terraform in this workspace."}]
+      },
+      "model": [...],
+      "mcp": {"gateway": {"tools": [...], "calls": [...]}, "opentofu": {...}},
+      "subprocess": [...]
+    }
+
+Recorded model responses hold the raw ``chat.completion.chunk`` payloads with
+their offsets from the request (``{"t": ms, "data": {...}}``). Hand-written
+cassettes may instead give ``text`` and ``toolCalls`` with ``latencyMs`` and
+``chunkIntervalMs``; they are expanded into chunks at replay time.
+
+Every entry may carry a ``digest`` of the request that produced it. Replay hands
+out the first unused entry with a matching digest and otherwise the next unused
+entry in recorded order, so hand-written cassettes without digests replay
+sequentially while recorded ones stay correct when specialists run concurrently.
+Paths under the harness's temporary root are stored as ``<root>``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+CASSETTE_VERSION = 1
+ROOT_PLACEHOLDER = "<root>"
+
+
+class ReplayMismatch(LookupError):
+    """Raised when replay needs a recording the cassette does not have."""
+
+
+def request_digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()[:24]
+
+
+class _Track:
+    """Recorded entries of one kind, handed out at most once each."""
+
+    def __init__(self, kind: str, entries: list[dict]) -> None:
+        self.kind = kind
+        self.entries = entries
+        self._used = [False] * len(entries)
+        self.unmatched = 0
+        self.missing = 0
+        self._lock = threading.Lock()
+
+    def take(self, digest: str, **match: Any) -> dict:
+        with self._lock:
+            fallback = None
+            for index, entry in enumerate(self.entries):
+                if self._used[index] or any(entry.get(key) != value for key, value in match.items()):
+                    continue
+                if entry.get("digest") == digest:
+                    self._used[index] = True
+                    return entry
+                if fallback is None:
+                    fallback = index
+            if fallback is None:
+                self.missing += 1
+                raise ReplayMismatch(f"no recorded {self.kind} response left for {match or digest}")
+            self._used[fallback] = True
+            if self.entries[fallback].get("digest"):
+                # A recorded request that no longer matches: the run has drifted from the recording.
+                self.unmatched += 1
+            return self.entries[fallback]
+
+    @property
+    def remaining(self) -> int:
+        return self._used.count(False)
+
+
+class Cassette:
+    """In-memory cassette with replay tracks and recording sinks."""
+
+    def __init__(self, data: dict | None = None) -> None:
+        data = data or {}
+        if data.get("version", CASSETTE_VERSION) != CASSETTE_VERSION:
+            raise ValueError(f"unsupported cassette version {data.get('version')!r}")
+        self.scenario: dict = data.get("scenario") or {}
+        self.model: list[dict] = list(data.get("model") or [])
+        self.mcp: dict[str, dict] = {name: dict(server) for name, server in (data.get("mcp") or {}).items()}
+        self.subprocess: list[dict] = list(data.get("subprocess") or [])
+        self.root = ""
+        self._lock = threading.Lock()
+        self.reset_replay()
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Cassette":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    def to_dict(self) -> dict:
+        return {
+            "version": CASSETTE_VERSION,
+            "scenario": self.scenario,
+            "model": self.model,
+            "mcp": self.mcp,
+            "subprocess": self.subprocess,
+        }
+
+    def reset_replay(self) -> None:
+        self.model_track = _Track("model", self.model)
+        self.mcp_tracks = {name: _Track(f"{name} MCP", server.get("calls") or []) for name, server in self.mcp.items()}
+        self.subprocess_track = _Track("subprocess", self.subprocess)
+
+    def normalize(self, value: Any) -> Any:
+        """Replace the harness root in strings with ``<root>``, recursively."""
+        return _map_strings(value, lambda text: text.replace(self.root, ROOT_PLACEHOLDER) if self.root else text)
+
+    def denormalize(self, value: Any) -> Any:
+        return _map_strings(value, lambda text: text.replace(ROOT_PLACEHOLDER, self.root) if self.root else text)
+
+    def record_model(self, entry: dict) -> None:
+        with self._lock:
+            self.model.append(entry)
+
+    def record_mcp(self, server: str, tools: list[dict] | None = None, call: dict | None = None) -> None:
+        with self._lock:
+            recorded = self.mcp.setdefault(server, {"tools": [], "calls": []})
+            if tools is not None:
+                recorded["tools"] = tools
+            if call is not None:
+                recorded.setdefault("calls", []).append(call)
+
+    def record_subprocess(self, entry: dict) -> None:
+        with self._lock:
+            self.subprocess.append(entry)
+
+    def replay_stats(self) -> dict[str, int]:
+        tracks = [self.model_track, self.subprocess_track, *self.mcp_tracks.values()]
+        return {
+            "unmatched": sum(track.unmatched for track in tracks),
+            "missing": sum(track.missing for track in tracks),
+            "unused": sum(track.remaining for track in tracks),
+        }
+
+
+def _map_strings(value: Any, func) -> Any:
+    if isinstance(value, str):
+        return func(value)
+    if isinstance(value, list):
+        return [_map_strings(item, func) for item in value]
+    if isinstance(value, dict):
+        return {key: _map_strings(item, func) for key, item in value.items()}
+    return value
@@ -0,0 +1,248 @@
+"""Local OpenAI-compatible chat completions server for record/replay runs.
+
+In replay mode the server answers ``POST .../chat/completions`` from the
+cassette's model track, streaming the recorded chunks at their recorded offsets
+scaled by ``speed`` (``speed=0`` sends them back to back). In record mode it
+proxies each request to a real upstream and records the chunks and timings it
+relays.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from benchmarks.cassette import Cassette, ReplayMismatch, request_digest
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_LATENCY_MS = 200.0
+_DEFAULT_CHUNK_INTERVAL_MS = 15.0
+_TEXT_CHUNK_CHARS = 24
+
+
+def model_request_digest(cassette: Cassette, request: dict) -> str:
+    """Digest the parts of a chat request that decide the response."""
+    return request_digest(
+        cassette.normalize(
+            {
+                "messages": _tool_results_in_call_order(request.get("messages")),
+                "tools": request.get("tools"),
+                "tool_choice": request.get("tool_choice"),
+            }
+        )
+    )
+
+
+def _tool_results_in_call_order(messages: Any) -> Any:
+    """Sort each run of tool messages by call id.
+
+    Concurrent tool calls append their results in completion order, which
+    varies between runs without changing what the model is asked.
+    """
+    if not isinstance(messages, list):
+        return messages
+    ordered: list = []
+    start = 0
+    for index, message in enumerate(messages + [None]):
+        if isinstance(message, dict) and message.get("role") == "tool":
+            continue
+        ordered += sorted(messages[start:index], key=lambda item: str(item.get("tool_call_id") or ""))
+        if message is not None:
+            ordered.append(message)
+        start = index + 1
+    return ordered
+
+
+def expand_model_entry(entry: dict, model_id: str, call_index: int) -> list[dict]:
+    """Return ``[{"t": ms, "data": chunk}]`` for a recorded or hand-written entry."""
+    if "chunks" in entry:
+        return entry["chunks"]
+
+    def chunk(delta: dict, finish_reason: str | None = None) -> dict:
+        return {
+            "id": f"chatcmpl-replay-{call_index}",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": model_id,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    deltas: list[dict] = [{"role": "assistant", "content": ""}]
+    text = entry.get("text") or ""
+    deltas.extend({"content": text[i : i + _TEXT_CHUNK_CHARS]} for i in range(0, len(text), _TEXT_CHUNK_CHARS))
+    for index, call in enumerate(entry.get("toolCalls") or []):
+        arguments = call.get("arguments", {})
+        deltas.append(
+            {
+                "tool_calls": [
+                    {
+                        "index": index,
+                        "id": call.get("id") or f"call_{call_index}_{index}",
+                        "type": "function",
+                        "function": {
+                            "name": call["name"],
+                            "arguments": arguments if isinstance(arguments, str) else json.dumps(arguments),
+                        },
+                    }
+                ]
+            }
+        )
+    latency = float(entry.get("latencyMs", _DEFAULT_LATENCY_MS))
+    interval = float(entry.get("chunkIntervalMs", _DEFAULT_CHUNK_INTERVAL_MS))
+    chunks = [{"t": latency + index * interval, "data": chunk(delta)} for index, delta in enumerate(deltas)]
+    finish_reason = "tool_calls" if entry.get("toolCalls") else "stop"
+    done_at = latency + len(deltas) * interval
+    chunks.append({"t": done_at, "data": chunk({}, finish_reason)})
+    usage = entry.get("usage") or {
+        "prompt_tokens": 0,
+        "completion_tokens": max(1, len(text) // 4),
+        "total_tokens": max(1, len(text) // 4),
+    }
+    chunks.append({"t": done_at, "data": {**chunk({}), "choices": [], "usage": usage}})
+    return chunks
+
+
+class FakeOpenAIServer:
+    """Serve chat completions from a cassette on an ephemeral localhost port."""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        *,
+        speed: float = 1.0,
+        upstream_url: str = "",
+        upstream_api_key: str = "",
+    ) -> None:
+        self.cassette = cassette
+        self.speed = max(0.0, speed)
+        self.upstream_url = upstream_url.rstrip("/")
+        self.upstream_api_key = upstream_api_key
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _next_call_index(self) -> int:
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+                logger.debug("fake-openai: " + format, *args)
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"unsupported path {self.path}"}})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not request.get("stream"):
+                    self._send_json(400, {"error": {"message": "only streaming chat completions are supported"}})
+                    return
+                started = time.perf_counter()
+                call_index = server._next_call_index()
+                digest = model_request_digest(server.cassette, request)
+                if server.upstream_url:
+                    self._proxy(request, digest, started)
+                    return
+                try:
+                    entry = server.cassette.model_track.take(digest)
+                except ReplayMismatch as exc:
+                    # 400 rather than 5xx so the client fails fast instead of retrying.
+                    self._send_json(400, {"error": {"message": str(exc), "type": "replay_mismatch"}})
+                    return
+                model_id = str(request.get("model") or server.cassette.scenario.get("modelId") or "replay-model")
+                self._start_stream()
+                for chunk in expand_model_entry(entry, model_id, call_index):
+                    self._wait_until(started, float(chunk.get("t", 0)))
+                    self._send_event(server.cassette.denormalize(chunk["data"]))
+                self._send_done()
+
+            def _proxy(self, request: dict, digest: str, started: float):
+                upstream = urllib.request.Request(
+                    f"{server.upstream_url}/chat/completions",
+                    data=json.dumps(request).encode("utf-8"),
+                    headers={
+                        "Content-Type": "application/json",
+                        "Authorization": f"Bearer {server.upstream_api_key}",
+                        "Accept": "text/event-stream",
+                    },
+                    method="POST",
+                )
+                chunks = []
+                try:
+                    with urllib.request.urlopen(upstream, timeout=600) as response:
+                        self._start_stream()
+                        for raw_line in response:
+                            line = raw_line.decode("utf-8").strip()
+                            if not line.startswith("data:"):
+                                continue
+                            payload = line[len("data:") :].strip()
+                            if payload == "[DONE]":
+                                break
+                            data = json.loads(payload)
+                            chunks.append({"t": round((time.perf_counter() - started) * 1000, 1), "data": data})
+                            self._send_event(data)
+                except urllib.error.HTTPError as exc:
+                    self._send_json(exc.code, json.loads(exc.read() or b"{}"))
+                    return
+                self._send_done()
+                server.cassette.record_model({"digest": digest, "chunks": server.cassette.normalize(chunks)})
+
+            def _wait_until(self, started: float, offset_ms: float) -> None:
+                delay = started + offset_ms * server.speed / 1000 - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            def _start_stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+            def _send_event(self, data: dict):
+                self.wfile.write(f"data: {json.dumps(data)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            def _send_done(self):
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _send_json(self, status: int, body: dict):
+                encoded = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+        return Handler
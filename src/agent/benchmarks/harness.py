@@ -0,0 +1,267 @@
+"""Drive ``main.invocations`` through a scripted session and measure it.
+
+A run creates a temporary root for the shared files mount, seeds the scenario
+files into the session's scratch workspace and swaps every external dependency
+for a local stand-in:
+
+- the model endpoint is a ``FakeOpenAIServer`` on localhost;
+- AgentCore Memory is a strands ``FileSessionManager`` under the run's root;
+- Gateway MCP tools and IaC subprocesses come from the cassette;
+- credentials and the caller's identity are fixed.
+
+Each turn reports time to the first text frame, total latency, event count and
+events per second, plus the runtime's own phase timings. Model and tool time
+per agent is taken from the strands OpenTelemetry spans: every ``chat`` and
+``execute_tool`` span is attributed to its nearest ``invoke_agent`` ancestor.
+Peak RSS is the process high-water mark, so compare it across fresh processes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from benchmarks.cassette import Cassette
+from benchmarks.fake_openai import FakeOpenAIServer
+from benchmarks.standins import RecordingToolProvider, ReplayToolProvider, SubprocessStandIn
+
+BENCH_USER_ID = "bench-user"
+
+# Lower is better for all of these except eventsPerSecond.
+COMPARED_METRICS = ("ttftMs", "totalMs", "eventsPerSecond", "peakRssMb")
+HIGHER_IS_BETTER = frozenset({"eventsPerSecond"})
+
+_span_exporter: InMemorySpanExporter | None = None
+
+
+def _spans() -> InMemorySpanExporter:
+    """Attach an in-memory exporter to the global SDK tracer provider once per process."""
+    global _span_exporter
+    if _span_exporter is None:
+        _span_exporter = InMemorySpanExporter()
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            provider = TracerProvider()
+            trace.set_tracer_provider(provider)
+        provider.add_span_processor(SimpleSpanProcessor(_span_exporter))
+    return _span_exporter
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def agent_breakdown(spans) -> dict[str, dict]:
+    """Sum model and tool span time per agent from strands spans."""
+    by_id = {span.context.span_id: span for span in spans}
+    agents: dict[str, dict] = {}
+    for span in spans:
+        if span.name == "chat":
+            kind, tool_name = "model", ""
+        elif span.name.startswith("execute_tool "):
+            kind, tool_name = "tool", span.name[len("execute_tool ") :]
+        else:
+            continue
+        owner = "unknown"
+        parent = span.parent
+        while parent is not None and parent.span_id in by_id:
+            ancestor = by_id[parent.span_id]
+            if ancestor.name.startswith("invoke_agent "):
+                owner = ancestor.name[len("invoke_agent ") :]
+                break
+            parent = ancestor.parent
+        elapsed = (span.end_time - span.start_time) / 1e9
+        stats = agents.setdefault(owner, {"modelMs": 0.0, "modelCalls": 0, "toolMs": 0.0, "toolCalls": 0, "tools": {}})
+        stats[f"{kind}Ms"] = round(stats[f"{kind}Ms"] + _ms(elapsed), 1)
+        stats[f"{kind}Calls"] += 1
+        if tool_name:
+            tool = stats["tools"].setdefault(tool_name, {"ms": 0.0, "count": 0})
+            tool["ms"] = round(tool["ms"] + _ms(elapsed), 1)
+            tool["count"] += 1
+    return agents
+
+
+async def _run_turn(main, payload: dict) -> dict:
+    context = main.RequestContext(session_id=payload["runtimeSessionId"])
+    started = time.perf_counter()
+    first_text_at = None
+    events = 0
+    text: list[str] = []
+    errors: list[str] = []
+    phases: dict = {}
+    async for event in main.invocations(payload, context):
+        events += 1
+        if isinstance(event.get("data"), str):
+            first_text_at = first_text_at or time.perf_counter()
+            text.append(event["data"])
+        elif event.get("lifecycle") == "timings":
+            phases = event["timings"].get("phases", {})
+        elif event.get("status") == "error":
+            errors.append(str(event.get("error")))
+    elapsed = time.perf_counter() - started
+    return {
+        "ttftMs": _ms(first_text_at - started) if first_text_at else None,
+        "totalMs": _ms(elapsed),
+        "events": events,
+        "eventsPerSecond": round(events / elapsed, 1) if elapsed > 0 else 0.0,
+        "phases": phases,
+        "errors": errors,
+        "text": "".join(text),
+    }
+
+
+async def _run_turns(main, scenario: dict, session_id: str) -> list[dict]:
+    turns = []
+    for turn in scenario.get("turns") or []:
+        payload = {"prompt": turn["prompt"], "runtimeSessionId": session_id}
+        if scenario.get("repository"):
+            payload["repository"] = scenario["repository"]
+        turns.append(await _run_turn(main, payload))
+    return turns
+
+
+def run_scenario(
+    cassette: Cassette,
+    *,
+    speed: float = 0.0,
+    record: bool = False,
+    upstream_url: str = "",
+    upstream_api_key: str = "",
+    model_id: str = "",
+) -> dict:
+    """Run the cassette's scenario once and return its measurements."""
+    scenario = cassette.scenario
+    session_id = str(scenario.get("sessionId") or "bench-session")
+    root = Path(tempfile.mkdtemp(prefix="agent-bench-")).resolve()
+    cassette.root = str(root)
+    cassette.reset_replay()
+    exporter = _spans()
+    exporter.clear()
+    try:
+        with ExitStack() as stack:
+            stack.enter_context(
+                mock.patch.dict(
+                    os.environ,
+                    {
+                        "SHARED_FILES_MOUNT_PATH": str(root / "mount"),
+                        "SHARED_FILES_FALLBACK_PATH": str(root / "fallback"),
+                        "STACK_NAME": os.environ.get("STACK_NAME", "agent-bench"),
+                        "GATEWAY_CREDENTIAL_PROVIDER_NAME": os.environ.get(
+                            "GATEWAY_CREDENTIAL_PROVIDER_NAME", "agent-bench-gateway"
+                        ),
+                    },
+                )
+            )
+            # main reads GATEWAY_CREDENTIAL_PROVIDER_NAME at import time.
+            main = importlib.import_module("main")
+            from strands.session import FileSessionManager
+
+            server = stack.enter_context(
+                FakeOpenAIServer(cassette, speed=speed, upstream_url=upstream_url, upstream_api_key=upstream_api_key)
+            )
+            credentials = {
+                "api_key": upstream_api_key or "replay",
+                "base_url": server.base_url,
+                "model_id": model_id or str(scenario.get("modelId") or "replay-model"),
+            }
+            stack.enter_context(mock.patch.object(main, "get_openai_credentials", lambda: dict(credentials)))
+            stack.enter_context(mock.patch.object(main, "extract_user_id_from_context", lambda context: BENCH_USER_ID))
+            stack.enter_context(
+                mock.patch.object(
+                    main,
+                    "_create_session_manager",
+                    lambda user_id, session_id: FileSessionManager(session_id=session_id, storage_dir=str(root / "memory")),
+                )
+            )
+            if record:
+                live_gateway = main.create_gateway_mcp_client
+                gateway_factory = lambda: RecordingToolProvider(live_gateway(), cassette, "gateway")  # noqa: E731
+            else:
+                gateway_factory = lambda: ReplayToolProvider(cassette, "gateway", speed)  # noqa: E731
+            stack.enter_context(mock.patch.object(main, "create_gateway_mcp_client", gateway_factory))
+            SubprocessStandIn(cassette, speed=speed, record=record).install(stack)
+
+            # Start cold so runs are comparable, and leave nothing bound to this cassette behind.
+            main.warm_resources.clear()
+            stack.callback(main.warm_resources.clear)
+            main.specialist_cache.clear()
+            stack.callback(main.specialist_cache.clear)
+
+            workspace = main.scratch_workspace_path(session_id)
+            for relative_path, content in (scenario.get("files") or {}).items():
+                path = workspace / relative_path
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(content, encoding="utf-8")
+
+            started = time.perf_counter()
+            turns = asyncio.run(_run_turns(main, scenario, session_id))
+            elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    events = sum(turn["events"] for turn in turns)
+    return {
+        "ttftMs": turns[0]["ttftMs"] if turns else None,
+        "totalMs": _ms(elapsed),
+        "events": events,
+        "eventsPerSecond": round(events / elapsed, 1) if elapsed > 0 else 0.0,
+        "peakRssMb": _peak_rss_mb(),
+        "modelRequests": server.requests,
+        "agents": agent_breakdown(exporter.get_finished_spans()),
+        "replay": cassette.replay_stats() if not record else {},
+        "turns": turns,
+    }
+
+
+def replay_report(cassette: Cassette, *, speed: float = 1.0, repeat: int = 1) -> dict:
+    """Replay a cassette ``repeat`` times and summarize with medians."""
+    runs = [run_scenario(cassette, speed=speed) for _ in range(max(1, repeat))]
+    summary = {}
+    for metric in COMPARED_METRICS:
+        values = [run[metric] for run in runs if run[metric] is not None]
+        summary[metric] = round(statistics.median(values), 1) if values else None
+    return {
+        "scenario": cassette.scenario.get("name", ""),
+        "speed": speed,
+        "repeat": len(runs),
+        "summary": summary,
+        "runs": runs,
+    }
+
+
+def compare_reports(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Return a message for each summary metric that regressed past ``max_regression``."""
+    regressions = []
+    for metric in COMPARED_METRICS:
+        current = report["summary"].get(metric)
+        previous = (baseline.get("summary") or {}).get(metric)
+        if not current or not previous:
+            continue
+        if metric in HIGHER_IS_BETTER:
+            regressed = current < previous * (1 - max_regression)
+        else:
+            regressed = current > previous * (1 + max_regression)
+        if regressed:
+            regressions.append(f"{metric}: {previous} -> {current} (limit {max_regression:.0%})")
+    return regressions
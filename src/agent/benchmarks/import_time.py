@@ -0,0 +1,74 @@
+"""Import-time report for the runtime entry module.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter from
+``src/agent`` and turns the trace into per-module self and cumulative times.
+Each measurement is the best of ``runs`` interpreters, to damp disk-cache and
+scheduler noise.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+AGENT_ROOT = Path(__file__).resolve().parents[1]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(trace: str) -> dict[str, dict]:
+    """Map module name to ``selfMs``, ``cumulativeMs`` and ``depth`` from an ``-X importtime`` trace."""
+    modules = {}
+    for line in trace.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = {
+            "selfMs": round(int(self_us) / 1000, 1),
+            "cumulativeMs": round(int(cumulative_us) / 1000, 1),
+            "depth": (len(indent) - 1) // 2,
+        }
+    return modules
+
+
+def measure_import_time(module: str = "main", runs: int = 1, env: dict[str, str] | None = None) -> dict:
+    """Import ``module`` in fresh interpreters and report the fastest run."""
+    child_env = {
+        **os.environ,
+        # main's Gateway client reads this at import time.
+        "GATEWAY_CREDENTIAL_PROVIDER_NAME": os.environ.get("GATEWAY_CREDENTIAL_PROVIDER_NAME", "import-time"),
+        **(env or {}),
+    }
+    best = None
+    for _ in range(max(1, runs)):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=AGENT_ROOT,
+            env=child_env,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=120,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{completed.stderr[-4000:]}")
+        modules = parse_importtime(completed.stderr)
+        if module not in modules:
+            raise RuntimeError(f"no import time recorded for {module}")
+        if best is None or modules[module]["cumulativeMs"] < best[module]["cumulativeMs"]:
+            best = modules
+    return {"module": module, "totalMs": best[module]["cumulativeMs"], "modules": best}
+
+
+def top_imports(report: dict, limit: int = 25) -> list[tuple[str, float, float]]:
+    """Slowest direct imports of the measured module as ``(name, cumulativeMs, selfMs)``."""
+    direct = [
+        (name, stats["cumulativeMs"], stats["selfMs"])
+        for name, stats in report["modules"].items()
+        if stats["depth"] == 1
+    ]
+    return sorted(direct, key=lambda item: -item[1])[:limit]
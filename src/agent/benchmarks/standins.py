@@ -0,0 +1,191 @@
+"""Record/replay stand-ins for the runtime's external dependencies.
+
+``ReplayToolProvider`` serves the Gateway MCP tools from a cassette and
+``RecordingToolProvider`` wraps a live MCP client to capture them.
+``SubprocessStandIn`` replaces the IaC tool subprocess helpers in
+``agents.iac_tools``: it either replays recorded results or runs the real
+command and records what it returned.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from strands.tools import ToolProvider
+from strands.tools.tools import PythonAgentTool
+from strands.types.tools import AgentTool
+
+from agents import iac_tools
+from agents.timings import timed_phase
+from benchmarks.cassette import Cassette, request_digest
+
+
+def _tool_call_digest(cassette: Cassette, name: str, tool_input: Any) -> str:
+    return request_digest(cassette.normalize({"name": name, "input": tool_input}))
+
+
+class ReplayToolProvider(ToolProvider):
+    """Serve an MCP server's tools and call results from a cassette."""
+
+    def __init__(self, cassette: Cassette, server: str, speed: float = 1.0) -> None:
+        self.cassette = cassette
+        self.server = server
+        self.speed = speed
+
+    async def load_tools(self, **kwargs: Any) -> list[AgentTool]:
+        specs = (self.cassette.mcp.get(self.server) or {}).get("tools") or []
+        return [PythonAgentTool(spec["name"], spec, self._replay_func(spec["name"])) for spec in specs]
+
+    def _replay_func(self, name: str):
+        def replay(tool_use, **_invocation_state):
+            track = self.cassette.mcp_tracks[self.server]
+            entry = track.take(_tool_call_digest(self.cassette, name, tool_use.get("input")), name=name)
+            time.sleep(float(entry.get("elapsedMs", 0)) * self.speed / 1000)
+            return {**self.cassette.denormalize(entry["result"]), "toolUseId": tool_use["toolUseId"]}
+
+        return replay
+
+    def add_consumer(self, consumer_id: Any, **kwargs: Any) -> None:
+        pass
+
+    def remove_consumer(self, consumer_id: Any, **kwargs: Any) -> None:
+        pass
+
+
+class _RecordingTool(AgentTool):
+    def __init__(self, inner: AgentTool, cassette: Cassette, server: str) -> None:
+        super().__init__()
+        self._inner = inner
+        self._cassette = cassette
+        self._server = server
+
+    @property
+    def tool_name(self) -> str:
+        return self._inner.tool_name
+
+    @property
+    def tool_spec(self):
+        return self._inner.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self._inner.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        started = time.perf_counter()
+        async for event in self._inner.stream(tool_use, invocation_state, **kwargs):
+            # The executor stops iterating at the result event, so record before yielding it.
+            if isinstance(event, dict) and "tool_result" in event:
+                result = event["tool_result"]
+                self._cassette.record_mcp(
+                    self._server,
+                    call={
+                        "name": self.tool_name,
+                        "digest": _tool_call_digest(self._cassette, self.tool_name, tool_use.get("input")),
+                        "result": self._cassette.normalize({k: v for k, v in result.items() if k != "toolUseId"}),
+                        "elapsedMs": round((time.perf_counter() - started) * 1000, 1),
+                    },
+                )
+            yield event
+
+
+class RecordingToolProvider(ToolProvider):
+    """Wrap a live tool provider and record its tool specs and call results."""
+
+    def __init__(self, inner: ToolProvider, cassette: Cassette, server: str) -> None:
+        self._inner = inner
+        self._cassette = cassette
+        self._server = server
+
+    async def load_tools(self, **kwargs: Any) -> list[AgentTool]:
+        tools = await self._inner.load_tools(**kwargs)
+        self._cassette.record_mcp(self._server, tools=[tool.tool_spec for tool in tools])
+        return [_RecordingTool(tool, self._cassette, self._server) for tool in tools]
+
+    def add_consumer(self, consumer_id: Any, **kwargs: Any) -> None:
+        self._inner.add_consumer(consumer_id, **kwargs)
+
+    def remove_consumer(self, consumer_id: Any, **kwargs: Any) -> None:
+        self._inner.remove_consumer(consumer_id, **kwargs)
+
+
+def _program(command: str) -> str:
+    name = Path(command).name
+    # The runtime prefers tofu and falls back to terraform; treat them as one program.
+    return "tofu" if name in {"tofu", "terraform"} else name
+
+
+class SubprocessStandIn:
+    """Replay or record the subprocess helpers behind the IaC tools."""
+
+    def __init__(self, cassette: Cassette, *, speed: float = 1.0, record: bool = False) -> None:
+        self.cassette = cassette
+        self.speed = speed
+        self.record = record
+
+    def install(self, stack: ExitStack) -> None:
+        stack.enter_context(mock.patch.object(iac_tools, "_run", self._wrap_run(iac_tools._run)))
+        stack.enter_context(
+            mock.patch.object(
+                iac_tools, "_run_ministack_terratest", self._wrap_terratest(iac_tools._run_ministack_terratest)
+            )
+        )
+        if not self.record:
+            stack.enter_context(
+                mock.patch.object(
+                    iac_tools, "_ensure_ministack", lambda endpoint, **_: {"ok": True, "endpoint": endpoint}
+                )
+            )
+            stack.enter_context(mock.patch.object(iac_tools, "_configure_infracost_api_key", lambda cwd: None))
+
+    def _wrap_run(self, original):
+        async def run(command: list[str], cwd: Path, timeout: int = 180):
+            program = _program(command[0]) if command else ""
+            async for event in self._call(program, command[1:], cwd, lambda: original(command, cwd, timeout)):
+                yield event
+
+        return run
+
+    def _wrap_terratest(self, original):
+        async def run_terratest(
+            cwd: Path, endpoint: str, test_pattern: str, timeout_seconds: int, reset_before: bool
+        ):
+            args = iac_tools._go_test_args(test_pattern, timeout_seconds)
+            async for event in self._call(
+                "go",
+                args[1:],
+                cwd,
+                lambda: original(cwd, endpoint, test_pattern, timeout_seconds, reset_before),
+            ):
+                yield event
+
+        return run_terratest
+
+    async def _call(self, program: str, args: list[str], cwd: Path, run_original):
+        """Yield the tool's progress events and JSON result, live when recording, from the cassette otherwise."""
+        key = self.cassette.normalize({"program": program, "args": args, "cwd": str(cwd)})
+        digest = request_digest(key)
+        if self.record:
+            started = time.perf_counter()
+            async for event in run_original():
+                if isinstance(event, str):
+                    self.cassette.record_subprocess(
+                        {
+                            **key,
+                            "digest": digest,
+                            "result": self.cassette.normalize(json.loads(event)),
+                            "elapsedMs": round((time.perf_counter() - started) * 1000, 1),
+                        }
+                    )
+                yield event
+            return
+        with timed_phase(f"subprocess.{program}", command=" ".join([program, *args[:1]])):
+            entry = self.cassette.subprocess_track.take(digest, program=program)
+            await asyncio.sleep(float(entry.get("elapsedMs", 0)) * self.speed / 1000)
+        yield json.dumps(self.cassette.denormalize(entry["result"]))
@@ -1,14 +1,17 @@
 """Strands agent with Gateway MCP tools and Memory."""
 
 import base64
+from dataclasses import replace
 from datetime import datetime, timezone
-import io
+from functools import partial
+import hashlib
 import json
 import logging
 import mimetypes
 import os
 import re
 import stat
+import tempfile
 import zipfile
 from pathlib import Path
 
@@ -31,10 +34,13 @@ except ImportError:
     Snapshot = None
 from strands.models import OpenAIModel
 from openai import AsyncOpenAI
-from strands_tools import file_read, file_write
-from strands_tools.swarm import swarm as strands_swarm
-from agents.artifacts import session_artifact_dir
-from agents.cancellation import cancel_session_agents, registered_agent
+from agents.action_pool import control_actions
+from agents.artifact_io import artifact_io
+from agents.artifacts import presigned_artifact_url, session_artifact_dir, session_artifact_path, user_artifact_dir
+from agents.attachment_store import AttachmentStore
+from agents.cancellation import cancel_session_agents, cancel_session_processes, registered_agent
+from agents.checkpoint_store import CheckpointStore
+from agents.context_compaction import compact_conversation, context_compaction_stats
 from agents.iac_tools import (
     checkov_scan,
     infracost_breakdown,
@@ -44,11 +50,26 @@ from agents.iac_tools import (
     ministack_terratest,
     tflint_scan,
 )
+from agents.lazy_tools import LazyTool
+from agents.llm_scheduler import estimate_request_tokens, llm_scheduler, request_origin
+from agents.memory_offload import OffloadingMemorySessionManager, memory_offload_stats
+from agents.model_routing import ModelRouter, model_tier_map, model_tier_stats
 from agents.orchestator.agent import create_agent as create_orchestrator_agent
 from agents.orchestator.tools.gateway import create_gateway_mcp_client
 from agents.orchestator.tools.opentofu_mcp import create_opentofu_mcp_client
 from agents.orchestator.tools.safe_diagram import diagram as safe_diagram
+from agents.plugin_cache import plugin_cache_stats
+from agents.profiler import InvocationProfiler
+from agents.request_policy import fallback_model_settings, request_policy, slot_granted
 from agents.runtime import AgentRuntimeTools
+from agents.specialist_cache import specialist_cache
+from agents.specialist_pool import specialist_pool_stats
+from agents.stream_coalescer import coalesce_stream, stream_coalescer_stats
+from agents.timings import InvocationTimings, mark_phase, start_invocation_timings, timed_phase
+from agents.tool_adapter import BYPASS_SPECIALIST_CACHE
+from agents.warm_factory import credential_fingerprint, warm_resource_ttl_seconds, warm_resources
+from agents.workspace import bind_workspace
+from agents.workspace_file_tools import file_read, file_write
 from utils.auth import extract_user_id_from_context, get_openai_credentials
 from utils.github_app import (
     create_pull_request as create_github_pull_request,
@@ -62,11 +83,18 @@ from utils.github_app import (
     setup_repository_workspace,
     workspace_path,
 )
+from utils.file_index import runtime_file_index
+from utils.file_preview import is_binary_file, read_file_lines, read_file_window
 
 logger = logging.getLogger(__name__)
 
 app = BedrockAgentCoreApp()
 MAX_FILE_PREVIEW_BYTES = int(os.environ.get("MAX_FILE_PREVIEW_BYTES", str(1024 * 1024)))
+DEFAULT_PREVIEW_LINES = int(os.environ.get("DEFAULT_PREVIEW_LINES", "500"))
+SOURCE_ARCHIVE_INLINE_MAX_BYTES = int(os.environ.get("SOURCE_ARCHIVE_INLINE_MAX_BYTES", str(4 * 1024 * 1024)))
+# A multiple of 3 keeps each base64 chunk unpadded, so clients can join chunks as text.
+SOURCE_ARCHIVE_CHUNK_BYTES = 3 * 256 * 1024
+SOURCE_ARCHIVE_URL_EXPIRES_IN = int(os.environ.get("SOURCE_ARCHIVE_URL_EXPIRES_IN", "900"))
 
 def _session_title_from_agent_response(response_text: str) -> str:
     text = re.sub(r"`([^`]+)`", r"\1", response_text or "")
@@ -226,21 +254,18 @@ def _create_handoff_to_user_tool(results: list[dict]):
 
 
 def _use_shared_files_workdir(repository: dict | None = None, session_id: str | None = None) -> str:
+    """Bind the session workspace for tools run from the current invocation.
+
+    The binding lives in a context variable rather than the process working
+    directory, so concurrent sessions in one process keep separate workspaces.
+    """
     safe_session_id = session_id or "agentcore"
-    os.environ["SHARED_FILES_SESSION_ID"] = safe_session_id
     if repository:
-        repo_path = setup_repository_workspace(repository, safe_session_id)
-        os.chdir(repo_path)
-        return str(repo_path)
-
-    workspace_path = str(scratch_workspace_path(safe_session_id))
-    try:
-        os.chdir(workspace_path)
-    except FileNotFoundError:
-        logger.warning("Shared files workspace path does not exist yet: %s", workspace_path)
-    except PermissionError:
-        logger.warning("Cannot use shared files workspace path as working directory: %s", workspace_path)
-    return workspace_path
+        workdir = setup_repository_workspace(repository, safe_session_id)
+    else:
+        workdir = scratch_workspace_path(safe_session_id)
+    bind_workspace(workdir, safe_session_id)
+    return str(workdir)
 
 
 def _runtime_filesystem_root(repository: dict | None, session_id: str) -> Path:
@@ -266,91 +291,170 @@ def _iso_mtime(path: Path) -> str:
     return datetime.fromtimestamp(path.stat().st_mtime, timezone.utc).isoformat().replace("+00:00", "Z")
 
 
-def _list_runtime_files(repository: dict | None, session_id: str, prefix: str = "") -> list[dict]:
+def _list_runtime_files(
+    repository: dict | None,
+    session_id: str,
+    prefix: str = "",
+    cursor: str = "",
+    limit: int | None = None,
+    delimiter: str = "",
+) -> dict:
     root = _runtime_filesystem_root(repository, session_id)
     if not root.exists():
-        return []
-
-    start = _safe_runtime_path(root, prefix)
-    if not start.exists():
-        return []
-
-    candidates = [start] if start.is_file() else start.rglob("*")
-    entries: list[dict] = []
-    for path in candidates:
-        if not path.is_file():
-            continue
-        relative_parts = path.relative_to(root).parts
-        if ".git" in relative_parts:
-            continue
-        entries.append(
-            {
-                "key": path.relative_to(root).as_posix(),
-                "size": path.stat().st_size,
-                "lastModified": _iso_mtime(path),
-                "eTag": None,
-            }
-        )
-        if len(entries) >= 1000:
-            break
+        return {"files": [], "prefixes": [], "nextCursor": None}
 
-    return sorted(entries, key=lambda item: item["key"])
+    _safe_runtime_path(root, prefix)
+    return runtime_file_index(root).list(prefix=prefix, cursor=cursor, limit=limit, delimiter=delimiter)
 
 
-def _get_runtime_file_content(repository: dict | None, session_id: str, key: str) -> dict:
+def _get_runtime_file_content(
+    repository: dict | None,
+    session_id: str,
+    key: str,
+    offset: int | None = None,
+    length: int | None = None,
+    start_line: int | None = None,
+    line_count: int | None = None,
+) -> dict:
     root = _runtime_filesystem_root(repository, session_id)
     path = _safe_runtime_path(root, key)
     if not path.exists() or not path.is_file():
         raise FileNotFoundError(key)
 
     size = path.stat().st_size
-    raw = path.read_bytes()[:MAX_FILE_PREVIEW_BYTES]
-    content_type = mimetypes.guess_type(path.name)[0]
-    try:
-        content = raw.decode("utf-8")
-        encoding = "utf-8"
-        if size > MAX_FILE_PREVIEW_BYTES:
-            content += f"\n\n[Preview truncated to {MAX_FILE_PREVIEW_BYTES} bytes of {size} bytes]"
-    except UnicodeDecodeError:
-        content = base64.b64encode(raw).decode("ascii")
-        encoding = "base64"
+    binary = is_binary_file(path)
+    if start_line is not None and not binary:
+        page = read_file_lines(path, start_line, line_count or DEFAULT_PREVIEW_LINES, MAX_FILE_PREVIEW_BYTES)
+    else:
+        window = min(length, MAX_FILE_PREVIEW_BYTES) if length else MAX_FILE_PREVIEW_BYTES
+        page = read_file_window(path, offset or 0, window, binary=binary)
+        ranged = offset is not None or length is not None
+        if not ranged and not binary and page["nextOffset"] is not None:
+            page["content"] += f"\n\n[Preview truncated to {MAX_FILE_PREVIEW_BYTES} bytes of {size} bytes]"
 
     return {
         "key": path.relative_to(root).as_posix(),
-        "content": content,
-        "contentType": content_type,
-        "encoding": encoding,
+        "contentType": mimetypes.guess_type(path.name)[0],
         "size": size,
         "lastModified": _iso_mtime(path),
+        **page,
     }
 
 
+def _walk_runtime_files(root: Path):
+    """Yield (relative key, path, stat) for indexed workspace files."""
+    for key in runtime_file_index(root).keys():
+        path = root / key
+        try:
+            file_stat = path.stat()
+        except OSError:
+            continue
+        if stat.S_ISREG(file_stat.st_mode):
+            yield key, path, file_stat
+
+
 def _runtime_files_zip(repository: dict | None, session_id: str) -> dict:
+    """Write the workspace zip to session artifact storage, reusing it while the tree is unchanged.
+
+    The archive is streamed to disk file by file, so memory use does not grow with
+    the workspace size. Its name is derived from a digest of every file's path,
+    size and mtime, which lets repeated downloads skip re-compression.
+    """
     root = _runtime_filesystem_root(repository, session_id)
-    buffer = io.BytesIO()
-    file_count = 0
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
-        if root.exists():
-            for path in sorted(root.rglob("*")):
-                if not path.is_file():
-                    continue
-                relative_parts = path.relative_to(root).parts
-                if ".git" in relative_parts:
-                    continue
-                archive.write(path, path.relative_to(root).as_posix())
-                file_count += 1
-
-    content = base64.b64encode(buffer.getvalue()).decode("ascii")
+    entries = list(_walk_runtime_files(root)) if root.exists() else []
+    digest = hashlib.sha256()
+    for key, _path, file_stat in entries:
+        digest.update(f"{key}\0{file_stat.st_size}\0{file_stat.st_mtime_ns}\n".encode("utf-8"))
+    tree_hash = digest.hexdigest()
+
+    archive_dir = session_artifact_dir(session_id, "archives", shared_files_base_path())
+    archive_path = archive_dir / f"source-{tree_hash[:16]}.zip"
+    cached = archive_path.is_file()
+    if not cached:
+        fd, temp_name = tempfile.mkstemp(prefix=".source-", suffix=".zip.tmp", dir=archive_dir)
+        try:
+            with os.fdopen(fd, "wb") as handle, zipfile.ZipFile(handle, "w", zipfile.ZIP_DEFLATED) as archive:
+                for key, path, _file_stat in entries:
+                    archive.write(path, key)
+            os.replace(temp_name, archive_path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        # Stale archives and their upload markers.
+        for stale in archive_dir.glob("source-*.zip*"):
+            if not stale.name.startswith(archive_path.name):
+                stale.unlink(missing_ok=True)
+
     return {
         "filename": f"{session_id}-source.zip",
-        "content": content,
-        "encoding": "base64",
+        "path": archive_path,
         "contentType": "application/zip",
-        "size": len(buffer.getvalue()),
-        "fileCount": file_count,
+        "size": archive_path.stat().st_size,
+        "fileCount": len(entries),
+        "treeHash": tree_hash,
+        "cached": cached,
+    }
+
+
+def _source_archive_events(repository: dict | None, session_id: str, delivery: str = ""):
+    """Deliver the workspace zip as a presigned URL, inline base64, or bounded chunks.
+
+    Without an explicit ``delivery``, a presigned URL is preferred when the shared
+    files bucket is configured; otherwise small archives are inlined and larger ones
+    are streamed as ``archiveChunk`` events before the final ``archive`` summary.
+    """
+    archive = _runtime_files_zip(repository, session_id)
+    archive_path = archive.pop("path")
+    size = archive["size"]
+
+    if delivery in {"", "url"}:
+        url, _object_key, expires_in = presigned_artifact_url(
+            archive_path,
+            archive["contentType"],
+            SOURCE_ARCHIVE_URL_EXPIRES_IN,
+            reuse_upload=True,
+        )
+        if url:
+            yield {
+                "status": "ok",
+                "archive": {**archive, "delivery": "url", "url": url, "urlExpiresIn": expires_in},
+            }
+            return
+
+    if delivery != "chunks" and size <= SOURCE_ARCHIVE_INLINE_MAX_BYTES:
+        content = base64.b64encode(archive_path.read_bytes()).decode("ascii")
+        yield {
+            "status": "ok",
+            "archive": {**archive, "delivery": "inline", "encoding": "base64", "content": content},
+        }
+        return
+
+    chunk_count = max(1, -(-size // SOURCE_ARCHIVE_CHUNK_BYTES))
+    with archive_path.open("rb") as handle:
+        for index in range(chunk_count):
+            chunk = handle.read(SOURCE_ARCHIVE_CHUNK_BYTES)
+            yield {
+                "archiveChunk": {
+                    "index": index,
+                    "chunkCount": chunk_count,
+                    "content": base64.b64encode(chunk).decode("ascii"),
+                }
+            }
+    yield {
+        "status": "ok",
+        "archive": {**archive, "delivery": "chunks", "encoding": "base64", "chunkCount": chunk_count},
     }
 
 
+async def _pooled_events(action: str, session_id: str, events):
+    """Advance a blocking event generator on the control-action pool, one event at a time."""
+    while True:
+        event = await control_actions.run(action, session_id, next, events, None)
+        if event is None:
+            return
+        yield event
+
+
 def _safe_attachment_name(name: str, fallback: str) -> str:
     cleaned = re.sub(r"[^A-Za-z0-9._-]+", "_", os.path.basename(name or "").strip())
     cleaned = cleaned.strip("._")
@@ -372,12 +476,16 @@ def _attachment_image_format(content_type: str, filename: str) -> str | None:
     return None
 
 
-def _save_prompt_attachments(attachments: list | None, session_id: str) -> list[dict]:
+def _attachment_store(user_id: str) -> AttachmentStore:
+    return AttachmentStore(user_artifact_dir(user_id, "attachments", shared_files_base_path()))
+
+
+def _save_prompt_attachments(attachments: list | None, session_id: str, user_id: str = "") -> list[dict]:
     if not isinstance(attachments, list):
         return []
 
     saved = []
-    attachment_dir = session_artifact_dir(session_id, "attachments", shared_files_base_path())
+    store = _attachment_store(user_id)
 
     for index, attachment in enumerate(attachments[:6], start=1):
         if not isinstance(attachment, dict):
@@ -397,20 +505,15 @@ def _save_prompt_attachments(attachments: list | None, session_id: str) -> list[
             continue
 
         filename = _safe_attachment_name(str(attachment.get("name") or ""), f"attachment-{index}")
-        path = attachment_dir / filename
-        stem, ext = os.path.splitext(filename)
-        suffix = 1
-        while path.exists():
-            path = attachment_dir / f"{stem}-{suffix}{ext}"
-            suffix += 1
-
-        path.write_bytes(content)
+        content_type = str(attachment.get("type") or "application/octet-stream")
+        stored = store.put(content, name=filename, content_type=content_type, session_id=session_id)
 
         saved.append(
             {
                 "name": filename,
-                "path": str(path),
-                "type": str(attachment.get("type") or "application/octet-stream"),
+                "path": str(stored["path"]),
+                "sha256": stored["sha256"],
+                "type": content_type,
                 "size": len(content),
                 "content": content,
             }
@@ -479,16 +582,16 @@ def _snapshot_checkpoints_enabled() -> bool:
     return os.environ.get("AGENT_SNAPSHOT_CHECKPOINTS", "true").lower() != "false"
 
 
-def _snapshot_checkpoint_path(session_id: str) -> Path | None:
+def _snapshot_checkpoint_store(session_id: str) -> CheckpointStore | None:
     if not _snapshot_checkpoints_enabled():
         return None
     try:
         checkpoint_dir = session_artifact_dir(session_id, "checkpoints", shared_files_base_path())
         if checkpoint_dir is None:
             return None
-        return Path(checkpoint_dir) / "latest.json"
+        return CheckpointStore(Path(checkpoint_dir))
     except Exception:
-        logger.exception("Failed to resolve snapshot checkpoint path for session %s", session_id)
+        logger.exception("Failed to resolve snapshot checkpoint store for session %s", session_id)
         return None
 
 
@@ -503,32 +606,32 @@ def _snapshot_to_dict(snapshot) -> dict | None:
 
 
 def _load_agent_checkpoint(agent: Agent, session_id: str) -> bool:
-    path = _snapshot_checkpoint_path(session_id)
-    if path is None or not path.exists():
-        return False
+    store = _snapshot_checkpoint_store(session_id)
     load_snapshot = getattr(agent, "load_snapshot", None)
-    if not callable(load_snapshot):
+    if store is None or not callable(load_snapshot):
         return False
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        data = store.load()
+        if data is None:
+            return False
         snapshot = Snapshot.from_dict(data) if Snapshot is not None and hasattr(Snapshot, "from_dict") else data
         load_snapshot(snapshot)
         return True
     except Exception:
-        logger.exception("Failed to load snapshot checkpoint from %s", path)
+        logger.exception("Failed to load snapshot checkpoint from %s", store.directory)
         return False
 
 
-def _save_agent_checkpoint(
+def _take_agent_checkpoint(
     agent: Agent,
     session_id: str,
     *,
     user_id: str,
     label: str,
-) -> str | None:
-    path = _snapshot_checkpoint_path(session_id)
+) -> tuple[CheckpointStore, dict] | None:
+    store = _snapshot_checkpoint_store(session_id)
     take_snapshot = getattr(agent, "take_snapshot", None)
-    if path is None or not callable(take_snapshot):
+    if store is None or not callable(take_snapshot):
         return None
     try:
         snapshot = take_snapshot(
@@ -543,17 +646,53 @@ def _save_agent_checkpoint(
         )
     except TypeError:
         snapshot = take_snapshot(preset="session")
+    data = _snapshot_to_dict(snapshot)
+    return (store, data) if data is not None else None
+
+
+def _write_agent_checkpoint(store: CheckpointStore, data: dict) -> str | None:
     try:
-        data = _snapshot_to_dict(snapshot)
-        if data is None:
-            return None
-        path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
-        return str(path)
+        return str(store.save(data))
     except Exception:
-        logger.exception("Failed to save snapshot checkpoint to %s", path)
+        logger.exception("Failed to save snapshot checkpoint to %s", store.directory)
         return None
 
 
+def _save_agent_checkpoint(
+    agent: Agent,
+    session_id: str,
+    *,
+    user_id: str,
+    label: str,
+) -> str | None:
+    checkpoint = _take_agent_checkpoint(agent, session_id, user_id=user_id, label=label)
+    return _write_agent_checkpoint(*checkpoint) if checkpoint is not None else None
+
+
+async def _save_agent_checkpoint_behind(
+    agent: Agent,
+    session_id: str,
+    *,
+    user_id: str,
+    label: str,
+) -> bool:
+    """Capture the snapshot now and persist it on the artifact I/O pool.
+
+    Writes for one session stay ordered, and the next checkpoint load for the
+    session waits for them, so the stream does not wait on the shared mount.
+    """
+    with timed_phase("checkpoint_capture", label=label):
+        try:
+            checkpoint = _take_agent_checkpoint(agent, session_id, user_id=user_id, label=label)
+        except Exception:
+            logger.exception("Failed to capture %s snapshot checkpoint for session %s", label, session_id)
+            return False
+        if checkpoint is None:
+            return False
+        await artifact_io.write_behind(session_id, _write_agent_checkpoint, *checkpoint)
+    return True
+
+
 def _empty_agent_response_message(saved_attachments: list[dict]) -> str:
     if any(_attachment_image_format(item["type"], item["name"]) for item in saved_attachments):
         return (
@@ -616,6 +755,20 @@ def _compact_stream_event(event: dict) -> dict | None:
     return None
 
 
+async def _compact_agent_stream(
+    agent: Agent,
+    agent_query,
+    assistant_chunks: list[str],
+    invocation_state: dict | None = None,
+):
+    async for event in agent.stream_async(agent_query, invocation_state=invocation_state):
+        if isinstance(event.get("data"), str):
+            assistant_chunks.append(event["data"])
+        compact_event = _compact_stream_event(event)
+        if compact_event is not None:
+            yield compact_event
+
+
 def _compact_tool_use(tool_use: dict) -> dict:
     return {
         "toolUseId": tool_use.get("toolUseId"),
@@ -697,7 +850,16 @@ def _compact_tool_result(tool_result: dict) -> dict:
 
 
 class OpenRouterModel(OpenAIModel):
-    """OpenAI-compatible model adapter that omits token-limit request fields."""
+    """OpenAI-compatible model adapter that omits token-limit request fields.
+
+    Each request waits for a slot from the process-wide ``llm_scheduler``, and
+    ``request_policy`` applies the invocation deadline, hedging and the
+    fallback endpoint when they are configured.
+    """
+
+    def __init__(self, *args, fallback: "OpenRouterModel | None" = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fallback = fallback
 
     def format_request(self, *args, **kwargs):
         request = super().format_request(*args, **kwargs)
@@ -705,6 +867,40 @@ class OpenRouterModel(OpenAIModel):
         request.pop("max_completion_tokens", None)
         return request
 
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        attempt = partial(self._scheduled_stream, messages, tool_specs, system_prompt, **kwargs)
+        if not request_policy.active(has_fallback=self.fallback is not None):
+            async for event in attempt():
+                yield event
+            return
+        fallback = None
+        if self.fallback is not None:
+            fallback = partial(self.fallback._scheduled_stream, messages, tool_specs, system_prompt, **kwargs)
+        async for event in request_policy.stream(
+            self.config.get("model_id", ""), attempt, fallback=fallback, can_hedge=llm_scheduler.has_idle_slot
+        ):
+            yield event
+
+    async def _scheduled_stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        session_id, priority = request_origin(kwargs.get("invocation_state"))
+        with timed_phase("llm_queue", priority=priority):
+            request = await llm_scheduler.acquire(
+                session_id, priority, estimate_request_tokens(messages, tool_specs, system_prompt)
+            )
+        slot_granted()
+        try:
+            with timed_phase("model", model_id=self.config.get("model_id", "")):
+                first_event = True
+                async for event in super().stream(messages, tool_specs, system_prompt, **kwargs):
+                    if first_event:
+                        first_event = False
+                        mark_phase("firstModelEvent")
+                    if "metadata" in event:
+                        request.record_usage(event["metadata"].get("usage"))
+                    yield event
+        finally:
+            llm_scheduler.release(request)
+
 
 def _create_session_manager(
     user_id: str, session_id: str
@@ -716,6 +912,9 @@ def _create_session_manager(
     When false (default), only short-term memory (conversation history) is active,
     avoiding the additional storage and retrieval costs of long-term memory.
 
+    Tool results above AGENT_MEMORY_OFFLOAD_CHARS are persisted as session
+    artifacts, with only an excerpt and the artifact path kept in memory events.
+
     Args:
         user_id: Unique identifier for the user (actor), extracted from the JWT sub claim.
         session_id: Unique identifier for the current conversation session.
@@ -753,9 +952,10 @@ def _create_session_manager(
         retrieval_config=retrieval_config,
         batch_size=_memory_batch_size(),
     )
-    return AgentCoreMemorySessionManager(
+    return OffloadingMemorySessionManager(
         agentcore_memory_config=config,
         region_name=os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
+        artifact_dir=session_artifact_path(session_id, "tool-outputs", shared_files_base_path()),
     )
 
 
@@ -776,6 +976,68 @@ def _close_session_manager(session_manager: AgentCoreMemorySessionManager | None
         close()
 
 
+WARM_FACTORY_CONSUMER_ID = "warm-agent-factory"
+
+
+def _warm_openai_client(openai_creds: dict[str, str]) -> AsyncOpenAI:
+    """Return a pooled OpenAI client keyed by credential and base URL.
+
+    Reusing the client keeps its HTTP connection pool alive between chat turns.
+    """
+    return warm_resources.get_or_create(
+        "openai_client",
+        (credential_fingerprint(openai_creds["api_key"]), openai_creds["base_url"]),
+        lambda: AsyncOpenAI(
+            api_key=openai_creds["api_key"],
+            base_url=openai_creds["base_url"],
+        ),
+        ttl_seconds=warm_resource_ttl_seconds(),
+    )
+
+
+def _build_shared_runtime_tools() -> AgentRuntimeTools:
+    gateway = create_gateway_mcp_client()
+    # Hold our own consumer reference so the MCP session survives agent cleanup
+    # and later invocations reuse the connected session instead of reconnecting.
+    add_consumer = getattr(gateway, "add_consumer", None)
+    if callable(add_consumer):
+        add_consumer(WARM_FACTORY_CONSUMER_ID)
+    return AgentRuntimeTools(
+        gateway=gateway,
+        opentofu=create_opentofu_mcp_client(),
+        handoff_to_user=None,
+        file_read=file_read,
+        file_write=file_write,
+        terraform_init=terraform_init,
+        terraform_plan=terraform_plan,
+        terraform_validate=terraform_validate,
+        ministack_terratest=ministack_terratest,
+        tflint_scan=tflint_scan,
+        infracost_breakdown=infracost_breakdown,
+        checkov_scan=checkov_scan,
+        diagram=safe_diagram,
+        # Not assigned to any agent by default; keep strands.multiagent out of startup.
+        swarm=LazyTool("swarm", "strands_tools.swarm:swarm"),
+    )
+
+
+def _release_shared_runtime_tools(runtime_tools: AgentRuntimeTools) -> None:
+    remove_consumer = getattr(runtime_tools.gateway, "remove_consumer", None)
+    if callable(remove_consumer):
+        remove_consumer(WARM_FACTORY_CONSUMER_ID)
+
+
+def _shared_runtime_tools() -> AgentRuntimeTools:
+    """Return the prebuilt, session-independent runtime tool registry."""
+    return warm_resources.get_or_create(
+        "runtime_tools",
+        os.environ.get("STACK_NAME", ""),
+        _build_shared_runtime_tools,
+        ttl_seconds=warm_resource_ttl_seconds(),
+        on_evict=_release_shared_runtime_tools,
+    )
+
+
 def create_strands_agent(
     user_id: str,
     session_id: str,
@@ -784,59 +1046,101 @@ def create_strands_agent(
     pull_request_results: list[dict] | None = None,
     handoff_results: list[dict] | None = None,
     session_manager: AgentCoreMemorySessionManager | None = None,
+    context_token_budget: int | None = None,
 ) -> Agent:
-    """Create a Strands agent with Gateway tools and memory."""
+    """Create a Strands agent with Gateway tools and memory.
 
-    _use_shared_files_workdir(repository, session_id)
+    Model clients, the Gateway MCP session, and the static tool registry are
+    process-wide warm resources; only the session manager, result sinks, and
+    workspace are bound per invocation.
+    """
 
-    # Get OpenAI credentials from AgentCore Identity
-    openai_creds = get_openai_credentials()
+    with timed_phase("workspace"):
+        _use_shared_files_workdir(repository, session_id)
 
-    # Create OpenAI client with custom base_url and api_key
-    openai_client = AsyncOpenAI(
-        api_key=openai_creds["api_key"],
-        base_url=openai_creds["base_url"],
-    )
+    # Get OpenAI credentials from AgentCore Identity
+    with timed_phase("credentials"):
+        openai_creds = get_openai_credentials()
+
+    # Create OpenAI models around the pooled client for this credential and base_url
+    openai_client = _warm_openai_client(openai_creds)
+    fallback_settings = fallback_model_settings()
+    fallback_client = None
+    if fallback_settings:
+        fallback_base_url = fallback_settings.get("base_url", openai_creds["base_url"])
+        fallback_client = _warm_openai_client({**openai_creds, "base_url": fallback_base_url})
+
+    def build_model(model_id: str) -> OpenRouterModel:
+        fallback = None
+        if fallback_client is not None:
+            fallback = OpenRouterModel(
+                client=fallback_client, model_id=fallback_settings.get("model_id", model_id), params={"temperature": 0.1}
+            )
+        return OpenRouterModel(client=openai_client, model_id=model_id, params={"temperature": 0.1}, fallback=fallback)
 
-    # Create OpenAI model with the custom client and model_id from credentials
-    openai_model = OpenRouterModel(
-        client=openai_client,
-        model_id=openai_creds["model_id"],
-        params={"temperature": 0.1},
-    )
+    openai_model = build_model(openai_creds["model_id"])
+    with timed_phase("model_tiers"):
+        model_router = ModelRouter(openai_model, build_model, model_tier_map())
 
-    session_manager = session_manager or _create_session_manager(user_id, session_id)
+    if session_manager is None:
+        with timed_phase("session_manager"):
+            session_manager = _create_session_manager(user_id, session_id)
 
     create_pull_request_tool = None
     if repository is not None and pull_request_results is not None:
         create_pull_request_tool = _create_pull_request_tool(repository, session_id, pull_request_results)
 
-    runtime_tools = AgentRuntimeTools(
-        gateway=create_gateway_mcp_client(),
-        opentofu=create_opentofu_mcp_client(),
+    with timed_phase("runtime_tools"):
+        shared_runtime_tools = _shared_runtime_tools()
+    runtime_tools = replace(
+        shared_runtime_tools,
         handoff_to_user=_create_handoff_to_user_tool(handoff_results if handoff_results is not None else []),
-        file_read=file_read,
-        file_write=file_write,
-        terraform_init=terraform_init,
-        terraform_plan=terraform_plan,
-        terraform_validate=terraform_validate,
-        ministack_terratest=ministack_terratest,
-        tflint_scan=tflint_scan,
-        infracost_breakdown=infracost_breakdown,
-        checkov_scan=checkov_scan,
-        diagram=safe_diagram,
-        swarm=strands_swarm,
         create_pull_request=create_pull_request_tool,
     )
 
-    return create_orchestrator_agent(
-        model=openai_model,
-        repository=repository,
-        state_backend=state_backend,
-        runtime_tools=runtime_tools,
-        session_manager=session_manager,
-        trace_attributes={"user.id": user_id, "session.id": session_id},
-    )
+    with timed_phase("agent_create"):
+        return create_orchestrator_agent(
+            model=openai_model,
+            repository=repository,
+            state_backend=state_backend,
+            runtime_tools=runtime_tools,
+            session_manager=session_manager,
+            trace_attributes={"user.id": user_id, "session.id": session_id},
+            context_token_budget=context_token_budget,
+            model_router=model_router,
+        )
+
+
+def _context_token_budget(payload: dict) -> int | None:
+    """Per-session history budget from the payload; None uses AGENT_CONTEXT_TOKEN_BUDGET."""
+    raw_value = payload.get("contextTokenBudget")
+    if raw_value is None:
+        return None
+    try:
+        return max(0, int(raw_value))
+    except (TypeError, ValueError):
+        logger.warning("Invalid contextTokenBudget=%r; using the default budget", raw_value)
+        return None
+
+
+def _stop_invocation_profiler(profiler: InvocationProfiler, session_id: str) -> str | None:
+    if not profiler.active:
+        return None
+    try:
+        output_dir = session_artifact_dir(session_id, "profiles", shared_files_base_path())
+    except Exception:
+        logger.exception("Profiles directory is unavailable for session %s", session_id)
+        output_dir = None
+    return profiler.stop(output_dir)
+
+
+def _timings_event(timings: InvocationTimings, profiler: InvocationProfiler, session_id: str) -> dict:
+    """Summarize the phase timers for the end of the stream, stopping any profiler first."""
+    summary = timings.summary()
+    profile_path = _stop_invocation_profiler(profiler, session_id)
+    if profile_path:
+        summary = {**summary, "profile": profile_path}
+    return {"lifecycle": "timings", "timings": summary}
 
 
 @app.entrypoint
@@ -860,27 +1164,62 @@ async def invocations(payload, context: RequestContext):
 
     session_manager: AgentCoreMemorySessionManager | None = None
     agent: Agent | None = None
+    action = str(
+        payload.get("controlAction") or payload.get("githubAction") or payload.get("filesystemAction") or "chat"
+    )
+    timings = start_invocation_timings({"session.id": session_id, "agentcore.action": action})
+    profiler = InvocationProfiler()
+    failure: BaseException | None = None
     try:
         user_id = extract_user_id_from_context(context)
         if payload.get("controlAction") == "cancelSession":
-            yield {"status": "ok", "cancelledAgents": cancel_session_agents(session_id)}
+            yield {
+                "status": "ok",
+                "cancelledAgents": cancel_session_agents(session_id),
+                "cancelledActions": control_actions.cancel_session(session_id),
+                "cancelledProcesses": cancel_session_processes(session_id),
+            }
+            return
+        if payload.get("controlAction") == "releaseSessionAttachments":
+            released = await artifact_io.run(lambda: _attachment_store(user_id).release_session(session_id))
+            yield {"status": "ok", **released}
+            return
+        if payload.get("controlAction") == "runtimeStats":
+            yield {
+                "status": "ok",
+                "warmResources": warm_resources.stats(),
+                "specialistPools": specialist_pool_stats(),
+                "specialistCache": specialist_cache.stats(),
+                "modelTiers": model_tier_stats(),
+                "llmScheduler": llm_scheduler.stats(),
+                "requestPolicy": request_policy.stats(),
+                "artifactIO": artifact_io.stats(),
+                "controlActions": control_actions.stats(),
+                "streamCoalescer": stream_coalescer_stats(),
+                "contextCompaction": context_compaction_stats(),
+                "memoryOffload": memory_offload_stats(),
+                "pluginCache": plugin_cache_stats(),
+            }
             return
 
         github_action = payload.get("githubAction")
         if github_action == "listInstalledRepositories":
-            yield {"status": "ok", **list_installed_repositories()}
+            yield {"status": "ok", **await control_actions.run(github_action, session_id, list_installed_repositories)}
             return
         if github_action == "previewPullRequest":
             if not repository:
                 yield {"status": "error", "error": "repository is required"}
                 return
-            yield {"status": "ok", "preview": preview_pull_request(repository, session_id)}
+            preview = await control_actions.run(github_action, session_id, preview_pull_request, repository, session_id)
+            yield {"status": "ok", "preview": preview}
             return
         if github_action == "setupRepositoryWorkspace":
             if not repository:
                 yield {"status": "error", "error": "repository is required"}
                 return
-            repo_path = setup_repository_workspace(repository, session_id)
+            repo_path = await control_actions.run(
+                github_action, session_id, setup_repository_workspace, repository, session_id
+            )
             yield {"status": "ok", "workspace": {"path": str(repo_path)}}
             return
         if github_action == "getFileDiff":
@@ -891,28 +1230,46 @@ async def invocations(payload, context: RequestContext):
             if not file_path:
                 yield {"status": "error", "error": "filePath is required"}
                 return
-            yield {"status": "ok", "fileDiff": get_file_diff(repository, session_id, file_path)}
+            file_diff = await control_actions.run(github_action, session_id, get_file_diff, repository, session_id, file_path)
+            yield {"status": "ok", "fileDiff": file_diff}
             return
         if github_action == "generateTerraformGraph":
             if not repository:
                 yield {"status": "error", "error": "repository is required"}
                 return
             terraform_path = str(payload.get("terraformPath") or ".").strip() or "."
-            yield {
-                "status": "ok",
-                "terraformGraph": generate_terraform_plan_graph(
-                    repository,
-                    session_id,
-                    terraform_path,
-                    state_backend,
-                ),
-            }
+            terraform_graph = await control_actions.run(
+                github_action,
+                session_id,
+                generate_terraform_plan_graph,
+                repository,
+                session_id,
+                terraform_path,
+                state_backend,
+            )
+            yield {"status": "ok", "terraformGraph": terraform_graph}
             return
 
         filesystem_action = payload.get("filesystemAction")
         if filesystem_action == "listFiles":
             prefix = str(payload.get("prefix") or "").strip()
-            yield {"status": "ok", "files": _list_runtime_files(repository, session_id, prefix)}
+            try:
+                limit = int(payload.get("limit") or 0)
+            except (TypeError, ValueError):
+                yield {"status": "error", "error": "limit must be an integer"}
+                return
+            listing = await control_actions.run(
+                filesystem_action,
+                session_id,
+                _list_runtime_files,
+                repository,
+                session_id,
+                prefix,
+                cursor=str(payload.get("cursor") or ""),
+                limit=limit,
+                delimiter=str(payload.get("delimiter") or ""),
+            )
+            yield {"status": "ok", **listing}
             return
         if filesystem_action == "getFileContent":
             file_key = str(payload.get("fileKey") or payload.get("key") or "").strip()
@@ -920,12 +1277,42 @@ async def invocations(payload, context: RequestContext):
                 yield {"status": "error", "error": "fileKey is required"}
                 return
             try:
-                yield {"status": "ok", "file": _get_runtime_file_content(repository, session_id, file_key)}
+                range_args = {
+                    name: int(payload[field])
+                    for field, name in (
+                        ("offset", "offset"),
+                        ("length", "length"),
+                        ("startLine", "start_line"),
+                        ("lineCount", "line_count"),
+                    )
+                    if payload.get(field) is not None
+                }
+            except (TypeError, ValueError):
+                yield {"status": "error", "error": "offset, length, startLine and lineCount must be integers"}
+                return
+            try:
+                file_content = await control_actions.run(
+                    filesystem_action,
+                    session_id,
+                    _get_runtime_file_content,
+                    repository,
+                    session_id,
+                    file_key,
+                    **range_args,
+                )
             except FileNotFoundError:
                 yield {"status": "error", "error": f"file not found: {file_key}"}
+                return
+            yield {"status": "ok", "file": file_content}
             return
         if filesystem_action == "downloadSourceZip":
-            yield {"status": "ok", "archive": _runtime_files_zip(repository, session_id)}
+            delivery = str(payload.get("archiveDelivery") or "").strip().lower()
+            async for event in _pooled_events(
+                filesystem_action,
+                session_id,
+                _source_archive_events(repository, session_id, delivery),
+            ):
+                yield event
             return
 
         if github_action == "createPullRequest":
@@ -933,24 +1320,29 @@ async def invocations(payload, context: RequestContext):
                 yield {"status": "error", "error": "repository is required"}
                 return
             pr_info = payload.get("pullRequest") or {}
-            yield {
-                "status": "ok",
-                "pullRequest": create_pull_request(
-                    repository,
-                    session_id,
-                    pr_info.get("title") or "AgentCore changes",
-                    pr_info.get("body") or "Created by AgentCore.",
-                ),
-            }
+            pull_request = await control_actions.run(
+                github_action,
+                session_id,
+                create_github_pull_request,
+                repository,
+                session_id,
+                pr_info.get("title") or "AgentCore changes",
+                pr_info.get("body") or "Created by AgentCore.",
+            )
+            yield {"status": "ok", "pullRequest": pull_request}
             return
         if github_action == "listPullRequests":
             if not repository:
                 yield {"status": "error", "error": "repository is required"}
                 return
-            yield {
-                "status": "ok",
-                "pullRequests": list_pull_requests(repository, payload.get("pullRequestState") or "open"),
-            }
+            pull_requests = await control_actions.run(
+                github_action,
+                session_id,
+                list_pull_requests,
+                repository,
+                payload.get("pullRequestState") or "open",
+            )
+            yield {"status": "ok", "pullRequests": pull_requests}
             return
 
         if payload.get("filesystemSmokeTest") is True:
@@ -1023,7 +1415,8 @@ async def invocations(payload, context: RequestContext):
 
         pull_request_results: list[dict] = []
         handoff_results: list[dict] = []
-        session_manager = _create_session_manager(user_id, session_id)
+        with timed_phase("session_manager"):
+            session_manager = _create_session_manager(user_id, session_id)
         agent = create_strands_agent(
             user_id,
             session_id,
@@ -1032,25 +1425,39 @@ async def invocations(payload, context: RequestContext):
             pull_request_results,
             handoff_results,
             session_manager=session_manager,
+            context_token_budget=_context_token_budget(payload),
         )
-        saved_attachments = _save_prompt_attachments(payload.get("attachments"), session_id)
+        with timed_phase("attachments"):
+            saved_attachments = await artifact_io.run(
+                _save_prompt_attachments,
+                payload.get("attachments"),
+                session_id,
+                user_id,
+            )
         agent_query = _prompt_with_attachment_content_blocks(user_query, saved_attachments)
-        restored_checkpoint = _load_agent_checkpoint(agent, session_id)
+        with timed_phase("checkpoint_load"):
+            await artifact_io.wait_for(session_id)
+            restored_checkpoint = await artifact_io.run(_load_agent_checkpoint, agent, session_id)
         if restored_checkpoint:
             yield {"lifecycle": "checkpoint_restored"}
+        with timed_phase("context_compaction"):
+            compaction = await compact_conversation(agent)
+        if compaction:
+            yield {"lifecycle": "context_compacted", **compaction}
         agent.state.set("original_user_prompt", user_query)
         agent.state.set("original_user_context", _json_safe_context(agent_query))
-        _save_agent_checkpoint(agent, session_id, user_id=user_id, label="before_invocation")
+        await _save_agent_checkpoint_behind(agent, session_id, user_id=user_id, label="before_invocation")
 
         assistant_chunks = []
-        with registered_agent(session_id, agent):
-            async for event in agent.stream_async(agent_query):
-                event_dict = dict(event)
-                if isinstance(event_dict.get("data"), str):
-                    assistant_chunks.append(event_dict["data"])
-                compact_event = _compact_stream_event(event_dict)
-                if compact_event is not None:
-                    yield compact_event
+        with registered_agent(session_id, agent), timed_phase("stream"):
+            agent_stream = _compact_agent_stream(
+                agent,
+                agent_query,
+                assistant_chunks,
+                invocation_state={BYPASS_SPECIALIST_CACHE: payload.get("bypassSpecialistCache") is True},
+            )
+            async for compact_event in coalesce_stream(agent_stream):
+                yield compact_event
 
         if not "".join(assistant_chunks).strip() and not handoff_results:
             fallback_message = _empty_agent_response_message(saved_attachments)
@@ -1067,17 +1474,27 @@ async def invocations(payload, context: RequestContext):
         if handoff_results:
             yield {"userHandoff": handoff_results[-1]}
 
-        checkpoint_path = _save_agent_checkpoint(agent, session_id, user_id=user_id, label="after_invocation")
-        if checkpoint_path:
+        if await _save_agent_checkpoint_behind(agent, session_id, user_id=user_id, label="after_invocation"):
             yield {"lifecycle": "checkpoint_saved"}
 
+        yield _timings_event(timings, profiler, session_id)
+
     except Exception as e:
+        failure = e
         logger.exception("Agent run failed")
         if session_id and agent is not None:
-            _save_agent_checkpoint(agent, session_id, user_id=user_id if "user_id" in locals() else "", label="error")
+            await _save_agent_checkpoint_behind(
+                agent,
+                session_id,
+                user_id=user_id if "user_id" in locals() else "",
+                label="error",
+            )
+            yield _timings_event(timings, profiler, session_id)
         yield {"status": "error", "error": str(e)}
     finally:
         _close_session_manager(session_manager)
+        _stop_invocation_profiler(profiler, session_id)
+        timings.finish(failure)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+import asyncio
+from contextvars import ContextVar
+from pathlib import Path
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.action_pool import ControlActionPool
+from agents.cancellation import ProcessCancelled, cancel_session_processes, run_process
+
+_request_label: ContextVar[str] = ContextVar("request_label", default="")
+
+
+class ControlActionPoolTests(unittest.TestCase):
+    def test_blocking_action_does_not_stall_the_event_loop(self):
+        pool = ControlActionPool(max_workers=2, limits={}, default_limit=2)
+        release = threading.Event()
+        ticks = []
+
+        async def ticker():
+            while not release.is_set():
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.005)
+
+        def slow_graph():
+            time.sleep(0.1)
+            return threading.get_ident()
+
+        async def scenario():
+            loop_thread = threading.get_ident()
+            tick_task = asyncio.create_task(ticker())
+            worker_thread = await pool.run("generateTerraformGraph", "session-1", slow_graph)
+            release.set()
+            await tick_task
+            return loop_thread, worker_thread
+
+        loop_thread, worker_thread = asyncio.run(scenario())
+
+        self.assertNotEqual(loop_thread, worker_thread)
+        self.assertGreater(len(ticks), 5)
+        self.assertEqual(pool.stats()["actions"]["generateTerraformGraph"]["completed"], 1)
+
+    def test_per_action_limit_queues_without_blocking_other_actions(self):
+        pool = ControlActionPool(max_workers=4, limits={"generateTerraformGraph": 1})
+        gate = threading.Event()
+        order = []
+
+        def slow_graph(name):
+            gate.wait(2)
+            order.append(name)
+            return name
+
+        async def scenario():
+            first = asyncio.ensure_future(pool.run("generateTerraformGraph", "s1", slow_graph, "first"))
+            second = asyncio.ensure_future(pool.run("generateTerraformGraph", "s2", slow_graph, "second"))
+            await asyncio.sleep(0.02)
+            stats = pool.stats()["actions"]["generateTerraformGraph"]
+            self.assertEqual((stats["running"], stats["queued"]), (1, 1))
+
+            self.assertEqual(await pool.run("getFileDiff", "s3", lambda: "diff"), "diff")
+            gate.set()
+            return await asyncio.gather(first, second)
+
+        self.assertEqual(asyncio.run(scenario()), ["first", "second"])
+        self.assertEqual(order, ["first", "second"])
+        self.assertEqual(pool.stats()["actions"]["generateTerraformGraph"]["peakQueued"], 1)
+
+    def test_cancelling_queued_jobs_drops_them_before_they_start(self):
+        pool = ControlActionPool(max_workers=2, limits={"setupRepositoryWorkspace": 1})
+        gate = threading.Event()
+        started = []
+
+        def job(name):
+            started.append(name)
+            gate.wait(2)
+            return name
+
+        async def scenario():
+            running = asyncio.ensure_future(pool.run("setupRepositoryWorkspace", "s1", job, "running"))
+            queued = asyncio.ensure_future(pool.run("setupRepositoryWorkspace", "s2", job, "queued"))
+            awaited = asyncio.ensure_future(pool.run("setupRepositoryWorkspace", "s3", job, "awaited"))
+            await asyncio.sleep(0.02)
+
+            self.assertEqual(pool.cancel_session("s2"), 1)
+            awaited.cancel()
+            await asyncio.sleep(0.02)
+            gate.set()
+            self.assertEqual(await running, "running")
+            for task in (queued, awaited):
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(scenario())
+
+        stats = pool.stats()["actions"]["setupRepositoryWorkspace"]
+        self.assertEqual(started, ["running"])
+        self.assertEqual((stats["cancelled"], stats["queued"], stats["running"]), (2, 0, 0))
+
+    def test_failures_propagate_and_free_the_lane(self):
+        pool = ControlActionPool(max_workers=1, limits={"previewPullRequest": 1})
+
+        def broken():
+            raise RuntimeError("git failed")
+
+        async def scenario():
+            with self.assertRaisesRegex(RuntimeError, "git failed"):
+                await pool.run("previewPullRequest", "s1", broken)
+            return await pool.run("previewPullRequest", "s1", lambda: "ok")
+
+        self.assertEqual(asyncio.run(scenario()), "ok")
+        stats = pool.stats()["actions"]["previewPullRequest"]
+        self.assertEqual((stats["failed"], stats["completed"]), (1, 1))
+
+
+    def test_jobs_run_in_the_submitting_context(self):
+        pool = ControlActionPool(max_workers=1, limits={})
+
+        async def scenario():
+            _request_label.set("invocation-1")
+            return await pool.run("getFileDiff", "s1", _request_label.get)
+
+        self.assertEqual(asyncio.run(scenario()), "invocation-1")
+
+    def test_cancelling_the_session_stops_a_running_job(self):
+        pool = ControlActionPool(max_workers=1, limits={})
+        started = threading.Event()
+
+        def clone():
+            started.set()
+            run_process([sys.executable, "-c", "import time; time.sleep(30)"])
+            return "cloned"
+
+        async def scenario():
+            job = asyncio.ensure_future(pool.run("setupRepositoryWorkspace", "s-running", clone))
+            await asyncio.to_thread(started.wait, 5)
+            self.assertEqual(pool.cancel_session("s-running"), 0)
+            signalled = 0
+            for _ in range(100):
+                signalled = cancel_session_processes("s-running", grace_seconds=1.0)
+                if signalled:
+                    break
+                await asyncio.sleep(0.02)
+            self.assertEqual(signalled, 1)
+            with self.assertRaises(ProcessCancelled):
+                await asyncio.wait_for(job, 5)
+
+        started_at = time.monotonic()
+        asyncio.run(scenario())
+        self.assertLess(time.monotonic() - started_at, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import asyncio
 import base64
+import importlib
 import os
 from pathlib import Path
 import sys
@@ -13,14 +14,21 @@ from unittest.mock import patch
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 
+_STUB_MODULES: dict[str, types.ModuleType] = {}
+
+
 def _install_module(name: str, **attrs):
     module = types.ModuleType(name)
     for key, value in attrs.items():
         setattr(module, key, value)
-    sys.modules[name] = module
+    _STUB_MODULES[name] = module
     return module
 
 
+async def _no_compaction():
+    return None
+
+
 class FakeBedrockAgentCoreApp:
     def entrypoint(self, fn):
         return fn
@@ -31,7 +39,7 @@ class FakeBedrockAgentCoreApp:
 
 class FakeOpenAIModel:
     def __init__(self, *args, **kwargs):
-        pass
+        self.client = kwargs.get("client")
 
     def format_request(self, *args, **kwargs):
         return {}
@@ -70,8 +78,44 @@ _install_module("strands", Agent=object, AgentSkills=object, ToolContext=object,
 _install_module("strands.models", OpenAIModel=FakeOpenAIModel)
 _install_module("openai", AsyncOpenAI=object)
 _install_module("strands_tools", file_read=object(), file_write=object())
-_install_module("strands_tools.swarm", swarm=object())
-_install_module("agents.artifacts", session_artifact_dir=lambda *args, **kwargs: None)
+_install_module("agents.lazy_tools", LazyTool=lambda name, target, tool_spec=None: object())
+_install_module(
+    "agents.llm_scheduler",
+    estimate_request_tokens=lambda messages, tool_specs=None, system_prompt=None: 1,
+    llm_scheduler=SimpleNamespace(stats=lambda: {}),
+    request_origin=lambda invocation_state: ("", "interactive"),
+)
+_install_module(
+    "agents.request_policy",
+    fallback_model_settings=lambda: {},
+    request_policy=SimpleNamespace(active=lambda has_fallback=False: False, stats=lambda: {}),
+    slot_granted=lambda: None,
+)
+_install_module(
+    "agents.model_routing",
+    ModelRouter=lambda primary, build, tiers: None,
+    model_tier_map=lambda: {},
+    model_tier_stats=lambda: {},
+)
+_install_module(
+    "agents.memory_offload",
+    OffloadingMemorySessionManager=object,
+    memory_offload_stats=lambda: {},
+)
+_install_module(
+    "agents.context_compaction",
+    SupersededToolResults=object,
+    CompactingConversationManager=lambda **kwargs: None,
+    compact_conversation=lambda agent: _no_compaction(),
+    context_compaction_stats=lambda: {},
+)
+_install_module(
+    "agents.artifacts",
+    session_artifact_dir=lambda *args, **kwargs: None,
+    session_artifact_path=lambda *args, **kwargs: None,
+    user_artifact_dir=lambda *args, **kwargs: None,
+    presigned_artifact_url=lambda *args, **kwargs: ("", "", None),
+)
 _install_module(
     "agents.iac_tools",
     checkov_scan=object(),
@@ -88,6 +132,7 @@ _install_module("agents.orchestator.tools", __path__=[])
 _install_module("agents.orchestator.tools.gateway", create_gateway_mcp_client=lambda: object())
 _install_module("agents.orchestator.tools.opentofu_mcp", create_opentofu_mcp_client=lambda: object())
 _install_module("agents.orchestator.tools.safe_diagram", diagram=object())
+_install_module("agents.workspace_file_tools", file_read=object(), file_write=object())
 _install_module(
     "utils.auth",
     extract_user_id_from_context=lambda _context: "user-1",
@@ -107,7 +152,26 @@ _install_module(
     workspace_path=lambda *_args, **_kwargs: None,
 )
 
-import main as agent_main
+agent_main = None
+CheckpointStore = None
+_modules_patch = patch.dict(sys.modules)
+
+
+def setUpModule():
+    """Import ``main`` against the stubs; the real modules come back in ``tearDownModule``."""
+    global agent_main, CheckpointStore
+    _modules_patch.start()
+    stubbed_roots = {"main", "agents", "utils", *(name.split(".")[0] for name in _STUB_MODULES)}
+    for name in list(sys.modules):
+        if name.split(".")[0] in stubbed_roots:
+            del sys.modules[name]
+    sys.modules.update(_STUB_MODULES)
+    agent_main = importlib.import_module("main")
+    CheckpointStore = importlib.import_module("agents.checkpoint_store").CheckpointStore
+
+
+def tearDownModule():
+    _modules_patch.stop()
 
 
 class FakeAgent:
@@ -115,7 +179,7 @@ class FakeAgent:
         self.fail = fail
         self.state = SimpleNamespace(set=lambda _key, _value: None)
 
-    async def stream_async(self, _query):
+    async def stream_async(self, _query, **_kwargs):
         if self.fail:
             raise RuntimeError("stream failed")
         yield {"data": "ok"}
@@ -171,10 +235,11 @@ class AgentCoreMemoryLifecycleTests(unittest.TestCase):
             clear=False,
         ), patch.object(agent_main, "AgentCoreMemoryConfig", FakeConfig), patch.object(
             agent_main,
-            "AgentCoreMemorySessionManager",
-            lambda agentcore_memory_config, region_name: {
+            "OffloadingMemorySessionManager",
+            lambda agentcore_memory_config, region_name, artifact_dir: {
                 "config": agentcore_memory_config,
                 "region": region_name,
+                "artifactDir": artifact_dir,
             },
         ):
             agent_main._create_session_manager("user-1", "session-1")
@@ -210,6 +275,9 @@ class AgentCoreMemoryLifecycleTests(unittest.TestCase):
 
         self.assertTrue(session_manager.closed)
         self.assertIn({"data": "ok"}, events)
+        self.assertEqual(events[-1]["lifecycle"], "timings")
+        self.assertEqual(events[-1]["timings"]["phases"]["stream"]["count"], 1)
+        self.assertIn("session_manager", events[-1]["timings"]["phases"])
 
     def test_invocation_closes_memory_session_manager_when_stream_fails(self):
         session_manager = FakeSessionManager()
@@ -238,6 +306,37 @@ class AgentCoreMemoryLifecycleTests(unittest.TestCase):
         self.assertEqual(events[-1]["status"], "error")
         self.assertIn("stream failed", events[-1]["error"])
 
+    def test_create_strands_agent_reuses_warm_client_and_tools(self):
+        created_clients = []
+
+        class FakeAsyncOpenAI:
+            def __init__(self, **kwargs):
+                created_clients.append(kwargs)
+
+        class FakeGateway:
+            def __init__(self):
+                self.consumers = set()
+
+            def add_consumer(self, consumer_id):
+                self.consumers.add(consumer_id)
+
+        agent_main.warm_resources.clear()
+        with patch.object(agent_main, "AsyncOpenAI", FakeAsyncOpenAI), patch.object(
+            agent_main, "create_gateway_mcp_client", FakeGateway
+        ), patch.object(agent_main, "_use_shared_files_workdir", return_value="/tmp"):
+            first = agent_main.create_strands_agent("user-1", "session-1", session_manager=FakeSessionManager())
+            second = agent_main.create_strands_agent("user-1", "session-2", session_manager=FakeSessionManager())
+        stats = agent_main.warm_resources.stats()
+        agent_main.warm_resources.clear()
+
+        self.assertEqual(len(created_clients), 1)
+        self.assertIs(first["model"].client, second["model"].client)
+        self.assertIs(first["runtime_tools"].gateway, second["runtime_tools"].gateway)
+        self.assertIn(agent_main.WARM_FACTORY_CONSUMER_ID, first["runtime_tools"].gateway.consumers)
+        self.assertIsNot(first["runtime_tools"].handoff_to_user, second["runtime_tools"].handoff_to_user)
+        self.assertEqual(stats["openai_client"]["hits"], 1)
+        self.assertEqual(stats["runtime_tools"]["hits"], 1)
+
     def test_save_agent_checkpoint_persists_snapshot_json(self):
         agent = FakeCheckpointAgent()
         with tempfile.TemporaryDirectory() as tmp:
@@ -259,10 +358,10 @@ class AgentCoreMemoryLifecycleTests(unittest.TestCase):
                     user_id="user-1",
                     label="after_invocation",
                 )
-                saved = Path(path).read_text(encoding="utf-8") if path else ""
+                saved = CheckpointStore(Path(path).parent).load() if path else None
 
         self.assertIsNotNone(path)
-        self.assertIn('"checkpoint_label": "after_invocation"', saved)
+        self.assertEqual(saved["app_data"]["checkpoint_label"], "after_invocation")
         self.assertEqual(agent.take_snapshot_calls[0]["preset"], "session")
         self.assertIn("system_prompt", agent.take_snapshot_calls[0]["include"])
         self.assertEqual(agent.take_snapshot_calls[0]["app_data"]["checkpoint_label"], "after_invocation")
@@ -295,26 +394,111 @@ class AgentCoreMemoryLifecycleTests(unittest.TestCase):
         self.assertTrue(restored)
         self.assertEqual(agent.loaded_snapshot["restored"]["schema_version"], "1.0")
 
-    def test_runtime_files_zip_archives_scratch_workspace_without_git_metadata(self):
+    def test_get_runtime_file_content_reads_requested_range_only(self):
         with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "plan.txt").write_text("abcdefghij" * 10, encoding="utf-8")
+
+            with patch.object(agent_main, "scratch_workspace_path", return_value=root), patch.object(
+                agent_main, "MAX_FILE_PREVIEW_BYTES", 40
+            ):
+                preview = agent_main._get_runtime_file_content(None, "session-123", "plan.txt")
+                ranged = agent_main._get_runtime_file_content(None, "session-123", "plan.txt", offset=95, length=10)
+
+        self.assertTrue(preview["content"].endswith("[Preview truncated to 40 bytes of 100 bytes]"))
+        self.assertEqual(preview["nextOffset"], 40)
+        self.assertEqual(ranged["content"], "fghij")
+        self.assertIsNone(ranged["nextOffset"])
+        self.assertEqual(ranged["size"], 100)
+
+    def _archive_events(self, root: Path, base_path: Path, delivery: str = "") -> list[dict]:
+        def fake_session_artifact_dir(session_id, category, base):
+            path = base / "sessions" / session_id / category
+            path.mkdir(parents=True, exist_ok=True)
+            return path
+
+        with patch.object(agent_main, "scratch_workspace_path", return_value=root), patch.object(
+            agent_main, "shared_files_base_path", return_value=base_path
+        ), patch.object(agent_main, "session_artifact_dir", side_effect=fake_session_artifact_dir):
+            return list(agent_main._source_archive_events(None, "session-123", delivery))
+
+    def test_runtime_files_zip_archives_scratch_workspace_without_git_metadata(self):
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as artifacts:
             root = Path(tmp)
             (root / "main.tf").write_text("resource test", encoding="utf-8")
             (root / ".git").mkdir()
             (root / ".git" / "config").write_text("private", encoding="utf-8")
 
-            with patch.object(agent_main, "scratch_workspace_path", return_value=root):
-                archive = agent_main._runtime_files_zip(None, "session-123")
+            events = self._archive_events(root, Path(artifacts))
+            archive = events[-1]["archive"]
 
             zip_path = root / "source.zip"
             zip_path.write_bytes(base64.b64decode(archive["content"]))
             with zipfile.ZipFile(zip_path) as zip_file:
                 names = zip_file.namelist()
 
+        self.assertEqual(len(events), 1)
+        self.assertEqual(archive["delivery"], "inline")
         self.assertEqual(archive["filename"], "session-123-source.zip")
         self.assertEqual(archive["fileCount"], 1)
         self.assertIn("main.tf", names)
         self.assertNotIn(".git/config", names)
 
+    def test_source_archive_is_reused_until_workspace_changes(self):
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as artifacts:
+            root = Path(tmp)
+            (root / "main.tf").write_text("resource test", encoding="utf-8")
+
+            first = self._archive_events(root, Path(artifacts))[-1]["archive"]
+            second = self._archive_events(root, Path(artifacts))[-1]["archive"]
+            (root / "variables.tf").write_text("variable x {}", encoding="utf-8")
+            third = self._archive_events(root, Path(artifacts))[-1]["archive"]
+            archives = list((Path(artifacts) / "sessions" / "session-123" / "archives").glob("*.zip"))
+
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(first["treeHash"], second["treeHash"])
+        self.assertFalse(third["cached"])
+        self.assertEqual(third["fileCount"], 2)
+        self.assertEqual(len(archives), 1)
+
+    def test_source_archive_streams_bounded_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as artifacts:
+            root = Path(tmp)
+            (root / "blob.bin").write_bytes(os.urandom(4096))
+
+            with patch.object(agent_main, "SOURCE_ARCHIVE_CHUNK_BYTES", 3 * 512):
+                events = self._archive_events(root, Path(artifacts), delivery="chunks")
+
+        chunks = [event["archiveChunk"] for event in events[:-1]]
+        archive = events[-1]["archive"]
+        content = base64.b64decode("".join(chunk["content"] for chunk in chunks))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(archive["delivery"], "chunks")
+        self.assertEqual(archive["chunkCount"], len(chunks))
+        self.assertEqual([chunk["index"] for chunk in chunks], list(range(len(chunks))))
+        self.assertNotIn("content", archive)
+        self.assertEqual(len(content), archive["size"])
+
+    def test_source_archive_prefers_presigned_url(self):
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as artifacts:
+            root = Path(tmp)
+            (root / "main.tf").write_text("resource test", encoding="utf-8")
+
+            with patch.object(
+                agent_main,
+                "presigned_artifact_url",
+                return_value=("https://bucket/source.zip", "sessions/source.zip", 900),
+            ) as presign:
+                events = self._archive_events(root, Path(artifacts))
+
+        archive = events[-1]["archive"]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(archive["delivery"], "url")
+        self.assertEqual(archive["url"], "https://bucket/source.zip")
+        self.assertNotIn("content", archive)
+        self.assertTrue(presign.call_args.kwargs["reuse_upload"])
 
 if __name__ == "__main__":
     unittest.main()
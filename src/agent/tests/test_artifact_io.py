@@ -0,0 +1,98 @@
+import asyncio
+from pathlib import Path
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents import artifact_io as artifact_io_module
+from agents.artifact_io import ArtifactIOExecutor
+
+
+class ArtifactIOExecutorTests(unittest.TestCase):
+    def test_run_executes_off_the_event_loop_thread(self):
+        executor = ArtifactIOExecutor(max_workers=2, max_pending=4)
+
+        async def scenario():
+            loop_thread = threading.get_ident()
+            worker_thread = await executor.run(threading.get_ident)
+            return loop_thread, worker_thread
+
+        loop_thread, worker_thread = asyncio.run(scenario())
+
+        self.assertNotEqual(loop_thread, worker_thread)
+        self.assertEqual(executor.stats()["completed"], 1)
+
+    def test_write_behind_keeps_per_key_order_and_wait_for_sees_writes(self):
+        executor = ArtifactIOExecutor(max_workers=4, max_pending=8)
+        writes = []
+
+        def slow_write(value, delay):
+            time.sleep(delay)
+            writes.append(value)
+
+        async def scenario():
+            await executor.write_behind("session-1", slow_write, "before", 0.05)
+            await executor.write_behind("session-1", slow_write, "after", 0)
+            self.assertEqual(writes, [])
+            await executor.wait_for("session-1")
+            return list(writes)
+
+        self.assertEqual(asyncio.run(scenario()), ["before", "after"])
+        self.assertEqual(executor.stats()["writeBehindPending"], 0)
+
+    def test_full_queue_waits_without_blocking_loop(self):
+        executor = ArtifactIOExecutor(max_workers=1, max_pending=1)
+        release = threading.Event()
+        ticks = []
+
+        async def ticker():
+            for _ in range(3):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+            release.set()
+
+        async def scenario():
+            blocked = asyncio.create_task(executor.run(release.wait, 5))
+            await asyncio.sleep(0)
+            queued = asyncio.create_task(executor.run(lambda: "queued"))
+            await ticker()
+            return await blocked, await queued
+
+        self.assertEqual(asyncio.run(scenario()), (True, "queued"))
+        self.assertEqual(len(ticks), 3)
+        self.assertEqual(executor.stats()["waitedForSlot"], 1)
+        self.assertEqual(executor.stats()["pending"], 0)
+
+    def test_write_behind_nowait_declines_when_backlog_is_full(self):
+        executor = ArtifactIOExecutor(max_workers=1, max_pending=1)
+        release = threading.Event()
+
+        first = executor.write_behind_nowait("session-1", release.wait, 5)
+        second = executor.write_behind_nowait("session-1", lambda: None)
+        release.set()
+        first.result(timeout=5)
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertEqual(executor.stats()["submitted"], 1)
+
+    def test_write_behind_failure_is_logged(self):
+        executor = ArtifactIOExecutor(max_workers=1, max_pending=2)
+
+        def failing_write():
+            raise OSError("mount unavailable")
+
+        async def scenario():
+            await executor.write_behind("session-1", failing_write)
+            await executor.wait_for("session-1")
+
+        with self.assertLogs(artifact_io_module.logger, level="ERROR"):
+            asyncio.run(scenario())
+        self.assertEqual(executor.stats()["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
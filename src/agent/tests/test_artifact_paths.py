@@ -1,11 +1,14 @@
 import os
+import sys
 import tempfile
+import types
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
-from agents.artifacts import session_artifact_dir
+from agents.artifacts import presigned_artifact_url, session_artifact_dir
 import agents.orchestator.tools.safe_diagram as safe_diagram
+from agents.workspace import use_workspace
 
 
 class ArtifactPathTests(unittest.TestCase):
@@ -35,31 +38,64 @@ class ArtifactPathTests(unittest.TestCase):
             self.assertEqual(output_dir, Path(tmp) / "sessions" / "chat-with-spaces" / "generic-diagrams")
             self.assertNotIn("repos", output_dir.parts)
 
-    def test_generic_diagram_tool_runs_from_session_artifacts(self):
+    def test_generic_diagram_tool_writes_to_bound_session_artifacts(self):
         with tempfile.TemporaryDirectory() as tmp:
             previous_cwd = os.getcwd()
             calls = []
 
             def fake_diagram(**kwargs):
-                calls.append((Path(os.getcwd()), kwargs))
+                module = sys.modules["strands_tools.diagram"]
+                output_path = module.save_diagram_to_directory(kwargs["title"], "mmd", "graph")
+                calls.append((Path(output_path), kwargs))
                 return "ok"
 
-            with patch.dict(
-                os.environ,
-                {
-                    "SHARED_FILES_ACTIVE_PATH": tmp,
-                    "SHARED_FILES_SESSION_ID": "chat-2",
-                },
-                clear=False,
-            ):
-                with patch.object(safe_diagram, "strands_diagram", fake_diagram):
-                    result = safe_diagram.diagram(diagram_type="graph", nodes=[])
+            safe_diagram._strands_diagram.cache_clear()
+            self.addCleanup(safe_diagram._strands_diagram.cache_clear)
+            with patch.dict(os.environ, {"SHARED_FILES_ACTIVE_PATH": tmp}, clear=False):
+                with use_workspace(Path(tmp) / "repo", "chat-2"), patch("strands_tools.diagram.diagram", fake_diagram):
+                    result = safe_diagram.diagram(diagram_type="graph", nodes=[], title="arch")
 
             self.assertEqual(result, "ok")
-            self.assertEqual(calls[0][0].resolve(), (Path(tmp) / "sessions" / "chat-2" / "generic-diagrams").resolve())
+            self.assertEqual(calls[0][0].parent.resolve(), (Path(tmp) / "sessions" / "chat-2" / "generic-diagrams").resolve())
+            self.assertEqual(calls[0][0].name, "arch.mmd")
             self.assertNotIn("repos", calls[0][0].parts)
             self.assertEqual(os.getcwd(), previous_cwd)
 
 
+class FakeS3Client:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.uploads = 0
+
+    def upload_file(self, *args, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("access denied")
+        self.uploads += 1
+
+    def generate_presigned_url(self, *args, **kwargs):
+        return "https://bucket/archive.zip"
+
+
+class PresignedArtifactUrlTests(unittest.TestCase):
+    def test_upload_is_reused_only_after_it_succeeded(self):
+        client = FakeS3Client(failures=1)
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(
+            os.environ, {"SHARED_FILES_ACTIVE_PATH": tmp, "SHARED_FILES_BUCKET_NAME": "bucket"}
+        ), patch.dict(sys.modules, {"boto3": types.SimpleNamespace(client=lambda _service: client)}):
+            archive = Path(tmp) / "source.zip"
+            archive.write_bytes(b"zip")
+
+            with self.assertLogs("agents.artifacts", level="ERROR"):
+                failed = presigned_artifact_url(archive, "application/zip", reuse_upload=True)
+            retried = presigned_artifact_url(archive, "application/zip", reuse_upload=True)
+            reused = presigned_artifact_url(archive, "application/zip", reuse_upload=True)
+
+        self.assertEqual(failed[0], "")
+        self.assertEqual(retried[0], "https://bucket/archive.zip")
+        self.assertEqual(reused[0], "https://bucket/archive.zip")
+        self.assertEqual(client.uploads, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.attachment_store import AttachmentStore, attachment_digest
+
+
+class AttachmentStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _blobs(self) -> list[Path]:
+        return [path for path in (self.root / "blobs").rglob("*") if path.is_file()]
+
+    def test_identical_content_is_stored_once_across_turns(self):
+        store = AttachmentStore(self.root)
+
+        first = store.put(b"png-bytes", name="diagram.png", content_type="image/png", session_id="session-1")
+        second = store.put(b"png-bytes", name="diagram.png", content_type="image/png", session_id="session-1")
+
+        self.assertFalse(first["deduplicated"])
+        self.assertTrue(second["deduplicated"])
+        self.assertEqual(first["path"], second["path"])
+        self.assertEqual(first["sha256"], attachment_digest(b"png-bytes"))
+        self.assertTrue(str(first["path"]).endswith(".png"))
+        self.assertEqual(len(self._blobs()), 1)
+        self.assertEqual(store.entries()[first["sha256"]]["sessions"], ["session-1"])
+
+    def test_release_deletes_blob_only_after_last_session(self):
+        store = AttachmentStore(self.root)
+        stored = store.put(b"shared", name="notes.txt", content_type="text/plain", session_id="session-1")
+        store.put(b"shared", name="copy.txt", content_type="text/plain", session_id="session-2")
+        store.put(b"private", name="other.txt", content_type="text/plain", session_id="session-1")
+
+        first_release = store.release_session("session-1")
+        self.assertEqual(first_release, {"released": 2, "deleted": 1})
+        self.assertTrue(stored["path"].exists())
+        self.assertEqual(store.entries()[stored["sha256"]]["names"], ["copy.txt"])
+
+        self.assertEqual(store.release_session("session-2"), {"released": 1, "deleted": 1})
+        self.assertEqual(self._blobs(), [])
+        self.assertEqual(store.entries(), {})
+
+    def test_separate_processes_keep_each_others_references(self):
+        # One store instance per session, as each runtime process builds its own.
+        sessions = [f"session-{index}" for index in range(16)]
+
+        def put(session_id: str) -> dict:
+            return AttachmentStore(self.root).put(
+                b"shared", name="diagram.png", content_type="image/png", session_id=session_id
+            )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(put, sessions))
+
+        digest = results[0]["sha256"]
+        self.assertEqual(sorted(AttachmentStore(self.root).entries()[digest]["sessions"]), sorted(sessions))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            releases = list(executor.map(lambda session_id: AttachmentStore(self.root).release_session(session_id), sessions[1:]))
+
+        self.assertEqual(sum(release["deleted"] for release in releases), 0)
+        self.assertTrue(results[0]["path"].exists())
+        self.assertEqual(AttachmentStore(self.root).release_session(sessions[0]), {"released": 1, "deleted": 1})
+        self.assertEqual(self._blobs(), [])
+
+    def test_put_racing_a_release_rewrites_the_blob(self):
+        releasing = AttachmentStore(self.root)
+        putting = AttachmentStore(self.root)
+        stored = releasing.put(b"data", name="a.bin", content_type="application/octet-stream", session_id="s1")
+        releasing.release_session("s1")
+
+        again = putting.put(b"data", name="a.bin", content_type="application/octet-stream", session_id="s2")
+
+        self.assertFalse(again["deduplicated"])
+        self.assertEqual(stored["path"], again["path"])
+        self.assertEqual(again["path"].read_bytes(), b"data")
+        self.assertEqual(putting.entries()[again["sha256"]]["sessions"], ["s2"])
+
+    def test_missing_blob_is_rewritten(self):
+        store = AttachmentStore(self.root)
+        stored = store.put(b"data", name="a.bin", content_type="application/octet-stream", session_id="s")
+        stored["path"].unlink()
+
+        again = store.put(b"data", name="a.bin", content_type="application/octet-stream", session_id="s")
+
+        self.assertFalse(again["deduplicated"])
+        self.assertEqual(again["path"].read_bytes(), b"data")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+import signal
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents import cancellation
+from agents.cancellation import ProcessCancelled, StreamedProcess, cancel_session_processes, run_process
+from agents.iac_tools import _run
+from agents.workspace import use_workspace
+
+# Leaves a grandchild in the process group that holds the output pipes open.
+SPAWNS_GRANDCHILD = [
+    sys.executable,
+    "-c",
+    "import subprocess, sys, time\n"
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+    "print('started', flush=True)\n"
+    "time.sleep(60)",
+]
+
+
+def _wait_for_process(session_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with cancellation._lock:
+            if cancellation._processes_by_session.get(session_id):
+                return
+        time.sleep(0.01)
+    raise AssertionError(f"no process registered for {session_id}")
+
+
+class RunProcessTests(unittest.TestCase):
+    def test_captures_output_like_subprocess_run(self):
+        script = "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"
+        completed = run_process([sys.executable, "-c", script], session_id="s1")
+
+        self.assertEqual((completed.returncode, completed.stdout, completed.stderr), (3, "out\n", "err\n"))
+        self.assertNotIn("s1", cancellation._processes_by_session)
+
+    def test_timeout_kills_the_whole_process_group(self):
+        started = time.monotonic()
+
+        with self.assertRaises(subprocess.TimeoutExpired) as raised:
+            run_process(SPAWNS_GRANDCHILD, timeout=1, session_id="s1")
+
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(raised.exception.output, "started\n")
+
+    def test_cancelling_the_session_terminates_its_processes(self):
+        outcome = {}
+
+        def run():
+            try:
+                run_process(SPAWNS_GRANDCHILD, timeout=60, session_id="cancel-me")
+            except ProcessCancelled as exc:
+                outcome["cancelled"] = exc
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        _wait_for_process("cancel-me")
+
+        self.assertEqual(cancel_session_processes("other-session"), 0)
+        self.assertEqual(cancel_session_processes("cancel-me", grace_seconds=0.5), 1)
+        worker.join(10)
+
+        self.assertFalse(worker.is_alive())
+        self.assertIn("cancelled", outcome)
+        self.assertEqual(cancel_session_processes("cancel-me"), 0)
+
+    def test_survivor_kill_skips_groups_that_are_gone(self):
+        exited = subprocess.Popen([sys.executable, "-c", "pass"], start_new_session=True)
+        exited.wait()
+        running = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"], start_new_session=True)
+        self.addCleanup(running.wait)
+
+        with patch("agents.cancellation.os.killpg", wraps=os.killpg) as killpg:
+            cancellation._kill_survivors([exited, running])
+
+        signalled = [call.args for call in killpg.call_args_list]
+        self.assertNotIn((exited.pid, signal.SIGKILL), signalled)
+        self.assertIn((running.pid, signal.SIGKILL), signalled)
+
+    def test_tool_result_reports_cancelled_runs(self):
+        results = []
+
+        async def collect():
+            return [event async for event in _run(["sleep", "60"], Path.cwd(), timeout=60)]
+
+        def run():
+            with use_workspace(Path.cwd(), "tool-session"):
+                results.append(json.loads(asyncio.run(collect())[-1]))
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        _wait_for_process("tool-session")
+        cancel_session_processes("tool-session")
+        worker.join(10)
+
+        self.assertEqual(results[0]["error"], "cancelled")
+        self.assertFalse(results[0]["ok"])
+
+
+
+class StreamedProcessTests(unittest.TestCase):
+    def _lines(self, process):
+        async def collect():
+            return [line async for line in process]
+
+        return asyncio.run(collect())
+
+    def test_streams_both_outputs_line_by_line(self):
+        script = "import sys; print('out'); print('err', file=sys.stderr); print('tail', end=''); sys.exit(3)"
+        process = StreamedProcess([sys.executable, "-c", script], session_id="s1")
+
+        lines = self._lines(process)
+
+        self.assertEqual(sorted(lines), [("stderr", "err"), ("stdout", "out"), ("stdout", "tail")])
+        self.assertEqual(process.returncode, 3)
+        self.assertNotIn("s1", cancellation._processes_by_session)
+
+    def test_timeout_kills_the_whole_process_group(self):
+        started = time.monotonic()
+
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self._lines(StreamedProcess(SPAWNS_GRANDCHILD, timeout=1, session_id="s1"))
+
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_cancelling_the_session_terminates_streamed_processes(self):
+        outcome = {}
+
+        def run():
+            try:
+                self._lines(StreamedProcess(SPAWNS_GRANDCHILD, timeout=60, session_id="stream-cancel"))
+            except ProcessCancelled as exc:
+                outcome["cancelled"] = exc
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        _wait_for_process("stream-cancel")
+
+        self.assertEqual(cancel_session_processes("stream-cancel", grace_seconds=0.5), 1)
+        worker.join(10)
+
+        self.assertFalse(worker.is_alive())
+        self.assertIn("cancelled", outcome)
+
+
+if __name__ == "__main__":
+    unittest.main()
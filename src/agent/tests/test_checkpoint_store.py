@@ -0,0 +1,132 @@
+import gzip
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.checkpoint_store import CheckpointStore, clear_checkpoint_cache
+
+
+def _snapshot(message_count: int, label: str = "after_invocation", system_prompt: str = "prompt") -> dict:
+    return {
+        "scope": "agent",
+        "schema_version": "1.0",
+        "created_at": f"2026-01-01T00:00:{message_count:02d}Z",
+        "data": {
+            "messages": [{"role": "user", "content": [{"text": f"turn {index}"}]} for index in range(message_count)],
+            "state": {"turns": message_count},
+            "system_prompt": system_prompt,
+        },
+        "app_data": {"checkpoint_label": label},
+    }
+
+
+class CheckpointStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+        clear_checkpoint_cache()
+
+    def tearDown(self):
+        clear_checkpoint_cache()
+        self._tmp.cleanup()
+
+    def _files(self, prefix: str) -> list[str]:
+        return sorted(path.name for path in self.directory.glob(f"{prefix}*"))
+
+    def test_appends_only_new_messages_per_turn(self):
+        store = CheckpointStore(self.directory, compact_every=10)
+
+        store.save(_snapshot(2))
+        base_size = (self.directory / "base-1.json.gz").stat().st_size
+        store.save(_snapshot(4))
+        journal_after_one = (self.directory / "journal-1.jsonl.gz").stat().st_size
+        store.save(_snapshot(6))
+        journal_after_two = (self.directory / "journal-1.jsonl.gz").stat().st_size
+
+        self.assertEqual((self.directory / "base-1.json.gz").stat().st_size, base_size)
+        self.assertLess(journal_after_two - journal_after_one, journal_after_one * 2)
+        entries = gzip.decompress((self.directory / "journal-1.jsonl.gz").read_bytes()).splitlines()
+        self.assertEqual(len(entries), 2)
+
+    def test_reload_in_new_process_replays_journal(self):
+        store = CheckpointStore(self.directory, compact_every=10)
+        for count in (2, 3, 5):
+            store.save(_snapshot(count, system_prompt="prompt v2"))
+
+        clear_checkpoint_cache()
+        loaded = CheckpointStore(self.directory).load()
+
+        self.assertEqual(loaded, _snapshot(5, system_prompt="prompt v2"))
+
+    def test_loaded_snapshot_is_a_copy_of_cached_state(self):
+        store = CheckpointStore(self.directory)
+        store.save(_snapshot(2))
+
+        loaded = store.load()
+        loaded["data"]["messages"].clear()
+
+        self.assertEqual(len(store.load()["data"]["messages"]), 2)
+
+    def test_compacts_after_threshold_and_removes_old_generation(self):
+        store = CheckpointStore(self.directory, compact_every=2)
+        for count in range(1, 6):
+            store.save(_snapshot(count))
+
+        clear_checkpoint_cache()
+        self.assertEqual(self._files("base-"), ["base-2.json.gz"])
+        self.assertEqual(len(CheckpointStore(self.directory).load()["data"]["messages"]), 5)
+
+    def test_rewritten_history_starts_new_base(self):
+        store = CheckpointStore(self.directory, compact_every=10)
+        store.save(_snapshot(4))
+        trimmed = _snapshot(4)
+        trimmed["data"]["messages"] = trimmed["data"]["messages"][2:]
+        store.save(trimmed)
+
+        clear_checkpoint_cache()
+        self.assertEqual(self._files("base-"), ["base-2.json.gz"])
+        self.assertEqual(CheckpointStore(self.directory).load()["data"]["messages"], trimmed["data"]["messages"])
+
+    def test_edited_middle_message_starts_new_base(self):
+        store = CheckpointStore(self.directory, compact_every=10)
+        store.save(_snapshot(4))
+        edited = _snapshot(5)
+        edited["data"]["messages"][1] = {"role": "user", "content": [{"text": "[superseded tool result]"}]}
+        store.save(edited)
+
+        clear_checkpoint_cache()
+        self.assertEqual(self._files("base-"), ["base-2.json.gz"])
+        self.assertEqual(CheckpointStore(self.directory).load()["data"]["messages"], edited["data"]["messages"])
+
+    def test_torn_journal_tail_is_ignored_and_overwritten(self):
+        store = CheckpointStore(self.directory, compact_every=10)
+        store.save(_snapshot(2))
+        store.save(_snapshot(3))
+        with (self.directory / "journal-1.jsonl.gz").open("ab") as handle:
+            handle.write(b"\x1f\x8b\x08partial")
+
+        clear_checkpoint_cache()
+        self.assertEqual(len(CheckpointStore(self.directory).load()["data"]["messages"]), 3)
+        store.save(_snapshot(4))
+        clear_checkpoint_cache()
+        self.assertEqual(len(CheckpointStore(self.directory).load()["data"]["messages"]), 4)
+
+    def test_unchanged_head_is_not_rewritten(self):
+        store = CheckpointStore(self.directory)
+        store.save(_snapshot(1, label="before_invocation"))
+        store.save(_snapshot(1, label="after_invocation"))
+
+        self.assertEqual(len(self._files("head-")), 1)
+        self.assertEqual(store.load()["app_data"]["checkpoint_label"], "after_invocation")
+
+    def test_reads_legacy_latest_json(self):
+        (self.directory / "latest.json").write_text('{"schema_version":"1.0","data":{"messages":[]}}', encoding="utf-8")
+
+        self.assertEqual(CheckpointStore(self.directory).load()["schema_version"], "1.0")
+
+
+if __name__ == "__main__":
+    unittest.main()
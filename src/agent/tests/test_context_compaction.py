@@ -0,0 +1,208 @@
+import asyncio
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.context_compaction import (
+    SUMMARY_PREFIX,
+    CompactingConversationManager,
+    compact_conversation,
+    context_compaction_stats,
+    estimate_tokens,
+    reset_context_compaction_stats,
+    stub_superseded_tool_results,
+)
+
+
+def _user(text):
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def _assistant(text):
+    return {"role": "assistant", "content": [{"text": text}]}
+
+
+def _tool_call(tool_use_id, name, tool_input, output):
+    return [
+        {"role": "assistant", "content": [{"toolUse": {"toolUseId": tool_use_id, "name": name, "input": tool_input}}]},
+        {
+            "role": "user",
+            "content": [{"toolResult": {"toolUseId": tool_use_id, "status": "success", "content": [{"text": output}]}}],
+        },
+    ]
+
+
+def _turns(count, size=2000):
+    messages = []
+    for index in range(count):
+        messages += [_user(f"question {index} " + "q" * size), _assistant(f"answer {index} " + "a" * size)]
+    return messages
+
+
+class _SummaryModel:
+    def __init__(self, text="Earlier the user asked about Terraform."):
+        self.text = text
+        self.requests = []
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.requests.append({"messages": messages, "tool_specs": tool_specs, "system_prompt": system_prompt})
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockDelta": {"delta": {"text": self.text}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+
+
+class _FailingModel:
+    async def stream(self, *args, **kwargs):
+        raise RuntimeError("model unavailable")
+        yield
+
+
+class _Agent:
+    def __init__(self, messages, manager, model=None):
+        self.messages = messages
+        self.conversation_manager = manager
+        self.model = model or _SummaryModel()
+
+
+class SupersededToolResultTests(unittest.TestCase):
+    def setUp(self):
+        reset_context_compaction_stats()
+
+    def test_only_the_latest_result_for_the_same_call_is_kept(self):
+        messages = [
+            _user("plan it"),
+            *_tool_call("t1", "terraform_plan", {"path": "."}, "plan one " + "x" * 1000),
+            *_tool_call("t2", "terraform_plan", {"path": "modules/vpc"}, "vpc plan " + "y" * 1000),
+            *_tool_call("t3", "terraform_plan", {"path": "."}, "plan two " + "z" * 1000),
+        ]
+
+        self.assertEqual(stub_superseded_tool_results(messages), 1)
+
+        results = [block["toolResult"] for message in messages for block in message["content"] if "toolResult" in block]
+        self.assertIn("Superseded", results[0]["content"][0]["text"])
+        self.assertTrue(results[1]["content"][0]["text"].startswith("vpc plan"))
+        self.assertTrue(results[2]["content"][0]["text"].startswith("plan two"))
+        self.assertEqual(results[0]["toolUseId"], "t1")
+        self.assertEqual(stub_superseded_tool_results(messages), 0)
+        self.assertEqual(context_compaction_stats(), {"stubbedResults": 1})
+
+    def test_short_results_and_other_tools_are_left_alone(self):
+        messages = [
+            *_tool_call("t1", "terraform_validate", {}, "Success!"),
+            *_tool_call("t2", "terraform_validate", {}, "Success!"),
+            *_tool_call("t3", "file_write", {"path": "main.tf"}, "w" * 1000),
+            *_tool_call("t4", "file_write", {"path": "main.tf"}, "w" * 1000),
+        ]
+
+        self.assertEqual(stub_superseded_tool_results(messages), 0)
+
+
+class CompactingConversationManagerTests(unittest.TestCase):
+    def setUp(self):
+        reset_context_compaction_stats()
+
+    def test_history_within_budget_is_not_compacted(self):
+        manager = CompactingConversationManager(keep_turns=2, token_budget=100_000)
+        agent = _Agent(_turns(6), manager)
+
+        self.assertIsNone(asyncio.run(compact_conversation(agent)))
+        self.assertEqual(len(agent.messages), 12)
+        self.assertEqual(agent.model.requests, [])
+
+    def test_older_turns_are_folded_into_a_summary(self):
+        manager = CompactingConversationManager(keep_turns=2, token_budget=1000)
+        messages = _turns(6)
+        agent = _Agent(list(messages), manager)
+
+        compaction = asyncio.run(compact_conversation(agent))
+
+        self.assertEqual(compaction["summarizedMessages"], 8)
+        self.assertLess(compaction["tokensAfter"], compaction["tokensBefore"])
+        self.assertEqual(agent.messages[0]["content"][0]["text"], SUMMARY_PREFIX + agent.model.text)
+        self.assertEqual(agent.messages[1:], messages[8:])
+        self.assertEqual(manager.removed_message_count, 8)
+        request = agent.model.requests[0]
+        self.assertEqual(request["messages"][:8], messages[:8])
+        self.assertIsNone(request["tool_specs"])
+        self.assertEqual(context_compaction_stats()["compactions"], 1)
+
+    def test_summary_model_is_used_when_configured(self):
+        summary_model = _SummaryModel("Cheap summary.")
+        manager = CompactingConversationManager(keep_turns=2, token_budget=1000, summary_model=summary_model)
+        agent = _Agent(_turns(6), manager)
+
+        asyncio.run(compact_conversation(agent))
+
+        self.assertEqual(agent.model.requests, [])
+        self.assertEqual(len(summary_model.requests), 1)
+        self.assertEqual(agent.messages[0]["content"][0]["text"], SUMMARY_PREFIX + "Cheap summary.")
+
+    def test_rolling_summary_replaces_the_previous_one(self):
+        manager = CompactingConversationManager(keep_turns=2, token_budget=1000)
+        agent = _Agent(_turns(4), manager)
+        asyncio.run(compact_conversation(agent))
+        first_summary = agent.messages[0]
+
+        agent.messages += _turns(2)
+        agent.model = _SummaryModel("Newer summary.")
+        compaction = asyncio.run(compact_conversation(agent))
+
+        self.assertEqual(compaction["summarizedMessages"], 4)
+        self.assertEqual(manager.removed_message_count, 8)
+        self.assertEqual(agent.model.requests[0]["messages"][0], first_summary)
+        self.assertEqual(agent.messages[0]["content"][0]["text"], SUMMARY_PREFIX + "Newer summary.")
+        self.assertEqual(len(agent.messages), 5)
+
+    def test_split_keeps_tool_results_with_their_turn(self):
+        manager = CompactingConversationManager(keep_turns=1, token_budget=10)
+        messages = [
+            *_turns(1),
+            _user("run a plan"),
+            *_tool_call("t1", "terraform_plan", {}, "plan"),
+            _assistant("done"),
+        ]
+
+        self.assertEqual(manager.compaction_split(messages), 2)
+
+    def test_summary_and_offset_survive_a_session_restore(self):
+        manager = CompactingConversationManager(keep_turns=2, token_budget=1000)
+        agent = _Agent(_turns(6), manager)
+        asyncio.run(compact_conversation(agent))
+
+        restored = CompactingConversationManager(keep_turns=2, token_budget=1000)
+        prepend = restored.restore_from_session(manager.get_state())
+
+        self.assertEqual(prepend, [agent.messages[0]])
+        self.assertEqual(restored.removed_message_count, 8)
+
+    def test_state_from_another_manager_keeps_its_offset(self):
+        manager = CompactingConversationManager()
+
+        prepend = manager.restore_from_session({"__name__": "SlidingWindowConversationManager", "removed_message_count": 3})
+
+        self.assertIsNone(prepend)
+        self.assertEqual(manager.removed_message_count, 3)
+
+    def test_failed_summary_leaves_history_untouched(self):
+        manager = CompactingConversationManager(keep_turns=2, token_budget=1000)
+        messages = _turns(6)
+        agent = _Agent(list(messages), manager, model=_FailingModel())
+
+        with self.assertLogs("agents.context_compaction", level="ERROR"):
+            self.assertIsNone(asyncio.run(compact_conversation(agent)))
+
+        self.assertEqual(agent.messages, messages)
+        self.assertEqual(manager.removed_message_count, 0)
+        self.assertEqual(context_compaction_stats(), {"failures": 1})
+
+    def test_token_estimate_counts_binary_blocks_as_fixed_cost(self):
+        image = {"role": "user", "content": [{"image": {"format": "png", "source": {"bytes": b"x" * 10}}}]}
+
+        self.assertEqual(estimate_tokens([image]), 1500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.file_index import RuntimeFileIndex, clear_runtime_file_indexes, runtime_file_index
+
+
+def _write(root: Path, key: str, content: str = "x") -> None:
+    path = root / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+class RuntimeFileIndexTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        for key in ["main.tf", "modules/vpc/main.tf", "modules/vpc/outputs.tf", "modules-extra.tf", ".git/config"]:
+            _write(self.root, key)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        clear_runtime_file_indexes()
+
+    def test_lists_sorted_keys_without_git_metadata(self):
+        listing = RuntimeFileIndex(self.root).list()
+
+        self.assertEqual(
+            [entry["key"] for entry in listing["files"]],
+            ["main.tf", "modules-extra.tf", "modules/vpc/main.tf", "modules/vpc/outputs.tf"],
+        )
+        self.assertIsNone(listing["nextCursor"])
+        self.assertEqual(listing["files"][0]["size"], 1)
+
+    def test_cursor_pages_through_prefix(self):
+        index = RuntimeFileIndex(self.root)
+
+        first = index.list(prefix="modules", limit=1)
+        second = index.list(prefix="modules", cursor=first["nextCursor"], limit=1)
+
+        self.assertEqual([entry["key"] for entry in first["files"]], ["modules/vpc/main.tf"])
+        self.assertEqual([entry["key"] for entry in second["files"]], ["modules/vpc/outputs.tf"])
+        self.assertIsNone(second["nextCursor"])
+
+    def test_prefix_naming_a_file_returns_only_that_file(self):
+        listing = RuntimeFileIndex(self.root).list(prefix="modules/vpc/main.tf")
+
+        self.assertEqual([entry["key"] for entry in listing["files"]], ["modules/vpc/main.tf"])
+
+    def test_delimiter_lists_immediate_children(self):
+        listing = RuntimeFileIndex(self.root).list(delimiter="/")
+
+        self.assertEqual([entry["key"] for entry in listing["files"]], ["main.tf", "modules-extra.tf"])
+        self.assertEqual(listing["prefixes"], ["modules/"])
+
+    def test_refresh_rescans_only_changed_directories(self):
+        index = RuntimeFileIndex(self.root)
+        index.keys()
+        initial_scans = index.scanned_directories
+
+        index.keys()
+        self.assertEqual(index.scanned_directories, initial_scans)
+
+        vpc = self.root / "modules" / "vpc"
+        _write(self.root, "modules/vpc/variables.tf")
+        stat = vpc.stat()
+        os.utime(vpc, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        keys = index.keys()
+
+        self.assertEqual(index.scanned_directories, initial_scans + 1)
+        self.assertIn("modules/vpc/variables.tf", keys)
+
+    def test_removed_directory_drops_its_files(self):
+        index = RuntimeFileIndex(self.root)
+        index.keys()
+
+        for name in ["main.tf", "outputs.tf"]:
+            (self.root / "modules" / "vpc" / name).unlink()
+        (self.root / "modules" / "vpc").rmdir()
+        stat = (self.root / "modules").stat()
+        os.utime(self.root / "modules", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(index.keys(), ["main.tf", "modules-extra.tf"])
+
+    def test_runtime_file_index_is_shared_per_root(self):
+        self.assertIs(runtime_file_index(self.root), runtime_file_index(self.root))
+
+
+if __name__ == "__main__":
+    unittest.main()
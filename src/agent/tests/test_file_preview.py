@@ -0,0 +1,85 @@
+import base64
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils import file_preview
+from utils.file_preview import clear_line_indexes, is_binary_file, read_file_lines, read_file_window
+
+
+class FilePreviewTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        clear_line_indexes()
+
+    def test_sniff_detects_binary_and_text(self):
+        text = self.root / "main.tf"
+        text.write_text("résource " * 2000, encoding="utf-8")
+        blob = self.root / "plugin"
+        blob.write_bytes(b"\x7fELF\x00\x01" + bytes(range(256)))
+
+        self.assertFalse(is_binary_file(text))
+        self.assertTrue(is_binary_file(blob))
+
+    def test_text_windows_split_on_character_boundaries_without_gaps(self):
+        path = self.root / "state.json"
+        original = "é" * 10 + "tail"
+        path.write_text(original, encoding="utf-8")
+
+        pieces = []
+        offset = 0
+        while offset is not None:
+            window = read_file_window(path, offset, 5)
+            pieces.append(window["content"])
+            offset = window["nextOffset"]
+
+        self.assertEqual("".join(pieces), original)
+        self.assertTrue(all("�" not in piece for piece in pieces))
+
+    def test_binary_window_reads_only_requested_range(self):
+        path = self.root / "blob.bin"
+        path.write_bytes(bytes(range(256)) * 4)
+
+        window = read_file_window(path, 10, 20)
+
+        self.assertEqual(window["encoding"], "base64")
+        self.assertEqual(base64.b64decode(window["content"]), bytes(range(10, 30)))
+        self.assertEqual(window["nextOffset"], 30)
+
+    def test_line_pages_seek_from_checkpoints(self):
+        path = self.root / "plan.txt"
+        path.write_text("".join(f"line {number}\n" for number in range(25)), encoding="utf-8")
+
+        with patch.object(file_preview, "LINE_INDEX_STRIDE", 4):
+            page = read_file_lines(path, 9, 3, max_bytes=1024)
+            last = read_file_lines(path, 24, 10, max_bytes=1024)
+
+        self.assertEqual(page["content"], "line 9\nline 10\nline 11\n")
+        self.assertEqual((page["totalLines"], page["nextLine"]), (25, 12))
+        self.assertEqual(last["content"], "line 24\n")
+        self.assertIsNone(last["nextLine"])
+
+    def test_line_page_respects_byte_budget_and_truncates_long_line(self):
+        path = self.root / "terraform.tfstate"
+        path.write_text("short\n" + "x" * 100 + "\nend\n", encoding="utf-8")
+
+        first = read_file_lines(path, 0, 10, max_bytes=20)
+        long_line = read_file_lines(path, 1, 10, max_bytes=20)
+
+        self.assertEqual(first["content"], "short\n")
+        self.assertEqual(first["nextLine"], 1)
+        self.assertEqual(long_line["content"], "x" * 20)
+        self.assertTrue(long_line["truncated"])
+        self.assertEqual(long_line["nextLine"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
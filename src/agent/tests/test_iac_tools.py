@@ -1,9 +1,46 @@
+import asyncio
 import json
+import sys
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
 from agents.iac_tools import _configure_infracost_api_key, _go_test_args, _ministack_env, _run, _run_ministack_terratest, _workspace_path
+from agents.iac_tools import MAX_OUTPUT_CHARS, _OutputBuffer
+from agents.iac_tools import cached_terraform_init, remember_terraform_init, terraform_init, terraform_plan, terraform_validate
+from agents.plugin_cache import provider_platform
+from agents.workspace import use_workspace
+
+AWS = "registry.opentofu.org/hashicorp/aws"
+MAIN_TF = """
+terraform {
+  required_providers {
+    aws = { source = "hashicorp/aws", version = "~> 5.0" }
+  }
+}
+
+module "network" {
+  source = "./modules/network"
+  cidr   = "10.0.0.0/16"
+}
+"""
+
+
+def _events(stream):
+    async def collect():
+        return [event async for event in stream]
+
+    return asyncio.run(collect())
+
+
+def _result(stream):
+    return json.loads(_events(stream)[-1])
+
+
+async def _fake_run(*events):
+    for event in events:
+        yield event
 
 
 class IaCToolSafetyTests(unittest.TestCase):
@@ -12,7 +49,7 @@ class IaCToolSafetyTests(unittest.TestCase):
             _workspace_path("../outside")
 
     def test_missing_command_reports_not_installed(self):
-        result = json.loads(_run(["definitely-not-an-infraq-command"], _workspace_path(".")))
+        result = _result(_run(["definitely-not-an-infraq-command"], _workspace_path(".")))
 
         self.assertFalse(result["ok"])
         self.assertEqual(result["error"], "not_installed")
@@ -61,17 +98,18 @@ class IaCToolSafetyTests(unittest.TestCase):
         self.assertEqual(env["TF_INPUT"], "0")
 
     def test_ministack_terratest_runs_go_test_with_endpoint_env(self):
-        class Completed:
-            returncode = 0
-            stdout = "ok"
-            stderr = ""
+        calls = []
+
+        def stream_command(command, cwd, timeout, env):
+            calls.append((command, env))
+            return _fake_run(json.dumps({"ok": True, "returncode": 0, "stdout": "ok"}))
 
         with (
             patch("agents.iac_tools.shutil.which", return_value="/usr/local/bin/go"),
             patch("agents.iac_tools._reset_ministack", return_value={"ok": True, "status": 200}),
-            patch("agents.iac_tools.subprocess.run", return_value=Completed()) as run,
+            patch("agents.iac_tools._stream_command", side_effect=stream_command),
         ):
-            result = json.loads(
+            result = _result(
                 _run_ministack_terratest(
                     Path.cwd(),
                     "http://127.0.0.1:4566",
@@ -82,9 +120,150 @@ class IaCToolSafetyTests(unittest.TestCase):
             )
 
         self.assertTrue(result["ok"])
-        self.assertEqual(run.call_args.args[0], ["go", "test", "./...", "-timeout", "120s", "-run", "TestCriticalPath"])
-        self.assertEqual(run.call_args.kwargs["env"]["AWS_ENDPOINT_URL"], "http://127.0.0.1:4566")
-        self.assertEqual(run.call_args.kwargs["env"]["AWS_ACCESS_KEY_ID"], "test")
+        self.assertEqual(result["reset"], {"ok": True, "status": 200})
+        command, env = calls[0]
+        self.assertEqual(command, ["go", "test", "./...", "-timeout", "120s", "-run", "TestCriticalPath"])
+        self.assertEqual(env["AWS_ENDPOINT_URL"], "http://127.0.0.1:4566")
+        self.assertEqual(env["AWS_ACCESS_KEY_ID"], "test")
+
+
+class StreamingRunTests(unittest.TestCase):
+    def test_output_is_streamed_as_progress_before_the_result(self):
+        script = (
+            "import sys, time\n"
+            "print('Refreshing state...', flush=True)\n"
+            "time.sleep(0.6)\n"
+            "print('Error: boom', file=sys.stderr)"
+        )
+
+        events = _events(_run([sys.executable, "-c", script], Path.cwd()))
+
+        progress = [event["specialistToolProgress"] for event in events[:-1]]
+        self.assertEqual({item["phase"] for item in progress}, {"output"})
+        self.assertIn("Refreshing state...", progress[0]["message"])
+        self.assertIn("Error: boom", progress[-1]["message"])
+        result = json.loads(events[-1])
+        self.assertEqual(
+            (result["returncode"], result["stdout"], result["stderr"]),
+            (0, "Refreshing state...\n", "Error: boom\n"),
+        )
+        self.assertFalse(result["truncated"])
+
+    def test_timeout_reports_the_output_seen_so_far(self):
+        script = "import time\nprint('planning', flush=True)\ntime.sleep(60)"
+
+        result = _result(_run([sys.executable, "-c", script], Path.cwd(), timeout=1))
+
+        self.assertEqual((result["error"], result["stdout"]), ("timeout", "planning\n"))
+
+    def test_output_buffer_keeps_head_tail_and_errors_within_budget(self):
+        buffer = _OutputBuffer()
+        for index in range(5000):
+            buffer.append(f"Error: resource {index} failed" if index == 2500 else f"line {index} " + "." * 40)
+
+        text = buffer.text()
+        self.assertLessEqual(len(text), MAX_OUTPUT_CHARS + 200)
+        self.assertTrue(text.startswith("line 0 "))
+        self.assertIn("Error: resource 2500 failed", text)
+        self.assertIn("line 4999 ", text)
+        self.assertIn("lines omitted ...]", text)
+        self.assertTrue(buffer.truncated)
+
+
+    def test_one_line_json_report_within_budget_is_kept_whole(self):
+        report = json.dumps({"projects": [{"name": f"module-{index}", "monthlyCost": "1.00"} for index in range(200)]})
+        self.assertGreater(len(report), 8000)
+        self.assertLess(len(report), MAX_OUTPUT_CHARS)
+        buffer = _OutputBuffer()
+        buffer.append("Evaluating Terraform directory")
+        buffer.append(report)
+
+        text = buffer.text()
+        self.assertEqual(json.loads(text.splitlines()[-1]), json.loads(report))
+        self.assertLessEqual(len(text), MAX_OUTPUT_CHARS + 200)
+        self.assertFalse(buffer.truncated)
+
+class TerraformInitMemoTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.workdir = Path(tmp.name)
+        (self.workdir / "main.tf").write_text(MAIN_TF, encoding="utf-8")
+        (self.workdir / "modules" / "network").mkdir(parents=True)
+        (self.workdir / "modules" / "network" / "main.tf").write_text('variable "cidr" {}\n', encoding="utf-8")
+        (self.workdir / ".terraform.lock.hcl").write_text(
+            f'provider "{AWS}" {{\n  version = "5.100.0"\n}}\n', encoding="utf-8"
+        )
+        (self.workdir / ".terraform" / "modules").mkdir(parents=True)
+        (self.workdir / ".terraform" / "modules" / "modules.json").write_text("{}", encoding="utf-8")
+        (self.workdir / ".terraform" / "providers" / AWS / "5.100.0" / provider_platform()).mkdir(parents=True)
+        self.args = ["tofu", "init", "-input=false"]
+        remember_terraform_init(self.workdir, self.args, {"ok": True, "stdout": "initialized"})
+
+    def test_unchanged_inputs_return_the_memoized_result(self):
+        (self.workdir / "main.tf").write_text(MAIN_TF.replace("10.0.0.0/16", "10.1.0.0/16"), encoding="utf-8")
+
+        self.assertEqual(
+            cached_terraform_init(self.workdir, self.args),
+            {"ok": True, "stdout": "initialized", "cached": True},
+        )
+
+    def test_init_inputs_and_backend_args_invalidate_the_memo(self):
+        self.assertIsNone(cached_terraform_init(self.workdir, [*self.args, "-backend-config=key=other"]))
+
+        nested = self.workdir / "modules" / "network" / "main.tf"
+        nested.write_text('module "subnets" {\n  source = "terraform-aws-modules/vpc/aws"\n}\n', encoding="utf-8")
+        self.assertIsNone(cached_terraform_init(self.workdir, self.args))
+
+    def test_missing_providers_or_modules_force_a_fresh_init(self):
+        (self.workdir / ".terraform" / "modules" / "modules.json").unlink()
+        self.assertIsNone(cached_terraform_init(self.workdir, self.args))
+
+    def test_terraform_init_tool_skips_the_run_when_memoized(self):
+        ran = json.dumps({"ok": True, "stdout": "ran"})
+        with (
+            use_workspace(self.workdir, "memo-session"),
+            patch("agents.iac_tools._which", return_value="tofu"),
+            patch("agents.iac_tools._run", side_effect=lambda *args, **kwargs: _fake_run(ran)) as run,
+        ):
+            cached = _result(terraform_init())
+            upgraded = _result(terraform_init(upgrade=True))
+
+        self.assertTrue(cached["cached"])
+        self.assertEqual(upgraded, {"ok": True, "stdout": "ran"})
+        self.assertEqual(run.call_count, 1)
+
+
+class WorkdirLockTests(unittest.TestCase):
+    def test_plan_and_validate_in_one_directory_do_not_overlap(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        workdir = Path(tmp.name)
+        running = {"now": 0, "peak": 0}
+
+        async def fake_run(args, cwd, timeout=180):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.02)
+            running["now"] -= 1
+            yield json.dumps({"ok": True, "command": args})
+
+        async def _collect(stream):
+            return [event async for event in stream]
+
+        async def both():
+            with use_workspace(workdir, "lock-session"):
+                return await asyncio.gather(
+                    _collect(terraform_plan()),
+                    _collect(terraform_validate()),
+                )
+
+        with patch("agents.iac_tools._which", return_value="tofu"), patch("agents.iac_tools._run", fake_run):
+            plan, validate = asyncio.run(both())
+
+        self.assertEqual(running["peak"], 1)
+        self.assertEqual(json.loads(plan[-1])["command"][1], "plan")
+        self.assertEqual(json.loads(validate[-1])["command"][1], "validate")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+import os
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.import_time import measure_import_time, parse_importtime
+
+# Best of three cold imports of main, including -X importtime overhead. Override
+# AGENT_IMPORT_BUDGET_MS on slower CI machines rather than loosening the default.
+DEFAULT_IMPORT_BUDGET_MS = 3000.0
+
+# Dependency trees that only rarely used tools need; they must load lazily.
+DEFERRED_MODULES = (
+    "strands_tools.diagram",
+    "strands_tools.swarm",
+    "strands.multiagent",
+    "matplotlib",
+    "networkx",
+    "graphviz",
+)
+
+
+class ImportTimeTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.report = measure_import_time("main", runs=3)
+
+    def test_main_import_stays_within_startup_budget(self):
+        budget = float(os.environ.get("AGENT_IMPORT_BUDGET_MS", DEFAULT_IMPORT_BUDGET_MS))
+        self.assertLessEqual(self.report["totalMs"], budget, f"import main took {self.report['totalMs']} ms")
+
+    def test_heavy_tool_dependencies_are_not_imported_at_startup(self):
+        loaded = [name for name in DEFERRED_MODULES if name in self.report["modules"]]
+
+        self.assertEqual(loaded, [])
+
+    def test_importtime_trace_is_parsed_with_nesting_depth(self):
+        modules = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     json.decoder\n"
+            "import time:       300 |        420 |   json\n"
+            "import time:      1500 |       1920 | main\n"
+        )
+
+        self.assertEqual(modules["main"], {"selfMs": 1.5, "cumulativeMs": 1.9, "depth": 0})
+        self.assertEqual(modules["json"]["depth"], 1)
+        self.assertEqual(modules["json.decoder"]["depth"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
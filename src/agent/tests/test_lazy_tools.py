@@ -0,0 +1,77 @@
+import asyncio
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.lazy_tools import LazyTool
+
+_TARGET_MODULE = "lazy_tools_test_target"
+_TARGET_SOURCE = '''
+import threading
+
+from strands import tool
+
+IMPORT_THREAD = threading.current_thread().name
+
+
+@tool
+def echo(text: str) -> str:
+    """Echo the text back.
+
+    Args:
+        text: Text to echo.
+    """
+    return text
+'''
+
+
+class LazyToolTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        (Path(tmp.name) / f"{_TARGET_MODULE}.py").write_text(_TARGET_SOURCE, encoding="utf-8")
+        sys.path.insert(0, tmp.name)
+        self.addCleanup(sys.path.remove, tmp.name)
+        self.addCleanup(sys.modules.pop, _TARGET_MODULE, None)
+
+    def test_target_is_imported_off_the_event_loop_on_first_call(self):
+        proxy = LazyTool("echo", f"{_TARGET_MODULE}:echo")
+        self.assertEqual(proxy.tool_name, "echo")
+        self.assertFalse(proxy.loaded)
+        self.assertNotIn(_TARGET_MODULE, sys.modules)
+
+        async def call():
+            tool_use = {"toolUseId": "tool-1", "name": "echo", "input": {"text": "hi"}}
+            events = [event async for event in proxy.stream(tool_use, {})]
+            return events, threading.current_thread().name
+
+        events, loop_thread = asyncio.run(call())
+
+        self.assertTrue(proxy.loaded)
+        self.assertEqual(events[-1]["tool_result"]["content"], [{"text": "hi"}])
+        self.assertNotEqual(sys.modules[_TARGET_MODULE].IMPORT_THREAD, loop_thread)
+
+    def test_given_spec_is_served_without_importing(self):
+        spec = {"name": "echo", "description": "Echo.", "inputSchema": {"json": {"type": "object"}}}
+        proxy = LazyTool("echo", f"{_TARGET_MODULE}:echo", tool_spec=spec)
+
+        self.assertIs(proxy.tool_spec, spec)
+        self.assertFalse(proxy.loaded)
+
+    def test_spec_without_override_comes_from_the_target(self):
+        proxy = LazyTool("echo", f"{_TARGET_MODULE}:echo")
+
+        self.assertEqual(proxy.tool_spec["name"], "echo")
+        self.assertTrue(proxy.loaded)
+
+    def test_target_with_a_different_tool_name_is_rejected(self):
+        with self.assertRaises(ValueError):
+            LazyTool("shout", f"{_TARGET_MODULE}:echo").load()
+
+
+if __name__ == "__main__":
+    unittest.main()
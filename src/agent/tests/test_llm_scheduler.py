@@ -0,0 +1,165 @@
+import asyncio
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.llm_scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    LLMScheduler,
+    TokenBucket,
+    estimate_request_tokens,
+    request_origin,
+)
+from agents.workspace import use_workspace
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _granted(requests):
+    return [request.future.done() for request in requests]
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_waits_for_refill_and_refunds_overestimates(self):
+        clock = FakeClock()
+        bucket = TokenBucket(600, clock)
+        bucket.take(600)
+
+        self.assertAlmostEqual(bucket.wait_seconds(100), 10.0)
+        clock.now = 5.0
+        self.assertAlmostEqual(bucket.wait_seconds(100), 5.0)
+        bucket.refund(50)
+        self.assertEqual(bucket.wait_seconds(100), 0.0)
+
+    def test_requests_above_the_burst_wait_for_a_full_bucket(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)
+        bucket.take(30)
+
+        self.assertAlmostEqual(bucket.wait_seconds(1000), 30.0)
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(0)
+        bucket.take(10**6)
+
+        self.assertFalse(bucket.enabled)
+        self.assertEqual(bucket.wait_seconds(10**6), 0.0)
+
+
+class LLMSchedulerTests(unittest.TestCase):
+    def _scheduler(self, **kwargs):
+        kwargs.setdefault("requests_per_minute", 0)
+        kwargs.setdefault("tokens_per_minute", 0)
+        return LLMScheduler(**kwargs)
+
+    def test_concurrency_cap_queues_until_release(self):
+        scheduler = self._scheduler(max_concurrent=2)
+        requests = [scheduler.submit("s1", BACKGROUND, 10) for _ in range(3)]
+
+        self.assertEqual(_granted(requests), [True, True, False])
+        self.assertEqual(scheduler.stats()["queued"], 1)
+        scheduler.release(requests[0])
+        self.assertEqual(_granted(requests), [True, True, True])
+        self.assertEqual(scheduler.stats()["running"], 2)
+
+    def test_sessions_are_served_round_robin(self):
+        scheduler = self._scheduler(max_concurrent=1)
+        running = scheduler.submit("busy", BACKGROUND, 10)
+        queued = [scheduler.submit(session, BACKGROUND, 10) for session in ("a", "a", "a", "b")]
+
+        order = []
+        current = running
+        for _ in queued:
+            scheduler.release(current)
+            current = next(request for request in queued if request.future.done() and request not in order)
+            order.append(current)
+
+        self.assertEqual([request.session_id for request in order], ["a", "b", "a", "a"])
+
+    def test_interactive_requests_go_first(self):
+        scheduler = self._scheduler(max_concurrent=1)
+        running = scheduler.submit("s1", BACKGROUND, 10)
+        specialist = scheduler.submit("s1", BACKGROUND, 10)
+        answer = scheduler.submit("s2", INTERACTIVE, 10)
+
+        scheduler.release(running)
+
+        self.assertEqual(_granted([specialist, answer]), [False, True])
+
+    def test_token_rate_limit_throttles_and_usage_is_reconciled(self):
+        clock = FakeClock()
+        scheduler = self._scheduler(max_concurrent=4, tokens_per_minute=600, clock=clock)
+        first = scheduler.submit("s1", BACKGROUND, 500)
+        second = scheduler.submit("s1", BACKGROUND, 500)
+        self.addCleanup(lambda: scheduler._timer and scheduler._timer.cancel())
+
+        self.assertEqual(_granted([first, second]), [True, False])
+        self.assertEqual(scheduler.stats()["priorities"][BACKGROUND]["throttled"], 1)
+
+        first.record_usage({"inputTokens": 90, "outputTokens": 10, "totalTokens": 100})
+        scheduler.release(first)
+
+        self.assertTrue(second.future.done())
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        scheduler = self._scheduler(max_concurrent=1)
+        running = scheduler.submit("s1", INTERACTIVE, 10)
+
+        async def wait_then_cancel():
+            task = asyncio.ensure_future(scheduler.acquire("s2", INTERACTIVE, 10))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(wait_then_cancel())
+        scheduler.release(running)
+
+        stats = scheduler.stats()
+        self.assertEqual((stats["queued"], stats["running"]), (0, 0))
+        self.assertEqual(stats["priorities"][INTERACTIVE]["cancelled"], 1)
+
+    def test_queue_wait_is_reported(self):
+        clock = FakeClock()
+        scheduler = self._scheduler(max_concurrent=1, clock=clock)
+        running = scheduler.submit("s1", INTERACTIVE, 10)
+        waiting = scheduler.submit("s1", INTERACTIVE, 10)
+        clock.now = 0.25
+        scheduler.release(running)
+        scheduler.release(waiting)
+
+        stats = scheduler.stats()["priorities"][INTERACTIVE]
+        self.assertEqual((stats["requests"], stats["maxWaitMs"], stats["avgWaitMs"]), (2, 250.0, 125.0))
+
+
+class RequestOriginTests(unittest.TestCase):
+    def test_specialists_are_background_and_keep_their_session(self):
+        specialist = SimpleNamespace(trace_attributes={"session.id": "s1", "specialist.agent": "reviewer"})
+        orchestrator = SimpleNamespace(trace_attributes={"session.id": "s1"})
+
+        self.assertEqual(request_origin({"agent": specialist}), ("s1", BACKGROUND))
+        self.assertEqual(request_origin({"agent": orchestrator}), ("s1", INTERACTIVE))
+
+    def test_calls_without_an_agent_use_the_workspace_session(self):
+        with use_workspace(Path.cwd(), "workspace-session"):
+            self.assertEqual(request_origin(None), ("workspace-session", INTERACTIVE))
+
+    def test_token_estimate_includes_system_prompt_and_tools(self):
+        messages = [{"role": "user", "content": [{"text": "x" * 400}]}]
+
+        self.assertEqual(estimate_request_tokens(messages), 100)
+        self.assertGreater(estimate_request_tokens(messages, [{"name": "t"}], "s" * 400), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
+from strands.types.session import SessionMessage
+
+from agents.artifact_io import artifact_io
+from agents.memory_offload import (
+    OffloadingMemorySessionManager,
+    memory_offload_chars,
+    memory_offload_stats,
+    reset_memory_offload_stats,
+)
+
+SESSION_ID = "session-offload"
+
+
+def _tool_result_message(content, tool_use_id="tool-1"):
+    return {
+        "role": "user",
+        "content": [{"toolResult": {"toolUseId": tool_use_id, "status": "success", "content": content}}],
+    }
+
+
+def _manager(artifact_dir, offload_chars=1000):
+    # Skip AgentCoreMemorySessionManager.__init__, which connects to AgentCore Memory.
+    manager = OffloadingMemorySessionManager.__new__(OffloadingMemorySessionManager)
+    manager.artifact_dir = artifact_dir
+    manager.offload_chars = offload_chars
+    manager.config = SimpleNamespace(session_id=SESSION_ID)
+    return manager
+
+
+def _offload(manager, message):
+    compact = manager.offload_tool_results(message)
+    asyncio.run(artifact_io.wait_for(SESSION_ID))
+    return compact
+
+
+class MemoryOffloadTests(unittest.TestCase):
+    def setUp(self):
+        reset_memory_offload_stats()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.artifact_dir = Path(tmp.name) / "tool-outputs"
+        self.manager = _manager(self.artifact_dir)
+
+    def test_large_output_is_stored_once_and_replaced_by_an_excerpt(self):
+        output = "Initializing...\n" + "resource line\n" * 200 + "Error: missing provider"
+        message = _tool_result_message([{"text": output}])
+
+        compact = _offload(self.manager, message)
+        _offload(self.manager, _tool_result_message([{"text": output}], tool_use_id="tool-2"))
+
+        stored = list(self.artifact_dir.iterdir())
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(stored[0].read_text(encoding="utf-8"), output)
+        tool_result = compact["content"][0]["toolResult"]
+        self.assertEqual(tool_result["toolUseId"], "tool-1")
+        self.assertEqual(tool_result["status"], "success")
+        text = tool_result["content"][0]["text"]
+        self.assertIn(str(stored[0]), text)
+        self.assertIn("Initializing", text)
+        self.assertIn("Error: missing provider", text)
+        self.assertLess(len(text), 1000)
+        self.assertEqual(message["content"][0]["toolResult"]["content"], [{"text": output}])
+        self.assertEqual(memory_offload_stats()["offloadedResults"], 2)
+
+    def test_specialist_envelope_keeps_its_summary_fields(self):
+        envelope = {
+            "agent": "engineer_agent",
+            "status": "complete",
+            "summary": "Added the VPC module.",
+            "changed_files": ["modules/vpc/main.tf"],
+            "findings": [{"severity": "info", "title": "x" * 2000}],
+        }
+
+        compact = _offload(self.manager, _tool_result_message([{"text": json.dumps(envelope)}]))
+
+        kept, pointer = compact["content"][0]["toolResult"]["content"][0]["text"].rsplit("\n", 1)
+        self.assertEqual(
+            json.loads(kept),
+            {key: envelope[key] for key in ("agent", "status", "summary", "changed_files")},
+        )
+        self.assertIn(str(self.artifact_dir), pointer)
+
+    def test_small_and_binary_results_are_persisted_unchanged(self):
+        small = _tool_result_message([{"text": "Success! The configuration is valid."}])
+        image = _tool_result_message([{"text": "x" * 2000}, {"image": {"format": "png", "source": {"bytes": b""}}}])
+        assistant = {"role": "assistant", "content": [{"text": "y" * 5000}]}
+
+        for message in (small, image, assistant):
+            self.assertIs(_offload(self.manager, message), message)
+        self.assertFalse(self.artifact_dir.exists())
+
+    def test_zero_threshold_disables_offloading(self):
+        message = _tool_result_message([{"text": "z" * 5000}])
+
+        self.assertIs(_offload(_manager(self.artifact_dir, offload_chars=0), message), message)
+
+    def test_create_message_persists_the_compact_copy(self):
+        session_message = SessionMessage.from_message(_tool_result_message([{"json": {"log": "w" * 3000}}]), 0)
+
+        with patch.object(AgentCoreMemorySessionManager, "create_message", return_value={"eventId": "e1"}) as create:
+            self.assertEqual(self.manager.create_message(SESSION_ID, "agent", session_message), {"eventId": "e1"})
+        asyncio.run(artifact_io.wait_for(SESSION_ID))
+
+        persisted = create.call_args.args[2]
+        self.assertEqual(persisted.message_id, session_message.message_id)
+        self.assertIn("stored at", persisted.message["content"][0]["toolResult"]["content"][0]["text"])
+        self.assertIn("json", session_message.message["content"][0]["toolResult"]["content"][0])
+
+    def test_invalid_threshold_falls_back_to_default(self):
+        with patch.dict(os.environ, {"AGENT_MEMORY_OFFLOAD_CHARS": "lots"}), self.assertLogs(
+            "agents.memory_offload", level="WARNING"
+        ):
+            self.assertEqual(memory_offload_chars(), 4000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import os
+from pathlib import Path
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents import model_routing
+from agents.model_routing import (
+    PRIMARY_TIER,
+    ModelRouter,
+    TierModel,
+    model_tier_map,
+    model_tier_stats,
+    reset_model_tier_stats,
+)
+
+
+class FakeModel:
+    def __init__(self, model_id, fail=False, fail_after_first=False):
+        self.config = {"model_id": model_id}
+        self.fail = fail
+        self.fail_after_first = fail_after_first
+        self.calls = 0
+
+    def get_config(self):
+        return self.config
+
+    def update_config(self, **config):
+        self.config.update(config)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.config['model_id']} unavailable")
+        yield {"messageStart": {"role": "assistant"}}
+        if self.fail_after_first:
+            raise RuntimeError("stream broke")
+        yield {"contentBlockDelta": {"delta": {"text": self.config["model_id"]}}}
+        yield {"metadata": {"usage": {"inputTokens": 12, "outputTokens": 3, "totalTokens": 15}, "metrics": {}}}
+
+
+def _collect(model):
+    async def collect():
+        return [event async for event in model.stream([{"role": "user", "content": [{"text": "hi"}]}])]
+
+    return asyncio.run(collect())
+
+
+class ModelTierMapTests(unittest.TestCase):
+    def test_tiers_come_from_the_environment(self):
+        with patch.dict(os.environ, {"OPENAI_MODEL_TIERS": '{"fast": "small-model", "empty": ""}'}, clear=False):
+            os.environ.pop("OPENAI_MODEL_TIERS_PARAMETER", None)
+            self.assertEqual(model_tier_map(), {"fast": "small-model"})
+
+    def test_ssm_parameter_takes_precedence(self):
+        env = {"OPENAI_MODEL_TIERS_PARAMETER": "/stack/model_tiers", "OPENAI_MODEL_TIERS": '{"fast": "env-model"}'}
+        with patch.dict(os.environ, env), patch.object(
+            model_routing, "get_ssm_parameter", return_value='{"fast": "ssm-model"}'
+        ) as get_parameter:
+            self.assertEqual(model_tier_map(), {"fast": "ssm-model"})
+        get_parameter.assert_called_once_with("/stack/model_tiers")
+
+    def test_unreadable_ssm_parameter_falls_back_to_the_environment(self):
+        env = {"OPENAI_MODEL_TIERS_PARAMETER": "/stack/model_tiers", "OPENAI_MODEL_TIERS": '{"fast": "env-model"}'}
+        with patch.dict(os.environ, env), patch.object(
+            model_routing, "get_ssm_parameter", side_effect=ValueError("not found")
+        ), self.assertLogs("agents.model_routing", level="WARNING"):
+            self.assertEqual(model_tier_map(), {"fast": "env-model"})
+
+    def test_invalid_mapping_uses_the_primary_model(self):
+        with patch.dict(os.environ, {"OPENAI_MODEL_TIERS": "fast=small"}), self.assertLogs(
+            "agents.model_routing", level="WARNING"
+        ):
+            os.environ.pop("OPENAI_MODEL_TIERS_PARAMETER", None)
+            self.assertEqual(model_tier_map(), {})
+
+
+class ModelRouterTests(unittest.TestCase):
+    def setUp(self):
+        reset_model_tier_stats()
+        self.primary = FakeModel("large-model")
+        self.built = []
+
+    def _router(self, tiers, **build_kwargs):
+        def build(model_id):
+            self.built.append(FakeModel(model_id, **build_kwargs))
+            return self.built[-1]
+
+        return ModelRouter(self.primary, build, tiers)
+
+    def test_mapped_tier_uses_its_own_model_and_is_reused(self):
+        router = self._router({"fast": "small-model"})
+
+        fast = router.model_for("fast")
+
+        self.assertIs(router.model_for("fast"), fast)
+        self.assertEqual(fast.get_config()["model_id"], "small-model")
+        self.assertEqual(_collect(fast)[1]["contentBlockDelta"]["delta"]["text"], "small-model")
+        self.assertEqual(len(self.built), 1)
+
+    def test_unmapped_and_primary_tiers_use_the_primary_model(self):
+        router = self._router({"fast": "large-model"})
+
+        for tier in (PRIMARY_TIER, "fast", "unknown", None):
+            self.assertIs(router.model_for(tier).model, self.primary)
+        self.assertEqual(self.built, [])
+
+    def test_tier_failing_before_its_first_event_falls_back_to_primary(self):
+        router = self._router({"fast": "small-model"}, fail=True)
+
+        with self.assertLogs("agents.model_routing", level="WARNING"):
+            events = _collect(router.model_for("fast"))
+
+        self.assertEqual(events[1]["contentBlockDelta"]["delta"]["text"], "large-model")
+        self.assertEqual(self.primary.calls, 1)
+        stats = model_tier_stats()["fast"]
+        self.assertEqual((stats["calls"], stats["fallbacks"], stats["errors"]), (1, 1, 0))
+
+    def test_failure_after_streaming_started_is_not_retried(self):
+        router = self._router({"fast": "small-model"}, fail_after_first=True)
+
+        with self.assertRaises(RuntimeError):
+            _collect(router.model_for("fast"))
+
+        self.assertEqual(self.primary.calls, 0)
+        self.assertEqual(model_tier_stats()["fast"]["errors"], 1)
+
+    def test_primary_failure_is_raised(self):
+        failing = TierModel(PRIMARY_TIER, FakeModel("large-model", fail=True))
+
+        with self.assertRaises(RuntimeError):
+            _collect(failing)
+
+        self.assertEqual(model_tier_stats()[PRIMARY_TIER]["errors"], 1)
+
+    def test_latency_and_token_usage_are_counted_per_tier(self):
+        router = self._router({"fast": "small-model"})
+        _collect(router.model_for("fast"))
+        _collect(router.model_for("fast"))
+        _collect(router.model_for(PRIMARY_TIER))
+
+        stats = model_tier_stats()
+        self.assertEqual(stats["fast"]["calls"], 2)
+        self.assertEqual(stats["fast"]["inputTokens"], 24)
+        self.assertEqual(stats["fast"]["outputTokens"], 6)
+        self.assertGreaterEqual(stats["fast"]["avgMs"], stats["fast"]["avgFirstEventMs"])
+        self.assertEqual(stats[PRIMARY_TIER]["calls"], 1)
+
+    def test_specialists_get_the_tier_declared_in_their_config(self):
+        from agents.engineer.agent import create_tool as create_engineer_tool
+        from agents.orchestator.tool import _specialist_model
+        from agents.reviewer.agent import create_tool as create_reviewer_tool
+        from agents.reviewer.config import MODEL_TIER as REVIEWER_TIER
+
+        router = self._router({REVIEWER_TIER: "small-model"})
+
+        self.assertEqual(_specialist_model(self.primary, router, create_reviewer_tool).get_config()["model_id"], "small-model")
+        self.assertIs(_specialist_model(self.primary, router, create_engineer_tool).model, self.primary)
+        self.assertIs(_specialist_model(self.primary, None, create_reviewer_tool), self.primary)
+
+
+if __name__ == "__main__":
+    unittest.main()
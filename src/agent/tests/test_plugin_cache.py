@@ -0,0 +1,139 @@
+import os
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.plugin_cache import (
+    evict_plugin_cache,
+    init_lock,
+    plugin_cache_stats,
+    provider_platform,
+    reset_plugin_cache_stats,
+    terraform_env,
+)
+
+AWS = "registry.opentofu.org/hashicorp/aws"
+LOCK_FILE = f'''
+provider "{AWS}" {{
+  version     = "5.100.0"
+  constraints = ">= 5.0.0"
+  hashes = [
+    "h1:abc=",
+  ]
+}}
+'''
+
+
+class PluginCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.cache = self.root / "cache"
+        self.workdir = self.root / "stack"
+        self.workdir.mkdir()
+        env = patch.dict(os.environ, {"TF_PLUGIN_CACHE_DIR": str(self.cache)})
+        env.start()
+        self.addCleanup(env.stop)
+        for name in ("TF_PROVIDER_MIRROR_DIR", "TF_PROVIDER_MIRROR_OFFLINE", "TF_CLI_CONFIG_FILE"):
+            os.environ.pop(name, None)
+        reset_plugin_cache_stats()
+
+    def _cache_version(self, version, size=0, age=0.0):
+        path = self.cache / AWS / version
+        (path / provider_platform()).mkdir(parents=True)
+        (path / provider_platform() / "terraform-provider-aws").write_bytes(b"x" * size)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_runs_share_the_cache_directory(self):
+        self.assertEqual(terraform_env(), {"TF_PLUGIN_CACHE_DIR": str(self.cache)})
+        self.assertTrue(self.cache.is_dir())
+
+    def test_mirror_serves_its_providers_and_the_registry_the_rest(self):
+        mirror = self.root / "mirror"
+        (mirror / AWS).mkdir(parents=True)
+
+        with patch.dict(os.environ, {"TF_PROVIDER_MIRROR_DIR": str(mirror)}):
+            config = Path(terraform_env()["TF_CLI_CONFIG_FILE"]).read_text(encoding="utf-8")
+        self.assertIn(f'include = ["{AWS}"]', config)
+        self.assertIn(f'exclude = ["{AWS}"]', config)
+
+        with patch.dict(os.environ, {"TF_PROVIDER_MIRROR_DIR": str(mirror), "TF_PROVIDER_MIRROR_OFFLINE": "true"}):
+            config = Path(terraform_env()["TF_CLI_CONFIG_FILE"]).read_text(encoding="utf-8")
+        self.assertNotIn("direct", config)
+
+        with patch.dict(os.environ, {"TF_PROVIDER_MIRROR_DIR": str(mirror), "TF_CLI_CONFIG_FILE": "/etc/tofurc"}):
+            self.assertNotIn("TF_CLI_CONFIG_FILE", terraform_env())
+
+    def test_init_with_cached_providers_takes_the_shared_lock(self):
+        version = self._cache_version("5.100.0", age=7200)
+        (self.workdir / ".terraform.lock.hcl").write_text(LOCK_FILE, encoding="utf-8")
+
+        with init_lock(self.workdir):
+            pass
+        with init_lock(self.workdir, upgrade=True):
+            pass
+
+        stats = plugin_cache_stats()
+        self.assertEqual((stats["sharedInits"], stats["exclusiveInits"]), (1, 1))
+        self.assertLess(time.time() - version.stat().st_mtime, 60)
+
+    def test_exclusive_init_waits_for_other_inits(self):
+        entered = []
+        holding = threading.Event()
+        release = threading.Event()
+
+        def first():
+            with init_lock(self.workdir):
+                holding.set()
+                release.wait(5)
+                entered.append("first")
+
+        def second():
+            holding.wait(5)
+            with init_lock(self.workdir):
+                entered.append("second")
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        holding.wait(5)
+        time.sleep(0.1)
+        self.assertEqual(entered, [])
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(entered, ["first", "second"])
+
+    def test_least_recently_used_idle_versions_are_evicted(self):
+        oldest = self._cache_version("5.0.0", size=400, age=3 * 3600)
+        older = self._cache_version("5.50.0", size=400, age=2 * 3600)
+        recent = self._cache_version("5.100.0", size=400, age=60)
+
+        removed = evict_plugin_cache(self.cache, max_bytes=500)
+
+        self.assertEqual(removed, 800)
+        self.assertFalse(oldest.exists())
+        self.assertFalse(older.exists())
+        self.assertTrue(recent.exists())
+        self.assertEqual(plugin_cache_stats()["evictedVersions"], 2)
+
+    def test_cache_within_budget_is_left_alone(self):
+        version = self._cache_version("5.0.0", size=100, age=3 * 3600)
+
+        self.assertEqual(evict_plugin_cache(self.cache, max_bytes=1000), 0)
+        self.assertTrue(version.exists())
+        self.assertEqual(plugin_cache_stats()["sizeBytes"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import importlib
+import os
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("GATEWAY_CREDENTIAL_PROVIDER_NAME", "test-gateway-provider")
+
+from benchmarks.cassette import Cassette
+from benchmarks.fake_openai import FakeOpenAIServer
+from benchmarks.harness import compare_reports, run_scenario
+from benchmarks.standins import ReplayToolProvider
+
+SAMPLE_CASSETTE = Path(__file__).resolve().parents[1] / "benchmarks" / "cassettes" / "validate-terraform.json"
+
+
+class ReplayBenchmarkTests(unittest.TestCase):
+    def test_sample_cassette_replays_end_to_end_with_per_agent_tool_time(self):
+        run = run_scenario(Cassette.load(SAMPLE_CASSETTE), speed=0)
+
+        (turn,) = run["turns"]
+        self.assertEqual(turn["errors"], [])
+        self.assertTrue(turn["text"].endswith("if the logs need a customer managed key."))
+        self.assertIsNotNone(run["ttftMs"])
+        self.assertGreater(run["eventsPerSecond"], 0)
+        self.assertGreater(run["peakRssMb"], 0)
+        self.assertEqual(run["replay"], {"unmatched": 0, "missing": 0, "unused": 0})
+        self.assertEqual(turn["phases"]["subprocess.tofu"]["count"], 1)
+
+        engineer = run["agents"]["engineer_agent"]
+        self.assertEqual(engineer["modelCalls"], 2)
+        self.assertEqual(engineer["tools"]["terraform_validate"]["count"], 1)
+        self.assertEqual(engineer["tools"]["gateway_aws-docs___search_documentation"]["count"], 1)
+        self.assertEqual(run["agents"]["orchestrator_agent"]["tools"]["engineer_agent"]["count"], 1)
+
+    def test_recorded_cassette_replays_with_matching_request_digests(self):
+        main = importlib.import_module("main")
+        source = Cassette.load(SAMPLE_CASSETTE)
+        recorded = Cassette({"scenario": source.scenario})
+        with FakeOpenAIServer(source, speed=0) as upstream, patch.object(
+            main, "create_gateway_mcp_client", lambda: ReplayToolProvider(source, "gateway", 0)
+        ):
+            run_scenario(recorded, record=True, upstream_url=upstream.base_url, upstream_api_key="test-key")
+
+        self.assertEqual(len(recorded.model), 4)
+        self.assertTrue(recorded.subprocess[0]["cwd"].startswith("<root>/"))
+        with tempfile.TemporaryDirectory() as tmp:
+            recorded.save(Path(tmp) / "cassette.json")
+            replayed = run_scenario(Cassette.load(Path(tmp) / "cassette.json"), speed=0)
+
+        self.assertEqual(replayed["replay"], {"unmatched": 0, "missing": 0, "unused": 0})
+        self.assertEqual(replayed["turns"][0]["errors"], [])
+        self.assertTrue(replayed["turns"][0]["text"].endswith("if the logs need a customer managed key."))
+
+    def test_compare_reports_flags_only_regressions_past_the_limit(self):
+        baseline = {"summary": {"ttftMs": 100.0, "totalMs": 1000.0, "eventsPerSecond": 50.0, "peakRssMb": 200.0}}
+        report = {"summary": {"ttftMs": 120.0, "totalMs": 1300.0, "eventsPerSecond": 30.0, "peakRssMb": None}}
+
+        regressions = compare_reports(report, baseline, 0.25)
+
+        self.assertEqual([message.split(":")[0] for message in regressions], ["totalMs", "eventsPerSecond"])
+
+
+if __name__ == "__main__":
+    unittest.main()
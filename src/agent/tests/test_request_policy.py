@@ -0,0 +1,165 @@
+import asyncio
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from strands.types.exceptions import ContextWindowOverflowException
+
+from agents.request_policy import ModelDeadlineExceeded, RequestPolicy, slot_granted
+from agents.timings import start_invocation_timings
+
+
+GRANT = object()
+MESSAGE_START = {"messageStart": {"role": "assistant"}}
+
+
+class FakeUpstream:
+    """Opens attempts that each follow the next script in ``plans``."""
+
+    def __init__(self, *plans):
+        self.plans = list(plans)
+        self.opened = 0
+        self.cancelled = 0
+        self.granted = 0
+
+    def open(self):
+        plan = self.plans[min(self.opened, len(self.plans) - 1)]
+        self.opened += 1
+        return self._attempt(self.opened, plan)
+
+    async def _attempt(self, number, plan):
+        try:
+            for step in plan:
+                if isinstance(step, (int, float)):
+                    await asyncio.sleep(step)
+                elif isinstance(step, BaseException):
+                    raise step
+                elif step is GRANT:
+                    self.granted += 1
+                    slot_granted()
+                elif isinstance(step, dict):
+                    yield step
+                else:
+                    yield f"{step}{number}"
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def _collect(policy, upstream, fallback=None, can_hedge=lambda: True, budget=False):
+    async def collect():
+        if budget:
+            start_invocation_timings()
+        events = []
+        async for event in policy.stream("model-a", upstream.open, fallback=fallback, can_hedge=can_hedge):
+            events.append(event)
+        return events
+
+    return asyncio.run(collect())
+
+
+def _primed(policy, seconds=0.01):
+    for _ in range(20):
+        policy.record_first_content("model-a", seconds)
+    return policy
+
+
+class RequestPolicyTests(unittest.TestCase):
+    def test_policy_is_off_unless_configured(self):
+        policy = RequestPolicy(budget_seconds=0, hedge=False)
+
+        self.assertFalse(policy.active())
+        self.assertTrue(policy.active(has_fallback=True))
+        self.assertIsNone(_primed(policy).hedge_delay("model-a"))
+
+    def test_slow_first_attempt_is_hedged_and_cancelled(self):
+        policy = _primed(RequestPolicy(budget_seconds=0, hedge=True, hedge_min_delay_seconds=0.02))
+        upstream = FakeUpstream([5, "slow"], ["fast", "done"])
+
+        self.assertEqual(_collect(policy, upstream), ["fast2", "done2"])
+        self.assertEqual(upstream.cancelled, 1)
+        stats = policy.stats()
+        self.assertEqual((stats["hedgesFired"], stats["hedgesWon"]), (1, 1))
+        self.assertEqual(stats["hedgeDelayMs"], {"model-a": 20.0})
+
+    def test_first_attempt_can_still_win_the_race(self):
+        policy = _primed(RequestPolicy(budget_seconds=0, hedge=True, hedge_min_delay_seconds=0.02))
+        upstream = FakeUpstream([0.05, "first"], [5, "second"])
+
+        self.assertEqual(_collect(policy, upstream), ["first1"])
+        self.assertEqual(policy.stats()["hedgesWon"], 0)
+        self.assertEqual(upstream.cancelled, 1)
+
+    def test_no_hedge_without_enough_latency_samples_or_an_idle_slot(self):
+        unprimed = RequestPolicy(budget_seconds=0, hedge=True, hedge_min_delay_seconds=0.01)
+        upstream = FakeUpstream([0.05, "only"])
+        self.assertEqual(_collect(unprimed, upstream), ["only1"])
+
+        busy = _primed(RequestPolicy(budget_seconds=0, hedge=True, hedge_min_delay_seconds=0.01))
+        upstream = FakeUpstream([0.05, "only"])
+        self.assertEqual(_collect(busy, upstream, can_hedge=lambda: False), ["only1"])
+
+        self.assertEqual(upstream.opened, 1)
+        self.assertEqual(busy.stats()["hedgesFired"], 0)
+
+    def test_stall_after_the_response_headers_is_hedged(self):
+        policy = _primed(RequestPolicy(budget_seconds=0, hedge=True, hedge_min_delay_seconds=0.02))
+        upstream = FakeUpstream([MESSAGE_START, 5, "late"], [MESSAGE_START, "fast"])
+
+        self.assertEqual(_collect(policy, upstream), [MESSAGE_START, "fast2"])
+        self.assertEqual(upstream.cancelled, 1)
+        self.assertEqual(policy.stats()["hedgesWon"], 1)
+
+    def test_latency_is_measured_from_the_slot_grant(self):
+        policy = _primed(RequestPolicy(budget_seconds=0, hedge=True, hedge_min_delay_seconds=0.05))
+        upstream = FakeUpstream([0.2, GRANT, 0.01, "content"], [5, "hedge"])
+        checks = []
+
+        def can_hedge():
+            # The scheduler has no idle slot while the first attempt is still queued.
+            checks.append(upstream.granted)
+            return upstream.granted > 0
+
+        self.assertEqual(_collect(policy, upstream, can_hedge=can_hedge), ["content1"])
+        self.assertEqual((upstream.opened, checks), (1, [0]))
+        self.assertLess(max(policy._latencies["model-a"]), 0.1)
+
+    def test_failure_before_the_first_event_uses_the_fallback(self):
+        policy = RequestPolicy(budget_seconds=0, hedge=False)
+        upstream = FakeUpstream([RuntimeError("503")])
+        fallback = FakeUpstream(["backup"])
+
+        with self.assertLogs("agents.request_policy", level="WARNING"):
+            events = _collect(policy, upstream, fallback=fallback.open)
+
+        self.assertEqual(events, ["backup1"])
+        self.assertEqual(policy.stats()["fallbacks"], 1)
+
+    def test_failures_after_streaming_started_and_context_overflow_are_raised(self):
+        policy = RequestPolicy(budget_seconds=0, hedge=False)
+        fallback = FakeUpstream(["backup"])
+
+        with self.assertRaises(RuntimeError):
+            _collect(policy, FakeUpstream(["partial", RuntimeError("reset")]), fallback=fallback.open)
+        with self.assertRaises(ContextWindowOverflowException):
+            _collect(policy, FakeUpstream([ContextWindowOverflowException("too long")]), fallback=fallback.open)
+
+        self.assertEqual(fallback.opened, 0)
+
+    def test_budget_bounds_the_first_event_and_stalls_mid_stream(self):
+        policy = RequestPolicy(budget_seconds=0.05, hedge=False)
+
+        with self.assertRaises(ModelDeadlineExceeded):
+            _collect(policy, FakeUpstream([5, "late"]), budget=True)
+        stalled = FakeUpstream(["start", 5, "late"])
+        with self.assertRaises(ModelDeadlineExceeded):
+            _collect(policy, stalled, budget=True)
+
+        self.assertEqual(stalled.cancelled, 1)
+        self.assertEqual(policy.stats()["deadlineExceeded"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,7 +32,7 @@ class RuntimeToolAssignmentTests(unittest.TestCase):
             runtime_tools=SimpleNamespace(handoff_to_user=None, create_pull_request=None),
             trace_attributes={},
         )
-        self.assertEqual(len(tools), len(SPECIALIST_TOOL_FACTORIES))
+        self.assertEqual(len(tools), len(SPECIALIST_TOOL_FACTORIES) + 1)
         self.assertEqual(
             [getattr(tool, "_tool_name", "") for tool in tools],
             [
@@ -42,6 +42,7 @@ class RuntimeToolAssignmentTests(unittest.TestCase):
                 "cost_capacity_agent",
                 "security_prover_agent",
                 "devops_agent",
+                "parallel_specialists",
             ],
         )
 
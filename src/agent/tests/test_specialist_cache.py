@@ -0,0 +1,194 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.specialist_cache import (
+    SpecialistResponseCache,
+    specialist_cache,
+    specialist_cache_key,
+    specialist_cache_ttl_seconds,
+    workspace_fingerprint,
+)
+from agents.specialist_output import SpecialistResponse
+from agents.tool_adapter import BYPASS_SPECIALIST_CACHE, create_agent_text_tool
+from agents.workspace import use_workspace
+
+
+class ReviewOutput(SpecialistResponse):
+    agent: str = "reviewer_agent"
+
+
+class ReviewAgent:
+    """Specialist stand-in that counts runs and can edit the workspace."""
+
+    def __init__(self, runs, edit=None, changed_files=()):
+        self.runs = runs
+        self.edit = edit
+        self.changed_files = list(changed_files)
+        self.state = {}
+
+    async def stream_async(self, input_text, **kwargs):
+        self.runs.append(input_text)
+        if self.edit is not None:
+            self.edit()
+        output = ReviewOutput(status="complete", summary=f"review {len(self.runs)}", changed_files=self.changed_files)
+        yield {"result": SimpleNamespace(structured_output=output)}
+
+
+def _tool_context(invocation_state=None, original_context=None, original_prompt="review my stack"):
+    values = {"original_user_prompt": original_prompt, "original_user_context": original_context}
+    return SimpleNamespace(
+        agent=SimpleNamespace(state=SimpleNamespace(get=values.get, set=lambda key, value: None)),
+        invocation_state=invocation_state or {},
+    )
+
+
+class WorkspaceFingerprintTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / "main.tf").write_text('resource "null_resource" "a" {}\n', encoding="utf-8")
+
+    def test_content_changes_change_the_fingerprint(self):
+        before = workspace_fingerprint(self.root)
+        (self.root / "main.tf").write_text('resource "null_resource" "b" {}\n', encoding="utf-8")
+
+        self.assertNotEqual(workspace_fingerprint(self.root), before)
+
+    def test_generated_directories_are_ignored(self):
+        before = workspace_fingerprint(self.root)
+        (self.root / ".terraform" / "providers").mkdir(parents=True)
+        (self.root / ".terraform" / "providers" / "plugin").write_bytes(b"binary")
+
+        self.assertEqual(workspace_fingerprint(self.root), before)
+
+
+class SpecialistResponseCacheTests(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SpecialistResponseCache(ttl_seconds=60, max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expired_entries_miss(self):
+        cache = SpecialistResponseCache(ttl_seconds=60, max_entries=2)
+        with patch("agents.specialist_cache.time.monotonic", return_value=100.0):
+            cache.put("a", "A")
+        with patch("agents.specialist_cache.time.monotonic", return_value=161.0):
+            self.assertIsNone(cache.get("a"))
+
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_delegation_whitespace_does_not_change_the_key(self):
+        self.assertEqual(
+            specialist_cache_key("s", "reviewer_agent", "Review  the\nstack ", "h", "m"),
+            specialist_cache_key("s", "reviewer_agent", "Review the stack", "h", "m"),
+        )
+
+    def test_zero_ttl_disables_the_cache(self):
+        with patch.dict(os.environ, {"SPECIALIST_CACHE_TTL_SECONDS": "0"}):
+            self.assertEqual(specialist_cache_ttl_seconds(), 0)
+            self.assertFalse(SpecialistResponseCache().enabled)
+
+
+class SpecialistToolCacheTests(unittest.TestCase):
+    def setUp(self):
+        specialist_cache.clear()
+        self.addCleanup(specialist_cache.clear)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / "main.tf").write_text("# stack\n", encoding="utf-8")
+        self.runs = []
+
+    def _tool(self, **agent_kwargs):
+        return create_agent_text_tool(
+            name="reviewer_agent",
+            description="Reviewer",
+            create_agent=lambda model, runtime_tools, trace_attributes: ReviewAgent(self.runs, **agent_kwargs),
+            model=SimpleNamespace(get_config=lambda: {"model_id": "model-a"}),
+            runtime_tools=None,
+            trace_attributes={"session.id": "session-1"},
+            output_model=ReviewOutput,
+        )
+
+    def _delegate(self, tool, text="Re-review the stack", tool_context=None):
+        async def collect():
+            with use_workspace(self.root, "session-1"):
+                return [chunk async for chunk in tool.__wrapped__(text, tool_context or _tool_context())]
+
+        return asyncio.run(collect())
+
+    def test_repeated_delegation_returns_cached_response(self):
+        tool = self._tool()
+        first = self._delegate(tool)
+        second = self._delegate(tool, text="Re-review   the stack")
+
+        self.assertEqual(len(self.runs), 1)
+        self.assertEqual(second[0], {"specialistToolProgress": {"phase": "cache_hit", "message": "reviewer_agent reused a cached result"}})
+        self.assertEqual(second[-1], first[-1])
+        self.assertEqual(json.loads(second[-1])["summary"], "review 1")
+        self.assertEqual(specialist_cache.stats()["hits"], 1)
+
+    def test_same_delegation_for_a_different_user_request_misses(self):
+        tool = self._tool()
+        self._delegate(tool)
+        self._delegate(tool, tool_context=_tool_context(original_prompt="check the stack for public buckets"))
+
+        self.assertEqual(len(self.runs), 2)
+        self.assertIn("public buckets", self.runs[1])
+        self.assertEqual(specialist_cache.stats()["hits"], 0)
+
+    def test_workspace_change_misses(self):
+        tool = self._tool()
+        self._delegate(tool)
+        (self.root / "main.tf").write_text("# edited\n", encoding="utf-8")
+        self._delegate(tool)
+
+        self.assertEqual(len(self.runs), 2)
+
+    def test_bypass_flag_runs_the_specialist(self):
+        tool = self._tool()
+        self._delegate(tool)
+        self._delegate(tool, tool_context=_tool_context({BYPASS_SPECIALIST_CACHE: True}))
+
+        self.assertEqual(len(self.runs), 2)
+        self.assertEqual(specialist_cache.stats()["bypassed"], 1)
+
+    def test_responses_that_change_files_are_not_cached(self):
+        reported = self._tool(changed_files=["main.tf"])
+        self._delegate(reported)
+        self._delegate(reported)
+
+        edited = self._tool(edit=lambda: (self.root / "notes.md").write_text(str(len(self.runs)), encoding="utf-8"))
+        self._delegate(edited, text="Write notes")
+        self._delegate(edited, text="Write notes")
+
+        self.assertEqual(len(self.runs), 4)
+        self.assertEqual(specialist_cache.stats()["stores"], 0)
+
+    def test_attachments_in_the_user_context_skip_the_cache(self):
+        tool = self._tool()
+        context = [{"text": "see image"}, {"image": {"format": "png", "source": {"bytes": b"x"}}}]
+        self._delegate(tool, tool_context=_tool_context(original_context=context))
+        self._delegate(tool, tool_context=_tool_context(original_context=context))
+
+        self.assertEqual(len(self.runs), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
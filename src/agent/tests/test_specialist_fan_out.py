@@ -0,0 +1,143 @@
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from agents.orchestator.tools.fan_out import create_fan_out_tool
+
+
+class FakeSpecialistTool:
+    def __init__(self, name, delay, tracker, fail=False):
+        self.tool_name = name
+        self.delay = delay
+        self.tracker = tracker
+        self.fail = fail
+
+    async def __wrapped__(self, input_text, _tool_context):
+        self.tracker["active"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["active"])
+        try:
+            yield {"specialistToolProgress": {"phase": "started", "message": f"{self.tool_name} started"}}
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("model unavailable")
+            yield {"specialistToolProgress": {"phase": "text", "message": "checked files"}}
+            yield json.dumps({"agent": self.tool_name, "status": "complete", "summary": input_text})
+        finally:
+            self.tracker["active"] -= 1
+
+
+def _collect(tool, delegations, max_concurrency=0):
+    async def run():
+        return [
+            chunk
+            async for chunk in tool.__wrapped__(
+                json.dumps(delegations),
+                SimpleNamespace(invocation_state={}),
+                max_concurrency=max_concurrency,
+            )
+        ]
+
+    return asyncio.run(run())
+
+
+class SpecialistFanOutTests(unittest.TestCase):
+    def test_gathers_envelopes_in_request_order_and_merges_progress(self):
+        tracker = {"active": 0, "peak": 0}
+        tool = create_fan_out_tool(
+            [
+                FakeSpecialistTool("reviewer_agent", 0.05, tracker),
+                FakeSpecialistTool("security_prover_agent", 0.01, tracker),
+                FakeSpecialistTool("cost_capacity_agent", 0.02, tracker),
+            ]
+        )
+
+        chunks = _collect(
+            tool,
+            [
+                {"agent": "reviewer_agent", "input": "review main.tf"},
+                {"agent": "security_prover_agent", "input": "prove main.tf"},
+                {"agent": "cost_capacity_agent", "input": "cost main.tf"},
+            ],
+        )
+
+        result = json.loads(chunks[-1])
+        self.assertEqual([item["agent"] for item in result["results"]], ["reviewer_agent", "security_prover_agent", "cost_capacity_agent"])
+        self.assertEqual(result["results"][0]["summary"], "review main.tf")
+        self.assertEqual(tracker["peak"], 3)
+        messages = [chunk["specialistToolProgress"]["message"] for chunk in chunks if isinstance(chunk, dict)]
+        self.assertIn("security_prover_agent: checked files", messages)
+        self.assertLess(
+            messages.index("security_prover_agent: checked files"),
+            messages.index("reviewer_agent: checked files"),
+        )
+
+    def test_respects_concurrency_cap(self):
+        tracker = {"active": 0, "peak": 0}
+        tool = create_fan_out_tool(
+            [FakeSpecialistTool(name, 0.01, tracker) for name in ("reviewer_agent", "security_prover_agent", "cost_capacity_agent")]
+        )
+        delegations = [
+            {"agent": "reviewer_agent", "input": "a"},
+            {"agent": "security_prover_agent", "input": "b"},
+            {"agent": "cost_capacity_agent", "input": "c"},
+        ]
+
+        with patch.dict("os.environ", {"SPECIALIST_FAN_OUT_CONCURRENCY": "2"}):
+            _collect(tool, delegations)
+        self.assertEqual(tracker["peak"], 2)
+
+        tracker["peak"] = 0
+        _collect(tool, delegations, max_concurrency=1)
+        self.assertEqual(tracker["peak"], 1)
+
+    def test_failed_specialist_returns_failed_envelope(self):
+        tracker = {"active": 0, "peak": 0}
+        tool = create_fan_out_tool(
+            [
+                FakeSpecialistTool("reviewer_agent", 0.0, tracker),
+                FakeSpecialistTool("security_prover_agent", 0.0, tracker, fail=True),
+            ]
+        )
+
+        with self.assertLogs("agents.orchestator.tools.fan_out", level="ERROR"):
+            chunks = _collect(
+                tool,
+                [
+                    {"agent": "reviewer_agent", "input": "review"},
+                    {"agent": "security_prover_agent", "input": "prove"},
+                ],
+            )
+
+        results = json.loads(chunks[-1])["results"]
+        self.assertEqual(results[0]["status"], "complete")
+        self.assertEqual(results[1]["status"], "failed")
+        self.assertIn("model unavailable", results[1]["summary"])
+
+    def test_rejects_agents_outside_fan_out_set(self):
+        tool = create_fan_out_tool([FakeSpecialistTool("reviewer_agent", 0.0, {"active": 0, "peak": 0})])
+
+        chunks = _collect(tool, [{"agent": "engineer_agent", "input": "edit main.tf"}])
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(json.loads(chunks[0])["status"], "failed")
+
+
+    def test_rejects_duplicate_agents(self):
+        tool = create_fan_out_tool([FakeSpecialistTool("reviewer_agent", 0.0, {"active": 0, "peak": 0})])
+
+        chunks = _collect(
+            tool,
+            [
+                {"agent": "reviewer_agent", "input": "review main.tf"},
+                {"agent": "reviewer_agent", "input": "review variables.tf"},
+            ],
+        )
+
+        self.assertEqual(len(chunks), 1)
+        self.assertIn("only be delegated once", json.loads(chunks[0])["summary"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from strands.agent.conversation_manager import SummarizingConversationManager
+
+from agents.specialist_pool import SpecialistAgentPool, reset_specialist_pool_stats, specialist_pool_stats
+from agents.tool_adapter import create_agent_text_tool
+
+
+class PooledAgent:
+    def __init__(self):
+        self.messages = []
+        self.state = {}
+        self.system_prompt = "base prompt"
+        self.inputs = []
+
+    async def stream_async(self, input_text, **_kwargs):
+        self.inputs.append(input_text)
+        self.messages.append({"role": "user", "content": [{"text": input_text}]})
+        self.state["agent_skills"] = {"last_injected_xml": "<skills/>"}
+        self.system_prompt = "base prompt\n\n<skills/>"
+        yield {"result": "done"}
+
+
+def _tool_context():
+    return SimpleNamespace(
+        agent=SimpleNamespace(state=SimpleNamespace(get=lambda _key: None, set=lambda _key, _value: None)),
+        invocation_state={},
+    )
+
+
+class SpecialistAgentPoolTests(unittest.TestCase):
+    def setUp(self):
+        reset_specialist_pool_stats()
+
+    def tearDown(self):
+        reset_specialist_pool_stats()
+
+    def test_reuses_agent_with_reset_conversation_state(self):
+        created = []
+
+        def create_agent(_model, _runtime_tools, _trace_attributes):
+            created.append(PooledAgent())
+            return created[-1]
+
+        tool = create_agent_text_tool(
+            name="pooled_agent",
+            description="Pooled",
+            create_agent=create_agent,
+            model=None,
+            runtime_tools=None,
+            trace_attributes={},
+        )
+
+        async def delegate(text):
+            return [chunk async for chunk in tool.__wrapped__(text, _tool_context())]
+
+        asyncio.run(delegate("first"))
+        asyncio.run(delegate("second"))
+
+        self.assertEqual(len(created), 1)
+        agent = created[0]
+        self.assertEqual(agent.inputs, ["first", "second"])
+        self.assertEqual(agent.messages, [])
+        self.assertEqual(agent.state, {})
+        self.assertEqual(agent.system_prompt, "base prompt")
+        stats = specialist_pool_stats()["pooled_agent"]
+        self.assertEqual((stats["created"], stats["reused"], stats["inUse"]), (1, 1, 0))
+        self.assertEqual(stats["reuseRatio"], 0.5)
+
+    def test_reset_restores_the_conversation_manager(self):
+        agent = PooledAgent()
+        agent.conversation_manager = SummarizingConversationManager()
+        pool = SpecialistAgentPool("summarized_agent", lambda: agent, max_idle=1)
+
+        with pool.lease() as leased:
+            leased.conversation_manager.removed_message_count = 6
+            leased.conversation_manager._summary_message = {"role": "user", "content": [{"text": "summary"}]}
+        with pool.lease() as leased:
+            manager = leased.conversation_manager
+
+        self.assertIs(leased, agent)
+        self.assertEqual(manager.removed_message_count, 0)
+        self.assertIsNone(manager._summary_message)
+
+    def test_failed_lease_discards_agent(self):
+        pool = SpecialistAgentPool("failing_agent", PooledAgent, max_idle=2)
+
+        with self.assertRaises(RuntimeError):
+            with pool.lease():
+                raise RuntimeError("model error")
+        with pool.lease() as agent:
+            pass
+        with pool.lease() as reused:
+            pass
+
+        self.assertIs(agent, reused)
+        stats = specialist_pool_stats()["failing_agent"]
+        self.assertEqual((stats["created"], stats["discarded"], stats["reused"]), (2, 1, 1))
+
+    def test_concurrent_leases_beyond_bound_are_not_kept_idle(self):
+        pool = SpecialistAgentPool("busy_agent", PooledAgent, max_idle=1)
+
+        with pool.lease() as first, pool.lease() as second:
+            self.assertIsNot(first, second)
+        with pool.lease() as reused:
+            pass
+
+        self.assertIs(reused, second)
+        stats = specialist_pool_stats()["busy_agent"]
+        self.assertEqual((stats["created"], stats["overflow"], stats["peakInUse"]), (2, 1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
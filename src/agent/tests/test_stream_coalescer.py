@@ -0,0 +1,123 @@
+import asyncio
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.stream_coalescer import coalesce_stream, reset_stream_coalescer_stats, stream_coalescer_stats
+
+
+async def _events(items, delays=None):
+    for index, item in enumerate(items):
+        if delays and delays.get(index):
+            await asyncio.sleep(delays[index])
+        yield item
+
+
+async def _collect(stream):
+    return [event async for event in stream]
+
+
+class StreamCoalescerTests(unittest.TestCase):
+    def setUp(self):
+        reset_stream_coalescer_stats()
+
+    def tearDown(self):
+        reset_stream_coalescer_stats()
+
+    def test_merges_text_and_keeps_order_around_other_events(self):
+        items = [
+            {"data": "Hel"},
+            {"data": "lo"},
+            {"current_tool_use": {"name": "terraform_plan"}},
+            {"data": " done"},
+            {"result": {"stop_reason": "end_turn"}},
+        ]
+
+        frames = asyncio.run(_collect(coalesce_stream(_events(items), window_ms=1000)))
+
+        self.assertEqual(
+            frames,
+            [
+                {"data": "Hello"},
+                {"current_tool_use": {"name": "terraform_plan"}},
+                {"data": " done"},
+                {"result": {"stop_reason": "end_turn"}},
+            ],
+        )
+        stats = stream_coalescer_stats()
+        self.assertEqual((stats["inputDeltas"], stats["textFrames"], stats["boundaryFlushes"]), (3, 2, 2))
+        self.assertEqual(stats["deltasPerFrame"], 1.5)
+
+    def test_flushes_when_byte_threshold_is_reached(self):
+        items = [{"data": "abcd"}, {"data": "efgh"}, {"data": "ij"}]
+
+        frames = asyncio.run(_collect(coalesce_stream(_events(items), window_ms=1000, max_bytes=8)))
+
+        self.assertEqual(frames, [{"data": "abcdefgh"}, {"data": "ij"}])
+        self.assertEqual(stream_coalescer_stats()["sizeFlushes"], 1)
+
+    def test_flushes_after_window_while_upstream_is_idle(self):
+        async def scenario():
+            received = []
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            stream = coalesce_stream(_events([{"data": "a"}, {"data": "b"}], delays={1: 0.2}), window_ms=10)
+            async for frame in stream:
+                received.append((frame, loop.time() - started))
+            return received
+
+        received = asyncio.run(scenario())
+
+        self.assertEqual([frame for frame, _ in received], [{"data": "a"}, {"data": "b"}])
+        self.assertLess(received[0][1], 0.15)
+        self.assertEqual(stream_coalescer_stats()["windowFlushes"], 1)
+
+    def test_slow_consumer_applies_back_pressure_to_upstream(self):
+        produced = []
+
+        async def upstream():
+            for index in range(10):
+                produced.append(index)
+                yield {"status": f"event-{index}"}
+
+        async def scenario():
+            stream = coalesce_stream(upstream(), window_ms=10, max_buffered_events=2)
+            first = await stream.__anext__()
+            await asyncio.sleep(0.05)
+            produced_while_paused = len(produced)
+            rest = [event async for event in stream]
+            return first, produced_while_paused, rest
+
+        first, produced_while_paused, rest = asyncio.run(scenario())
+
+        self.assertEqual(first, {"status": "event-0"})
+        self.assertLessEqual(produced_while_paused, 4)
+        self.assertEqual(len(rest), 9)
+        self.assertGreater(stream_coalescer_stats()["backPressureWaits"], 0)
+
+    def test_upstream_error_flushes_pending_text_then_raises(self):
+        async def failing():
+            yield {"data": "partial"}
+            raise RuntimeError("model failed")
+
+        async def scenario():
+            frames = []
+            with self.assertRaises(RuntimeError):
+                async for frame in coalesce_stream(failing(), window_ms=1000):
+                    frames.append(frame)
+            return frames
+
+        self.assertEqual(asyncio.run(scenario()), [{"data": "partial"}])
+
+    def test_zero_window_passes_events_through(self):
+        items = [{"data": "a"}, {"data": "b"}]
+
+        frames = asyncio.run(_collect(coalesce_stream(_events(items), window_ms=0)))
+
+        self.assertEqual(frames, items)
+
+
+if __name__ == "__main__":
+    unittest.main()
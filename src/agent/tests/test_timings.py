@@ -0,0 +1,86 @@
+import asyncio
+from pathlib import Path
+import pstats
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from agents.profiler import InvocationProfiler
+from agents.timings import mark_phase, start_invocation_timings, timed_phase
+
+_exporter = InMemorySpanExporter()
+_provider = TracerProvider()
+_provider.add_span_processor(SimpleSpanProcessor(_exporter))
+trace.set_tracer_provider(_provider)
+
+
+class InvocationTimingsTests(unittest.TestCase):
+    def setUp(self):
+        _exporter.clear()
+
+    def test_phases_from_tasks_and_threads_roll_up_into_the_invocation(self):
+        async def invocation():
+            timings = start_invocation_timings({"session.id": "session-1", "agentcore.action": "chat"})
+            with timed_phase("credentials"):
+                await asyncio.sleep(0.01)
+
+            def subprocess_tool():
+                with timed_phase("subprocess.terraform"):
+                    time.sleep(0.01)
+
+            await asyncio.gather(asyncio.to_thread(subprocess_tool), asyncio.to_thread(subprocess_tool))
+            mark_phase("firstModelEvent")
+            return timings, timings.finish()
+
+        timings, summary = asyncio.run(invocation())
+
+        self.assertEqual(summary["phases"]["subprocess.terraform"]["count"], 2)
+        self.assertGreaterEqual(summary["phases"]["credentials"]["ms"], 5)
+        self.assertIn("firstModelEvent", summary["marks"])
+        self.assertIs(timings.summary(), summary)
+
+        spans = {span.name: span for span in _exporter.get_finished_spans()}
+        root = spans["agentcore.invocation"]
+        self.assertEqual(spans["agentcore.credentials"].parent.span_id, root.context.span_id)
+        self.assertEqual(root.attributes["agentcore.phase.subprocess.terraform.count"], 2)
+        self.assertEqual(root.attributes["agentcore.action"], "chat")
+
+    def test_failed_phase_is_recorded_on_its_span(self):
+        with self.assertRaises(RuntimeError):
+            with timed_phase("checkpoint_load"):
+                raise RuntimeError("mount unavailable")
+
+        (span,) = _exporter.get_finished_spans()
+        self.assertEqual(span.status.status_code, trace.StatusCode.ERROR)
+
+
+class InvocationProfilerTests(unittest.TestCase):
+    def test_cprofile_dump_is_written_and_only_one_profile_runs_at_a_time(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = InvocationProfiler(mode="cprofile", sample_rate=1)
+            overlapping = InvocationProfiler(mode="cprofile", sample_rate=1)
+            self.assertTrue(profiler.active)
+            self.assertFalse(overlapping.active)
+            sum(range(1000))
+            path = profiler.stop(Path(tmp))
+
+            self.assertFalse(profiler.active)
+            self.assertTrue(path.endswith(".prof"))
+            self.assertGreater(pstats.Stats(path).total_calls, 0)
+            self.assertTrue(InvocationProfiler(mode="cprofile", sample_rate=1).stop(None) is None)
+
+    def test_disabled_or_unsampled_profiler_is_inactive(self):
+        self.assertFalse(InvocationProfiler(mode="", sample_rate=1).active)
+        self.assertFalse(InvocationProfiler(mode="cprofile", sample_rate=0).active)
+
+
+if __name__ == "__main__":
+    unittest.main()
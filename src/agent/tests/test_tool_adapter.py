@@ -1,6 +1,6 @@
 import unittest
 
-from agents.tool_adapter import _with_original_user_prompt
+from agents.tool_adapter import _inner_tool_progress, _with_original_user_prompt
 
 
 class SpecialistPromptTests(unittest.TestCase):
@@ -81,5 +81,24 @@ class SpecialistPromptTests(unittest.TestCase):
         )
 
 
+
+class InnerToolProgressTests(unittest.TestCase):
+    def test_forwards_progress_streamed_by_specialist_tools(self):
+        event = {
+            "type": "tool_stream",
+            "tool_stream_event": {
+                "tool_use": {"toolUseId": "t1", "name": "terraform_plan"},
+                "data": {"specialistToolProgress": {"phase": "output", "message": "tofu: Refreshing state..."}},
+            },
+        }
+
+        self.assertEqual(
+            _inner_tool_progress(event),
+            {"specialistToolProgress": {"phase": "output", "message": "tofu: Refreshing state..."}},
+        )
+        self.assertIsNone(_inner_tool_progress({"tool_stream_event": {"data": "raw chunk"}}))
+        self.assertIsNone(_inner_tool_progress({"data": "text"}))
+
+
 if __name__ == "__main__":
     unittest.main()
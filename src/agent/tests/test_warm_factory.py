@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch
+
+from agents import warm_factory
+from agents.warm_factory import WarmResourceCache, credential_fingerprint
+
+
+class WarmResourceCacheTests(unittest.TestCase):
+    def test_reuses_resource_and_counts_hits_and_misses(self):
+        cache = WarmResourceCache()
+        builds = []
+
+        def build():
+            builds.append(object())
+            return builds[-1]
+
+        first = cache.get_or_create("openai_client", ("key", "https://llm"), build)
+        second = cache.get_or_create("openai_client", ("key", "https://llm"), build)
+        other = cache.get_or_create("openai_client", ("other", "https://llm"), build)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(len(builds), 2)
+        self.assertEqual(
+            cache.stats()["openai_client"],
+            {"hits": 1, "misses": 2, "evictions": 0, "size": 2},
+        )
+
+    def test_expired_resource_is_rebuilt_and_released(self):
+        cache = WarmResourceCache()
+        released = []
+
+        with patch.object(warm_factory.time, "monotonic", side_effect=[100.0, 200.0, 200.0]):
+            first = cache.get_or_create("runtime_tools", "stack", object, ttl_seconds=30, on_evict=released.append)
+            second = cache.get_or_create("runtime_tools", "stack", object, ttl_seconds=30, on_evict=released.append)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(released, [first])
+        self.assertEqual(cache.stats()["runtime_tools"]["evictions"], 1)
+
+    def test_release_errors_do_not_break_rebuild(self):
+        cache = WarmResourceCache()
+
+        def failing_release(_value):
+            raise RuntimeError("already closed")
+
+        cache.get_or_create("runtime_tools", "stack", object, on_evict=failing_release)
+        with self.assertLogs(warm_factory.logger, level="ERROR"):
+            self.assertTrue(cache.invalidate("runtime_tools", "stack"))
+        self.assertEqual(cache.stats()["runtime_tools"]["size"], 0)
+
+    def test_credential_fingerprint_does_not_expose_secret(self):
+        fingerprint = credential_fingerprint("sk-secret-value")
+
+        self.assertNotIn("secret", fingerprint)
+        self.assertEqual(fingerprint, credential_fingerprint("sk-secret-value"))
+        self.assertNotEqual(fingerprint, credential_fingerprint("sk-other-value"))
+
+
+if __name__ == "__main__":
+    unittest.main()
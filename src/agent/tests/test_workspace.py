@@ -0,0 +1,77 @@
+import asyncio
+import os
+from pathlib import Path
+import sys
+import tempfile
+import types
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.iac_tools import _workspace_path
+from agents.workspace import bind_workspace, current_workspace, use_workspace, workspace_file_path
+from agents.workspace_file_tools import workspace_file_tool
+
+
+class SessionWorkspaceTests(unittest.TestCase):
+    def test_concurrent_sessions_resolve_tool_paths_in_their_own_workspace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            roots = {name: Path(tmp) / name for name in ("session-a", "session-b")}
+            for root in roots.values():
+                root.mkdir()
+            previous_cwd = os.getcwd()
+
+            async def invocation(session_id):
+                bind_workspace(roots[session_id], session_id)
+                await asyncio.sleep(0.01)
+                # Strands runs synchronous tools with asyncio.to_thread.
+                return await asyncio.to_thread(_workspace_path, "modules")
+
+            async def scenario():
+                return await asyncio.gather(invocation("session-a"), invocation("session-b"))
+
+            resolved = asyncio.run(scenario())
+
+            self.assertEqual(resolved, [roots["session-a"].resolve() / "modules", roots["session-b"].resolve() / "modules"])
+            self.assertEqual(os.getcwd(), previous_cwd)
+            self.assertIsNone(current_workspace())
+
+    def test_workspace_path_rejects_escape_from_bound_root(self):
+        with tempfile.TemporaryDirectory() as tmp, use_workspace(tmp, "session-1"):
+            self.assertEqual(_workspace_path("."), Path(tmp).resolve())
+            with self.assertRaises(ValueError):
+                _workspace_path("../outside")
+
+    def test_file_tool_wrapper_anchors_relative_paths(self):
+        calls = []
+
+        def fake_file_read(tool, **kwargs):
+            calls.append(tool["input"])
+            return {"toolUseId": tool["toolUseId"], "status": "success", "content": []}
+
+        module = types.SimpleNamespace(
+            TOOL_SPEC={"name": "fake_file_read", "description": "read", "inputSchema": {"json": {}}},
+            fake_file_read=fake_file_read,
+        )
+        wrapped = workspace_file_tool(module, {"path": True, "comparison_path": False})
+
+        async def invoke():
+            return [
+                event
+                async for event in wrapped.stream(
+                    {"toolUseId": "t1", "name": "fake_file_read", "input": {"path": "main.tf, /etc/hosts", "comparison_path": "old.tf", "mode": "diff"}},
+                    {},
+                )
+            ]
+
+        with tempfile.TemporaryDirectory() as tmp, use_workspace(tmp, "session-1"):
+            asyncio.run(invoke())
+            expected = workspace_file_path("old.tf")
+
+        self.assertEqual(calls[0]["path"], f"{Path(tmp) / 'main.tf'},/etc/hosts")
+        self.assertEqual(calls[0]["comparison_path"], expected)
+        self.assertEqual(calls[0]["mode"], "diff")
+
+
+if __name__ == "__main__":
+    unittest.main()
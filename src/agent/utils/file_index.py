@@ -0,0 +1,207 @@
+"""
+Incremental file tree index for the runtime file browser.
+
+Directories are read with ``os.scandir`` and cached together with their
+mtime, so a repeated listing only re-reads directories whose entries changed.
+File sizes and timestamps are fetched for the returned page only.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import RLock
+
+logger = logging.getLogger(__name__)
+
+IGNORED_DIRECTORY_NAMES = frozenset({".git"})
+DEFAULT_LIST_LIMIT = 1000
+MAX_LIST_LIMIT = 5000
+_MAX_CACHED_INDEXES = 32
+
+_indexes_lock = RLock()
+_indexes: OrderedDict[str, "RuntimeFileIndex"] = OrderedDict()
+
+
+def _join(directory: str, name: str) -> str:
+    return f"{directory}/{name}" if directory else name
+
+
+def _scan_directory(path: Path) -> tuple[list[str], list[str]]:
+    subdirectories: list[str] = []
+    files: list[str] = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in IGNORED_DIRECTORY_NAMES:
+                            subdirectories.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        logger.debug("Skipping unreadable directory %s", path)
+    return sorted(subdirectories), sorted(files)
+
+
+def _iso_timestamp(mtime: float) -> str:
+    return datetime.fromtimestamp(mtime, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _clamp_limit(limit: int | None) -> int:
+    if not limit or limit <= 0:
+        return DEFAULT_LIST_LIMIT
+    return min(limit, MAX_LIST_LIMIT)
+
+
+class RuntimeFileIndex:
+    """Cached directory tree for one workspace root.
+
+    Each directory is stored as ``(mtime_ns, subdirectories, files)``. A refresh
+    stats every indexed directory and rescans only those whose mtime moved, which
+    covers created, deleted and renamed entries. In-place edits do not change a
+    directory's listing, and their sizes are read fresh when a page is built.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._lock = RLock()
+        self._directories: dict[str, tuple[int, list[str], list[str]]] = {}
+        self._keys: list[str] | None = None
+        self.scanned_directories = 0
+
+    def keys(self) -> list[str]:
+        """Return every indexed file key in sorted order, refreshing changed directories."""
+        with self._lock:
+            changed = False
+            seen: set[str] = set()
+            pending = [""]
+            while pending:
+                relative = pending.pop()
+                path = self.root / relative if relative else self.root
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(relative)
+                cached = self._directories.get(relative)
+                if cached is None or cached[0] != mtime_ns:
+                    subdirectories, files = _scan_directory(path)
+                    self._directories[relative] = (mtime_ns, subdirectories, files)
+                    self.scanned_directories += 1
+                    changed = True
+                else:
+                    subdirectories = cached[1]
+                pending.extend(_join(relative, name) for name in subdirectories)
+
+            for removed in set(self._directories) - seen:
+                del self._directories[removed]
+                changed = True
+
+            if changed or self._keys is None:
+                self._keys = sorted(
+                    _join(directory, name)
+                    for directory, (_mtime, _subdirectories, files) in self._directories.items()
+                    for name in files
+                )
+            return self._keys
+
+    def list(
+        self,
+        prefix: str = "",
+        cursor: str = "",
+        limit: int | None = None,
+        delimiter: str = "",
+    ) -> dict:
+        """List one page of files below ``prefix``.
+
+        ``prefix`` names a file or a directory relative to the root. With
+        ``delimiter="/"`` only the immediate children of that directory are
+        returned, with subdirectories reported in ``prefixes``. ``cursor`` is the
+        ``nextCursor`` of the previous page.
+        """
+        limit = _clamp_limit(limit)
+        prefix = prefix.strip().strip("/")
+        keys = self.keys()
+
+        if delimiter:
+            with self._lock:
+                directory = self._directories.get(prefix)
+            if directory is None:
+                return {"files": [], "prefixes": [], "nextCursor": None}
+            _mtime, subdirectories, files = directory
+            candidates = sorted(
+                [(_join(prefix, name) + "/", True) for name in subdirectories]
+                + [(_join(prefix, name), False) for name in files]
+            )
+            start = bisect.bisect_right(candidates, (cursor, True)) if cursor else 0
+            page = candidates[start : start + limit]
+            next_cursor = page[-1][0] if start + limit < len(candidates) else None
+            return {
+                "files": self._describe([key for key, is_directory in page if not is_directory]),
+                "prefixes": [key for key, is_directory in page if is_directory],
+                "nextCursor": next_cursor,
+            }
+
+        index = bisect.bisect_left(keys, prefix) if prefix else 0
+        if prefix and index < len(keys) and keys[index] == prefix:
+            matches = [] if cursor else [prefix]
+            return {"files": self._describe(matches), "prefixes": [], "nextCursor": None}
+
+        scope = f"{prefix}/" if prefix else ""
+        start = bisect.bisect_left(keys, scope)
+        if cursor:
+            start = max(start, bisect.bisect_right(keys, cursor))
+        page: list[str] = []
+        position = start
+        while position < len(keys) and len(page) < limit and keys[position].startswith(scope):
+            page.append(keys[position])
+            position += 1
+        has_more = position < len(keys) and keys[position].startswith(scope)
+        return {
+            "files": self._describe(page),
+            "prefixes": [],
+            "nextCursor": page[-1] if has_more and page else None,
+        }
+
+    def _describe(self, keys: list[str]) -> list[dict]:
+        entries = []
+        for key in keys:
+            try:
+                file_stat = os.stat(self.root / key)
+            except OSError:
+                continue
+            entries.append(
+                {
+                    "key": key,
+                    "size": file_stat.st_size,
+                    "lastModified": _iso_timestamp(file_stat.st_mtime),
+                    "eTag": None,
+                }
+            )
+        return entries
+
+
+def runtime_file_index(root: Path) -> RuntimeFileIndex:
+    """Return the shared index for ``root``, keeping the most recently used roots."""
+    cache_key = str(root.resolve())
+    with _indexes_lock:
+        index = _indexes.get(cache_key)
+        if index is None:
+            index = RuntimeFileIndex(Path(cache_key))
+            _indexes[cache_key] = index
+        _indexes.move_to_end(cache_key)
+        while len(_indexes) > _MAX_CACHED_INDEXES:
+            _indexes.popitem(last=False)
+        return index
+
+
+def clear_runtime_file_indexes() -> None:
+    with _indexes_lock:
+        _indexes.clear()
@@ -0,0 +1,175 @@
+"""
+Bounded reads for the runtime file preview.
+
+Only the requested byte window or line page is read from disk, so previewing a
+large state file or plan output costs the size of the page, not of the file.
+"""
+
+from __future__ import annotations
+
+import base64
+import codecs
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+
+SNIFF_BYTES = 8192
+LINE_INDEX_STRIDE = 1000
+_READ_BLOCK_BYTES = 1024 * 1024
+_MAX_CACHED_LINE_INDEXES = 16
+
+_line_index_lock = RLock()
+_line_indexes: OrderedDict[tuple[str, int, int], tuple[list[int], int]] = OrderedDict()
+
+
+def is_binary_file(path: Path) -> bool:
+    """Classify a file from its first few KB: NUL bytes or invalid UTF-8 mean binary."""
+    with path.open("rb") as handle:
+        sniff = handle.read(SNIFF_BYTES)
+    if b"\0" in sniff:
+        return True
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sniff, final=False)
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def _decode_window(raw: bytes, at_start: bool, at_end: bool) -> tuple[str, int, int]:
+    """Decode a UTF-8 byte window, dropping characters split by the window edges.
+
+    Returns the text and how many bytes were dropped from each edge.
+    """
+    lead = 0
+    if not at_start:
+        while lead < min(3, len(raw)) and 0x80 <= raw[lead] <= 0xBF:
+            lead += 1
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    text = decoder.decode(raw[lead:], final=at_end)
+    pending = len(decoder.getstate()[0])
+    return text, lead, pending
+
+
+def read_file_window(path: Path, offset: int, length: int, binary: bool | None = None) -> dict:
+    """Read at most ``length`` bytes starting at ``offset``.
+
+    Text windows are trimmed to whole characters; ``offset`` and ``nextOffset``
+    in the result describe the bytes actually covered, so a client can request
+    the following window without gaps or overlap.
+    """
+    size = path.stat().st_size
+    offset = min(max(0, offset), size)
+    length = max(0, length)
+    if binary is None:
+        binary = is_binary_file(path)
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        raw = handle.read(length)
+    end = offset + len(raw)
+
+    if binary:
+        return {
+            "content": base64.b64encode(raw).decode("ascii"),
+            "encoding": "base64",
+            "offset": offset,
+            "length": len(raw),
+            "nextOffset": end if end < size else None,
+        }
+
+    text, lead, pending = _decode_window(raw, at_start=offset == 0, at_end=end >= size)
+    start = offset + lead
+    end -= pending
+    return {
+        "content": text,
+        "encoding": "utf-8",
+        "offset": start,
+        "length": end - start,
+        "nextOffset": end if end < size else None,
+    }
+
+
+def _line_index(path: Path) -> tuple[list[int], int]:
+    """Return byte offsets of every ``LINE_INDEX_STRIDE``-th line and the line count.
+
+    The index is built with one streaming pass and cached per (path, size, mtime).
+    """
+    file_stat = path.stat()
+    cache_key = (str(path), file_stat.st_size, file_stat.st_mtime_ns)
+    with _line_index_lock:
+        cached = _line_indexes.get(cache_key)
+        if cached is not None:
+            _line_indexes.move_to_end(cache_key)
+            return cached
+
+    checkpoints = [0]
+    line_count = 0
+    position = 0
+    last_byte = b""
+    with path.open("rb") as handle:
+        while block := handle.read(_READ_BLOCK_BYTES):
+            search_from = 0
+            while (newline := block.find(b"\n", search_from)) != -1:
+                line_count += 1
+                if line_count % LINE_INDEX_STRIDE == 0:
+                    checkpoints.append(position + newline + 1)
+                search_from = newline + 1
+            position += len(block)
+            last_byte = block[-1:]
+    if position and last_byte != b"\n":
+        line_count += 1
+
+    with _line_index_lock:
+        _line_indexes[cache_key] = (checkpoints, line_count)
+        while len(_line_indexes) > _MAX_CACHED_LINE_INDEXES:
+            _line_indexes.popitem(last=False)
+    return checkpoints, line_count
+
+
+def read_file_lines(path: Path, start_line: int, line_count: int, max_bytes: int) -> dict:
+    """Read ``line_count`` lines starting at zero-based ``start_line``.
+
+    Seeks to the nearest indexed checkpoint instead of scanning from the top, and
+    stops early once ``max_bytes`` of text has been collected. A single line longer
+    than ``max_bytes`` is cut and reported with ``truncated``.
+    """
+    checkpoints, total_lines = _line_index(path)
+    start_line = min(max(0, start_line), total_lines)
+    checkpoint = min(start_line // LINE_INDEX_STRIDE, len(checkpoints) - 1)
+
+    size = path.stat().st_size
+    lines: list[str] = []
+    collected = 0
+    truncated = False
+    with path.open("rb") as handle:
+        handle.seek(checkpoints[checkpoint])
+        for _ in range(start_line - checkpoint * LINE_INDEX_STRIDE):
+            handle.readline()
+        while len(lines) < max(0, line_count) and collected < max_bytes:
+            raw = handle.readline(max_bytes - collected)
+            if not raw:
+                break
+            complete = raw.endswith(b"\n") or handle.tell() >= size
+            if not complete and lines:
+                break
+            lines.append(raw.decode("utf-8", errors="replace"))
+            collected += len(raw)
+            if not complete:
+                truncated = True
+                break
+
+    next_line = start_line + len(lines)
+    return {
+        "content": "".join(lines),
+        "encoding": "utf-8",
+        "startLine": start_line,
+        "lineCount": len(lines),
+        "totalLines": total_lines,
+        "nextLine": next_line if next_line < total_lines else None,
+        "truncated": truncated,
+    }
+
+
+def clear_line_indexes() -> None:
+    with _line_index_lock:
+        _line_indexes.clear()
+
@@ -17,6 +17,9 @@ from urllib.request import Request, urlopen
 
 import jwt
 
+from agents.cancellation import run_process
+from agents.iac_tools import cached_terraform_init, remember_terraform_init
+from agents.plugin_cache import init_lock, terraform_env
 from utils.auth import get_github_app_credentials
 
 GITHUB_API = "https://api.github.com"
@@ -40,13 +43,8 @@ def _run_git(args: list[str], cwd: Path | None = None, timeout: int = 120) -> st
     if cwd is not None:
         command.extend(["-c", f"safe.directory={cwd}"])
     command.extend(args)
-    result = subprocess.run(
-        command,
-        cwd=str(cwd) if cwd else None,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-    )
+    # Registered for cancellation, so cancelSession stops a clone or fetch mid-action.
+    result = run_process(command, cwd=str(cwd) if cwd else None, timeout=timeout)
     if result.returncode != 0:
         detail = (result.stderr or result.stdout or "").strip()
         message = f"{' '.join(command)} failed with {result.returncode}: {detail}"
@@ -481,15 +479,15 @@ def _terraform_backend_args(state_backend: dict | None) -> list[str]:
     return args
 
 
-def _run_process(command: list[str], cwd: Path, timeout: int = 300) -> subprocess.CompletedProcess[str]:
-    completed = subprocess.run(
+def _run_process(
+    command: list[str], cwd: Path, timeout: int = 300, session_id: str | None = None
+) -> subprocess.CompletedProcess[str]:
+    completed = run_process(
         command,
         cwd=str(cwd),
-        env={**os.environ, "TF_INPUT": "0", "TOFU_INPUT": "0"},
-        capture_output=True,
-        check=False,
-        text=True,
+        env={**os.environ, **terraform_env(), "TF_INPUT": "0", "TOFU_INPUT": "0"},
         timeout=timeout,
+        session_id=session_id,
     )
     if completed.returncode != 0:
         output = (completed.stderr or completed.stdout or "").strip()
@@ -555,9 +553,15 @@ def generate_terraform_plan_graph(
         rover_zip_base = tmp_path / "rover"
         rover_zip = tmp_path / "rover.zip"
 
-        _run_process([terraform, "init", "-input=false", *_terraform_backend_args(state_backend)], workdir, timeout=300)
-        _run_process([terraform, "plan", "-input=false", "-no-color", "-out", str(plan_out)], workdir, timeout=420)
-        plan = json.loads(_run_process([terraform, "show", "-json", str(plan_out)], workdir, timeout=180).stdout)
+        init_args = [terraform, "init", "-input=false", *_terraform_backend_args(state_backend)]
+        if cached_terraform_init(workdir, init_args) is None:
+            with init_lock(workdir):
+                _run_process(init_args, workdir, timeout=300, session_id=session_id)
+            remember_terraform_init(workdir, init_args, {"ok": True, "cwd": str(workdir), "command": init_args})
+        plan_args = [terraform, "plan", "-input=false", "-no-color", "-out", str(plan_out)]
+        _run_process(plan_args, workdir, timeout=420, session_id=session_id)
+        show_args = [terraform, "show", "-json", str(plan_out)]
+        plan = json.loads(_run_process(show_args, workdir, timeout=180, session_id=session_id).stdout)
         plan_json.write_text(json.dumps(plan), encoding="utf-8")
         _run_process(
             [
@@ -573,6 +577,7 @@ def generate_terraform_plan_graph(
             ],
             workdir,
             timeout=240,
+            session_id=session_id,
         )
         if not rover_zip.exists():
             raise RuntimeError("Rover did not create the expected standalone graph bundle")
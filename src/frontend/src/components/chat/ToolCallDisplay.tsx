@@ -235,6 +235,8 @@ function progressPhaseLabel(phase: string) {
       return "Reasoning"
     case "completed":
       return "Done"
+    case "cache_hit":
+      return "Cached"
     default:
       return "Update"
   }
@@ -247,6 +249,7 @@ function progressPhaseClass(phase: string) {
     case "text":
       return "bg-sky-50 text-sky-700"
     case "completed":
+    case "cache_hit":
       return "bg-emerald-50 text-emerald-700"
     case "started":
     case "thinking":
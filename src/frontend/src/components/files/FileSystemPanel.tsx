@@ -52,10 +52,14 @@ type FileDiff = {
   currentContent: string
 }
 
+const MAX_LIST_PAGES = 10
+
 type SourceArchive = {
   filename: string
-  content: string
-  encoding: "base64"
+  content?: string
+  encoding?: "base64"
+  delivery?: "url" | "inline" | "chunks"
+  url?: string
   contentType?: string
   size?: number
   fileCount?: number
@@ -428,7 +432,17 @@ function workspacePrefixes(_sessionId?: string, _repository?: SelectedRepository
   return []
 }
 
-function downloadBase64Archive(archive: SourceArchive) {
+function downloadArchiveUrl(archive: SourceArchive & { url: string }) {
+  const link = document.createElement("a")
+  link.href = archive.url
+  link.download = archive.filename || "source.zip"
+  link.rel = "noopener"
+  document.body.appendChild(link)
+  link.click()
+  link.remove()
+}
+
+function downloadBase64Archive(archive: SourceArchive & { content: string }) {
   const binary = window.atob(archive.content)
   const bytes = new Uint8Array(binary.length)
   for (let index = 0; index < binary.length; index += 1) {
@@ -536,13 +550,20 @@ export function FileSystemPanel({
 
       if (options.showLoading) setIsRefreshing(true)
       try {
-        const response = await client.filesystemAction(
-          "listFiles",
-          sessionId,
-          accessToken,
-          repository
-        )
-        const entries = (((response as any)?.files ?? []) as FileEntry[])
+        const entries: FileEntry[] = []
+        let cursor: string | undefined
+        for (let page = 0; page < MAX_LIST_PAGES; page += 1) {
+          const response = await client.filesystemAction(
+            "listFiles",
+            sessionId,
+            accessToken,
+            repository,
+            { cursor }
+          )
+          entries.push(...(((response as any)?.files ?? []) as FileEntry[]))
+          cursor = (response as any)?.nextCursor || undefined
+          if (!cursor) break
+        }
         setEvents(prev => mergeFileEvents(prev, entries.map(eventFromEntry)))
         setError(null)
         setStatus("connected")
@@ -710,8 +731,13 @@ export function FileSystemPanel({
         repository
       )
       const archive = (response as any)?.archive as SourceArchive | undefined
-      if (!archive?.content) throw new Error("Source archive was empty")
-      downloadBase64Archive(archive)
+      if (archive?.url) {
+        downloadArchiveUrl({ ...archive, url: archive.url })
+      } else if (archive?.content) {
+        downloadBase64Archive({ ...archive, content: archive.content })
+      } else {
+        throw new Error("Source archive was empty")
+      }
       setError(null)
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to download source ZIP")
@@ -32,6 +32,7 @@ import type { ChatSession } from "@/components/chat/types"
 import { useRunningSessions } from "@/components/chat/running-sessions"
 import { hasFirstAgentResponse } from "@/components/chat/session-utils"
 import { useAuth } from "@/hooks/useAuth"
+import { AgentCoreClient } from "@/lib/agentcore-client"
 import { cn } from "@/lib/utils"
 import { useWebAppStore } from "@/stores/webAppStore"
 
@@ -57,6 +58,18 @@ function chatMetadata(session: ChatSession) {
   ].filter(Boolean).join(" · ")
 }
 
+async function releaseSessionAttachments(sessionId: string, accessToken: string) {
+  const response = await fetch("/aws-exports.json")
+  if (!response.ok) throw new Error("Failed to load frontend configuration")
+  const config = await response.json()
+  if (!config.agentRuntimeArn) throw new Error("Agent Runtime ARN not found in configuration")
+  const client = new AgentCoreClient({
+    runtimeArn: config.agentRuntimeArn,
+    region: config.awsRegion || "ap-southeast-1",
+  })
+  await client.releaseSessionAttachments(sessionId, accessToken)
+}
+
 function sessionTime(session: ChatSession) {
   const time = Date.parse(session.endDate || session.startDate || "")
   return Number.isNaN(time) ? 0 : time
@@ -123,6 +136,13 @@ export function AppSidebar({ collapsed = false, onCollapsedChange }: AppSidebarP
     const idToken = auth.user?.id_token
     if (!idToken) return
     void deleteChatSession(sessionId, idToken)
+    // Drop the session's references to attachments stored on the runtime's shared mount.
+    const accessToken = auth.user?.access_token
+    if (accessToken) {
+      void releaseSessionAttachments(sessionId, accessToken).catch(err => {
+        console.warn("Failed to release AgentCore session attachments:", err)
+      })
+    }
     if (activeSessionId === sessionId) {
       navigate("/")
     }
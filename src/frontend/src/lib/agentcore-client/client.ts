@@ -68,6 +68,14 @@ export class AgentCoreClient {
   }
 
   async cancelSession(sessionId: string, accessToken: string): Promise<void> {
+    await this.controlAction("cancelSession", sessionId, accessToken)
+  }
+
+  async releaseSessionAttachments(sessionId: string, accessToken: string): Promise<void> {
+    await this.controlAction("releaseSessionAttachments", sessionId, accessToken)
+  }
+
+  private async controlAction(action: string, sessionId: string, accessToken: string): Promise<void> {
     if (!accessToken) throw new Error("No valid access token found.")
     if (!this.runtimeArn) throw new Error("Agent Runtime ARN not configured.")
 
@@ -85,9 +93,9 @@ export class AgentCoreClient {
         "X-Amzn-Bedrock-AgentCore-Runtime-Session-Id": sessionId,
       },
       body: JSON.stringify({
-        prompt: "cancelSession",
+        prompt: action,
         runtimeSessionId: sessionId,
-        controlAction: "cancelSession",
+        controlAction: action,
       }),
     })
 
@@ -167,7 +175,17 @@ export class AgentCoreClient {
     sessionId: string,
     accessToken: string,
     repository?: SelectedRepository | null,
-    options?: { prefix?: string; fileKey?: string }
+    options?: {
+      prefix?: string
+      fileKey?: string
+      cursor?: string
+      limit?: number
+      delimiter?: string
+      offset?: number
+      length?: number
+      startLine?: number
+      lineCount?: number
+    }
   ): Promise<unknown> {
     if (!accessToken) throw new Error("No valid access token found.")
     if (!this.runtimeArn) throw new Error("Agent Runtime ARN not configured.")
@@ -192,6 +210,13 @@ export class AgentCoreClient {
         repository: repository ?? undefined,
         prefix: options?.prefix,
         fileKey: options?.fileKey,
+        cursor: options?.cursor,
+        limit: options?.limit,
+        delimiter: options?.delimiter,
+        offset: options?.offset,
+        length: options?.length,
+        startLine: options?.startLine,
+        lineCount: options?.lineCount,
       }),
     })
 
@@ -208,6 +233,16 @@ export class AgentCoreClient {
     if (parsed && typeof parsed === "object" && "status" in parsed && parsed.status === "error") {
       throw new Error(parsed.error || `${action} failed`)
     }
+    if (parsed?.archive?.delivery === "chunks") {
+      // Large archives arrive as ordered base64 chunks ahead of the final summary event.
+      parsed.archive.content = lines
+        .slice(0, -1)
+        .map(line => JSON.parse(line.replace(/^data:\s*/, "")))
+        .filter(event => event && typeof event === "object" && "archiveChunk" in event)
+        .sort((a, b) => a.archiveChunk.index - b.archiveChunk.index)
+        .map(event => event.archiveChunk.content)
+        .join("")
+    }
     return parsed
   }
 }
@@ -120,7 +120,11 @@ export const parseStrandsChunk: ChunkParser = (line, callback) => {
 
     // Lifecycle events
     if (typeof json.lifecycle === "string") {
-      callback({ type: "lifecycle", event: json.lifecycle })
+      callback(
+        json.timings === undefined
+          ? { type: "lifecycle", event: json.lifecycle }
+          : { type: "lifecycle", event: json.lifecycle, timings: json.timings }
+      )
       return
     }
 
@@ -51,7 +51,7 @@ export type StreamEvent =
   | { type: "tool_result"; toolUseId: string; result: string }
   | { type: "message"; role: string; content: unknown[] }
   | { type: "result"; stopReason: string }
-  | { type: "lifecycle"; event: string }
+  | { type: "lifecycle"; event: string; timings?: unknown }
   | { type: "pull_request"; pullRequest: unknown }
   | { type: "session_title"; title: string }
   | { type: "user_handoff"; handoff: UserHandoffPayload }
@@ -6,6 +6,12 @@ import { AppSidebar } from "@/components/layout/AppSidebar"
 import { useWebAppStore } from "@/stores/webAppStore"
 import { reconcileRunningSessions, registerRunningSession, unregisterRunningSession } from "@/components/chat/running-sessions"
 
+const authUser = vi.hoisted((): Record<string, unknown> => ({
+  id_token: "id-token",
+  profile: { email: "user@example.com" },
+}))
+const releaseSessionAttachments = vi.hoisted(() => vi.fn(async () => undefined))
+
 vi.mock("@/stores/webAppStore", async () => {
   const { create } = await vi.importActual<typeof import("zustand")>("zustand")
   const useWebAppStore = create<any>((set, get) => ({
@@ -89,10 +95,7 @@ vi.mock("@/hooks/useAuth", () => ({
   useAuth: () => ({
     isAuthenticated: true,
     signOut: vi.fn(),
-    user: {
-      id_token: "id-token",
-      profile: { email: "user@example.com" },
-    },
+    user: authUser,
   }),
 }))
 
@@ -109,6 +112,7 @@ vi.mock("@/lib/agentcore-client", () => ({
     return {
       githubAction: vi.fn(async () => ({ repositories: [] })),
       cancelSession: vi.fn(async () => undefined),
+      releaseSessionAttachments,
       invoke: vi.fn(),
     }
   }),
@@ -142,6 +146,8 @@ const answeredHistory = [
 
 describe("New Chat from sidebar", () => {
   beforeEach(() => {
+    delete authUser.access_token
+    releaseSessionAttachments.mockClear()
     reconcileRunningSessions([])
     unregisterRunningSession("repo-session")
     unregisterRunningSession("empty-new-chat")
@@ -486,6 +492,7 @@ describe("New Chat from sidebar", () => {
   })
 
   it("deletes a chat from the sidebar without recreating it", async () => {
+    authUser.access_token = "access-token"
     useWebAppStore.setState({
       sessions: [
         {
@@ -533,6 +540,9 @@ describe("New Chat from sidebar", () => {
     expect(screen.queryByText("Old chat")).not.toBeInTheDocument()
     expect(useWebAppStore.getState().activeSessionId).toBe("active-session")
     expect(useWebAppStore.getState().deleteChatSession).toHaveBeenCalledWith("old-session", "id-token")
+    await waitFor(() => {
+      expect(releaseSessionAttachments).toHaveBeenCalledWith("old-session", "access-token")
+    })
   })
 
   it("shows a chat action menu for pinning and renaming recents", async () => {
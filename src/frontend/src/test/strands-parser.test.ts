@@ -87,4 +87,12 @@ describe("parseStrandsChunk", () => {
 
     expect(events).toEqual([{ type: "lifecycle", event: "checkpoint_saved" }])
   })
+
+  it("passes phase timings through on the timings lifecycle event", () => {
+    const events: StreamEvent[] = []
+    const timings = { totalMs: 1200, phases: { model: { ms: 900, count: 2 } }, marks: {} }
+    parseStrandsChunk(`data: ${JSON.stringify({ lifecycle: "timings", timings })}`, event => events.push(event))
+
+    expect(events).toEqual([{ type: "lifecycle", event: "timings", timings }])
+  })
 })
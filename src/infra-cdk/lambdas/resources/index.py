@@ -951,7 +951,6 @@ def _sanitize_message(
     *,
     user_id: str = "",
     session_id: str = "",
-    message_index: int = 0,
 ) -> dict[str, Any]:
     if not isinstance(message, dict):
         raise ValueError("message must be an object")
@@ -987,14 +986,8 @@ def _sanitize_message(
         sanitized_attachments = [
             attachment
             for attachment in (
-                _sanitize_chat_attachment(
-                    attachment,
-                    user_id=user_id,
-                    session_id=session_id,
-                    message_index=message_index,
-                    attachment_index=attachment_index,
-                )
-                for attachment_index, attachment in enumerate(attachments[:6])
+                _sanitize_chat_attachment(attachment, user_id=user_id, session_id=session_id)
+                for attachment in attachments[:6]
             )
             if attachment
         ]
@@ -1018,22 +1011,13 @@ def _safe_chat_attachment_key_part(value: str, fallback: str) -> str:
     return (cleaned or fallback)[:120]
 
 
-def _chat_attachment_object_key(
-    *,
-    user_id: str,
-    session_id: str,
-    message_index: int,
-    attachment_id: str,
-    name: str,
-) -> str:
+def _chat_attachment_object_key(*, user_id: str, digest: str) -> str:
     user_hash = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:24]
-    safe_session_id = _safe_chat_attachment_key_part(session_id, "session")
-    safe_attachment_id = _safe_chat_attachment_key_part(attachment_id, "attachment")
-    safe_name = _safe_chat_attachment_key_part(name, "attachment")
-    return (
-        f"chat-attachments/{user_hash}/{safe_session_id}/"
-        f"message-{message_index:03d}/{safe_attachment_id}-{safe_name}"
-    )
+    return f"chat-attachments/{user_hash}/sha256/{digest}"
+
+
+def _chat_attachment_index_key(user_id: str, digest: str) -> dict[str, str]:
+    return {"pk": user_id, "sk": f"ATTACHMENT#{digest}"}
 
 
 def _store_chat_attachment_data(
@@ -1042,22 +1026,46 @@ def _store_chat_attachment_data(
     content_type: str,
     user_id: str,
     session_id: str,
-    message_index: int,
-    attachment_id: str,
     name: str,
 ) -> tuple[str, int] | None:
+    """Store attachment bytes once per user under their SHA-256 digest.
+
+    An ``ATTACHMENT#<digest>`` item records the object key and the set of
+    sessions referencing it. The object is uploaded only when that item is new,
+    so re-saving a session that still carries the same dataUrl skips the upload.
+    """
     if not CHAT_ATTACHMENT_BUCKET or not user_id or not session_id:
         return None
     content = _decode_chat_attachment_data_url(data_url)
     if content is None or len(content) > 4 * 1024 * 1024:
         return None
-    object_key = _chat_attachment_object_key(
-        user_id=user_id,
-        session_id=session_id,
-        message_index=message_index,
-        attachment_id=attachment_id,
-        name=name,
-    )
+    digest = hashlib.sha256(content).hexdigest()
+    object_key = _chat_attachment_object_key(user_id=user_id, digest=digest)
+    index_key = _chat_attachment_index_key(user_id, digest)
+    try:
+        previous = table.update_item(
+            Key=index_key,
+            UpdateExpression=(
+                "ADD #sessions :session "
+                "SET #type = :type, objectKey = :objectKey, #size = :size, "
+                "contentType = :contentType, #name = :name, updatedAt = :now"
+            ),
+            ExpressionAttributeNames={"#sessions": "sessions", "#type": "type", "#size": "size", "#name": "name"},
+            ExpressionAttributeValues={
+                ":session": {session_id},
+                ":type": "chatAttachment",
+                ":objectKey": object_key,
+                ":size": len(content),
+                ":contentType": content_type,
+                ":name": name[:240],
+                ":now": _now(),
+            },
+            ReturnValues="ALL_OLD",
+        ).get("Attributes") or {}
+    except Exception:
+        return None
+    if previous.get("objectKey") == object_key:
+        return object_key, len(content)
     try:
         s3.put_object(
             Bucket=CHAT_ATTACHMENT_BUCKET,
@@ -1066,17 +1074,94 @@ def _store_chat_attachment_data(
             ContentType=content_type,
         )
     except Exception:
+        _drop_failed_chat_attachment(index_key, session_id)
         return None
     return object_key, len(content)
 
 
+def _drop_failed_chat_attachment(index_key: dict[str, str], session_id: str) -> None:
+    """Undo this session's reference after a failed upload.
+
+    Other sessions may have referenced the digest in the meantime, so only this
+    session is removed. ``objectKey`` is cleared so that the next save of any
+    referencing session uploads the object again; the item itself is deleted
+    only when no references remain.
+    """
+    try:
+        remaining = (
+            table.update_item(
+                Key=index_key,
+                UpdateExpression="DELETE #sessions :session REMOVE objectKey",
+                ExpressionAttributeNames={"#sessions": "sessions"},
+                ExpressionAttributeValues={":session": {session_id}},
+                ReturnValues="ALL_NEW",
+            )
+            .get("Attributes", {})
+            .get("sessions")
+        )
+        if not remaining:
+            table.delete_item(
+                Key=index_key,
+                ConditionExpression="attribute_not_exists(#sessions)",
+                ExpressionAttributeNames={"#sessions": "sessions"},
+            )
+    except Exception:
+        pass
+
+
+def _release_chat_attachments(user_id: str, session_id: str) -> dict[str, int]:
+    """Drop ``session_id`` from attachment references and delete unreferenced objects."""
+    if not CHAT_ATTACHMENT_BUCKET:
+        return {"released": 0, "deleted": 0}
+    released = 0
+    deleted = 0
+    params: dict[str, Any] = {
+        "KeyConditionExpression": "pk = :pk AND begins_with(sk, :prefix)",
+        "FilterExpression": "contains(#sessions, :session)",
+        "ExpressionAttributeNames": {"#sessions": "sessions"},
+        "ExpressionAttributeValues": {":pk": user_id, ":prefix": "ATTACHMENT#", ":session": session_id},
+    }
+    while True:
+        response = table.query(**params)
+        for item in response.get("Items", []):
+            key = {"pk": item["pk"], "sk": item["sk"]}
+            remaining = (
+                table.update_item(
+                    Key=key,
+                    UpdateExpression="DELETE #sessions :session",
+                    ExpressionAttributeNames={"#sessions": "sessions"},
+                    ExpressionAttributeValues={":session": {session_id}},
+                    ReturnValues="ALL_NEW",
+                )
+                .get("Attributes", {})
+                .get("sessions")
+            )
+            released += 1
+            if remaining:
+                continue
+            try:
+                table.delete_item(
+                    Key=key,
+                    ConditionExpression="attribute_not_exists(#sessions)",
+                    ExpressionAttributeNames={"#sessions": "sessions"},
+                )
+            except ClientError as exc:
+                if exc.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                    continue
+                raise
+            s3.delete_object(Bucket=CHAT_ATTACHMENT_BUCKET, Key=item["objectKey"])
+            deleted += 1
+        if not response.get("LastEvaluatedKey"):
+            break
+        params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return {"released": released, "deleted": deleted}
+
+
 def _sanitize_chat_attachment(
     attachment: Any,
     *,
     user_id: str = "",
     session_id: str = "",
-    message_index: int = 0,
-    attachment_index: int = 0,
 ) -> dict[str, Any] | None:
     if not isinstance(attachment, dict):
         return None
@@ -1105,8 +1190,6 @@ def _sanitize_chat_attachment(
             content_type=content_type,
             user_id=user_id,
             session_id=session_id,
-            message_index=message_index,
-            attachment_id=attachment_id or f"attachment-{attachment_index}",
             name=name,
         )
         if stored:
@@ -1260,8 +1343,8 @@ def _sanitize_chat_session(session: Any, user_id: str = "") -> dict[str, Any]:
         "id": session_id,
         "name": name,
         "history": [
-            _sanitize_message(message, user_id=user_id, session_id=session_id, message_index=index)
-            for index, message in enumerate(history[-80:])
+            _sanitize_message(message, user_id=user_id, session_id=session_id)
+            for message in history[-80:]
         ],
         "startDate": str(session.get("startDate") or _now()),
         "endDate": str(session.get("endDate") or _now()),
@@ -1312,10 +1395,14 @@ def _save_chat_sessions(user_id: str, payload: dict[str, Any]) -> dict[str, Any]
                     "updatedAt": timestamp,
                 }
             )
+        removed_ids = []
         for session in existing:
             session_id = str(session.get("sessionId") or session.get("id") or "")
             if session_id not in incoming_ids:
                 batch.delete_item(Key={"pk": user_id, "sk": session["sk"]})
+                removed_ids.append(session_id)
+    for session_id in removed_ids:
+        _release_chat_attachments(user_id, session_id)
     active_session_id = str(payload.get("activeSessionId") or "").strip()
     if active_session_id:
         _save_user_config(user_id, {"key": "activeChatSessionId", "value": active_session_id})
@@ -1385,9 +1472,11 @@ def _delete_chat_session(user_id: str, session_id_value: Any) -> dict[str, Any]:
             },
         )
     agentcore_cleanup = _delete_agentcore_session_events(user_id, session_id)
+    attachment_cleanup = _release_chat_attachments(user_id, session_id)
     result = _list_chat_sessions(user_id)
     result["deletedSessionId"] = session_id
     result["agentcoreCleanup"] = agentcore_cleanup
+    result["attachmentCleanup"] = attachment_cleanup
     return result
 
 
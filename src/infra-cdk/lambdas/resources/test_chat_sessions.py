@@ -1,3 +1,4 @@
+import hashlib
 from io import BytesIO
 from test_pull_requests import load_index_module
 from unittest import TestCase, main
@@ -83,6 +84,8 @@ class ChatSessionPersistenceTests(TestCase):
         data_url = "data:text/plain;base64,aGVsbG8="
         self.module.CHAT_ATTACHMENT_BUCKET = "chat-attachment-bucket"
         self.module.s3 = Mock()
+        self.module.table = Mock()
+        self.module.table.update_item.return_value = {}
 
         result = self.module._sanitize_chat_session(
             {
@@ -118,6 +121,79 @@ class ChatSessionPersistenceTests(TestCase):
         self.assertEqual(attachment["size"], 5)
         self.module.s3.put_object.assert_called_once()
         self.assertEqual(self.module.s3.put_object.call_args.kwargs["Body"], b"hello")
+        self.assertTrue(attachment["dataKey"].endswith("/sha256/" + hashlib.sha256(b"hello").hexdigest()))
+        index_update = self.module.table.update_item.call_args.kwargs
+        self.assertEqual(index_update["Key"]["sk"], "ATTACHMENT#" + hashlib.sha256(b"hello").hexdigest())
+        self.assertEqual(index_update["ExpressionAttributeValues"][":session"], {"session-1"})
+
+    def test_resaved_attachment_with_known_digest_is_not_uploaded_again(self):
+        self.module.CHAT_ATTACHMENT_BUCKET = "chat-attachment-bucket"
+        self.module.s3 = Mock()
+        self.module.table = Mock()
+        object_key = self.module._chat_attachment_object_key(
+            user_id="user-1",
+            digest=hashlib.sha256(b"hello").hexdigest(),
+        )
+        self.module.table.update_item.return_value = {"Attributes": {"objectKey": object_key}}
+
+        stored = self.module._store_chat_attachment_data(
+            "data:text/plain;base64,aGVsbG8=",
+            content_type="text/plain",
+            user_id="user-1",
+            session_id="session-2",
+            name="notes.txt",
+        )
+
+        self.assertEqual(stored, (object_key, 5))
+        self.module.s3.put_object.assert_not_called()
+
+    def test_failed_upload_keeps_references_added_by_other_sessions(self):
+        self.module.CHAT_ATTACHMENT_BUCKET = "chat-attachment-bucket"
+        self.module.s3 = Mock()
+        self.module.s3.put_object.side_effect = RuntimeError("upload failed")
+        self.module.table = Mock()
+        self.module.table.update_item.side_effect = [
+            {"Attributes": {}},
+            {"Attributes": {"sessions": {"session-2"}}},
+        ]
+
+        stored = self.module._store_chat_attachment_data(
+            "data:text/plain;base64,aGVsbG8=",
+            content_type="text/plain",
+            user_id="user-1",
+            session_id="session-1",
+            name="notes.txt",
+        )
+
+        self.assertIsNone(stored)
+        rollback = self.module.table.update_item.call_args.kwargs
+        self.assertEqual(rollback["UpdateExpression"], "DELETE #sessions :session REMOVE objectKey")
+        self.assertEqual(rollback["ExpressionAttributeValues"][":session"], {"session-1"})
+        self.module.table.delete_item.assert_not_called()
+
+    def test_release_deletes_attachment_only_when_last_session_is_gone(self):
+        self.module.CHAT_ATTACHMENT_BUCKET = "chat-attachment-bucket"
+        self.module.s3 = Mock()
+        self.module.table = Mock()
+        self.module.table.query.return_value = {
+            "Items": [
+                {"pk": "user-1", "sk": "ATTACHMENT#shared", "objectKey": "chat-attachments/u/sha256/shared"},
+                {"pk": "user-1", "sk": "ATTACHMENT#single", "objectKey": "chat-attachments/u/sha256/single"},
+            ]
+        }
+        self.module.table.update_item.side_effect = [
+            {"Attributes": {"sessions": {"session-2"}}},
+            {"Attributes": {}},
+        ]
+
+        result = self.module._release_chat_attachments("user-1", "session-1")
+
+        self.assertEqual(result, {"released": 2, "deleted": 1})
+        self.module.table.delete_item.assert_called_once()
+        self.module.s3.delete_object.assert_called_once_with(
+            Bucket="chat-attachment-bucket",
+            Key="chat-attachments/u/sha256/single",
+        )
 
     def test_list_chat_sessions_rehydrates_s3_attachment_data(self):
         self.module.CHAT_ATTACHMENT_BUCKET = "chat-attachment-bucket"
@@ -385,6 +385,14 @@ export class BackendStack extends cdk.NestedStack {
       })
     )
 
+    // Model IDs per agent tier. Kept in SSM so tiers can be retuned without redeploying the runtime.
+    const modelTiersParameterName = `/${config.stack_name_base}/model_tiers`
+    new ssm.StringParameter(this, "ModelTiersParam", {
+      parameterName: modelTiersParameterName,
+      stringValue: JSON.stringify(config.backend.openai?.model_tiers || {}),
+      description: "JSON map of agent model tier to OpenAI-compatible model ID",
+    })
+
     // Environment variables for the runtime
     const envVars: { [key: string]: string } = {
       AWS_REGION: stack.region,
@@ -395,6 +403,7 @@ export class BackendStack extends cdk.NestedStack {
       OPENAI_CREDENTIAL_PROVIDER_NAME: `${config.stack_name_base}-openai-credentials`, // Used by @requires_api_key decorator to look up OpenAI credentials
       OPENAI_BASE_URL: config.backend.openai?.base_url || "https://api.openai.com/v1",
       OPENAI_MODEL_ID: config.backend.openai?.model_id || "gpt-4o",
+      OPENAI_MODEL_TIERS_PARAMETER: modelTiersParameterName,
       GITHUB_CREDENTIAL_PROVIDER_NAME:
         config.backend.github?.credential_provider_name || `${config.stack_name_base}-github-app`,
       GITHUB_APP_ID: config.backend.github?.app_id || "",
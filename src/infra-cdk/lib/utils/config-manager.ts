@@ -46,6 +46,8 @@ export interface OpenAIConfig {
   base_url: string
   /** OpenAI model ID to use. Defaults to gpt-4o */
   model_id: string
+  /** Model IDs per agent model tier, for example { fast: "gpt-4o-mini" }. Unlisted tiers use model_id. */
+  model_tiers: Record<string, string>
 }
 
 export interface GitHubConfig {
@@ -178,6 +180,22 @@ export class ConfigManager {
     return normalized
   }
 
+  private _modelTiers(value: unknown, configPath: string): Record<string, string> {
+    if (value === undefined || value === null) return {}
+    if (typeof value !== "object" || Array.isArray(value)) {
+      throw new Error(`Invalid backend.openai.model_tiers in ${configPath}. Expected a map of tier name to model ID.`)
+    }
+
+    const tiers: Record<string, string> = {}
+    for (const [tier, modelId] of Object.entries(value)) {
+      if (typeof modelId !== "string" || !modelId.trim()) {
+        throw new Error(`Invalid model ID for tier '${tier}' in backend.openai.model_tiers of ${configPath}.`)
+      }
+      tiers[tier] = modelId.trim()
+    }
+    return tiers
+  }
+
   private _loadConfig(configFile: string): AppConfig {
     let configPath: string
 
@@ -271,10 +289,12 @@ export class ConfigManager {
                   this.env.OPENAI_MODEL_ID ||
                   parsedConfig.backend.openai.model_id ||
                   "gpt-4o",
+                model_tiers: this._modelTiers(parsedConfig.backend.openai.model_tiers, configPath),
               }
             : {
                 base_url: this.env.OPENAI_BASE_URL || "https://api.openai.com/v1",
                 model_id: this.env.OPENAI_MODEL_ID || "gpt-4o",
+                model_tiers: {},
               },
           github: {
             app_slug: this.env.GITHUB_APP_SLUG || parsedConfig.backend?.github?.app_slug || "",